@@ -0,0 +1 @@
+# Este archivo vacío convierte al directorio 'benchmarks' en un paquete de Python.
@@ -0,0 +1,329 @@
+# benchmarks/suite.py
+"""
+Suite de rendimiento de la simulación, el análisis y los gráficos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.suite medir --salida benchmarks/linea_base.json
+    python -m benchmarks.suite medir --rapido --salida /tmp/actual.json
+    python -m benchmarks.suite comparar benchmarks/linea_base.json /tmp/actual.json --umbral 0.2
+
+Cada caso corre en un proceso hijo para que el pico de memoria (RSS) sea el de ese caso y no
+el acumulado de la suite. Los tiempos son el mínimo de varias repeticiones.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: sin medición de RSS
+    resource = None
+
+# Días simulados por caso: las corridas no llegan a terminar la campaña, así el costo crece
+# con la población y no con el tiempo hasta la parada temprana
+DIAS_POR_CASO = 5
+POBLACIONES = (10_000, 100_000, 1_000_000, 10_000_000)
+CABINAS = (5, 17)
+# El modelo SimPy es demasiado lento para las poblaciones grandes
+POBLACION_MAXIMA_SIMPY = 100_000
+POBLACION_MAXIMA_RAPIDO = 100_000
+# Población del caso sobre el que se miden análisis, escritura y gráficos
+POBLACION_ETAPAS = 1_000_000
+POBLACION_ETAPAS_RAPIDO = 100_000
+UMBRAL_REGRESION = 0.20
+# Diferencias menores a esto no cuentan como regresión: en casos de milisegundos son ruido
+TOLERANCIA_SEGUNDOS = 0.05
+# Red sintética de centros (ver src/red_centros.py): centros y población total. Se mide con un
+# proceso y con todos los núcleos; la razón entre los dos es la aceleración del reparto
+RED_SINTETICA = (100, 10_000_000)
+RED_SINTETICA_RAPIDO = (20, 1_000_000)
+# Arranques medidos en un intérprete nuevo: comando y presupuesto de tiempo en segundos.
+# "trabajador" es lo que importa un proceso del pool para una corrida sin gráficos.
+ARRANQUES = {
+    "importacion.main_help": (["-m", "src.main", "--help"], 0.3),
+    "importacion.trabajador": (["-c", "import src.main, src.simulation, src.analysis, src.almacenamiento"], 1.5),
+}
+
+
+def _rss_pico_mb() -> float:
+    """Pico de memoria residente del proceso actual en MB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _config_caso(poblacion: int, num_cabinas: int) -> dict:
+    from src.config import ConfiguracionSimulacion
+    return dict(ConfiguracionSimulacion.ESCENARIO_BASE, poblacion_total=poblacion, num_cabinas=num_cabinas)
+
+
+def _medir_simulacion(poblacion: int, num_cabinas: int, motor: str, repeticiones: int) -> dict:
+    """Ejecuta `ejecutar_simulacion` y mide tiempo, eventos por segundo y pico de memoria."""
+    from src.simulation import ejecutar_simulacion
+    config = _config_caso(poblacion, num_cabinas)
+    tiempos = []
+    for repeticion in range(repeticiones):
+        inicio = time.perf_counter()
+        resultados_df = ejecutar_simulacion(config, DIAS_POR_CASO, motor=motor, semilla=repeticion)
+        tiempos.append(time.perf_counter() - inicio)
+        eventos = len(resultados_df)
+        del resultados_df
+    segundos = min(tiempos)
+    return {
+        "segundos": segundos,
+        "eventos": eventos,
+        "eventos_por_segundo": eventos / segundos if segundos > 0 else None,
+        "rss_pico_mb": _rss_pico_mb(),
+    }
+
+
+def _medir_etapas(poblacion: int, repeticiones: int) -> dict:
+    """
+    Sobre los eventos de una corrida, mide `calcular_metricas_principales`, la escritura en CSV
+    y en Parquet y `generar_visualizaciones_escenario`.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    from src.simulation import ejecutar_simulacion
+    from src.analysis import calcular_metricas_principales
+    from src.almacenamiento import guardar_resultados
+    from src.visualization import generar_visualizaciones_escenario
+
+    config = _config_caso(poblacion, 5)
+    resultados_df = ejecutar_simulacion(config, DIAS_POR_CASO, motor="vectorizado", semilla=0)
+    etapas = {
+        "analisis": lambda carpeta: calcular_metricas_principales(resultados_df, config, DIAS_POR_CASO),
+        "escritura_csv": lambda carpeta: guardar_resultados(resultados_df, carpeta, "benchmark", formato="csv"),
+        "escritura_parquet": lambda carpeta: guardar_resultados(resultados_df, carpeta, "benchmark", formato="parquet"),
+        "graficos": lambda carpeta: generar_visualizaciones_escenario(resultados_df, carpeta, config),
+    }
+    resultados = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, etapa in etapas.items():
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                etapa(carpeta)
+                tiempos.append(time.perf_counter() - inicio)
+            resultados[nombre] = {
+                "segundos": min(tiempos),
+                "eventos": len(resultados_df),
+                "eventos_por_segundo": len(resultados_df) / min(tiempos) if min(tiempos) > 0 else None,
+            }
+    return resultados
+
+
+def _medir_red(num_centros: int, poblacion: int, procesos: int, repeticiones: int) -> dict:
+    """Ejecuta `ejecutar_red` sobre una red sintética y mide el tiempo de reloj."""
+    from src.red_centros import crear_red_sintetica, ejecutar_red
+    red = crear_red_sintetica(num_centros, poblacion)
+    tiempos = []
+    for repeticion in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = ejecutar_red(red, DIAS_POR_CASO, semilla=repeticion, procesos=procesos)
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "segundos": min(tiempos),
+        "procesos": procesos,
+        # Sin RSS: los centros corren en procesos hijos y el del proceso que mide no dice nada
+        "vacunados": resultado["red"]["generales"]["total_vacunados"],
+    }
+
+
+def _medir_arranque(argumentos: list, repeticiones: int) -> float:
+    """Tiempo mínimo de reloj de `python <argumentos>` en un intérprete nuevo."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, *argumentos], check=True, capture_output=True)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def _medir_y_enviar(conexion, funcion, argumentos):
+    """Cuerpo del proceso de medición: manda por `conexion` el resultado o la excepción."""
+    try:
+        conexion.send((True, funcion(*argumentos)))
+    except BaseException as error:
+        conexion.send((False, error))
+    finally:
+        conexion.close()
+
+
+def _ejecutar_en_proceso(funcion, *argumentos):
+    """
+    Corre una medición en un proceso nuevo (spawn) y devuelve su resultado. El proceso no es
+    demonio (a diferencia de los de un Pool), así la medición puede abrir su propio pool, como
+    `ejecutar_red` con varios procesos.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    receptor, emisor = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_medir_y_enviar, args=(emisor, funcion, argumentos))
+    proceso.start()
+    emisor.close()
+    try:
+        exito, resultado = receptor.recv()
+    except EOFError:
+        proceso.join()
+        raise RuntimeError(f"El proceso de medición terminó sin resultado (código {proceso.exitcode}).")
+    finally:
+        receptor.close()
+    proceso.join()
+    if not exito:
+        raise resultado
+    return resultado
+
+
+def definir_casos(rapido: bool = False) -> list:
+    """Lista de casos de simulación: (nombre, población, cabinas, motor)."""
+    poblacion_maxima = POBLACION_MAXIMA_RAPIDO if rapido else max(POBLACIONES)
+    casos = []
+    for motor in ("vectorizado", "simpy"):
+        for poblacion in POBLACIONES:
+            if poblacion > poblacion_maxima or (motor == "simpy" and poblacion > POBLACION_MAXIMA_SIMPY):
+                continue
+            for num_cabinas in CABINAS:
+                casos.append((f"simulacion.{motor}.pob_{poblacion}.cabinas_{num_cabinas}", poblacion, num_cabinas, motor))
+    return casos
+
+
+def _metadatos() -> dict:
+    import numpy
+    import pandas
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "plataforma": platform.platform(),
+        "nucleos": os.cpu_count(),
+        "dias_por_caso": DIAS_POR_CASO,
+    }
+
+
+def medir(rapido: bool = False, repeticiones: int = 3) -> dict:
+    """Ejecuta toda la suite y devuelve el diccionario que se guarda como línea base."""
+    casos = {}
+    for nombre, poblacion, num_cabinas, motor in definir_casos(rapido):
+        # Las corridas más pesadas se repiten una sola vez
+        repeticiones_caso = repeticiones if poblacion <= POBLACION_MAXIMA_SIMPY else 1
+        print(f"Midiendo {nombre}...")
+        casos[nombre] = _ejecutar_en_proceso(_medir_simulacion, poblacion, num_cabinas, motor, repeticiones_caso)
+        print(f"  {casos[nombre]['segundos']:.3f} s, {casos[nombre]['eventos_por_segundo'] or 0:,.0f} eventos/s, "
+              f"RSS pico {casos[nombre]['rss_pico_mb'] or 0:,.0f} MB")
+
+    print("Midiendo tiempos de arranque...")
+    for nombre, (argumentos, presupuesto) in ARRANQUES.items():
+        segundos = _medir_arranque(argumentos, max(repeticiones, 5))
+        casos[nombre] = {"segundos": segundos, "presupuesto_segundos": presupuesto}
+        excedido = "  <-- EXCEDE EL PRESUPUESTO" if segundos > presupuesto else ""
+        print(f"  {nombre}: {segundos:.3f} s (presupuesto {presupuesto:.1f} s){excedido}")
+
+    num_centros, poblacion_red = RED_SINTETICA_RAPIDO if rapido else RED_SINTETICA
+    print(f"Midiendo la red sintética ({num_centros} centros, población {poblacion_red:,})...")
+    secuencial = None
+    for procesos in sorted({1, os.cpu_count() or 1}):
+        nombre = f"red.centros_{num_centros}.pob_{poblacion_red}.procesos_{procesos}"
+        casos[nombre] = _ejecutar_en_proceso(_medir_red, num_centros, poblacion_red, procesos, 1)
+        secuencial = secuencial or casos[nombre]["segundos"]
+        casos[nombre]["aceleracion"] = secuencial / casos[nombre]["segundos"]
+        print(f"  {nombre}: {casos[nombre]['segundos']:.3f} s (aceleración {casos[nombre]['aceleracion']:.2f}x)")
+
+    poblacion_etapas = POBLACION_ETAPAS_RAPIDO if rapido else POBLACION_ETAPAS
+    print(f"Midiendo análisis, escritura y gráficos (población {poblacion_etapas:,})...")
+    for etapa, medicion in _ejecutar_en_proceso(_medir_etapas, poblacion_etapas, repeticiones).items():
+        nombre = f"{etapa}.pob_{poblacion_etapas}"
+        casos[nombre] = medicion
+        print(f"  {nombre}: {medicion['segundos']:.3f} s")
+
+    return {"metadatos": _metadatos(), "casos": casos}
+
+
+def comparar(linea_base: dict, actual: dict, umbral: float = UMBRAL_REGRESION) -> list:
+    """
+    Compara dos mediciones caso por caso. Un caso es una regresión si su tiempo o su pico de
+    memoria superan a los de la línea base en más de `umbral` (fracción: 0.2 = 20%). En tiempo
+    además la diferencia tiene que superar `TOLERANCIA_SEGUNDOS`.
+
+    Returns:
+        list: Un diccionario por caso común con las razones actual/base y si hay regresión.
+    """
+    filas = []
+    for nombre, base in linea_base["casos"].items():
+        if nombre not in actual["casos"]:
+            continue
+        medicion = actual["casos"][nombre]
+        fila = {"caso": nombre, "regresion": False}
+        for metrica in ("segundos", "rss_pico_mb"):
+            if base.get(metrica) and medicion.get(metrica) is not None:
+                razon = medicion[metrica] / base[metrica]
+                fila[metrica] = razon
+                significativa = metrica != "segundos" or medicion[metrica] - base[metrica] > TOLERANCIA_SEGUNDOS
+                fila["regresion"] = fila["regresion"] or (razon > 1 + umbral and significativa)
+        filas.append(fila)
+    return filas
+
+
+def _imprimir_comparacion(filas: list, umbral: float):
+    print(f"{'Caso':<55} {'Tiempo':>8} {'RSS':>8}")
+    for fila in filas:
+        tiempo = f"{fila['segundos']:.2f}x" if "segundos" in fila else "-"
+        rss = f"{fila['rss_pico_mb']:.2f}x" if "rss_pico_mb" in fila else "-"
+        marca = "  <-- REGRESIÓN" if fila["regresion"] else ""
+        print(f"{fila['caso']:<55} {tiempo:>8} {rss:>8}{marca}")
+    regresiones = sum(fila["regresion"] for fila in filas)
+    print(f"\n{regresiones} regresiones de más del {umbral:.0%} en {len(filas)} casos comparados.")
+
+
+def main(argumentos: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de la simulación de vacunación.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_medir = subcomandos.add_parser("medir", help="Ejecuta la suite y guarda los resultados en JSON.")
+    parser_medir.add_argument("--salida", default=os.path.join("benchmarks", "linea_base.json"))
+    parser_medir.add_argument("--rapido", action="store_true", help=f"Solo poblaciones hasta {POBLACION_MAXIMA_RAPIDO:,}.")
+    parser_medir.add_argument("--repeticiones", type=int, default=3)
+
+    parser_comparar = subcomandos.add_parser("comparar", help="Compara dos archivos de resultados.")
+    parser_comparar.add_argument("linea_base")
+    parser_comparar.add_argument("actual")
+    parser_comparar.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                                 help="Fracción de empeoramiento tolerada (0.2 = 20%%).")
+
+    argumentos = parser.parse_args(argumentos)
+    if argumentos.comando == "medir":
+        resultados = medir(argumentos.rapido, argumentos.repeticiones)
+        os.makedirs(os.path.dirname(argumentos.salida) or ".", exist_ok=True)
+        with open(argumentos.salida, "w") as f:
+            json.dump(resultados, f, indent=4)
+        print(f"Resultados guardados en: {argumentos.salida}")
+        return 0
+
+    with open(argumentos.linea_base) as f:
+        linea_base = json.load(f)
+    with open(argumentos.actual) as f:
+        actual = json.load(f)
+    filas = comparar(linea_base, actual, argumentos.umbral)
+    _imprimir_comparacion(filas, argumentos.umbral)
+    # Código de salida distinto de cero si hay regresiones, para usarlo en CI
+    return 1 if any(fila["regresion"] for fila in filas) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
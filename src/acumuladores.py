@@ -0,0 +1,533 @@
+# src/acumuladores.py
+
+import math
+import numpy as np
+from src.registro_eventos import EVENTO_VACUNADO, EVENTO_REPROGRAMACION
+
+# Hitos de vacunación (fracción de la población) que se registran durante la corrida
+HITOS_VACUNACION = {
+    "70_porciento": 0.70,
+    "80_porciento": 0.80,
+    "100_porciento": 1.0,
+}
+# Ancho (minutos) de los intervalos de la serie de cola y ocupación de EstadisticasTiempo
+RESOLUCION_SERIE_MINUTOS = 5
+# Una fila de la serie: inicio del intervalo y promedios en el tiempo dentro de él
+TIPO_SERIE_OCUPACION = np.dtype([
+    ("minuto", np.float64),
+    ("longitud_cola", np.float64),
+    ("cabinas_ocupadas", np.float64),
+])
+
+
+class EstadisticoEnLinea:
+    """
+    Media y varianza por el método de Welford, más mínimo y máximo, en memoria constante.
+    Admite valores sueltos, lotes de NumPy y la fusión de dos estadísticos (fórmula de Chan).
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def agregar(self, valor: float):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def _combinar(self, n: int, media: float, m2: float, minimo: float, maximo: float):
+        if n == 0:
+            return
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+
+    def agregar_lote(self, valores: np.ndarray):
+        if len(valores) == 0:
+            return
+        valores = np.asarray(valores, dtype=np.float64)
+        media = float(valores.mean())
+        self._combinar(len(valores), media, float(((valores - media) ** 2).sum()),
+                       float(valores.min()), float(valores.max()))
+
+    def fusionar(self, otro: "EstadisticoEnLinea"):
+        self._combinar(otro.n, otro.media, otro.m2, otro.minimo, otro.maximo)
+
+    @property
+    def varianza(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+
+class BosquejoCuantiles:
+    """
+    Bosquejo de cuantiles con error relativo acotado (al estilo DDSketch): cada valor positivo
+    cae en el balde ceil(log_gamma(x)). La memoria depende del rango de valores, no de la
+    cantidad de observaciones, y dos bosquejos se fusionan sumando baldes.
+    """
+
+    def __init__(self, precision_relativa: float = 0.01):
+        self.precision_relativa = precision_relativa
+        self.gamma = (1 + precision_relativa) / (1 - precision_relativa)
+        self._log_gamma = math.log(self.gamma)
+        self.baldes = {}
+        self.ceros = 0
+        self.n = 0
+
+    def agregar(self, valor: float):
+        self.n += 1
+        if valor <= 0:
+            self.ceros += 1
+            return
+        indice = math.ceil(math.log(valor) / self._log_gamma)
+        self.baldes[indice] = self.baldes.get(indice, 0) + 1
+
+    def agregar_lote(self, valores: np.ndarray):
+        valores = np.asarray(valores, dtype=np.float64)
+        self.n += len(valores)
+        positivos = valores[valores > 0]
+        self.ceros += len(valores) - len(positivos)
+        if len(positivos) == 0:
+            return
+        indices, cantidades = np.unique(np.ceil(np.log(positivos) / self._log_gamma).astype(np.int64), return_counts=True)
+        for indice, cantidad in zip(indices.tolist(), cantidades.tolist()):
+            self.baldes[indice] = self.baldes.get(indice, 0) + cantidad
+
+    def fusionar(self, otro: "BosquejoCuantiles"):
+        if otro.gamma != self.gamma:
+            raise ValueError("Solo se pueden fusionar bosquejos con la misma precisión relativa.")
+        self.n += otro.n
+        self.ceros += otro.ceros
+        for indice, cantidad in otro.baldes.items():
+            self.baldes[indice] = self.baldes.get(indice, 0) + cantidad
+
+    def cuantil(self, q: float) -> float:
+        """Devuelve el cuantil q (entre 0 y 1) con error relativo menor a `precision_relativa`."""
+        if self.n == 0:
+            return 0.0
+        rango = q * (self.n - 1)
+        acumulado = self.ceros
+        if rango < acumulado:
+            return 0.0
+        for indice in sorted(self.baldes):
+            acumulado += self.baldes[indice]
+            if rango < acumulado:
+                return 2 * self.gamma ** indice / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.baldes) / (self.gamma + 1)
+
+
+class SeguimientoHitos:
+    """
+    Instante en que un conteo acumulado (vacunados, primeras dosis, etc.) cruza cada hito de
+    `HITOS_VACUNACION`, alimentado con los tiempos de cada vacunación en orden.
+    """
+
+    def __init__(self, poblacion_total: int):
+        # Vacunados necesarios para cada hito y el instante en que se alcanzó (None = no alcanzado)
+        self.vacunados_necesarios = {
+            nombre: int(poblacion_total * porcentaje) for nombre, porcentaje in HITOS_VACUNACION.items()
+        }
+        self.tiempos = {nombre: None for nombre in HITOS_VACUNACION}
+        self.contador = 0
+        self._proximos = sorted(self.vacunados_necesarios.items(), key=lambda hito: hito[1])
+
+    def registrar(self, tiempos_vacunados):
+        """Marca los hitos cruzados por los vacunados de un lote (en orden de tiempo)."""
+        while self._proximos:
+            nombre, necesarios = self._proximos[0]
+            posicion = max(necesarios, 1) - self.contador - 1
+            if posicion >= len(tiempos_vacunados):
+                break
+            self.tiempos[nombre] = float(tiempos_vacunados[max(posicion, 0)])
+            self._proximos.pop(0)
+        self.contador += len(tiempos_vacunados)
+
+    def descartar_tiempos(self):
+        self.tiempos = {nombre: None for nombre in HITOS_VACUNACION}
+        self._proximos = []
+
+
+def _integral_escalones(puntos: np.ndarray, tiempos: np.ndarray) -> np.ndarray:
+    """
+    Integral hasta cada punto de la función que sube 1 en cada uno de `tiempos` (ordenados):
+    la suma de (punto - t) sobre los t anteriores al punto, con sumas prefijas.
+    """
+    anteriores = np.searchsorted(tiempos, puntos, side="left")
+    sumas = np.concatenate(([0.0], np.cumsum(tiempos)))
+    return puntos * anteriores - sumas[anteriores]
+
+
+def _maximo_escalones(nivel_inicial: int, subidas: np.ndarray, bajadas: np.ndarray) -> int:
+    """Máximo de un nivel que sube en `subidas` y baja en `bajadas` (a igual tiempo, baja primero)."""
+    if len(subidas) == 0:
+        return nivel_inicial
+    tiempos = np.concatenate([bajadas, subidas])
+    saltos = np.concatenate([np.full(len(bajadas), -1, dtype=np.int64), np.ones(len(subidas), dtype=np.int64)])
+    orden = np.lexsort((saltos, tiempos))
+    return max(nivel_inicial, nivel_inicial + int(np.cumsum(saltos[orden]).max()))
+
+
+class EstadisticasTiempo:
+    """
+    Integrales en el tiempo de la longitud de la cola y de las cabinas ocupadas. Con ellas salen
+    el promedio ponderado por tiempo de la cola (el promedio sobre eventos sobrerrepresenta los
+    momentos con mucho movimiento) y la utilización medida con el tiempo real de servicio.
+
+    Además acumula las mismas integrales por intervalos fijos de `resolucion_minutos`, de los
+    que sale la serie de cola y ocupación (`serie`). El modelo SimPy informa cada cambio de
+    estado con `registrar` (O(1)); el motor vectorizado informa una ventana entera con
+    `registrar_ventana`. El tiempo se mide desde `inicio` (0 para una campaña; el comienzo
+    del día para un día independiente) y los niveles arrancan en 0.
+    """
+
+    def __init__(self, num_cabinas: int, resolucion_minutos: float = RESOLUCION_SERIE_MINUTOS, inicio: float = 0.0):
+        self.num_cabinas = num_cabinas
+        self.resolucion_minutos = resolucion_minutos
+        # Instante hasta el que están integrados los niveles actuales
+        self.tiempo = float(inicio)
+        self.cola = 0
+        self.ocupadas = 0
+        self.tiempo_total = 0.0
+        # Tiempo de cabina disponible hasta el último cambio de la cantidad de cabinas
+        self.disponible_previo = 0.0
+        self.tiempo_previo = 0.0
+        self.integral_cola = 0.0
+        self.integral_ocupadas = 0.0
+        self.maximo_cola = 0
+        self.maximo_ocupadas = 0
+        # Por intervalo de la serie: integrales y tiempo cubierto (crecen por duplicación)
+        self._baldes_cola = np.zeros(0)
+        self._baldes_ocupadas = np.zeros(0)
+        self._baldes_tiempo = np.zeros(0)
+
+    def _asegurar_baldes(self, cantidad: int):
+        if cantidad <= len(self._baldes_tiempo):
+            return
+        nuevo = max(cantidad, 2 * len(self._baldes_tiempo), 256)
+        for nombre in ("_baldes_cola", "_baldes_ocupadas", "_baldes_tiempo"):
+            baldes = getattr(self, nombre)
+            setattr(self, nombre, np.concatenate([baldes, np.zeros(nuevo - len(baldes))]))
+
+    def _integrar_hasta(self, tiempo: float):
+        """Integra los niveles actuales (constantes) desde `self.tiempo` hasta `tiempo`."""
+        desde = self.tiempo
+        if tiempo <= desde:
+            return
+        self.tiempo = tiempo
+        self.tiempo_total += tiempo - desde
+        self.integral_cola += self.cola * (tiempo - desde)
+        self.integral_ocupadas += self.ocupadas * (tiempo - desde)
+
+        resolucion = self.resolucion_minutos
+        primero = int(desde // resolucion)
+        ultimo = int(tiempo // resolucion)
+        self._asegurar_baldes(ultimo + 1)
+        if primero == ultimo:
+            tramos = ((primero, tiempo - desde),)
+        else:
+            tramos = ((primero, (primero + 1) * resolucion - desde), (ultimo, tiempo - ultimo * resolucion))
+            if ultimo > primero + 1:
+                # Intervalos completos sin cambios de estado (ej.: la noche entre dos días)
+                intermedios = slice(primero + 1, ultimo)
+                self._baldes_cola[intermedios] += self.cola * resolucion
+                self._baldes_ocupadas[intermedios] += self.ocupadas * resolucion
+                self._baldes_tiempo[intermedios] += resolucion
+        for balde, duracion in tramos:
+            self._baldes_cola[balde] += self.cola * duracion
+            self._baldes_ocupadas[balde] += self.ocupadas * duracion
+            self._baldes_tiempo[balde] += duracion
+
+    def registrar(self, tiempo: float, cola: int, ocupadas: int):
+        """Cambio de estado en `tiempo`: desde ahí la cola y las cabinas ocupadas son las dadas."""
+        self._integrar_hasta(tiempo)
+        self.cola = cola
+        self.ocupadas = ocupadas
+        if cola > self.maximo_cola:
+            self.maximo_cola = cola
+        if ocupadas > self.maximo_ocupadas:
+            self.maximo_ocupadas = ocupadas
+
+    def registrar_ventana(self, fin: float, llegadas: np.ndarray, inicios: np.ndarray, salidas: np.ndarray):
+        """
+        Integra la ventana [self.tiempo, fin) de una vez: cada llegada suma uno a la cola, cada
+        inicio de servicio pasa un paciente de la cola a una cabina y cada salida libera una
+        cabina. Los tres arrays están ordenados y sus instantes caen dentro de la ventana.
+        """
+        desde = self.tiempo
+        if fin <= desde:
+            return
+        resolucion = self.resolucion_minutos
+        primero = int(desde // resolucion)
+        # Bordes de intervalo dentro de la ventana y el fin: en cada uno se evalúa la integral
+        bordes = np.arange(primero + 1, int(np.ceil(fin / resolucion))) * resolucion
+        puntos = np.append(bordes, fin)
+        # Relativo al inicio de la ventana, para que las sumas prefijas no pierdan precisión
+        relativos = puntos - desde
+        integral_cola = (self.cola * relativos + _integral_escalones(relativos, llegadas - desde)
+                         - _integral_escalones(relativos, inicios - desde))
+        integral_ocupadas = (self.ocupadas * relativos + _integral_escalones(relativos, inicios - desde)
+                             - _integral_escalones(relativos, salidas - desde))
+
+        baldes = slice(primero, primero + len(puntos))
+        self._asegurar_baldes(baldes.stop)
+        self._baldes_cola[baldes] += np.diff(integral_cola, prepend=0.0)
+        self._baldes_ocupadas[baldes] += np.diff(integral_ocupadas, prepend=0.0)
+        self._baldes_tiempo[baldes] += np.diff(puntos, prepend=desde)
+        self.integral_cola += float(integral_cola[-1])
+        self.integral_ocupadas += float(integral_ocupadas[-1])
+        self.tiempo_total += fin - desde
+        self.tiempo = fin
+
+        self.maximo_cola = max(self.maximo_cola, _maximo_escalones(self.cola, llegadas, inicios))
+        self.maximo_ocupadas = max(self.maximo_ocupadas, _maximo_escalones(self.ocupadas, inicios, salidas))
+        self.cola += len(llegadas) - len(inicios)
+        self.ocupadas += len(inicios) - len(salidas)
+
+    def cambiar_cabinas(self, num_cabinas: int):
+        """
+        Desde el instante ya integrado hay `num_cabinas` cabinas (ver src/bifurcacion.py): la
+        utilización pasa a medirse contra el tiempo disponible de cada tramo.
+        """
+        self.disponible_previo += self.num_cabinas * (self.tiempo_total - self.tiempo_previo)
+        self.tiempo_previo = self.tiempo_total
+        self.num_cabinas = num_cabinas
+
+    def cerrar(self, tiempo: float):
+        """Integra el estado vigente hasta el fin de la corrida."""
+        self._integrar_hasta(tiempo)
+
+    def fusionar(self, otro: "EstadisticasTiempo"):
+        """Suma las integrales de otra corrida: los promedios pasan a ser los de ambas juntas."""
+        self.tiempo_total += otro.tiempo_total
+        self.integral_cola += otro.integral_cola
+        self.integral_ocupadas += otro.integral_ocupadas
+        self.maximo_cola = max(self.maximo_cola, otro.maximo_cola)
+        self.maximo_ocupadas = max(self.maximo_ocupadas, otro.maximo_ocupadas)
+        self._asegurar_baldes(len(otro._baldes_tiempo))
+        cantidad = len(otro._baldes_tiempo)
+        self._baldes_cola[:cantidad] += otro._baldes_cola
+        self._baldes_ocupadas[:cantidad] += otro._baldes_ocupadas
+        self._baldes_tiempo[:cantidad] += otro._baldes_tiempo
+
+    @staticmethod
+    def fusionar_simultaneos(sistemas: list, minutos_por_dia_red: float) -> "EstadisticasTiempo":
+        """
+        Estadísticas conjuntas de sistemas que funcionaron al mismo tiempo (ej.: los centros de
+        una red), dados como pares (EstadisticasTiempo, minutos por día). Los relojes se alinean
+        por día: el minuto `o` desde la apertura del día `d` de cada sistema es el minuto
+        `d·minutos_por_dia_red + o` del conjunto, con la jornada más larga como jornada común.
+        Mientras un sistema está cerrado (su jornada es más corta o ya terminó su campaña) suma
+        cola 0 y ninguna cabina ocupada, y sus cabinas cuentan como disponibles y ociosas en su
+        horario hasta el fin del conjunto.
+
+        El máximo exacto de la cola sumada no se puede reconstruir: queda la mejor cota inferior
+        entre la cola más larga de cada uno y el mayor promedio por intervalo de la serie sumada.
+        """
+        resolucion = sistemas[0][0].resolucion_minutos
+        conjunto = EstadisticasTiempo(sum(estadisticas.num_cabinas for estadisticas, _ in sistemas), resolucion)
+
+        def fin_en_el_conjunto(tiempo, minutos_por_dia):
+            # El fin de una jornada completa es el cierre de ese día, no la apertura del siguiente
+            dia = max(int(np.ceil(tiempo / minutos_por_dia)) - 1, 0)
+            return dia * minutos_por_dia_red + tiempo - dia * minutos_por_dia
+
+        horizonte = max(fin_en_el_conjunto(estadisticas.tiempo_total, minutos_por_dia)
+                        for estadisticas, minutos_por_dia in sistemas)
+        dias_completos, resto = divmod(horizonte, minutos_por_dia_red)
+        disponible = 0.0
+        for estadisticas, minutos_por_dia in sistemas:
+            conjunto.integral_cola += estadisticas.integral_cola
+            conjunto.integral_ocupadas += estadisticas.integral_ocupadas
+            conjunto.maximo_cola = max(conjunto.maximo_cola, estadisticas.maximo_cola)
+            conjunto.maximo_ocupadas += estadisticas.maximo_ocupadas
+            # Horario del sistema dentro del horizonte: después de su fin, las cabinas quedan ociosas
+            abierto = dias_completos * minutos_por_dia + min(resto, minutos_por_dia)
+            disponible += estadisticas.disponible_previo + estadisticas.num_cabinas * (abierto - estadisticas.tiempo_previo)
+
+            # Cada intervalo de la serie va al del conjunto que empieza en el mismo minuto del día
+            cantidad = len(estadisticas._baldes_tiempo)
+            if cantidad == 0:
+                continue
+            dias, desde_apertura = np.divmod(np.arange(cantidad) * resolucion, minutos_por_dia)
+            destinos = ((dias * minutos_por_dia_red + desde_apertura) // resolucion).astype(np.int64)
+            conjunto._asegurar_baldes(int(destinos[-1]) + 1)
+            np.add.at(conjunto._baldes_cola, destinos, estadisticas._baldes_cola)
+            np.add.at(conjunto._baldes_ocupadas, destinos, estadisticas._baldes_ocupadas)
+
+        conjunto.tiempo = conjunto.tiempo_total = conjunto.tiempo_previo = float(horizonte)
+        conjunto.disponible_previo = disponible
+        # Cada intervalo dura lo mismo para todos: los sistemas cerrados aportan ceros
+        cantidad = int(np.ceil(horizonte / resolucion))
+        conjunto._asegurar_baldes(cantidad)
+        conjunto._baldes_tiempo[:] = np.clip(horizonte - np.arange(len(conjunto._baldes_tiempo)) * resolucion, 0.0, resolucion)
+        if cantidad:
+            cola_por_intervalo = conjunto._baldes_cola[:cantidad] / conjunto._baldes_tiempo[:cantidad]
+            conjunto.maximo_cola = max(conjunto.maximo_cola, int(np.floor(cola_por_intervalo.max())))
+        return conjunto
+
+    @property
+    def cola_promedio(self) -> float:
+        return self.integral_cola / self.tiempo_total if self.tiempo_total > 0 else 0.0
+
+    @property
+    def utilizacion(self) -> float:
+        """Fracción del tiempo disponible de las cabinas en que estuvieron atendiendo."""
+        disponible = self.disponible_previo + self.num_cabinas * (self.tiempo_total - self.tiempo_previo)
+        return self.integral_ocupadas / disponible if disponible > 0 else 0.0
+
+    def serie(self) -> np.ndarray:
+        """
+        Serie de resolución fija (ver TIPO_SERIE_OCUPACION): por intervalo, la longitud de la
+        cola y las cabinas ocupadas promediadas en el tiempo. Termina en el último intervalo
+        con tiempo simulado.
+        """
+        cubiertos = np.flatnonzero(self._baldes_tiempo > 0)
+        cantidad = int(cubiertos[-1]) + 1 if len(cubiertos) else 0
+        tiempo = self._baldes_tiempo[:cantidad]
+        serie = np.zeros(cantidad, dtype=TIPO_SERIE_OCUPACION)
+        serie["minuto"] = np.arange(cantidad) * self.resolucion_minutos
+        with np.errstate(invalid="ignore", divide="ignore"):
+            serie["longitud_cola"] = np.where(tiempo > 0, self._baldes_cola[:cantidad] / tiempo, 0.0)
+            serie["cabinas_ocupadas"] = np.where(tiempo > 0, self._baldes_ocupadas[:cantidad] / tiempo, 0.0)
+        return serie
+
+
+class AcumuladorMetricas:
+    """
+    Destino de eventos alternativo al registro: en lugar de guardar cada evento actualiza
+    contadores, estadísticos en línea, el bosquejo de cuantiles de la espera y el instante en
+    que se cruza cada hito. Expone la misma interfaz que `RegistroEventos` (`agregar` y
+    `extender`), así que los dos motores lo usan sin cambios. La memoria es O(1) en la
+    población (solo crece el conteo por día, O(días)).
+
+    Con `dosis_por_esquema=2` los hitos y `vacunados_por_dia` cuentan esquemas completos
+    (segundas dosis) y los de la primera dosis se siguen aparte.
+    """
+
+    def __init__(self, poblacion_total: int, minutos_por_dia: float, dosis_por_esquema: int = 1):
+        self.poblacion_total = poblacion_total
+        self.minutos_por_dia = minutos_por_dia
+        # Minuto en que empezaría el día 0 con la jornada vigente (ver MotorVectorizado.inicio_dia)
+        self.desplazamiento_minutos = 0.0
+        self.dosis_por_esquema = dosis_por_esquema
+        self.total_vacunados = 0
+        self.total_reprogramados = 0
+        # Minutos de cola de los reprogramados (0 para quien se va al llegar; con la política
+        # "reprogramar", lo que esperaron hasta el cierre)
+        self.espera_total_reprogramados = 0.0
+        self.vacunados_por_dosis = {dosis: 0 for dosis in range(1, dosis_por_esquema + 1)}
+        self.espera = EstadisticoEnLinea()
+        self.en_sistema = EstadisticoEnLinea()
+        self.cola = EstadisticoEnLinea()
+        self.bosquejo_espera = BosquejoCuantiles()
+        self.hitos = SeguimientoHitos(poblacion_total)
+        self.hitos_primera_dosis = SeguimientoHitos(poblacion_total) if dosis_por_esquema > 1 else None
+        # Esquemas completados por día
+        self.vacunados_por_dia = {}
+        # Integrales en el tiempo de la cola y la ocupación; las asigna el motor al terminar
+        self.estadisticas_tiempo = None
+
+    @property
+    def tiempos_hitos(self) -> dict:
+        """Instante (minutos) en que se alcanzó cada hito de esquemas completos."""
+        return self.hitos.tiempos
+
+    @property
+    def tiempos_hitos_primera_dosis(self) -> dict:
+        return self.hitos_primera_dosis.tiempos if self.hitos_primera_dosis is not None else None
+
+    def __len__(self) -> int:
+        return self.total_vacunados + self.total_reprogramados
+
+    def agregar(self, tiempo, dia, paciente, digito_dni, evento, longitud_cola, tiempo_espera, tiempo_sistema, dosis=1):
+        """Actualiza los acumuladores con un evento (misma firma que RegistroEventos.agregar)."""
+        self.cola.agregar(longitud_cola)
+        if evento == EVENTO_REPROGRAMACION:
+            self.total_reprogramados += 1
+            self.espera_total_reprogramados += float(tiempo_espera)
+            return
+        self.espera.agregar(tiempo_espera)
+        self.en_sistema.agregar(tiempo_sistema)
+        self.bosquejo_espera.agregar(tiempo_espera)
+        self.total_vacunados += 1
+        self.vacunados_por_dosis[dosis] += 1
+        if dosis == 1 and self.hitos_primera_dosis is not None:
+            self.hitos_primera_dosis.registrar((tiempo,))
+        if dosis == self.dosis_por_esquema:
+            dia_evento = int((tiempo - self.desplazamiento_minutos) // self.minutos_por_dia)
+            self.vacunados_por_dia[dia_evento] = self.vacunados_por_dia.get(dia_evento, 0) + 1
+            self.hitos.registrar((tiempo,))
+
+    def extender(self, columnas: dict):
+        """Actualiza los acumuladores con un lote de eventos ordenado por tiempo."""
+        if len(columnas["tiempo_simulacion"]) == 0:
+            return
+        self.cola.agregar_lote(columnas["longitud_cola_actual"])
+        vacunado = columnas["evento"] == EVENTO_VACUNADO
+        self.total_reprogramados += int(len(vacunado) - np.count_nonzero(vacunado))
+        self.espera_total_reprogramados += float(np.sum(columnas["tiempo_espera_minutos"][~vacunado], dtype=np.float64))
+
+        tiempos = columnas["tiempo_simulacion"][vacunado]
+        if len(tiempos) == 0:
+            return
+        esperas = columnas["tiempo_espera_minutos"][vacunado]
+        self.espera.agregar_lote(esperas)
+        self.en_sistema.agregar_lote(columnas["tiempo_en_sistema_minutos"][vacunado])
+        self.bosquejo_espera.agregar_lote(esperas)
+        self.total_vacunados += len(tiempos)
+
+        if self.dosis_por_esquema > 1:
+            dosis = columnas["dosis"][vacunado]
+            for numero in self.vacunados_por_dosis:
+                self.vacunados_por_dosis[numero] += int(np.count_nonzero(dosis == numero))
+            self.hitos_primera_dosis.registrar(tiempos[dosis == 1])
+            tiempos = tiempos[dosis == self.dosis_por_esquema]
+        else:
+            self.vacunados_por_dosis[1] += len(tiempos)
+
+        dias, cantidades = np.unique(((tiempos - self.desplazamiento_minutos) // self.minutos_por_dia).astype(np.int64),
+                                       return_counts=True)
+        for dia_evento, cantidad in zip(dias.tolist(), cantidades.tolist()):
+            self.vacunados_por_dia[dia_evento] = self.vacunados_por_dia.get(dia_evento, 0) + cantidad
+        self.hitos.registrar(tiempos)
+
+    def fusionar(self, otro: "AcumuladorMetricas"):
+        """
+        Suma los acumuladores de otra corrida. Los instantes de los hitos no se pueden sumar y
+        se descartan; quedan los conteos de `vacunados_por_dia` para recalcularlos.
+        """
+        self.total_vacunados += otro.total_vacunados
+        self.total_reprogramados += otro.total_reprogramados
+        self.espera_total_reprogramados += otro.espera_total_reprogramados
+        for dosis, cantidad in otro.vacunados_por_dosis.items():
+            self.vacunados_por_dosis[dosis] = self.vacunados_por_dosis.get(dosis, 0) + cantidad
+        self.espera.fusionar(otro.espera)
+        self.en_sistema.fusionar(otro.en_sistema)
+        self.cola.fusionar(otro.cola)
+        self.bosquejo_espera.fusionar(otro.bosquejo_espera)
+        for dia, cantidad in otro.vacunados_por_dia.items():
+            self.vacunados_por_dia[dia] = self.vacunados_por_dia.get(dia, 0) + cantidad
+        if self.estadisticas_tiempo is not None and otro.estadisticas_tiempo is not None:
+            self.estadisticas_tiempo.fusionar(otro.estadisticas_tiempo)
+        self.hitos.descartar_tiempos()
+        if self.hitos_primera_dosis is not None:
+            self.hitos_primera_dosis.descartar_tiempos()
+
+    def percentiles_espera(self) -> dict:
+        """Percentiles p50, p90 y p99 del tiempo de espera de los vacunados."""
+        return {
+            "p50": float(self.bosquejo_espera.cuantil(0.50)),
+            "p90": float(self.bosquejo_espera.cuantil(0.90)),
+            "p99": float(self.bosquejo_espera.cuantil(0.99)),
+        }
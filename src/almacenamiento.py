@@ -0,0 +1,270 @@
+# src/almacenamiento.py
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.registro_eventos import RegistroEventos, agregar_ids_paciente
+
+# Formatos disponibles para los resultados crudos. CSV queda como opción de exportación.
+FORMATOS_SALIDA = ("csv", "parquet", "feather")
+EXTENSIONES = {"csv": "csv", "parquet": "parquet", "feather": "feather"}
+# Orden en que se buscan los archivos de un escenario al cargarlos
+_PREFERENCIA_CARGA = ("parquet", "feather", "csv")
+_CLAVE_DIAS_LOTES = b"dias_por_lote"
+# Filas por lote al leer un CSV de a partes (los columnares se leen de a row group o lote de Arrow)
+FILAS_POR_LOTE_CSV = 1_000_000
+
+
+def _importar_pyarrow():
+    """Importa pyarrow solo cuando se usa un formato columnar."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Los formatos 'parquet' y 'feather' requieren pyarrow (pip install pyarrow). "
+            "Usa formato_salida='csv' si no está disponible."
+        ) from e
+    return pyarrow
+
+
+def ruta_resultados(ruta_escenario: str, nombre_escenario: str, formato: str) -> str:
+    """Devuelve la ruta del archivo de resultados crudos de un escenario para un formato."""
+    if formato not in FORMATOS_SALIDA:
+        raise ValueError(f"Formato de salida desconocido: {formato}. Opciones: {', '.join(FORMATOS_SALIDA)}")
+    return os.path.join(ruta_escenario, f"resultados_{nombre_escenario}.{EXTENSIONES[formato]}")
+
+
+def _tabla_por_dia(resultados_df: pd.DataFrame):
+    """
+    Convierte el DataFrame a una tabla de Arrow agrupada por `dia` (orden estable: dentro de
+    cada día los eventos siguen en orden de tiempo) y devuelve también los límites de cada grupo.
+    """
+    pa = _importar_pyarrow()
+    if "dia" in resultados_df.columns and not resultados_df["dia"].is_monotonic_increasing:
+        resultados_df = resultados_df.sort_values("dia", kind="stable")
+    tabla = pa.Table.from_pandas(resultados_df, preserve_index=False)
+
+    if "dia" not in resultados_df.columns or resultados_df.empty:
+        return tabla, [(None, 0, len(resultados_df))]
+    dias = resultados_df["dia"].to_numpy()
+    cortes = np.flatnonzero(np.diff(dias)) + 1
+    inicios = np.concatenate([[0], cortes])
+    finales = np.concatenate([cortes, [len(dias)]])
+    grupos = [(int(dias[i]), int(i), int(f - i)) for i, f in zip(inicios, finales)]
+    return tabla, grupos
+
+
+def guardar_resultados(resultados_df: pd.DataFrame, ruta_escenario: str, nombre_escenario: str,
+                       formato: str = "parquet", compresion: str = "zstd") -> str:
+    """
+    Guarda los eventos crudos de un escenario.
+
+    - csv: el esquema original, con el ID legible del paciente.
+    - parquet: un row group por valor de `dia`, para que los lectores salteen los días que no usan.
+    - feather: un lote de Arrow IPC por valor de `dia`, con el índice de días en los metadatos.
+
+    Returns:
+        str: Ruta del archivo escrito.
+    """
+    ruta = ruta_resultados(ruta_escenario, nombre_escenario, formato)
+    if formato == "csv":
+        agregar_ids_paciente(resultados_df).to_csv(ruta, index=False)
+        return ruta
+
+    pa = _importar_pyarrow()
+    tabla, grupos = _tabla_por_dia(resultados_df)
+    if formato == "parquet":
+        with pa.parquet.ParquetWriter(ruta, tabla.schema, compression=compresion) as escritor:
+            for _, desde, cantidad in grupos:
+                escritor.write_table(tabla.slice(desde, cantidad), row_group_size=max(1, cantidad))
+    else:
+        metadatos = dict(tabla.schema.metadata or {})
+        metadatos[_CLAVE_DIAS_LOTES] = json.dumps([dia for dia, _, _ in grupos]).encode()
+        esquema = tabla.schema.with_metadata(metadatos)
+        opciones = pa.ipc.IpcWriteOptions(compression=compresion)
+        with pa.ipc.new_file(ruta, esquema, options=opciones) as escritor:
+            for _, desde, cantidad in grupos:
+                for lote in tabla.slice(desde, cantidad).to_batches():
+                    escritor.write_batch(lote)
+    return ruta
+
+
+class EscritorEventos:
+    """
+    Destino de eventos que los va volcando a un Parquet de solo agregado: junta en memoria los
+    eventos de `dias_por_lote` días y, cuando llega uno de un día posterior, los escribe como
+    un row group y los suelta. La memoria queda acotada por los eventos de un lote, sin importar
+    la duración de la campaña ni la población.
+
+    Expone la misma interfaz que `RegistroEventos` (`agregar`, `extender`, `len()`), así que los
+    dos motores lo usan sin cambios; los eventos tienen que llegar en orden de tiempo, como los
+    emiten ambos. Los row groups quedan en orden de tiempo (no agrupados por `dia`, que es el día
+    de llegada): los lectores filtran igual por las estadísticas de cada row group.
+
+    Uso:
+        escritor = EscritorEventos(ruta, minutos_por_dia)
+        simular_vectorizado(config, dias, rng, destino=escritor)
+        escritor.cerrar()
+    """
+
+    def __init__(self, ruta: str, minutos_por_dia: float, dias_por_lote: int = 1, compresion: str = "zstd"):
+        if os.path.splitext(ruta)[1] != ".parquet":
+            raise ValueError(f"El volcado por lotes solo escribe Parquet: {ruta}")
+        self.ruta = ruta
+        self.minutos_por_lote = minutos_por_dia * max(1, dias_por_lote)
+        self.compresion = compresion
+        self.lotes_escritos = 0
+        # Integrales en el tiempo de la cola y la ocupación; las asigna el motor al terminar
+        self.estadisticas_tiempo = None
+        self._pendientes = RegistroEventos()
+        self._fin_lote = self.minutos_por_lote
+        self._escritor = None
+        self._tamano = 0
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    def _avanzar(self, tiempo: float):
+        """Vuelca el lote en curso si `tiempo` ya cae en un lote posterior."""
+        if tiempo < self._fin_lote:
+            return
+        self.volcar()
+        self._fin_lote = (tiempo // self.minutos_por_lote + 1) * self.minutos_por_lote
+
+    def agregar(self, tiempo, dia, paciente, digito_dni, evento, longitud_cola, tiempo_espera, tiempo_sistema, dosis=1):
+        self._avanzar(tiempo)
+        self._pendientes.agregar(tiempo, dia, paciente, digito_dni, evento, longitud_cola, tiempo_espera, tiempo_sistema, dosis)
+        self._tamano += 1
+
+    def extender(self, columnas: dict):
+        self._tamano += len(columnas["tiempo_simulacion"])
+        # Un bloque que cruza el fin del lote se parte: lo anterior cierra el lote en curso
+        while len(columnas["tiempo_simulacion"]) > 0:
+            tiempos = columnas["tiempo_simulacion"]
+            self._avanzar(float(tiempos[0]))
+            corte = int(np.searchsorted(tiempos, self._fin_lote, side="left"))
+            self._pendientes.extender({nombre: valores[:corte] for nombre, valores in columnas.items()})
+            columnas = {nombre: valores[corte:] for nombre, valores in columnas.items()}
+
+    def volcar(self):
+        """Escribe los eventos pendientes como un row group y libera su memoria."""
+        if len(self._pendientes) == 0:
+            return
+        self._escribir(self._pendientes.a_dataframe())
+        self._pendientes = RegistroEventos()
+
+    def _escribir(self, eventos_df: pd.DataFrame):
+        pa = _importar_pyarrow()
+        tabla = pa.Table.from_pandas(eventos_df, preserve_index=False)
+        if self._escritor is None:
+            self._escritor = pa.parquet.ParquetWriter(self.ruta, tabla.schema, compression=self.compresion)
+        self._escritor.write_table(tabla, row_group_size=max(1, len(eventos_df)))
+        self.lotes_escritos += 1
+
+    def cerrar(self) -> str:
+        """Vuelca lo pendiente y cierra el archivo (vacío pero con esquema si no hubo eventos)."""
+        self.volcar()
+        if self._escritor is None:
+            self._escribir(self._pendientes.a_dataframe())
+        self._escritor.close()
+        return self.ruta
+
+
+def leer_resultados_por_lotes(ruta: str, columnas: list = None):
+    """
+    Recorre los eventos crudos de a partes, en el orden del archivo, sin cargarlos todos: un
+    DataFrame por row group (parquet), por lote de Arrow (feather) o cada FILAS_POR_LOTE_CSV filas.
+    """
+    extension = os.path.splitext(ruta)[1].lstrip(".")
+    columnas = list(columnas) if columnas is not None else None
+    if extension == "csv":
+        for parte in pd.read_csv(ruta, usecols=columnas, chunksize=FILAS_POR_LOTE_CSV):
+            yield parte
+    elif extension == "parquet":
+        pa = _importar_pyarrow()
+        archivo = pa.parquet.ParquetFile(ruta)
+        for indice in range(archivo.num_row_groups):
+            yield archivo.read_row_group(indice, columns=columnas).to_pandas()
+    elif extension == "feather":
+        pa = _importar_pyarrow()
+        with pa.memory_map(ruta) as fuente:
+            lector = pa.ipc.open_file(fuente)
+            for indice in range(lector.num_record_batches):
+                lote = lector.get_batch(indice)
+                yield (lote.select(columnas) if columnas is not None else lote).to_pandas()
+    else:
+        raise ValueError(f"Extensión de resultados desconocida: {ruta}")
+
+
+def buscar_resultados(ruta_escenario: str, nombre_escenario: str) -> str:
+    """Devuelve el archivo de resultados existente de un escenario (prefiere los formatos columnares)."""
+    for formato in _PREFERENCIA_CARGA:
+        ruta = ruta_resultados(ruta_escenario, nombre_escenario, formato)
+        if os.path.exists(ruta):
+            return ruta
+    raise FileNotFoundError(f"No se encontraron resultados para el escenario '{nombre_escenario}' en {ruta_escenario}.")
+
+
+def cargar_resultados(ruta: str, columnas: list = None, dias: list = None) -> pd.DataFrame:
+    """
+    Carga los eventos crudos leyendo solo las columnas y los días pedidos.
+
+    En parquet los días que no interesan se descartan por las estadísticas de cada row group;
+    en feather se leen solo los lotes de esos días, con el archivo mapeado en memoria.
+    El resultado queda ordenado por `tiempo_simulacion` si esa columna se carga.
+
+    Args:
+        ruta (str): Archivo .parquet, .feather o .csv.
+        columnas (list): Columnas a cargar (None = todas).
+        dias (list): Valores de `dia` a conservar (None = todos).
+    """
+    columnas_lectura = list(columnas) if columnas is not None else None
+    # Para filtrar por día hace falta leer esa columna aunque no se haya pedido
+    if dias is not None and columnas_lectura is not None and "dia" not in columnas_lectura:
+        columnas_lectura.append("dia")
+
+    extension = os.path.splitext(ruta)[1].lstrip(".")
+    if extension == "csv":
+        df = pd.read_csv(ruta, usecols=columnas_lectura)
+        if "evento" in df.columns:
+            df["evento"] = df["evento"].astype("category")
+        if dias is not None:
+            df = df[df["dia"].isin(dias)]
+    elif extension == "parquet":
+        pa = _importar_pyarrow()
+        filtros = [("dia", "in", list(dias))] if dias is not None else None
+        df = pa.parquet.read_table(ruta, columns=columnas_lectura, filters=filtros).to_pandas()
+    elif extension == "feather":
+        pa = _importar_pyarrow()
+        with pa.memory_map(ruta) as fuente:
+            lector = pa.ipc.open_file(fuente)
+            dias_por_lote = json.loads((lector.schema.metadata or {}).get(_CLAVE_DIAS_LOTES, b"null"))
+            indices = range(lector.num_record_batches)
+            if dias is not None and dias_por_lote is not None and len(dias_por_lote) == lector.num_record_batches:
+                dias_buscados = set(dias)
+                indices = [i for i in indices if dias_por_lote[i] in dias_buscados]
+            lotes = [lector.get_batch(i) for i in indices]
+            if columnas_lectura is not None:
+                lotes = [lote.select(columnas_lectura) for lote in lotes]
+            esquema = lotes[0].schema if lotes else lector.schema
+            df = pa.Table.from_batches(lotes, schema=esquema).to_pandas()
+        if dias is not None:
+            df = df[df["dia"].isin(dias)]
+    else:
+        raise ValueError(f"Extensión de resultados desconocida: {ruta}")
+
+    if columnas is not None:
+        df = df[list(columnas)]
+    if "tiempo_simulacion" in df.columns and not df["tiempo_simulacion"].is_monotonic_increasing:
+        df = df.sort_values("tiempo_simulacion", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def cargar_resultados_escenario(nombre_escenario: str, columnas: list = None, dias: list = None,
+                                ruta_base: str = os.path.join("data", "output")) -> pd.DataFrame:
+    """Busca y carga los resultados crudos de un escenario guardado en `ruta_base/<escenario>/`."""
+    ruta = buscar_resultados(os.path.join(ruta_base, nombre_escenario), nombre_escenario)
+    return cargar_resultados(ruta, columnas=columnas, dias=dias)
@@ -3,51 +3,38 @@
 import pandas as pd
 import numpy as np
 from src.config import ConfiguracionSimulacion
+from src.almacenamiento import cargar_resultados, leer_resultados_por_lotes
+from src.acumuladores import AcumuladorMetricas, EstadisticasTiempo, HITOS_VACUNACION
+from src.registro_eventos import EVENTO_VACUNADO, EVENTO_REPROGRAMACION
+from src.calendario_dosis import dosis_por_esquema
+from src.recosteo import calcular_estadisticas_costo, costos_desde_estadisticas
 
-def calcular_tiempo_para_hitos_vacunacion(vacunados_df: pd.DataFrame, poblacion_total: int, horas_operacion_dia: int) -> dict:
+# Columnas del registro de eventos que usa calcular_metricas_principales
+COLUMNAS_METRICAS = [
+    "tiempo_simulacion", "evento", "dosis", "longitud_cola_actual", "tiempo_espera_minutos", "tiempo_en_sistema_minutos"
+]
+
+def formatear_hitos_vacunacion(tiempos_hitos: dict, poblacion_total: int, horas_operacion_dia: int) -> dict:
     """
-    Calcula el tiempo (días y semanas) para alcanzar hitos de vacunación (70%, 80%, 100%).
+    Convierte el instante (en minutos de simulación) en que se alcanzó cada hito a días y
+    semanas operativos. Un instante None indica que el hito no se alcanzó.
 
     Args:
-        vacunados_df (pd.DataFrame): DataFrame con los datos de los pacientes vacunados.
+        tiempos_hitos (dict): Nombre del hito -> minuto en que se alcanzó (o None).
         poblacion_total (int): Tamaño total de la población objetivo.
         horas_operacion_dia (int): Horas de operación del centro por día.
 
     Returns:
         dict: Un diccionario con los tiempos para cada hito.
     """
-    hitos = {
-        "70_porciento": 0.70,
-        "80_porciento": 0.80,
-        "100_porciento": 1.0,
-    }
-    
-    #Diccionario para almecenar resultados
-    resultados_hitos = {}
-
-    #Chequeo para valores nulos
-    if vacunados_df.empty or poblacion_total == 0:
-        for hito_nombre in hitos:
-            resultados_hitos[hito_nombre] = {"dias": "N/A", "semanas": "N/A", "vacunados_necesarios": "N/A"}
-        return resultados_hitos
-
-    # Asegurarse de que el df esté ordenado por tiempo
-    vacunados_df = vacunados_df.sort_values(by="tiempo_simulacion").reset_index(drop=True)
-    vacunados_df["vacunados_acumulados"] = vacunados_df.index + 1
-
     minutos_por_dia_operativo = horas_operacion_dia * 60
+    resultados_hitos = {}
 
-    for hito_nombre, hito_porcentaje in hitos.items():
-
-        #
+    for hito_nombre, hito_porcentaje in HITOS_VACUNACION.items():
         vacunados_necesarios = int(poblacion_total * hito_porcentaje)
-        
-        # Buscar la primera vez que se alcanza el hito
-        df_hito = vacunados_df[vacunados_df["vacunados_acumulados"] >= vacunados_necesarios]
-        
-        if not df_hito.empty:
-            tiempo_en_minutos = df_hito.iloc[0]["tiempo_simulacion"]
-            
+        tiempo_en_minutos = tiempos_hitos.get(hito_nombre)
+
+        if tiempo_en_minutos is not None:
             # Convertir minutos a días y semanas operativos
             dias_necesarios = tiempo_en_minutos / minutos_por_dia_operativo
             semanas_necesarias = dias_necesarios / 5  # Asumiendo operación 5 días/semana
@@ -68,55 +55,57 @@ def calcular_tiempo_para_hitos_vacunacion(vacunados_df: pd.DataFrame, poblacion_
     return resultados_hitos
 
 
-def calcular_metricas_principales(resultados_df: pd.DataFrame, config_escenario: dict, duracion_dias: int) -> dict:
+def _hitos_no_disponibles() -> dict:
+    return {hito_nombre: {"dias": "N/A", "semanas": "N/A", "vacunados_necesarios": "N/A"} for hito_nombre in HITOS_VACUNACION}
+
+
+def calcular_tiempo_para_hitos_vacunacion(vacunados_df: pd.DataFrame, poblacion_total: int, horas_operacion_dia: int) -> dict:
     """
-    Calcula las métricas de rendimiento clave a partir de los datos de la simulación.
+    Calcula el tiempo (días y semanas) para alcanzar hitos de vacunación (70%, 80%, 100%).
 
     Args:
-        resultados_df (pd.DataFrame): DataFrame con los datos crudos de la simulación.
-        config_escenario (dict): Diccionario con los parámetros del escenario simulado.
-        duracion_dias (int): Duración de la simulación en días.
+        vacunados_df (pd.DataFrame): DataFrame con los datos de los pacientes vacunados.
+        poblacion_total (int): Tamaño total de la población objetivo.
+        horas_operacion_dia (int): Horas de operación del centro por día.
 
     Returns:
-        dict: Un diccionario con todas las métricas calculadas.
+        dict: Un diccionario con los tiempos para cada hito.
     """
-    if resultados_df.empty:
-        return {"error": "El DataFrame de resultados está vacío. No se pueden calcular métricas."}
+    #Chequeo para valores nulos
+    if vacunados_df.empty or poblacion_total == 0:
+        return _hitos_no_disponibles()
 
-    # --- Filtrar eventos ---
-    # solo las filas donde el evento fue "Vacunado"
-    vacunados_df = resultados_df[resultados_df["evento"] == "Vacunado"].copy()
-    # solo las filas donde el evento fue "Reprogramacion"
-    reprogramados_df = resultados_df[resultados_df["evento"] == "Reprogramacion"].copy()
+    # Tiempos de vacunación ordenados: el k-ésimo es el instante en que hay k vacunados
+    tiempos_ordenados = np.sort(vacunados_df["tiempo_simulacion"].to_numpy())
 
-    # --- Métricas Generales  ---
-    # cuenta cuántas filas hay en vacunados_df
-    total_vacunados = int(len(vacunados_df))
-    # cuenta cuántas filas hay en reprogramados_df
-    total_reprogramados = int(len(reprogramados_df))
+    tiempos_hitos = {}
+    for hito_nombre, hito_porcentaje in HITOS_VACUNACION.items():
+        vacunados_necesarios = int(poblacion_total * hito_porcentaje)
+        # Buscar la primera vez que se alcanza el hito
+        posicion = max(vacunados_necesarios, 1) - 1
+        tiempos_hitos[hito_nombre] = float(tiempos_ordenados[posicion]) if posicion < len(tiempos_ordenados) else None
+
+    return formatear_hitos_vacunacion(tiempos_hitos, poblacion_total, horas_operacion_dia)
+
+
+def _ensamblar_metricas(config_escenario: dict, duracion_dias: int, total_vacunados: int, total_reprogramados: int,
+                        estadisticas_espera: dict, longitud_cola_promedio: float, longitud_cola_maxima: int,
+                        tiempos_hitos: dict, estadisticas_tiempo: EstadisticasTiempo = None,
+                        espera_total_reprogramados: float = 0.0) -> dict:
+    """
+    Arma el diccionario de métricas (utilización, costos e hitos incluidos) a partir de los
+    conteos y estadísticos ya calculados, vengan del DataFrame de eventos o de los acumuladores.
+    `espera_total_reprogramados` (minutos de cola de los reprogramados) entra en el costo de la espera.
+
+    Con las `estadisticas_tiempo` del motor, la cola promedio es el promedio ponderado por tiempo
+    y la utilización sale del tiempo ocupado medido (el promedio sobre eventos queda como
+    'promedio_por_evento'). Sin ellas (ej.: eventos leídos de un archivo) se estiman como antes.
+    """
     # La suma de los dos anteriores
     total_pacientes_procesados = total_vacunados + total_reprogramados
     # porcentaje de pacientes que reprogramaron sobre el total.
     tasa_abandono = (total_reprogramados / total_pacientes_procesados) if total_pacientes_procesados > 0 else 0
 
-    # --- Estadísticas de Cola y Tiempos  ---
-    if total_vacunados > 0:
-        tiempo_espera_promedio = float(vacunados_df['tiempo_espera_minutos'].mean())
-        tiempo_espera_maximo = float(vacunados_df['tiempo_espera_minutos'].max())
-        tiempo_espera_minimo = float(vacunados_df['tiempo_espera_minutos'].min())
-        
-        tiempo_en_sistema_promedio = float(vacunados_df['tiempo_en_sistema_minutos'].mean())
-        
-        longitud_cola_promedio = float(resultados_df['longitud_cola_actual'].mean())
-        longitud_cola_maxima = int(resultados_df['longitud_cola_actual'].max())
-    else:
-        tiempo_espera_promedio = 0.0
-        tiempo_espera_maximo = 0.0
-        tiempo_espera_minimo = 0.0
-        tiempo_en_sistema_promedio = 0.0
-        longitud_cola_promedio = 0.0
-        longitud_cola_maxima = int(resultados_df['longitud_cola_actual'].max()) if not resultados_df.empty else 0
-
     # --- Utilización de Puestos ---
     # cuánto tiempo se invirtió en total vacunando
     tiempo_total_servicio = total_vacunados * config_escenario["tiempo_promedio_vacunacion_minutos"]
@@ -124,25 +113,30 @@ def calcular_metricas_principales(resultados_df: pd.DataFrame, config_escenario:
     tiempo_total_disponible = config_escenario["num_cabinas"] * config_escenario["horas_operacion_por_dia"] * 60 * duracion_dias
     # división del tiempo de servicio entre el tiempo disponible.
     utilizacion_promedio_cabinas = (tiempo_total_servicio / tiempo_total_disponible) if tiempo_total_disponible > 0 else 0
+    longitud_cola = {"promedio": longitud_cola_promedio, "maxima": longitud_cola_maxima}
+    if estadisticas_tiempo is not None and estadisticas_tiempo.tiempo_total > 0:
+        # Medido en el motor: tiempo realmente ocupado sobre el tiempo simulado (hasta la parada)
+        tiempo_total_servicio = estadisticas_tiempo.integral_ocupadas
+        utilizacion_promedio_cabinas = estadisticas_tiempo.utilizacion
+        longitud_cola = {
+            "promedio": float(estadisticas_tiempo.cola_promedio),
+            "maxima": int(estadisticas_tiempo.maximo_cola),
+            "promedio_por_evento": longitud_cola_promedio,
+        }
 
     # --- Cálculo de Costos ---
-    costos_config = ConfiguracionSimulacion.COSTOS
-    #Costo por cabina por día
-    costo_fijo_total = costos_config["costo_fijo_por_cabina_por_dia"] * config_escenario["num_cabinas"] * duracion_dias
-    costo_total_dosis = costos_config["costo_por_dosis"] * total_vacunados
-    costo_total_reprogramaciones = costos_config["costo_por_reprogramacion"] * total_reprogramados
-    
-    costo_total_campana = costo_fijo_total + costo_total_dosis + costo_total_reprogramaciones
+    # Todas las partidas son lineales en estas estadísticas: se guardan para recostear la corrida
+    # con otros precios sin volver a simular (ver src/recosteo.py)
+    estadisticas_costo = calcular_estadisticas_costo(config_escenario, duracion_dias, total_vacunados,
+                                                     total_reprogramados, estadisticas_espera["promedio"],
+                                                     espera_total_reprogramados)
+    costos = costos_desde_estadisticas(estadisticas_costo)
+    costo_total_campana = costos["costo_total_campana"]
     costo_por_paciente_vacunado = (costo_total_campana / total_vacunados) if total_vacunados > 0 else 0
 
     # Métrica de costo diario: Costo total por día de campaña.
     costo_diario_promedio = (costo_total_campana / duracion_dias) if duracion_dias > 0 else 0
 
-    # --- Cálculo de Tiempos para Hitos de Vacunación ---
-    poblacion_total = config_escenario.get("poblacion_total", 0)
-    horas_operacion = config_escenario.get("horas_operacion_por_dia", 1)
-    tiempos_hitos = calcular_tiempo_para_hitos_vacunacion(vacunados_df, poblacion_total, horas_operacion)
-
     # --- Ensamblar diccionario de resultados ---
     metricas = {
         "parametros_escenario": {
@@ -157,31 +151,190 @@ def calcular_metricas_principales(resultados_df: pd.DataFrame, config_escenario:
             "tasa_abandono_porcentual": float(tasa_abandono * 100),
         },
         "tiempos_espera_minutos": {
-            "promedio": tiempo_espera_promedio,
-            "maximo": tiempo_espera_maximo,
-            "minimo": tiempo_espera_minimo,
-        },
-        "longitud_cola": {
-            "promedio": longitud_cola_promedio,
-            "maxima": longitud_cola_maxima,
+            "promedio": estadisticas_espera["promedio"],
+            "maximo": estadisticas_espera["maximo"],
+            "minimo": estadisticas_espera["minimo"],
         },
+        "longitud_cola": longitud_cola,
         "rendimiento": {
-            "tiempo_promedio_en_sistema_minutos": tiempo_en_sistema_promedio,
+            "tiempo_promedio_en_sistema_minutos": estadisticas_espera["en_sistema_promedio"],
             "utilizacion_promedio_cabinas_porcentual": float(utilizacion_promedio_cabinas * 100),
+            "tiempo_ocupado_cabinas_minutos": float(tiempo_total_servicio),
         },
         "costos": {
-            "costo_total_campana": float(costo_total_campana),
-            "costo_fijo_total": float(costo_fijo_total),
-            "costo_total_dosis": float(costo_total_dosis),
-            "costo_total_reprogramaciones": float(costo_total_reprogramaciones),
+            **costos,
             "costo_por_paciente_vacunado": float(costo_por_paciente_vacunado),
             "costo_diario_promedio": float(costo_diario_promedio),
         },
+        "estadisticas_costo": estadisticas_costo,
         "hitos_vacunacion": tiempos_hitos,
     }
     
     return metricas
 
+
+def _agregar_metricas_dos_dosis(metricas: dict, total_primeras_dosis: int, total_esquemas_completos: int,
+                                hitos_primera_dosis: dict):
+    """
+    Con el esquema de dos dosis, `total_vacunados` cuenta dosis aplicadas y `hitos_vacunacion`
+    se refiere a esquemas completos; se agregan los conteos por dosis y los hitos de la primera.
+    """
+    metricas["generales"]["total_primeras_dosis"] = total_primeras_dosis
+    metricas["generales"]["total_esquemas_completos"] = total_esquemas_completos
+    metricas["hitos_primera_dosis"] = hitos_primera_dosis
+
+
+def calcular_metricas_principales(resultados_df: pd.DataFrame, config_escenario: dict, duracion_dias: int,
+                                  estadisticas_tiempo: EstadisticasTiempo = None) -> dict:
+    """
+    Calcula las métricas de rendimiento clave a partir de los datos de la simulación.
+
+    Args:
+        resultados_df (pd.DataFrame): DataFrame con los datos crudos de la simulación.
+        config_escenario (dict): Diccionario con los parámetros del escenario simulado.
+        duracion_dias (int): Duración de la simulación en días.
+        estadisticas_tiempo (EstadisticasTiempo | None): Integrales en el tiempo de la corrida
+            (ver `ejecutar_simulacion`); con ellas la cola y la utilización son las ponderadas por tiempo.
+
+    Returns:
+        dict: Un diccionario con todas las métricas calculadas.
+    """
+    if resultados_df.empty:
+        return {"error": "El DataFrame de resultados está vacío. No se pueden calcular métricas."}
+
+    # --- Filtrar eventos ---
+    # solo las filas donde el evento fue "Vacunado" (una máscara basta, no hace falta copiar)
+    es_vacunado = (resultados_df["evento"] == "Vacunado").to_numpy()
+    vacunados_df = resultados_df[es_vacunado]
+
+    # --- Métricas Generales  ---
+    # cuenta cuántas filas hay en vacunados_df
+    total_vacunados = int(es_vacunado.sum())
+    # cuenta cuántas filas fueron "Reprogramacion"
+    es_reprogramado = (resultados_df["evento"] == "Reprogramacion").to_numpy()
+    total_reprogramados = int(es_reprogramado.sum())
+    # quien se va al cierre también hizo cola: su espera entra en el costo
+    espera_total_reprogramados = float(resultados_df["tiempo_espera_minutos"].to_numpy()[es_reprogramado].sum(dtype=np.float64))
+
+    # --- Estadísticas de Cola y Tiempos  ---
+    if total_vacunados > 0:
+        estadisticas_espera = {
+            "promedio": float(vacunados_df['tiempo_espera_minutos'].mean()),
+            "maximo": float(vacunados_df['tiempo_espera_minutos'].max()),
+            "minimo": float(vacunados_df['tiempo_espera_minutos'].min()),
+            "en_sistema_promedio": float(vacunados_df['tiempo_en_sistema_minutos'].mean()),
+        }
+        longitud_cola_promedio = float(resultados_df['longitud_cola_actual'].mean())
+        longitud_cola_maxima = int(resultados_df['longitud_cola_actual'].max())
+    else:
+        estadisticas_espera = {"promedio": 0.0, "maximo": 0.0, "minimo": 0.0, "en_sistema_promedio": 0.0}
+        longitud_cola_promedio = 0.0
+        longitud_cola_maxima = int(resultados_df['longitud_cola_actual'].max()) if not resultados_df.empty else 0
+
+    # --- Cálculo de Tiempos para Hitos de Vacunación ---
+    poblacion_total = config_escenario.get("poblacion_total", 0)
+    horas_operacion = config_escenario.get("horas_operacion_por_dia", 1)
+    # Con dos dosis los hitos se cuentan sobre esquemas completos (segundas dosis)
+    dos_dosis = dosis_por_esquema(config_escenario) > 1 and "dosis" in resultados_df.columns
+    if dos_dosis:
+        dosis = vacunados_df["dosis"].to_numpy()
+        primeras_df = vacunados_df[dosis == 1]
+        completos_df = vacunados_df[dosis == 2]
+    else:
+        completos_df = vacunados_df
+    tiempos_hitos = calcular_tiempo_para_hitos_vacunacion(completos_df, poblacion_total, horas_operacion)
+
+    metricas = _ensamblar_metricas(config_escenario, duracion_dias, total_vacunados, total_reprogramados,
+                                   estadisticas_espera, longitud_cola_promedio, longitud_cola_maxima, tiempos_hitos,
+                                   estadisticas_tiempo, espera_total_reprogramados)
+    if dos_dosis:
+        _agregar_metricas_dos_dosis(metricas, len(primeras_df), len(completos_df),
+                                    calcular_tiempo_para_hitos_vacunacion(primeras_df, poblacion_total, horas_operacion))
+    if total_vacunados > 0:
+        p50, p90, p99 = np.percentile(vacunados_df['tiempo_espera_minutos'].to_numpy(), [50, 90, 99])
+        metricas["tiempos_espera_minutos"]["percentiles"] = {"p50": float(p50), "p90": float(p90), "p99": float(p99)}
+    return metricas
+
+
+def calcular_metricas_desde_acumuladores(acumulador: AcumuladorMetricas, config_escenario: dict, duracion_dias: int) -> dict:
+    """
+    Calcula las mismas métricas que `calcular_metricas_principales` a partir de los acumuladores
+    de una corrida en modo "solo_metricas", sin ningún evento guardado. Agrega los percentiles
+    p50, p90 y p99 de la espera estimados con el bosquejo de cuantiles.
+    """
+    if len(acumulador) == 0:
+        return {"error": "El DataFrame de resultados está vacío. No se pueden calcular métricas."}
+
+    total_vacunados = acumulador.total_vacunados
+    if total_vacunados > 0:
+        estadisticas_espera = {
+            "promedio": float(acumulador.espera.media),
+            "maximo": float(acumulador.espera.maximo),
+            "minimo": float(acumulador.espera.minimo),
+            "en_sistema_promedio": float(acumulador.en_sistema.media),
+        }
+        longitud_cola_promedio = float(acumulador.cola.media)
+    else:
+        estadisticas_espera = {"promedio": 0.0, "maximo": 0.0, "minimo": 0.0, "en_sistema_promedio": 0.0}
+        longitud_cola_promedio = 0.0
+    longitud_cola_maxima = int(acumulador.cola.maximo)
+
+    poblacion_total = config_escenario.get("poblacion_total", 0)
+    horas_operacion = config_escenario.get("horas_operacion_por_dia", 1)
+    dos_dosis = acumulador.dosis_por_esquema > 1
+
+    def hitos(tiempos, cantidad):
+        if cantidad == 0 or poblacion_total == 0:
+            return _hitos_no_disponibles()
+        return formatear_hitos_vacunacion(tiempos, poblacion_total, horas_operacion)
+
+    total_completos = acumulador.vacunados_por_dosis[acumulador.dosis_por_esquema]
+    tiempos_hitos = hitos(acumulador.tiempos_hitos, total_completos)
+
+    metricas = _ensamblar_metricas(config_escenario, duracion_dias, total_vacunados, acumulador.total_reprogramados,
+                                   estadisticas_espera, longitud_cola_promedio, longitud_cola_maxima, tiempos_hitos,
+                                   acumulador.estadisticas_tiempo, acumulador.espera_total_reprogramados)
+    if dos_dosis:
+        total_primeras = acumulador.vacunados_por_dosis[1]
+        _agregar_metricas_dos_dosis(metricas, total_primeras, total_completos,
+                                    hitos(acumulador.tiempos_hitos_primera_dosis, total_primeras))
+    metricas["tiempos_espera_minutos"]["percentiles"] = acumulador.percentiles_espera()
+    return metricas
+
+
+def acumular_desde_archivo(ruta_resultados: str, config_escenario: dict,
+                           estadisticas_tiempo: EstadisticasTiempo = None) -> AcumuladorMetricas:
+    """
+    Pasa los eventos de un archivo de resultados, de a un row group (o lote) por vez, por un
+    AcumuladorMetricas: la memoria es la de un lote. El archivo tiene que estar en orden de
+    tiempo, como lo deja el modo "en_disco" de `ejecutar_simulacion`.
+    """
+    acumulador = AcumuladorMetricas(config_escenario["poblacion_total"], config_escenario["horas_operacion_por_dia"] * 60,
+                                    dosis_por_esquema(config_escenario))
+    for lote in leer_resultados_por_lotes(ruta_resultados, COLUMNAS_METRICAS):
+        columnas = {nombre: lote[nombre].to_numpy() for nombre in COLUMNAS_METRICAS if nombre != "evento"}
+        # El acumulador trabaja con los códigos de evento del registro, no con las etiquetas
+        columnas["evento"] = np.where((lote["evento"] == "Vacunado").to_numpy(), EVENTO_VACUNADO, EVENTO_REPROGRAMACION)
+        acumulador.extender(columnas)
+    acumulador.estadisticas_tiempo = estadisticas_tiempo
+    return acumulador
+
+
+def calcular_metricas_desde_archivo(ruta_resultados: str, config_escenario: dict, duracion_dias: int,
+                                    estadisticas_tiempo: EstadisticasTiempo = None, por_lotes: bool = False) -> dict:
+    """
+    Calcula las métricas principales leyendo del archivo de resultados crudos solo las
+    columnas que hacen falta (ver COLUMNAS_METRICAS).
+
+    Con `por_lotes=True` no se carga el archivo entero: se recorre de a un lote con
+    `acumular_desde_archivo` (los percentiles de la espera salen del bosquejo de cuantiles).
+    """
+    if por_lotes:
+        acumulador = acumular_desde_archivo(ruta_resultados, config_escenario, estadisticas_tiempo)
+        return calcular_metricas_desde_acumuladores(acumulador, config_escenario, duracion_dias)
+    resultados_df = cargar_resultados(ruta_resultados, columnas=COLUMNAS_METRICAS)
+    return calcular_metricas_principales(resultados_df, config_escenario, duracion_dias, estadisticas_tiempo)
+
 # --- Bloque para Pruebas ---
 if __name__ == '__main__':
     # Crear un DataFrame de ejemplo para probar la función de análisis
@@ -0,0 +1,198 @@
+# src/barrido.py
+
+import itertools
+import multiprocessing
+import traceback
+from src.config import ConfiguracionSimulacion
+from src.cache import (
+    parametros_corrida, clave_corrida, buscar_entrada, guardar_entrada, restaurar_entrada, RUTA_CACHE
+)
+from src.modelo_analitico import estimar_campana
+
+# Estados de un punto del barrido al terminar
+#   "simulado":   se simuló en esta corrida
+#   "cache":      ya estaba en la caché de resultados (misma configuración, semilla, motor y código)
+#   "duplicado":  otro punto de la grilla tiene exactamente la misma configuración
+#   "descartado": el modelo analítico lo da por infactible para el plazo (ver `plazo_dias`)
+#   "fallido":    la simulación falló en todos los intentos
+ESTADOS_PUNTO = ("simulado", "cache", "duplicado", "descartado", "fallido")
+# Formato con el que se calculan las claves de la caché (las corridas del barrido no guardan eventos)
+MODO_BARRIDO = "solo_metricas"
+FORMATO_BARRIDO = "parquet"
+
+
+def expandir_grilla(rangos: dict, config_base: dict = None) -> dict:
+    """
+    Arma una configuración por cada combinación de los valores de `rangos` (producto cartesiano,
+    en el orden de las claves), a partir de `config_base`. Cualquier clave de un escenario se
+    puede barrer; el nombre de cada punto lista los valores barridos.
+
+    Args:
+        rangos (dict): Clave del escenario -> lista de valores (ej. {"num_cabinas": range(5, 30)}).
+        config_base (dict): Escenario del que se parte. Por defecto, el escenario base.
+
+    Returns:
+        dict: Nombre del punto -> configuración.
+    """
+    config_base = ConfiguracionSimulacion.ESCENARIO_BASE if config_base is None else config_base
+    rangos = {clave: list(valores) for clave, valores in rangos.items()}
+    vacios = [clave for clave, valores in rangos.items() if not valores]
+    if vacios:
+        raise ValueError(f"Rangos vacíos en el barrido: {', '.join(vacios)}")
+    configs = {}
+    for valores in itertools.product(*rangos.values()):
+        cambios = dict(zip(rangos, valores))
+        nombre = "__".join(f"{clave}={valor}" for clave, valor in cambios.items())
+        configs[nombre] = dict(config_base, **cambios)
+    return configs
+
+
+def eventos_estimados(config: dict, duracion_dias: int) -> float:
+    """
+    Cantidad de eventos (vacunaciones más reprogramaciones) que va a generar una corrida según
+    el modelo analítico: el costo de simularla es proporcional a ella.
+    """
+    try:
+        estimacion = estimar_campana(config, duracion_dias)
+    except (ValueError, KeyError, ZeroDivisionError):
+        # Una configuración que el modelo no puede evaluar va primero: falla (o no) en su proceso
+        return float("inf")
+    return estimacion["total_vacunados"] + estimacion["total_reprogramados"]
+
+
+def _factible_segun_modelo(config: dict, duracion_dias: int, plazo_dias: float) -> bool:
+    """Criterio de `cribar_configuraciones` para un punto; si el modelo no lo puede evaluar, se simula."""
+    from src.modelo_analitico import cribar_configuraciones
+
+    try:
+        return cribar_configuraciones({None: config}, duracion_dias, plazo_dias)[0]["simular"]
+    except (ValueError, KeyError, ZeroDivisionError):
+        return True
+
+
+def _simular_punto(tarea: tuple) -> tuple:
+    """
+    Simula un punto en un proceso del pool (modo solo métricas). Un error no tumba el barrido:
+    se devuelve su traza para reintentar el punto o reportarlo.
+    """
+    from src.simulation import ejecutar_simulacion
+    from src.analysis import calcular_metricas_desde_acumuladores
+
+    nombre, config, duracion_dias, semilla, motor = tarea
+    try:
+        acumulador = ejecutar_simulacion(config, duracion_dias, motor=motor, semilla=semilla, modo=MODO_BARRIDO)
+        return nombre, calcular_metricas_desde_acumuladores(acumulador, config, duracion_dias), None
+    except Exception:
+        return nombre, None, traceback.format_exc()
+
+
+def ejecutar_barrido(configs: dict, duracion_dias: int, semilla: int, motor: str = "vectorizado",
+                     procesos: int = None, reintentos: int = 1, plazo_dias: float = None, usar_cache: bool = True,
+                     ruta_cache: str = RUTA_CACHE) -> dict:
+    """
+    Simula todos los puntos de un barrido en un pool de procesos sin supervisión.
+
+    - Deduplica: los puntos con la misma configuración se simulan una vez, y los que ya están en
+      la caché de resultados (ver src/cache.py) no se vuelven a simular. Cada punto terminado se
+      guarda en la caché apenas llega, así un barrido interrumpido retoma donde quedó.
+    - Ordena las tareas de la más larga a la más corta según los eventos estimados por el modelo
+      analítico y las reparte con `imap_unordered` de a una: las corridas largas no quedan para el
+      final con el resto de los procesos ociosos.
+    - Aísla los errores: un punto que falla no corta el barrido; se reintenta hasta `reintentos`
+      veces al final y, si sigue fallando, se reporta con su traza.
+    - Con `plazo_dias`, no simula los puntos que el modelo analítico da por infactibles (ver
+      modelo_analitico.cribar_configuraciones).
+
+    Todos los puntos usan la misma semilla: las diferencias entre puntos no dependen del azar.
+
+    Returns:
+        dict: "puntos" (nombre -> estado, configuración, métricas, eventos estimados, intentos y
+              error), "resumen" (cantidad de puntos por estado) y los parámetros de la corrida.
+    """
+    procesos = max(1, procesos or multiprocessing.cpu_count())
+    puntos = {}
+    pendientes = {}
+    vistos = {}
+    descartados = set()
+    if plazo_dias is not None:
+        descartados = {nombre for nombre, config in configs.items()
+                       if not _factible_segun_modelo(config, duracion_dias, plazo_dias)}
+
+    for nombre, config in configs.items():
+        parametros = parametros_corrida(config, duracion_dias, semilla, motor, MODO_BARRIDO, FORMATO_BARRIDO)
+        clave = clave_corrida(parametros)
+        punto = {"config": config, "clave": clave, "metricas": None, "intentos": 0, "error": None}
+        puntos[nombre] = punto
+        entrada = buscar_entrada(clave, ruta_cache) if usar_cache and clave not in vistos else None
+        if nombre in descartados:
+            punto["estado"] = "descartado"
+        elif clave in vistos:
+            punto["estado"] = "duplicado"
+            punto["original"] = vistos[clave]
+        elif entrada is not None:
+            punto["metricas"], _ = restaurar_entrada(entrada, None, nombre, ruta_cache)
+            punto["estado"] = "cache"
+        else:
+            punto["eventos_estimados"] = eventos_estimados(config, duracion_dias)
+            pendientes[nombre] = parametros
+        vistos.setdefault(clave, nombre)
+
+    total = len(pendientes)
+    print(f"Barrido de {len(configs)} puntos: {total} a simular en {procesos} procesos "
+          f"({len(configs) - total} resueltos por caché, duplicados o descartados).")
+
+    hechos = 0
+
+    def procesar(resultados) -> list:
+        """Registra los resultados a medida que llegan; devuelve los puntos que fallaron."""
+        nonlocal hechos
+        fallidos = []
+        for nombre, metricas, error in resultados:
+            punto = puntos[nombre]
+            punto["intentos"] += 1
+            if error is not None:
+                punto["error"] = error
+                fallidos.append(nombre)
+                print(f"  [{hechos}/{total}] Falló '{nombre}' (intento {punto['intentos']}): "
+                      f"{error.strip().splitlines()[-1]}")
+                continue
+            hechos += 1
+            punto.update(estado="simulado", metricas=metricas, error=None)
+            if usar_cache:
+                guardar_entrada(punto["clave"], pendientes[nombre], metricas, ruta_cache=ruta_cache)
+            print(f"  [{hechos}/{total}] {nombre}")
+        return fallidos
+
+    # Las más largas primero: el pool termina casi parejo
+    por_simular = sorted(pendientes, key=lambda nombre: puntos[nombre]["eventos_estimados"], reverse=True)
+    pool = multiprocessing.Pool(processes=min(procesos, total)) if procesos > 1 and total > 1 else None
+    try:
+        for _ in range(reintentos + 1):
+            if not por_simular:
+                break
+            tareas = [(nombre, puntos[nombre]["config"], duracion_dias, semilla, motor) for nombre in por_simular]
+            resultados = (pool.imap_unordered(_simular_punto, tareas, chunksize=1) if pool is not None
+                          else map(_simular_punto, tareas))
+            por_simular = procesar(resultados)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    for nombre in por_simular:
+        puntos[nombre]["estado"] = "fallido"
+
+    # Los duplicados comparten las métricas de su original
+    for punto in puntos.values():
+        if punto["estado"] == "duplicado":
+            original = puntos[punto["original"]]
+            punto["metricas"] = original["metricas"]
+
+    return {
+        "duracion_dias": duracion_dias,
+        "semilla": semilla,
+        "motor": motor,
+        "plazo_dias": plazo_dias,
+        "puntos": puntos,
+        "resumen": {estado: sum(1 for punto in puntos.values() if punto["estado"] == estado)
+                    for estado in ESTADOS_PUNTO},
+    }
@@ -0,0 +1,248 @@
+# src/bifurcacion.py
+
+import multiprocessing
+import pickle
+import numpy as np
+import pandas as pd
+from src.acumuladores import AcumuladorMetricas
+from src.analysis import calcular_metricas_desde_acumuladores
+from src.calendario_dosis import dosis_por_esquema
+from src.motor_vectorizado import MotorVectorizado
+from src.recosteo import costos_desde_estadisticas
+from src.registro_eventos import RegistroEventos
+from src.simulation import crear_secuencia_semilla
+
+# Parámetros que una rama puede cambiar a partir del día de la bifurcación
+CAMBIOS_BIFURCABLES = ("num_cabinas", "horas_operacion_por_dia", "tasa_asistencia")
+
+# Estado serializado de la instantánea en cada proceso del pool (ver `_inicializar_rama`)
+_instantanea_trabajador = None
+
+
+def tomar_instantanea(config_escenario: dict, dia: int, semilla, guardar_eventos: bool = False) -> dict:
+    """
+    Simula los días [0, dia) con el motor vectorizado y congela el estado completo de la corrida
+    al abrir el día `dia`: la cola y las llegadas diferidas, los pacientes en una cabina, el
+    instante en que se libera cada cabina, los contadores, el calendario de segundas dosis, el
+    estado del generador aleatorio y los acumuladores de métricas. Las ramas (ver
+    `simular_rama`) arrancan de una copia de ese estado, así el prefijo común se simula una vez.
+
+    Usa los mismos flujos aleatorios que `ejecutar_simulacion(..., motor="vectorizado")` con la
+    misma semilla: una rama sin cambios da exactamente la corrida completa. El modelo SimPy no
+    se puede bifurcar (sus procesos son generadores, que no se serializan).
+
+    Args:
+        config_escenario (dict): Parámetros del escenario hasta la bifurcación.
+        dia (int): Día operativo en que abren las ramas.
+        semilla (int | np.random.SeedSequence): Semilla raíz de la corrida.
+        guardar_eventos (bool): Si es True, guarda también los eventos del prefijo; cada rama
+                                guarda solo los suyos, a partir de `desplazamiento_eventos`.
+
+    Returns:
+        dict: La configuración, el día, el estado serializado ("estado"), la cantidad de eventos
+              del prefijo ("desplazamiento_eventos") y, con `guardar_eventos`, su registro.
+    """
+    if dia < 0:
+        raise ValueError("El día de la bifurcación no puede ser negativo.")
+    secuencia = crear_secuencia_semilla(semilla)
+    motor = MotorVectorizado(config_escenario, np.random.default_rng(secuencia), secuencia_dias=secuencia)
+    acumulador = AcumuladorMetricas(config_escenario["poblacion_total"], motor.minutos_por_dia,
+                                    dosis_por_esquema(config_escenario))
+    acumulador.estadisticas_tiempo = motor.estadisticas_tiempo
+    registro = RegistroEventos() if guardar_eventos else None
+    for dia_prefijo in range(dia):
+        eventos = motor.simular_dia(dia_prefijo)
+        acumulador.extender(eventos)
+        if registro is not None:
+            registro.extender(eventos)
+        if motor.objetivo_alcanzado:
+            break
+    return {
+        "config": config_escenario,
+        "dia": dia,
+        "estado": pickle.dumps((motor, acumulador), protocol=pickle.HIGHEST_PROTOCOL),
+        "desplazamiento_eventos": len(acumulador),
+        "objetivo_alcanzado": motor.objetivo_alcanzado,
+        "registro": registro,
+    }
+
+
+def aplicar_cambios(motor: MotorVectorizado, acumulador: AcumuladorMetricas, cambios: dict, dia: int):
+    """
+    Cambia los parámetros de una corrida congelada a partir del día `dia`:
+
+    - Cabinas: las nuevas quedan libres desde la apertura de `dia` y la cola que espera se
+      reasigna (ver MotorVectorizado.cambiar_cabinas).
+    - Horas de operación: los días siguientes tienen la nueva jornada; el día `dia` abre donde
+      terminó el anterior.
+    - Asistencia: cambia la cantidad de llegadas desde `dia`.
+    """
+    desconocidos = [clave for clave in cambios if clave not in CAMBIOS_BIFURCABLES]
+    if desconocidos:
+        raise ValueError(f"Parámetros que no se pueden cambiar en una rama: {', '.join(desconocidos)}. "
+                         f"Opciones: {', '.join(CAMBIOS_BIFURCABLES)}")
+    config = dict(motor.config, **cambios)
+    apertura = motor.inicio_dia(dia)
+
+    num_cabinas = config["num_cabinas"]
+    if num_cabinas < 1:
+        raise ValueError("Una rama necesita al menos una cabina.")
+    if num_cabinas != motor.config["num_cabinas"]:
+        motor.cambiar_cabinas(num_cabinas, apertura)
+
+    minutos_por_dia = config["horas_operacion_por_dia"] * 60
+    if minutos_por_dia != motor.minutos_por_dia:
+        for objeto in (motor, acumulador):
+            objeto.minutos_por_dia = minutos_por_dia
+            objeto.desplazamiento_minutos = apertura - dia * minutos_por_dia
+    motor.config = config
+
+
+def _tiempos_en_jornada_final(tiempos: dict, instantanea: dict, minutos_por_dia: float, apertura: float) -> dict:
+    """
+    Lleva los instantes de los hitos a la escala de la jornada final: los del prefijo se
+    reescalan día por día y los de la rama se cuentan desde la apertura de la bifurcación.
+    """
+    minutos_previos = instantanea["config"]["horas_operacion_por_dia"] * 60
+    dia = instantanea["dia"]
+    return {
+        nombre: None if tiempo is None
+        else tiempo * minutos_por_dia / minutos_previos if tiempo < apertura
+        else dia * minutos_por_dia + (tiempo - apertura)
+        for nombre, tiempo in tiempos.items()
+    }
+
+
+def _metricas_rama(acumulador: AcumuladorMetricas, instantanea: dict, config_rama: dict, duracion_dias: int,
+                   apertura: float) -> dict:
+    """
+    Métricas de una rama: las de la corrida completa con la configuración final, con los hitos en
+    días operativos reales y el costo fijo con las cabinas de cada tramo.
+    """
+    config_previa = instantanea["config"]
+    dia = min(instantanea["dia"], duracion_dias)
+    if config_rama["horas_operacion_por_dia"] != config_previa["horas_operacion_por_dia"]:
+        minutos_por_dia = config_rama["horas_operacion_por_dia"] * 60
+        acumulador.hitos.tiempos = _tiempos_en_jornada_final(acumulador.hitos.tiempos, instantanea,
+                                                             minutos_por_dia, apertura)
+        if acumulador.hitos_primera_dosis is not None:
+            acumulador.hitos_primera_dosis.tiempos = _tiempos_en_jornada_final(
+                acumulador.hitos_primera_dosis.tiempos, instantanea, minutos_por_dia, apertura)
+
+    metricas = calcular_metricas_desde_acumuladores(acumulador, config_rama, duracion_dias)
+    if "error" in metricas:
+        return metricas
+    estadisticas = dict(metricas["estadisticas_costo"],
+                        cabinas_dia=config_previa["num_cabinas"] * dia + config_rama["num_cabinas"] * (duracion_dias - dia))
+    total_vacunados = estadisticas["total_vacunados"]
+    costos = costos_desde_estadisticas(estadisticas)
+    metricas["estadisticas_costo"] = estadisticas
+    metricas["costos"].update(
+        costos,
+        costo_por_paciente_vacunado=(costos["costo_total_campana"] / total_vacunados) if total_vacunados > 0 else 0.0,
+        costo_diario_promedio=(costos["costo_total_campana"] / duracion_dias) if duracion_dias > 0 else 0.0,
+    )
+    metricas["parametros_escenario"]["bifurcacion"] = {
+        "dia": instantanea["dia"],
+        "cambios": {clave: config_rama[clave] for clave in CAMBIOS_BIFURCABLES
+                    if config_rama[clave] != config_previa[clave]},
+    }
+    return metricas
+
+
+def simular_rama(instantanea: dict, cambios: dict, duracion_dias: int, guardar_eventos: bool = False) -> dict:
+    """
+    Continúa una copia de la corrida congelada en `instantanea` con `cambios` (ver
+    `aplicar_cambios`) hasta `duracion_dias` y devuelve sus métricas de campaña completa. Con
+    `guardar_eventos` devuelve también los eventos de la rama (los del prefijo quedan en la
+    instantánea; ver `eventos_completos`).
+    """
+    motor, acumulador = pickle.loads(instantanea["estado"])
+    dia = instantanea["dia"]
+    aplicar_cambios(motor, acumulador, cambios, dia)
+    apertura = motor.inicio_dia(dia)
+    registro = RegistroEventos() if guardar_eventos else None
+    if not motor.objetivo_alcanzado:
+        for dia_rama in range(dia, duracion_dias):
+            eventos = motor.simular_dia(dia_rama)
+            acumulador.extender(eventos)
+            if registro is not None:
+                registro.extender(eventos)
+            if motor.objetivo_alcanzado:
+                break
+    return {
+        "metricas": _metricas_rama(acumulador, instantanea, motor.config, duracion_dias, apertura),
+        "eventos": registro,
+    }
+
+
+def eventos_completos(instantanea: dict, rama: dict) -> pd.DataFrame:
+    """Eventos de toda la corrida de una rama: los del prefijo seguidos de los de la rama."""
+    if instantanea["registro"] is None or rama["eventos"] is None:
+        raise ValueError("La instantánea y la rama tienen que haberse simulado con guardar_eventos=True.")
+    return pd.concat([instantanea["registro"].a_dataframe(), rama["eventos"].a_dataframe()], ignore_index=True)
+
+
+def _inicializar_rama(instantanea: dict):
+    """Cada proceso del pool recibe la instantánea una sola vez, no con cada rama."""
+    global _instantanea_trabajador
+    _instantanea_trabajador = instantanea
+
+
+def _simular_rama_trabajador(tarea: tuple) -> tuple:
+    nombre, cambios, duracion_dias, guardar_eventos = tarea
+    return nombre, simular_rama(_instantanea_trabajador, cambios, duracion_dias, guardar_eventos)
+
+
+def ejecutar_ramas(instantanea: dict, ramas: dict, duracion_dias: int, procesos: int = None,
+                   guardar_eventos: bool = False) -> dict:
+    """
+    Simula en un pool de procesos todas las ramas de una instantánea: el prefijo común ya está
+    pagado y cada rama simula solo desde el día de la bifurcación. Todas las ramas continúan
+    con el mismo estado del generador aleatorio, así sus diferencias se deben a los cambios y
+    no al azar (con `numeros_aleatorios_comunes` la correspondencia es paciente por paciente).
+
+    Args:
+        instantanea (dict): Estado congelado (ver `tomar_instantanea`).
+        ramas (dict): Nombre de la rama -> cambios (ej. {"mas_5_cabinas": {"num_cabinas": 10}});
+                      una rama sin cambios ({}) continúa la corrida original.
+        duracion_dias (int): Días máximos de la campaña completa (prefijo incluido).
+        procesos (int): Procesos del pool. Por defecto, todos los núcleos disponibles.
+        guardar_eventos (bool): Si es True, cada rama devuelve sus eventos.
+
+    Returns:
+        dict: {"dia", "ramas": nombre -> {"metricas", "eventos"}} en el orden de `ramas`.
+    """
+    tareas = [(nombre, cambios, duracion_dias, guardar_eventos) for nombre, cambios in ramas.items()]
+    procesos = max(1, min(procesos or multiprocessing.cpu_count(), len(tareas)))
+    # La instantánea viaja sin los eventos del prefijo: las ramas no los necesitan
+    instantanea_ramas = dict(instantanea, registro=None)
+
+    resultados = {}
+    if procesos == 1:
+        _inicializar_rama(instantanea_ramas)
+        resultados.update(map(_simular_rama_trabajador, tareas))
+    else:
+        with multiprocessing.Pool(processes=procesos, initializer=_inicializar_rama,
+                                  initargs=(instantanea_ramas,)) as pool:
+            resultados.update(pool.imap_unordered(_simular_rama_trabajador, tareas))
+    return {
+        "dia": instantanea["dia"],
+        "ramas": {nombre: resultados[nombre] for nombre in ramas},
+    }
+
+
+# --- Bloque para Pruebas ---
+if __name__ == '__main__':
+    import time
+    from src.config import ConfiguracionSimulacion
+
+    config_base = ConfiguracionSimulacion.obtener_configuracion_escenario("base")
+    ramas = {f"mas_{extra}_cabinas": {"num_cabinas": config_base["num_cabinas"] + extra} for extra in range(20)}
+    inicio = time.perf_counter()
+    instantanea = tomar_instantanea(config_base, 40, semilla=2025)
+    resultado = ejecutar_ramas(instantanea, ramas, duracion_dias=200)
+    print(f"{len(ramas)} ramas desde el día 40 en {time.perf_counter() - inicio:.1f} s")
+    for nombre, rama in resultado["ramas"].items():
+        hito = rama["metricas"]["hitos_vacunacion"]["100_porciento"]["dias"]
+        print(f"  {nombre}: 100% en {hito} días, costo ${rama['metricas']['costos']['costo_total_campana']:,.0f}")
@@ -0,0 +1,188 @@
+# src/cache.py
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import time
+from src.config import ConfiguracionSimulacion
+
+# Carpeta de la caché de resultados: una subcarpeta por clave
+RUTA_CACHE = os.path.join("data", "cache")
+# Versión del formato de la caché y de la semántica del modelo. Subirla invalida todas las entradas
+# (por ejemplo, si cambia la definición de una métrica sin tocar los módulos del motor).
+VERSION_CACHE = 1
+# Módulos cuyo código fuente entra en la clave: si cambian, los resultados guardados dejan de valer
+MODULOS_MODELO = ("simulation.py", "motor_vectorizado.py", "registro_eventos.py", "acumuladores.py", "analysis.py",
+                  "calendario_dosis.py", "cierre_diario.py", "numeros_comunes.py", "recosteo.py",
+                  "intensidad_llegadas.py")
+# Límites por defecto para `limpiar_cache`
+MAX_BYTES_CACHE = 2 * 1024**3
+MAX_DIAS_CACHE = 30
+ARCHIVO_META = "meta.json"
+ARCHIVO_METRICAS = "metricas.json"
+
+
+@functools.lru_cache(maxsize=1)
+def huella_codigo() -> str:
+    """Hash del código fuente de los módulos del modelo (la "versión del motor")."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    hash_codigo = hashlib.sha256()
+    for modulo in MODULOS_MODELO:
+        with open(os.path.join(carpeta, modulo), "rb") as f:
+            hash_codigo.update(modulo.encode() + b"\0" + f.read())
+    return hash_codigo.hexdigest()[:16]
+
+
+def parametros_corrida(config_escenario: dict, duracion_dias: int, semilla, motor: str, modo: str,
+                       formato_salida: str) -> dict:
+    """
+    Todo lo que determina el resultado de una corrida, en una forma serializable y estable. Los
+    precios de `COSTOS` entran en la clave: las métricas guardadas incluyen los costos.
+    """
+    return {
+        "version_cache": VERSION_CACHE,
+        "version_motor": huella_codigo(),
+        "config": config_escenario,
+        "costos": ConfiguracionSimulacion.COSTOS,
+        "duracion_dias": duracion_dias,
+        "semilla": semilla,
+        "motor": motor,
+        "modo": modo,
+        "formato_salida": formato_salida,
+    }
+
+
+def clave_corrida(parametros: dict) -> str:
+    """Hash estable (JSON canónico con claves ordenadas) de los parámetros de una corrida."""
+    canonico = json.dumps(parametros, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonico.encode()).hexdigest()
+
+
+def _ruta_entrada(clave: str, ruta_cache: str) -> str:
+    return os.path.join(ruta_cache, clave)
+
+
+def buscar_entrada(clave: str, ruta_cache: str = RUTA_CACHE) -> dict:
+    """
+    Devuelve los metadatos de la entrada con esa clave, o None si no está o está incompleta.
+    Un acierto actualiza la fecha de último uso (la limpieza descarta primero lo menos usado).
+    """
+    ruta_meta = os.path.join(_ruta_entrada(clave, ruta_cache), ARCHIVO_META)
+    try:
+        with open(ruta_meta) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    meta["ultimo_uso"] = time.time()
+    with open(ruta_meta, "w") as f:
+        json.dump(meta, f, indent=4, default=str)
+    return meta
+
+
+def guardar_entrada(clave: str, parametros: dict, metricas: dict, ruta_eventos: str = None,
+                    ruta_cache: str = RUTA_CACHE) -> str:
+    """
+    Guarda las métricas y, si hay, una copia del archivo de eventos crudos de una corrida.
+    Los metadatos se escriben al final: una entrada sin 'meta.json' no cuenta como acierto.
+    """
+    ruta_entrada = _ruta_entrada(clave, ruta_cache)
+    os.makedirs(ruta_entrada, exist_ok=True)
+    with open(os.path.join(ruta_entrada, ARCHIVO_METRICAS), "w") as f:
+        json.dump(metricas, f, indent=4, default=str)
+
+    archivo_eventos = None
+    if ruta_eventos is not None:
+        archivo_eventos = "eventos" + os.path.splitext(ruta_eventos)[1]
+        shutil.copy2(ruta_eventos, os.path.join(ruta_entrada, archivo_eventos))
+
+    ahora = time.time()
+    meta = dict(parametros, clave=clave, archivo_eventos=archivo_eventos, creado=ahora, ultimo_uso=ahora)
+    with open(os.path.join(ruta_entrada, ARCHIVO_META), "w") as f:
+        json.dump(meta, f, indent=4, default=str)
+    return ruta_entrada
+
+
+def restaurar_entrada(meta: dict, ruta_escenario: str, nombre_escenario: str, ruta_cache: str = RUTA_CACHE) -> tuple:
+    """
+    Copia los eventos guardados a la carpeta del escenario y devuelve (métricas, ruta de los
+    eventos restaurados o None en modo "solo_metricas").
+    """
+    ruta_entrada = _ruta_entrada(meta["clave"], ruta_cache)
+    with open(os.path.join(ruta_entrada, ARCHIVO_METRICAS)) as f:
+        metricas = json.load(f)
+
+    ruta_eventos = None
+    if meta.get("archivo_eventos"):
+        # Import local: almacenamiento trae pandas, que la caché solo necesita al restaurar eventos
+        from src.almacenamiento import ruta_resultados
+        ruta_eventos = ruta_resultados(ruta_escenario, nombre_escenario, meta["formato_salida"])
+        shutil.copy2(os.path.join(ruta_entrada, meta["archivo_eventos"]), ruta_eventos)
+    return metricas, ruta_eventos
+
+
+def _tamano_carpeta(ruta: str) -> int:
+    return sum(entrada.stat().st_size for entrada in os.scandir(ruta) if entrada.is_file())
+
+
+def limpiar_cache(ruta_cache: str = RUTA_CACHE, max_bytes: int = MAX_BYTES_CACHE, max_dias: float = MAX_DIAS_CACHE) -> list:
+    """
+    Elimina las entradas sin usar hace más de `max_dias` días y, si la caché sigue ocupando más
+    de `max_bytes`, las menos usadas recientemente hasta entrar en el límite. También borra las
+    entradas incompletas (sin metadatos).
+
+    Returns:
+        list: Claves eliminadas.
+    """
+    if not os.path.isdir(ruta_cache):
+        return []
+
+    entradas = []
+    eliminadas = []
+    limite_uso = time.time() - max_dias * 86400 if max_dias is not None else None
+    for carpeta in os.scandir(ruta_cache):
+        if not carpeta.is_dir():
+            continue
+        try:
+            with open(os.path.join(carpeta.path, ARCHIVO_META)) as f:
+                ultimo_uso = json.load(f).get("ultimo_uso", 0)
+        except (OSError, ValueError):
+            ultimo_uso = None
+        if ultimo_uso is None or (limite_uso is not None and ultimo_uso < limite_uso):
+            shutil.rmtree(carpeta.path, ignore_errors=True)
+            eliminadas.append(carpeta.name)
+            continue
+        entradas.append((ultimo_uso, carpeta.name, _tamano_carpeta(carpeta.path)))
+
+    if max_bytes is not None:
+        total = sum(tamano for _, _, tamano in entradas)
+        for _, clave, tamano in sorted(entradas):
+            if total <= max_bytes:
+                break
+            shutil.rmtree(_ruta_entrada(clave, ruta_cache), ignore_errors=True)
+            eliminadas.append(clave)
+            total -= tamano
+    return eliminadas
+
+
+def escribir_meta_escenario(ruta_escenario: str, parametros: dict):
+    """Guarda en la carpeta del escenario con qué parámetros se generaron sus resultados."""
+    meta = dict(parametros, clave=clave_corrida(parametros), generado=time.time())
+    with open(os.path.join(ruta_escenario, ARCHIVO_META), "w") as f:
+        json.dump(meta, f, indent=4, default=str)
+
+
+def resultado_desactualizado(ruta_escenario: str, config_escenario: dict) -> bool:
+    """
+    Indica si los resultados de la carpeta de un escenario no corresponden a la configuración
+    y el código actuales (o si no se sabe con qué se generaron).
+    """
+    try:
+        with open(os.path.join(ruta_escenario, ARCHIVO_META)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return True
+    parametros = parametros_corrida(config_escenario, meta.get("duracion_dias"), meta.get("semilla"),
+                                    meta.get("motor"), meta.get("modo"), meta.get("formato_salida"))
+    return clave_corrida(parametros) != meta.get("clave")
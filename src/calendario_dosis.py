@@ -0,0 +1,65 @@
+# src/calendario_dosis.py
+
+import numpy as np
+
+# El centro opera de lunes a viernes: los intervalos en días de calendario se pasan a días operativos
+DIAS_OPERATIVOS_POR_SEMANA = 5
+DIAS_POR_SEMANA = 7
+
+
+def esquema_dos_dosis(config: dict) -> bool:
+    """Indica si el escenario aplica el esquema de dos dosis."""
+    return bool(config.get("esquema_dos_dosis_habilitado", False))
+
+
+def dosis_por_esquema(config: dict) -> int:
+    """Cantidad de dosis que completan el esquema (la última es la que cuenta para el objetivo)."""
+    return 2 if esquema_dos_dosis(config) else 1
+
+
+def intervalo_dias_operativos(config: dict) -> int:
+    """
+    Días operativos entre la primera y la segunda dosis: `intervalo_dos_dosis_dias` está en días
+    de calendario (21 días = 3 semanas = 15 días operativos).
+    """
+    dias_calendario = config.get("intervalo_dos_dosis_dias", 21)
+    return max(1, round(dias_calendario * DIAS_OPERATIVOS_POR_SEMANA / DIAS_POR_SEMANA))
+
+
+class CalendarioDosis:
+    """
+    Turnos de segunda dosis agrupados por día operativo y dígito del DNI. En lugar de un proceso
+    que duerme 21 días por paciente, cada primera dosis suma uno al conteo del día en que le
+    toca volver; ese día las vueltas se generan en bloque junto con las llegadas del día.
+    """
+
+    def __init__(self):
+        self._turnos = {}
+        self._total = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    def programar(self, dia: int, digito_dni: int, cantidad: int = 1):
+        """Agenda `cantidad` segundas dosis del dígito dado para el día operativo `dia`."""
+        if dia not in self._turnos:
+            self._turnos[dia] = np.zeros(10, dtype=np.int64)
+        self._turnos[dia][digito_dni] += cantidad
+        self._total += cantidad
+
+    def programar_lote(self, dia: int, digitos_dni: np.ndarray):
+        """Agenda una segunda dosis para cada dígito del array, todas para el mismo día."""
+        if len(digitos_dni) == 0:
+            return
+        if dia not in self._turnos:
+            self._turnos[dia] = np.zeros(10, dtype=np.int64)
+        self._turnos[dia] += np.bincount(np.asarray(digitos_dni, dtype=np.int64), minlength=10)
+        self._total += len(digitos_dni)
+
+    def retirar_dia(self, dia: int) -> np.ndarray:
+        """Quita del calendario los turnos de un día y devuelve su conteo por dígito (10 valores)."""
+        turnos = self._turnos.pop(dia, None)
+        if turnos is None:
+            return np.zeros(10, dtype=np.int64)
+        self._total -= int(turnos.sum())
+        return turnos
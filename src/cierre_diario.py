@@ -0,0 +1,115 @@
+# src/cierre_diario.py
+
+import multiprocessing
+import numpy as np
+from src.registro_eventos import EVENTO_VACUNADO
+
+# Qué pasa con la cola al cierre del horario:
+#   "continuar":   la cola pasa al día siguiente (el centro nunca se vacía; comportamiento original)
+#   "vaciar_cola": no entra nadie más, pero se atiende a todos los que están en la cola (horas extra)
+#   "reprogramar": quienes siguen en la cola al cierre se van a reprogramar; los que ya están en
+#                  una cabina terminan de vacunarse
+# Con "vaciar_cola" y "reprogramar" cada día empieza con el centro vacío: dados sus llegadas, los
+# días son independientes y se pueden simular en paralelo (ver `simular_dias_en_paralelo`).
+POLITICAS_CIERRE = ("continuar", "vaciar_cola", "reprogramar")
+
+
+def politica_cierre(config: dict) -> str:
+    """Política de cierre del escenario (por defecto, la cola pasa al día siguiente)."""
+    politica = config.get("politica_cierre", "continuar")
+    if politica not in POLITICAS_CIERRE:
+        raise ValueError(f"Política de cierre desconocida: {politica}. Opciones: {', '.join(POLITICAS_CIERRE)}")
+    return politica
+
+
+def dias_independientes(config: dict) -> bool:
+    """Indica si el centro cierra vacío cada día, así ningún día arrastra cola al siguiente."""
+    return politica_cierre(config) != "continuar"
+
+
+def secuencia_del_dia(raiz: np.random.SeedSequence, dia: int) -> np.random.SeedSequence:
+    """
+    Flujo aleatorio propio del día `dia`: el mismo hijo que daría `raiz.spawn(dia + 1)[dia]`,
+    pero sin tocar el contador de hijos de la raíz. Así un día da lo mismo simulado en orden,
+    suelto o en otro proceso.
+    """
+    return np.random.SeedSequence(raiz.entropy, spawn_key=tuple(raiz.spawn_key) + (dia,),
+                                  pool_size=raiz.pool_size)
+
+
+def _simular_bloque_dias(tarea: tuple) -> list:
+    """
+    Simula en un proceso del pool un bloque de días consecutivos, cada uno desde el centro vacío
+    y sin vacunados previos. Devuelve por día sus eventos (columnas) y sus estadísticas en el tiempo.
+    """
+    from src.simulation import simular_dia_independiente
+
+    config, motor, dias, raiz = tarea
+    return [(dia, *simular_dia_independiente(config, dia, motor, raiz)) for dia in dias]
+
+
+def _bloques_de_dias(duracion_dias: int, procesos: int) -> list:
+    """Reparte los días en bloques consecutivos: unos cuatro por proceso, para equilibrar la carga."""
+    tamano = max(1, -(-duracion_dias // (4 * procesos)))
+    return [range(inicio, min(inicio + tamano, duracion_dias)) for inicio in range(0, duracion_dias, tamano)]
+
+
+def simular_dias_en_paralelo(config: dict, duracion_dias: int, motor: str, raiz: np.random.SeedSequence, destino,
+                             estadisticas_tiempo, procesos: int = None):
+    """
+    Simula una campaña con días independientes repartiendo bloques de días en un pool de
+    procesos, y pasa los eventos y las estadísticas en el tiempo al `destino` en orden de día.
+
+    Cada día usa el flujo `secuencia_del_dia(raiz, dia)`, igual que la corrida en serie con la
+    misma política, así que el resultado no depende de la cantidad de procesos. La parada
+    temprana es lo único que cruza días: al fusionar en orden se cuenta el acumulado de
+    vacunados; el día en que se alcanza la población objetivo se vuelve a simular con ese
+    acumulado (corta en la última vacunación necesaria) y los días siguientes se descartan.
+
+    Solo admite el esquema de una dosis: con dos dosis el calendario de vueltas une los días.
+
+    Args:
+        config (dict): Escenario con `politica_cierre` distinta de "continuar".
+        duracion_dias (int): Días máximos a simular.
+        motor (str): "simpy" o "vectorizado".
+        raiz (np.random.SeedSequence): Semilla raíz de la corrida.
+        destino: RegistroEventos, AcumuladorMetricas o EscritorEventos.
+        estadisticas_tiempo (EstadisticasTiempo): Donde se fusionan las estadísticas de cada día.
+        procesos (int): Procesos del pool. Por defecto, todos los núcleos disponibles.
+    """
+    from src.calendario_dosis import dosis_por_esquema
+    from src.simulation import simular_dia_independiente
+
+    if not dias_independientes(config):
+        raise ValueError("Simular días en paralelo necesita una política de cierre que vacíe el centro "
+                         "('vaciar_cola' o 'reprogramar').")
+    if dosis_por_esquema(config) > 1:
+        raise ValueError("Con el esquema de dos dosis los días no son independientes: se simulan en serie.")
+
+    procesos = procesos or multiprocessing.cpu_count()
+    tareas = [(config, motor, dias, raiz) for dias in _bloques_de_dias(duracion_dias, procesos)]
+    vacunados = 0
+
+    def fusionar(resultados) -> bool:
+        nonlocal vacunados
+        for bloque in resultados:
+            for dia, eventos, estadisticas_dia in bloque:
+                vacunados_dia = int(np.count_nonzero(eventos["evento"] == EVENTO_VACUNADO))
+                if vacunados + vacunados_dia >= config["poblacion_total"]:
+                    eventos, estadisticas_dia = simular_dia_independiente(config, dia, motor, raiz, vacunados)
+                    destino.extender(eventos)
+                    estadisticas_tiempo.fusionar(estadisticas_dia)
+                    return True
+                vacunados += vacunados_dia
+                destino.extender(eventos)
+                estadisticas_tiempo.fusionar(estadisticas_dia)
+        return False
+
+    if procesos == 1 or len(tareas) == 1:
+        fusionar(map(_simular_bloque_dias, tareas))
+    else:
+        # imap mantiene el orden de los bloques; al alcanzar el objetivo se sale y el pool se termina
+        with multiprocessing.Pool(processes=min(procesos, len(tareas))) as pool:
+            fusionar(pool.imap(_simular_bloque_dias, tareas))
+    destino.estadisticas_tiempo = estadisticas_tiempo
+    return destino
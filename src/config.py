@@ -58,8 +58,8 @@ class ConfiguracionSimulacion:
     ESCENARIO_ACELERADO = ESCENARIO_BASE.copy()
     ESCENARIO_ACELERADO["tiempo_promedio_vacunacion_minutos"] = 2
 
-    # Para el esquema de dos dosis, esto podría implicar una lógica más compleja dentro del modelo de simulación
-    # en lugar de solo un parámetro de configuración, pero podemos añadir un indicador aquí.
+    # Esquema de dos dosis: cada primera dosis agenda la vuelta para la segunda en un calendario por día
+    # (ver src/calendario_dosis.py). El intervalo está en días de calendario: 21 días = 15 días operativos.
     ESCENARIO_DOS_DOSIS = ESCENARIO_BASE.copy()
     ESCENARIO_DOS_DOSIS["esquema_dos_dosis_habilitado"] = True
     ESCENARIO_DOS_DOSIS["intervalo_dos_dosis_dias"] = 21
@@ -67,6 +67,40 @@ class ConfiguracionSimulacion:
     ESCENARIO_HORARIO_EXTENDIDO = ESCENARIO_BASE.copy()
     ESCENARIO_HORARIO_EXTENDIDO["horas_operacion_por_dia"] = 12  # Operación de 8:00 a 20:00
 
+    # Cierre diario: quienes siguen en la cola al cierre se van a reprogramar y cada día empieza con
+    # el centro vacío, así los días se pueden simular en paralelo (ver src/cierre_diario.py)
+    ESCENARIO_CIERRE_DIARIO = ESCENARIO_CABINAS_12_SEMANAS.copy()
+    ESCENARIO_CIERRE_DIARIO["politica_cierre"] = "reprogramar"
+
+    # Llegadas con pico a la apertura y a la salida del trabajo, y más asistencia los lunes
+    # (ver src/intensidad_llegadas.py): mismos pacientes por día, repartidos según la hora
+    ESCENARIO_PICOS_HORARIOS = ESCENARIO_BASE.copy()
+    ESCENARIO_PICOS_HORARIOS["perfil_llegadas"] = {0: 1.6, 2: 1.0, 4: 0.6, 6: 1.0, 8: 1.4}
+    ESCENARIO_PICOS_HORARIOS["factor_asistencia_dia_semana"] = {0: 1.15}
+
+    # Redes de centros: cada centro tiene sus cabinas, su horario y su población de referencia;
+    # lo que un centro no define lo toma de "parametros_comunes" (ver src/red_centros.py)
+    RED_PROVINCIAL = {
+        "parametros_comunes": ESCENARIO_BASE,
+        "centros": [
+            {"nombre": "capital", "num_cabinas": 17, "horas_operacion_por_dia": 12, "poblacion_total": 420000},
+            {"nombre": "norte", "num_cabinas": 5, "poblacion_total": 198000},
+            {"nombre": "sur", "num_cabinas": 6, "poblacion_total": 150000},
+            {"nombre": "este", "num_cabinas": 3, "horas_operacion_por_dia": 8, "poblacion_total": 64000},
+            {"nombre": "oeste", "num_cabinas": 2, "horas_operacion_por_dia": 8, "poblacion_total": 41000},
+        ],
+    }
+
+    @staticmethod
+    def obtener_configuracion_red(nombre_red: str) -> dict:
+        """
+        Devuelve la configuración de una red de centros dado su nombre.
+        """
+        if nombre_red == "provincial":
+            return ConfiguracionSimulacion.RED_PROVINCIAL
+        else:
+            raise ValueError(f"Red de centros desconocida: {nombre_red}")
+
     #Metodo estatico que devuelve un diccionario con los parámetros de configuración específicos para un escenario de simulación de vacunación dado.
     @staticmethod
     def obtener_configuracion_escenario(nombre_escenario: str) -> dict:
@@ -89,6 +123,10 @@ class ConfiguracionSimulacion:
             return ConfiguracionSimulacion.ESCENARIO_ACELERADO
         elif nombre_escenario == "horario_extendido":
             return ConfiguracionSimulacion.ESCENARIO_HORARIO_EXTENDIDO
+        elif nombre_escenario == "cierre_diario":
+            return ConfiguracionSimulacion.ESCENARIO_CIERRE_DIARIO
+        elif nombre_escenario == "picos_horarios":
+            return ConfiguracionSimulacion.ESCENARIO_PICOS_HORARIOS
         else:
             raise ValueError(f"Escenario desconocido: {nombre_escenario}")
 
@@ -0,0 +1,152 @@
+# src/etapa_salida.py
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Backend sin ventanas para los procesos que grafican: solo guardan PNG
+BACKEND_GRAFICOS = "Agg"
+# Columnas que usan los gráficos de un escenario: solo esas viajan al proceso que grafica
+COLUMNAS_GRAFICOS = ("tiempo_simulacion", "evento", "longitud_cola_actual", "tiempo_espera_minutos")
+# Escenarios simulados que pueden esperar a ser escritos antes de frenar a quien los produce
+CAPACIDAD_COLA = 2
+
+
+def inicializar_trabajador():
+    """
+    Inicializa cada proceso de un pool: fuerza el backend Agg antes de que se importe matplotlib,
+    así ningún proceso intenta cargar un backend interactivo (Tk, Qt) que no va a usar.
+    """
+    os.environ["MPLBACKEND"] = BACKEND_GRAFICOS
+
+
+def _generar_graficos(eventos, ruta_escenario: str, config_escenario: dict):
+    """
+    Corre en un proceso del pool de gráficos. `eventos` es un DataFrame, la ruta de un archivo
+    de eventos (se lee de a lotes) o el descriptor de un bloque de memoria compartida, que se
+    abre sin copiar y se cierra sin liberarlo.
+    """
+    from src.visualization import generar_visualizaciones_escenario, generar_visualizaciones_desde_archivo
+    if isinstance(eventos, str):
+        generar_visualizaciones_desde_archivo(eventos, ruta_escenario, config_escenario)
+        return
+    if not isinstance(eventos, dict):
+        generar_visualizaciones_escenario(eventos, ruta_escenario, config_escenario)
+        return
+    from src.memoria_compartida import DataFrameCompartido
+    compartido = DataFrameCompartido(eventos, columnas=COLUMNAS_GRAFICOS)
+    try:
+        generar_visualizaciones_escenario(compartido.dataframe, ruta_escenario, config_escenario)
+    finally:
+        compartido.cerrar(liberar=False)
+
+
+class EtapaSalida:
+    """
+    Etapa de salida en paralelo con la simulación. Los escenarios simulados entran por una cola
+    acotada a un hilo escritor, que llama a `guardar(resultado, graficar)` (eventos, JSON, caché);
+    `graficar` manda los gráficos a un pool de procesos aparte. Mientras tanto quien produce los
+    resultados sigue simulando.
+
+    Contrapresión: `encolar` se bloquea si ya hay `capacidad` escenarios esperando, y el escritor
+    se bloquea si ya hay `max_graficos_pendientes` gráficos en curso. Así en memoria nunca hay más
+    que unos pocos registros de eventos, aunque escribir o graficar sea más lento que simular.
+
+    Uso:
+        with EtapaSalida(guardar) as etapa:
+            etapa.consumir(pool, funcion, tareas, procesos)
+    """
+
+    def __init__(self, guardar, capacidad: int = CAPACIDAD_COLA, procesos_graficos: int = 1,
+                 max_graficos_pendientes: int = None):
+        self.guardar = guardar
+        self.procesos_graficos = procesos_graficos
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._cupos_graficos = threading.BoundedSemaphore(max_graficos_pendientes or procesos_graficos + 1)
+        self._hilo = None
+        self._pool_graficos = None
+        self.errores = []
+
+    def __enter__(self):
+        # spawn: el proceso hijo no hereda el hilo escritor ni el estado del padre
+        contexto = multiprocessing.get_context("spawn")
+        self._pool_graficos = ProcessPoolExecutor(max_workers=self.procesos_graficos, mp_context=contexto,
+                                                  initializer=inicializar_trabajador)
+        self._hilo = threading.Thread(target=self._escribir, name="etapa_salida", daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+    def encolar(self, resultado):
+        """Pasa un escenario simulado al escritor; se bloquea mientras la cola esté llena."""
+        if resultado is not None:
+            self._cola.put(resultado)
+
+    def consumir(self, pool, funcion, tareas, procesos: int = 1, max_en_vuelo: int = None):
+        """
+        Ejecuta `funcion(tarea)` en el `pool` de multiprocessing y encola cada resultado a medida
+        que sale, en el orden de `tareas`. A lo sumo `max_en_vuelo` tareas (por defecto, los
+        `procesos` del pool más la capacidad de la cola) están lanzadas sin que su resultado se
+        haya encolado: los resultados no se acumulan en el proceso principal.
+        """
+        max_en_vuelo = max_en_vuelo or procesos + self._cola.maxsize
+        en_vuelo = deque()
+        for tarea in tareas:
+            if len(en_vuelo) >= max_en_vuelo:
+                self.encolar(en_vuelo.popleft().get())
+            en_vuelo.append(pool.apply_async(funcion, (tarea,)))
+        while en_vuelo:
+            self.encolar(en_vuelo.popleft().get())
+
+    def graficar(self, resultados_df, ruta_escenario: str, config_escenario: dict, descriptor: dict = None,
+                 ruta_eventos: str = None):
+        """
+        Manda los gráficos de un escenario al pool de gráficos (espera si hay demasiados en curso).
+        Con el `descriptor` de un bloque de memoria compartida con los mismos eventos, viaja solo
+        el descriptor; quien creó el bloque no debe liberarlo antes de `cerrar()`. Con
+        `ruta_eventos` el proceso de gráficos lee el archivo de a lotes.
+        """
+        eventos = ruta_eventos if ruta_eventos is not None else descriptor
+        if eventos is None:
+            eventos = resultados_df[[c for c in COLUMNAS_GRAFICOS if c in resultados_df.columns]]
+        self._cupos_graficos.acquire()
+        try:
+            futuro = self._pool_graficos.submit(_generar_graficos, eventos, ruta_escenario, config_escenario)
+        except Exception:
+            self._cupos_graficos.release()
+            raise
+        futuro.add_done_callback(lambda f: self._fin_grafico(f, ruta_escenario))
+
+    def _fin_grafico(self, futuro, ruta_escenario: str):
+        self._cupos_graficos.release()
+        if futuro.exception() is not None:
+            print(f"Error al generar los gráficos en '{ruta_escenario}': {futuro.exception()}")
+            self.errores.append(futuro.exception())
+
+    def _escribir(self):
+        while True:
+            resultado = self._cola.get()
+            if resultado is None:
+                return
+            try:
+                self.guardar(resultado, self.graficar)
+            except Exception as e:
+                # Un escenario que no se pudo guardar no frena a los demás
+                print(f"Error al guardar las salidas de '{resultado.get('nombre')}': {e}")
+                self.errores.append(e)
+
+    def cerrar(self):
+        """Espera a que se escriban todos los escenarios encolados y terminen sus gráficos."""
+        if self._hilo is not None:
+            self._cola.put(None)
+            self._hilo.join()
+            self._hilo = None
+        if self._pool_graficos is not None:
+            self._pool_graficos.shutdown(wait=True)
+            self._pool_graficos = None
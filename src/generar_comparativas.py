@@ -2,9 +2,57 @@
 
 import os
 import json
+import numpy as np
 import pandas as pd
-from src.visualization import plot_comparacion_escenarios
 from src.config import ConfiguracionSimulacion
+from src.cache import resultado_desactualizado
+
+# Formato de las columnas de métricas para mostrar las tablas en consola
+FORMATOS_TABLA = {
+    'Tasa de Asistencia (%)': '{:.0f}%',
+    'Días para Vacunar 80%': '{:.1f}',
+    'Días para Vacunar 100%': '{:.1f}',
+    'Tiempo Espera Promedio (min)': '{:,.1f}',
+    'Tiempo Espera Máximo (min)': '{:,.1f}',
+    'Longitud Máxima de Cola': '{:,.0f}',
+    'Total Reprogramaciones': '{:,.0f}',
+    'Utilización Cabinas (%)': '{:.1f}%',
+    'Costo Total': 'S/ {:,.0f}',
+    'Costo por Vacunado': 'S/ {:,.2f}'
+}
+
+def _columnas_metricas(metricas: dict) -> dict:
+    """Métricas de rendimiento y de costo (outputs) de una fila de las tablas consolidadas."""
+    hitos = metricas.get("hitos_vacunacion", {})
+    tiempos_espera = metricas.get("tiempos_espera_minutos", {})
+    cola = metricas.get("longitud_cola", {})
+    generales = metricas.get("generales", {})
+    rendimiento = metricas.get("rendimiento", {})
+    costos = metricas.get("costos", {})
+    return {
+        # Métricas de Rendimiento (Outputs)
+        "Días para Vacunar 80%": hitos.get("80_porciento", {}).get("dias"),
+        "Días para Vacunar 100%": hitos.get("100_porciento", {}).get("dias"),
+        "Tiempo Espera Promedio (min)": tiempos_espera.get("promedio"),
+        "Tiempo Espera Máximo (min)": tiempos_espera.get("maximo"),
+        "Longitud Máxima de Cola": cola.get("maxima"),
+        "Total Reprogramaciones": generales.get("total_reprogramados"),
+        "Utilización Cabinas (%)": rendimiento.get("utilizacion_promedio_cabinas_porcentual"),
+
+        # Métricas de Costo (Outputs)
+        "Costo Total": costos.get("costo_total_campana"),
+        "Costo por Vacunado": costos.get("costo_por_paciente_vacunado")
+    }
+
+def _formatear_tabla(df: pd.DataFrame) -> pd.DataFrame:
+    """Copia de la tabla con las columnas de `FORMATOS_TABLA` formateadas para la consola."""
+    df_display = df.copy()
+    for col, fmt in FORMATOS_TABLA.items():
+        if col in df_display.columns:
+            # Los hitos no alcanzados ya vienen como texto ("No alcanzado")
+            df_display[col] = df_display[col].apply(
+                lambda x, fmt=fmt: x if isinstance(x, str) else (fmt.format(x) if pd.notna(x) else 'N/A'))
+    return df_display
 
 def generar_tabla_consolidada(metricas_por_escenario: dict, ruta_salida: str):
     """
@@ -21,14 +69,6 @@ def generar_tabla_consolidada(metricas_por_escenario: dict, ruta_salida: str):
             print(f"Advertencia: No se encontró configuración para el escenario '{nombre}'. Se usarán valores por defecto.")
             config_escenario = {}
 
-        # Extraer métricas de resultados (outputs)
-        hitos = metricas.get("hitos_vacunacion", {})
-        tiempos_espera = metricas.get("tiempos_espera_minutos", {})
-        cola = metricas.get("longitud_cola", {})
-        generales = metricas.get("generales", {})
-        rendimiento = metricas.get("rendimiento", {})
-        costos = metricas.get("costos", {})
-
         fila = {
             # Identificación
             "Escenario": nombre,
@@ -39,18 +79,8 @@ def generar_tabla_consolidada(metricas_por_escenario: dict, ruta_salida: str):
             "Tasa de Asistencia (%)": config_escenario.get("tasa_asistencia", 0) * 100,
             "Política de Asignación": "Estándar", # Placeholder, ya que no es un parámetro simple
             
-            # Métricas de Rendimiento (Outputs)
-            "Días para Vacunar 80%": hitos.get("80_porciento", {}).get("dias"),
-            "Días para Vacunar 100%": hitos.get("100_porciento", {}).get("dias"),
-            "Tiempo Espera Promedio (min)": tiempos_espera.get("promedio"),
-            "Tiempo Espera Máximo (min)": tiempos_espera.get("maximo"),
-            "Longitud Máxima de Cola": cola.get("maxima"),
-            "Total Reprogramaciones": generales.get("total_reprogramados"),
-            "Utilización Cabinas (%)": rendimiento.get("utilizacion_promedio_cabinas_porcentual"),
-            
-            # Métricas de Costo (Outputs)
-            "Costo Total": costos.get("costo_total_campana"),
-            "Costo por Vacunado": costos.get("costo_por_paciente_vacunado")
+            # Métricas de Rendimiento y de Costo (Outputs)
+            **_columnas_metricas(metricas),
         }
         datos_tabla.append(fila)
     
@@ -61,23 +91,7 @@ def generar_tabla_consolidada(metricas_por_escenario: dict, ruta_salida: str):
     df_consolidado = pd.DataFrame(datos_tabla)
     
     # Formatear columnas para mejor legibilidad
-    format_dict = {
-        'Tasa de Asistencia (%)': '{:.0f}%',
-        'Días para Vacunar 80%': '{:.1f}',
-        'Días para Vacunar 100%': '{:.1f}',
-        'Tiempo Espera Promedio (min)': '{:,.1f}',
-        'Tiempo Espera Máximo (min)': '{:,.1f}',
-        'Longitud Máxima de Cola': '{:,.0f}',
-        'Total Reprogramaciones': '{:,.0f}',
-        'Utilización Cabinas (%)': '{:.1f}%',
-        'Costo Total': 'S/ {:,.0f}',
-        'Costo por Vacunado': 'S/ {:,.2f}'
-    }
-    
-    df_display = df_consolidado.copy()
-    for col, fmt in format_dict.items():
-        if col in df_display.columns:
-            df_display[col] = df_display[col].apply(lambda x: fmt.format(x) if pd.notna(x) else 'N/A')
+    df_display = _formatear_tabla(df_consolidado)
 
     ruta_csv = os.path.join(ruta_salida, "resumen_consolidado_escenarios.csv")
     df_consolidado.to_csv(ruta_csv, index=False, float_format='%.2f')
@@ -87,6 +101,122 @@ def generar_tabla_consolidada(metricas_por_escenario: dict, ruta_salida: str):
     print(df_display.to_string())
 
 
+def generar_tabla_barrido(barrido: dict, ruta_salida: str, filas_consola: int = 10) -> pd.DataFrame:
+    """
+    Tabla consolidada de un barrido de parámetros (ver src/barrido.py): una fila por punto con
+    resultados, con los parámetros que varían entre puntos y las mismas métricas que
+    `generar_tabla_consolidada`, ordenada por costo total. Muestra en consola los más baratos.
+    """
+    puntos = barrido["puntos"]
+    configs = [punto["config"] for punto in puntos.values()]
+    claves = list(dict.fromkeys(clave for config in configs for clave in config))
+    barridas = [clave for clave in claves
+                if len({json.dumps(config.get(clave), sort_keys=True, default=str) for config in configs}) > 1]
+
+    datos_tabla = []
+    for nombre, punto in puntos.items():
+        if punto["metricas"] is None:
+            continue
+        fila = {"Punto": nombre, **{clave: punto["config"].get(clave) for clave in barridas}}
+        fila.update(_columnas_metricas(punto["metricas"]))
+        fila["Origen"] = punto["estado"]
+        datos_tabla.append(fila)
+    if not datos_tabla:
+        print("El barrido no tiene puntos con resultados.")
+        return None
+
+    df_barrido = pd.DataFrame(datos_tabla).sort_values("Costo Total", kind="stable").reset_index(drop=True)
+    ruta_csv = os.path.join(ruta_salida, "resumen_barrido.csv")
+    df_barrido.to_csv(ruta_csv, index=False, float_format='%.2f')
+    print(f"Tabla del barrido guardada en: {ruta_csv}")
+    print(f"\nLos {min(filas_consola, len(df_barrido))} puntos más baratos:")
+    print(_formatear_tabla(df_barrido.drop(columns=["Punto"]).head(filas_consola)).to_string())
+    return df_barrido
+
+def generar_tabla_vacunados_por_dia(eventos_por_escenario: dict, ruta_salida: str) -> pd.DataFrame:
+    """
+    Tabla de dosis aplicadas por día (filas) y escenario (columnas) a partir de los eventos de
+    cada escenario, que pueden ser vistas sobre memoria compartida: solo se leen `dia` y `evento`.
+    """
+    columnas = {}
+    for nombre, resultados_df in eventos_por_escenario.items():
+        vacunado = (resultados_df["evento"] == "Vacunado").to_numpy()
+        columnas[nombre] = np.bincount(resultados_df["dia"].to_numpy()[vacunado])
+    dias = max((len(conteos) for conteos in columnas.values()), default=0)
+    tabla = pd.DataFrame({nombre: np.pad(conteos, (0, dias - len(conteos))) for nombre, conteos in columnas.items()},
+                         index=pd.RangeIndex(dias, name="dia"))
+
+    ruta_csv = os.path.join(ruta_salida, "vacunados_por_dia_escenarios.csv")
+    tabla.to_csv(ruta_csv)
+    print(f"Vacunados por día de {len(columnas)} escenarios guardados en: {ruta_csv}")
+    return tabla
+
+
+# Métricas de la tabla de diferencias pareadas: etiqueta -> clave en las métricas aplanadas
+METRICAS_PAREADAS = {
+    "Días para Vacunar 100%": "hitos_vacunacion.100_porciento.dias",
+    "Tiempo Espera Promedio (min)": "tiempos_espera_minutos.promedio",
+    "Total Reprogramaciones": "generales.total_reprogramados",
+    "Utilización Cabinas (%)": "rendimiento.utilizacion_promedio_cabinas_porcentual",
+    "Costo Total": "costos.costo_total_campana",
+}
+
+
+def generar_tabla_diferencias_pareadas(comparacion: dict, ruta_salida: str) -> pd.DataFrame:
+    """
+    Tabla de diferencias pareadas contra el escenario de referencia (ver
+    replicas.comparar_escenarios_pareados): por escenario y métrica, la diferencia media, su IC
+    del 95% y el IC de cada escenario por separado, que muestra cuánto angosta el pareo.
+    """
+    referencia = comparacion["referencia"]
+    resumen_referencia = comparacion["escenarios"][referencia]
+    filas = []
+    for nombre, diferencias in comparacion["diferencias"].items():
+        for etiqueta, clave in METRICAS_PAREADAS.items():
+            if clave not in diferencias:
+                continue
+            diferencia = diferencias[clave]
+            propio = comparacion["escenarios"][nombre].get(clave, {})
+            filas.append({
+                "Escenario": nombre,
+                "Referencia": referencia,
+                "Métrica": etiqueta,
+                "Valor Escenario": propio.get("media"),
+                "Valor Referencia": resumen_referencia.get(clave, {}).get("media"),
+                "Diferencia Media": diferencia["media"],
+                "IC 95% Inferior": diferencia["ic95_inferior"],
+                "IC 95% Superior": diferencia["ic95_superior"],
+                # Semiamplitud sin parear: la del escenario y la de la referencia combinadas
+                "Semiamplitud Sin Parear": _semiamplitud_independiente(propio, resumen_referencia.get(clave, {})),
+                "Réplicas": diferencia["n"],
+            })
+    tabla = pd.DataFrame(filas)
+    ruta_csv = os.path.join(ruta_salida, "diferencias_pareadas_escenarios.csv")
+    tabla.to_csv(ruta_csv, index=False, float_format='%.4f')
+    print(f"Diferencias pareadas contra '{referencia}' guardadas en: {ruta_csv}")
+    return tabla
+
+
+def _semiamplitud_independiente(resumen_a: dict, resumen_b: dict) -> float:
+    """Semiamplitud del IC de la diferencia si los dos escenarios se hubieran simulado por separado."""
+    semiamplitudes = [(r["ic95_superior"] - r["ic95_inferior"]) / 2 for r in (resumen_a, resumen_b) if r]
+    return float(np.hypot(*semiamplitudes)) if len(semiamplitudes) == 2 else float("nan")
+
+
+def avisar_si_desactualizado(nombre_escenario: str, ruta_escenario: str):
+    """
+    Avisa si los resultados guardados de un escenario no corresponden a su configuración o al
+    código actuales (ver 'meta.json' en la carpeta del escenario).
+    """
+    try:
+        config_escenario = ConfiguracionSimulacion.obtener_configuracion_escenario(nombre_escenario)
+    except ValueError:
+        return
+    if resultado_desactualizado(ruta_escenario, config_escenario):
+        print(f"Advertencia: los resultados de '{nombre_escenario}' están desactualizados o no tienen metadatos. "
+              "Vuelve a ejecutar 'python -m src.main' para regenerarlos.")
+
+
 def generar_graficos_comparativos():
     """
     Carga las métricas guardadas de múltiples escenarios y genera
@@ -122,6 +252,7 @@ def generar_graficos_comparativos():
                     metricas = json.load(f)
                 metricas_por_escenario[nombre_escenario] = metricas
                 print(f"Métricas cargadas para el escenario: '{nombre_escenario}'")
+                avisar_si_desactualizado(nombre_escenario, os.path.join(ruta_base_output, nombre_escenario))
             except Exception as e:
                 print(f"Advertencia: No se pudieron cargar las métricas para '{nombre_escenario}': {e}. Se omitirá.")
         else:
@@ -132,6 +263,7 @@ def generar_graficos_comparativos():
         return
 
     # --- Generar Gráficos ---
+    from src.visualization import plot_comparacion_escenarios
     print("\nGenerando visualizaciones comparativas...")
     metricas_a_graficar = [
         ('costos.costo_total_campana', 'Comparación de Costo Total por Escenario'),
@@ -0,0 +1,86 @@
+# src/intensidad_llegadas.py
+
+import numpy as np
+
+# Perfil de llegadas dentro de la jornada. "perfil_llegadas" en el escenario puede ser:
+#   - una lista de pesos para tramos iguales de la jornada (con una por hora, una tabla horaria),
+#     ej. [1.6, 1.4, 1.0, 0.8, 0.6, 0.9, 1.1, 1.0, 0.9, 0.7];
+#   - un diccionario {hora desde la apertura: peso}, constante por tramos hasta la próxima hora
+#     o el cierre, ej. {0: 1.5, 2: 1.0, 4: 0.6, 5.5: 1.0}.
+# Solo importa la forma: la cantidad de llegadas del día no cambia.
+# "factor_asistencia_dia_semana" ({día de la semana: factor}, 0 = lunes) multiplica la tasa de
+# asistencia de ese día; los días que no figuran quedan con factor 1.
+
+
+def factor_dia_semana(config: dict, dia: int) -> float:
+    """Factor de asistencia del día de la semana de `dia` (1 si el escenario no define uno)."""
+    return float(config.get("factor_asistencia_dia_semana", {}).get(dia % 5, 1.0))
+
+
+def pacientes_del_dia(config: dict, dia: int) -> int:
+    """
+    Primeras visitas del día: la población de los dígitos del DNI asignados al día de la semana
+    por la tasa de asistencia, con el factor del día (sin superar a toda esa población).
+    """
+    digitos_hoy = config["asignacion_digitos_dias"].get(dia % 5, [])
+    pacientes_por_digito = config["poblacion_total"] / 10
+    asistencia = config["tasa_asistencia"]
+    if "factor_asistencia_dia_semana" in config:
+        asistencia = min(1.0, asistencia * factor_dia_semana(config, dia))
+    return int(len(digitos_hoy) * pacientes_por_digito * asistencia)
+
+
+def tramos_perfil(config: dict, minutos_por_dia: float):
+    """
+    Intensidad relativa de llegadas constante por tramos: (bordes en minutos desde la apertura,
+    peso de cada tramo), con pesos normalizados a promedio 1 en la jornada. None si el escenario
+    no define "perfil_llegadas" (llegadas parejas en toda la jornada).
+    """
+    perfil = config.get("perfil_llegadas")
+    if perfil is None:
+        return None
+    if isinstance(perfil, dict):
+        horas = sorted(perfil)
+        if not horas or horas[0] != 0:
+            raise ValueError("El perfil de llegadas por tramos tiene que empezar en la hora 0 (la apertura).")
+        bordes = np.append(np.asarray(horas, dtype=np.float64) * 60, np.inf)
+        pesos = np.asarray([perfil[hora] for hora in horas], dtype=np.float64)
+        # Los tramos que empiezan después del cierre no cuentan
+        dentro = bordes[:-1] < minutos_por_dia
+        bordes = np.append(bordes[:-1][dentro], minutos_por_dia)
+        pesos = pesos[dentro]
+    else:
+        pesos = np.asarray(perfil, dtype=np.float64)
+        bordes = np.linspace(0.0, minutos_por_dia, len(pesos) + 1)
+    if len(pesos) == 0 or np.any(pesos < 0) or not np.any(pesos > 0):
+        raise ValueError("El perfil de llegadas necesita pesos no negativos y al menos uno positivo.")
+    promedio = np.sum(pesos * np.diff(bordes)) / minutos_por_dia
+    return bordes, pesos / promedio
+
+
+def aplicar_perfil(instantes: np.ndarray, config: dict, minutos_por_dia: float) -> np.ndarray:
+    """
+    Lleva instantes de llegadas parejas (tasa constante en la jornada) a llegadas con el perfil
+    del escenario, por inversión de la intensidad acumulada: el instante `s` pasa a ser el `t`
+    en que la intensidad acumulada Λ(t) vale `s`. Como Λ es lineal por tramos, la inversa es una
+    interpolación: O(llegadas) en NumPy, sin descartar llegadas, y conserva el orden (y con
+    números aleatorios comunes, el paciente `i` sigue siendo el mismo cuantil del día).
+
+    Con un proceso de Poisson homogéneo de entrada sale el no homogéneo de intensidad λ·perfil(t);
+    con uniformes ordenadas (llegadas condicionadas al total del día), uniformes con densidad
+    proporcional al perfil. Los instantes posteriores al cierre (llegadas que pasan al día
+    siguiente con la política "continuar") no se modifican.
+    """
+    tramos = tramos_perfil(config, minutos_por_dia)
+    if tramos is None or len(instantes) == 0:
+        return instantes
+    bordes, intensidad = tramos
+    acumulada = np.concatenate([[0.0], np.cumsum(intensidad * np.diff(bordes))])
+    # Tramo de cada instante: el último cuya acumulada inicial no lo supera. Un tramo sin
+    # llegadas (peso 0) deja la acumulada plana y nunca se elige
+    tramo = np.clip(np.searchsorted(acumulada, instantes, side="right") - 1, 0, len(intensidad) - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        transformados = bordes[tramo] + (instantes - acumulada[tramo]) / intensidad[tramo]
+    # Por redondeo, el final de la jornada puede caer en un último tramo sin llegadas
+    transformados = np.where(intensidad[tramo] > 0, np.minimum(transformados, minutos_por_dia), bordes[tramo])
+    return np.where(instantes < minutos_por_dia, transformados, instantes)
@@ -1,43 +1,147 @@
 # src/main.py
 
+import argparse
 import json
-import pandas as pd
 import os
 import multiprocessing
 from functools import partial
 from src.config import ConfiguracionSimulacion
-from src.simulation import ejecutar_simulacion
-from src.analysis import calcular_metricas_principales
-from src.visualization import generar_visualizaciones_escenario, plot_comparacion_escenarios
+from src.cache import (
+    parametros_corrida, clave_corrida, buscar_entrada, guardar_entrada, restaurar_entrada,
+    limpiar_cache, escribir_meta_escenario
+)
+from src.perfil import PerfilEscenario, MODOS_PERFIL, VARIABLE_ENTORNO, modo_desde_entorno
+from src.etapa_salida import EtapaSalida, inicializar_trabajador
+# La simulación, el análisis y los gráficos (NumPy, pandas, SimPy, matplotlib, seaborn) se importan
+# dentro de las funciones que los usan: así `--help` arranca en milisegundos y cada proceso del
+# pool carga matplotlib solo si efectivamente grafica.
 
-def ejecutar_escenario(nombre_escenario: str, duracion_simulacion_dias: int) -> tuple[str, dict]:
+# Serie de cola y ocupación del escenario (array estructurado, ver acumuladores.TIPO_SERIE_OCUPACION)
+ARCHIVO_SERIE_OCUPACION = "serie_ocupacion.npy"
+
+def ejecutar_escenario(nombre_escenario: str, duracion_simulacion_dias: int, motor: str = "simpy", semilla: int = None,
+                       formato_salida: str = "parquet", modo: str = "eventos", usar_cache: bool = True,
+                       forzar: bool = False, perfil: str = None) -> tuple[str, dict]:
     """
     Ejecuta la simulación y el análisis para un único escenario.
+    `motor` elige entre el modelo SimPy ("simpy") y el motor vectorizado ("vectorizado");
+    `semilla` hace reproducible la corrida y `formato_salida` ("csv", "parquet" o "feather")
+    define cómo se guardan los eventos crudos. Con `modo="solo_metricas"` no se guardan
+    eventos ni gráficos: solo 'metricas.json', calculado con acumuladores en línea. Con
+    `modo="en_disco"` la simulación vuelca los eventos a Parquet día por día y las métricas y
+    los gráficos se calculan leyendo ese archivo de a un lote: la memoria no crece con la población.
+
+    Con semilla fija, el resultado se guarda en la caché ('data/cache/') bajo un hash de la
+    configuración, la duración, la semilla, el motor y el código del modelo; si ya está, se
+    reutiliza sin simular. `forzar=True` vuelve a simular y reemplaza la entrada.
+
+    `perfil` ("fases", "cprofile" o "pyinstrument"; por defecto el valor de la variable de entorno
+    VACUNACION_PERFIL) guarda en 'perf.json' el tiempo de reloj, de CPU y el pico de memoria de
+    cada fase y los contadores del motor; con "cprofile"/"pyinstrument" además se vuelca el perfil
+    de la fase de simulación. Sin perfil la instrumentación no hace nada.
+
+    Es `simular_escenario` seguido de `guardar_salidas_escenario`; `ejecutar_escenarios` hace lo
+    mismo pero escribe y grafica un escenario mientras simula el siguiente.
+    """
+    resultado = simular_escenario(nombre_escenario, duracion_simulacion_dias, motor=motor, semilla=semilla,
+                                  formato_salida=formato_salida, modo=modo, usar_cache=usar_cache, forzar=forzar,
+                                  perfil=perfil)
+    if resultado is None:
+        return nombre_escenario, {}
+    guardar_salidas_escenario(resultado)
+    return nombre_escenario, resultado["metricas"]
+
+def simular_escenario(nombre_escenario: str, duracion_simulacion_dias: int, motor: str = "simpy", semilla: int = None,
+                      formato_salida: str = "parquet", modo: str = "eventos", usar_cache: bool = True,
+                      forzar: bool = False, perfil: str = None, compartir: bool = False) -> dict:
     """
+    Parte de cómputo de `ejecutar_escenario` (mismos argumentos): busca en la caché o simula y
+    calcula las métricas, sin escribir nada salvo al restaurar de la caché.
+
+    Con `compartir=True` (en un proceso del pool) los eventos van a un bloque de memoria
+    compartida y el resultado lleva solo su descriptor en 'eventos_compartidos': devolverlo al
+    proceso principal no serializa el DataFrame (ver src/memoria_compartida.py).
+
+    Returns:
+        dict: El escenario listo para `guardar_salidas_escenario` (eventos, métricas, perfil y
+              datos de la caché), o None si la simulación falló.
+    """
+    from src.simulation import ejecutar_simulacion
+    from src.analysis import (
+        calcular_metricas_principales, calcular_metricas_desde_acumuladores, calcular_metricas_desde_archivo
+    )
+    from src.acumuladores import EstadisticasTiempo
+    from src.almacenamiento import ruta_resultados
+
     print(f"\n--- Ejecutando escenario: {nombre_escenario} ---")
+    perfil = PerfilEscenario(perfil if perfil is not None else modo_desde_entorno())
     
     # 1. Cargar configuración del escenario
     config_actual = ConfiguracionSimulacion.obtener_configuracion_escenario(nombre_escenario)
+    ruta_salida_escenario = os.path.join("data", "output", nombre_escenario)
+    if modo == "en_disco":
+        # El volcado día por día solo escribe Parquet
+        formato_salida = "parquet"
+    parametros = parametros_corrida(config_actual, duracion_simulacion_dias, semilla, motor, modo, formato_salida)
+    # Sin semilla la corrida no es reproducible: no se guarda ni se busca en la caché
+    usar_cache = usar_cache and semilla is not None
+    resultado = {
+        "nombre": nombre_escenario,
+        "config": config_actual,
+        "ruta": ruta_salida_escenario,
+        "parametros": parametros,
+        "clave": clave_corrida(parametros),
+        "usar_cache": usar_cache,
+        "perfil": perfil,
+        "resultados_df": None,
+        "eventos_compartidos": None,
+        "ruta_eventos": None,
+        "serie_ocupacion": None,
+        "desde_cache": False,
+    }
+
+    if usar_cache and not forzar:
+        entrada = buscar_entrada(resultado["clave"])
+        if entrada is not None:
+            with perfil.fase("restauracion_cache"):
+                resultado["metricas"] = restaurar_escenario(nombre_escenario, entrada, parametros, config_actual)
+            resultado["desde_cache"] = True
+            return resultado
     
     # 2. Ejecutar la simulación
+    estadisticas_tiempo = EstadisticasTiempo(config_actual["num_cabinas"])
+    if modo == "en_disco":
+        # Los eventos se escriben durante la simulación, siempre en Parquet (es el formato de solo agregado)
+        os.makedirs(ruta_salida_escenario, exist_ok=True)
+        resultado["ruta_eventos"] = ruta_resultados(ruta_salida_escenario, nombre_escenario, "parquet")
     try:
-        resultados_df = ejecutar_simulacion(config_actual, duracion_simulacion_dias)
+        with perfil.fase("simulacion"), perfil.perfilar(ruta_salida_escenario, "perfil_simulacion"):
+            resultados_df = ejecutar_simulacion(config_actual, duracion_simulacion_dias, motor=motor, semilla=semilla,
+                                                modo=modo, perfil=perfil, estadisticas_tiempo=estadisticas_tiempo,
+                                                ruta_eventos=resultado["ruta_eventos"])
         print(f"Simulación '{nombre_escenario}' completada. Eventos registrados: {len(resultados_df)}")
     except Exception as e:
         print(f"Error al ejecutar la simulación para el escenario '{nombre_escenario}': {e}")
-        return nombre_escenario, {}
-
-    # Crear directorio de salida
-    ruta_salida_escenario = os.path.join("data", "output", nombre_escenario)
-    os.makedirs(ruta_salida_escenario, exist_ok=True)
-
-    # 3. Guardar datos crudos
-    nombre_archivo_csv = os.path.join(ruta_salida_escenario, f"resultados_{nombre_escenario}.csv")
-    resultados_df.to_csv(nombre_archivo_csv, index=False)
-    print(f"Resultados crudos para '{nombre_escenario}' guardados en: {nombre_archivo_csv}")
+        return None
 
-    # 4. Analizar resultados
-    metricas = calcular_metricas_principales(resultados_df, config_actual, duracion_simulacion_dias)
+    # 3. Analizar resultados
+    with perfil.fase("analisis"):
+        if modo == "solo_metricas":
+            # No hay eventos que guardar: las métricas salen de los acumuladores de la corrida
+            metricas = calcular_metricas_desde_acumuladores(resultados_df, config_actual, duracion_simulacion_dias)
+        elif modo == "en_disco":
+            metricas = calcular_metricas_desde_archivo(resultado["ruta_eventos"], config_actual, duracion_simulacion_dias,
+                                                       estadisticas_tiempo, por_lotes=True)
+        else:
+            metricas = calcular_metricas_principales(resultados_df, config_actual, duracion_simulacion_dias,
+                                                     estadisticas_tiempo)
+            resultado["resultados_df"] = resultados_df
+    resultado["metricas"] = metricas
+    resultado["serie_ocupacion"] = estadisticas_tiempo.serie()
+    if compartir and resultado["resultados_df"] is not None:
+        from src.memoria_compartida import exportar_dataframe
+        resultado["eventos_compartidos"] = exportar_dataframe(resultado["resultados_df"])
+        resultado["resultados_df"] = None
     
     # Imprimir métricas clave
     print(f"Métricas clave para el escenario '{nombre_escenario}':")
@@ -45,22 +149,340 @@ def ejecutar_escenario(nombre_escenario: str, duracion_simulacion_dias: int) ->
     print(f"  Tasa de Abandono: {metricas.get('generales', {}).get('tasa_abandono_porcentual', 0):.2f}%")
     hitos = metricas.get('hitos_vacunacion', {})
     print(f"  Tiempo para 100% población: {hitos.get('100_porciento', {}).get('dias', 'N/A')} días")
+    return resultado
+
+def guardar_salidas_escenario(resultado: dict, graficar=None):
+    """
+    Parte de entrada/salida de `ejecutar_escenario`: guarda los eventos crudos, los gráficos,
+    'serie_ocupacion.npy', 'metricas.json', 'perf.json' y la entrada de la caché de un escenario
+    de `simular_escenario`.
+
+    `graficar(resultados_df, ruta, config)` reemplaza a la generación de gráficos en el mismo
+    hilo (la etapa de salida la usa para mandarlos a otro proceso). En modo "en_disco" los
+    eventos ya están escritos y los gráficos se leen del archivo con `ruta_eventos=`.
+    """
+    import numpy as np
+    from src.almacenamiento import guardar_resultados
+
+    nombre_escenario = resultado["nombre"]
+    ruta_salida_escenario = resultado["ruta"]
+    resultados_df = resultado["resultados_df"]
+    metricas = resultado["metricas"]
+    perfil = resultado["perfil"]
+    if resultado["desde_cache"]:
+        # restaurar_escenario ya dejó todo en la carpeta del escenario
+        if perfil.activo:
+            perfil.guardar(ruta_salida_escenario)
+        return
+
+    # Crear directorio de salida
+    os.makedirs(ruta_salida_escenario, exist_ok=True)
+
+    # 4. Guardar datos crudos
+    ruta_resultados = None
+    if resultados_df is not None:
+        with perfil.fase("escritura_eventos"):
+            ruta_resultados = guardar_resultados(resultados_df, ruta_salida_escenario, nombre_escenario,
+                                                 formato=resultado["parametros"]["formato_salida"])
+        print(f"Resultados crudos para '{nombre_escenario}' guardados en: {ruta_resultados}")
 
     # 5. Generar visualizaciones
-    print(f"Generando visualizaciones para '{nombre_escenario}'...")
-    generar_visualizaciones_escenario(resultados_df, ruta_salida_escenario, config_actual)
-    print(f"Visualizaciones para '{nombre_escenario}' guardadas en: {ruta_salida_escenario}")
+    if resultado["ruta_eventos"] is not None:
+        ruta_resultados = resultado["ruta_eventos"]
+        print(f"Resultados crudos para '{nombre_escenario}' guardados en: {ruta_resultados}")
+        if graficar is not None:
+            graficar(None, ruta_salida_escenario, resultado["config"], ruta_eventos=ruta_resultados)
+        else:
+            with perfil.fase("graficos"):
+                from src.visualization import generar_visualizaciones_desde_archivo
+                generar_visualizaciones_desde_archivo(ruta_resultados, ruta_salida_escenario, resultado["config"])
+    if resultados_df is not None:
+        if graficar is not None:
+            graficar(resultados_df, ruta_salida_escenario, resultado["config"])
+        else:
+            print(f"Generando visualizaciones para '{nombre_escenario}'...")
+            with perfil.fase("graficos"):
+                from src.visualization import generar_visualizaciones_escenario
+                generar_visualizaciones_escenario(resultados_df, ruta_salida_escenario, resultado["config"])
+            print(f"Visualizaciones para '{nombre_escenario}' guardadas en: {ruta_salida_escenario}")
+
+    # Serie de cola y cabinas ocupadas cada RESOLUCION_SERIE_MINUTOS, promediadas en el tiempo
+    if resultado["serie_ocupacion"] is not None:
+        np.save(os.path.join(ruta_salida_escenario, ARCHIVO_SERIE_OCUPACION), resultado["serie_ocupacion"])
 
     # 6. Guardar métricas en JSON
     ruta_metricas_json = os.path.join(ruta_salida_escenario, "metricas.json")
     try:
-        with open(ruta_metricas_json, 'w') as f:
+        with perfil.fase("escritura_metricas"), open(ruta_metricas_json, 'w') as f:
             json.dump(metricas, f, indent=4, default=str) # default=str para manejar tipos no serializables como numpy.int64
         print(f"Métricas para '{nombre_escenario}' guardadas en: {ruta_metricas_json}")
     except Exception as e:
         print(f"Error al guardar las métricas en JSON para '{nombre_escenario}': {e}")
 
-    return nombre_escenario, metricas
+    if perfil.activo:
+        print(f"Perfil de '{nombre_escenario}' guardado en: {perfil.guardar(ruta_salida_escenario)}")
+
+    escribir_meta_escenario(ruta_salida_escenario, resultado["parametros"])
+    if resultado["usar_cache"]:
+        guardar_entrada(resultado["clave"], resultado["parametros"], metricas, ruta_resultados)
+
+def ejecutar_escenarios(nombres_escenarios: list, num_procesos: int, analisis_conjunto=None, **opciones) -> dict:
+    """
+    Ejecuta varios escenarios (`opciones` son las de `ejecutar_escenario`) con la salida en
+    paralelo: los procesos del pool solo simulan y analizan, y la `EtapaSalida` del proceso
+    principal escribe eventos y JSON en un hilo y grafica en otro proceso mientras tanto.
+
+    Los eventos vuelven del pool por memoria compartida: el proceso principal y el de gráficos
+    los leen del mismo bloque sin copiarlos. Los bloques se mantienen hasta el final para que
+    `analisis_conjunto(metricas_por_escenario, eventos_por_escenario)` trabaje sobre todos los
+    escenarios simulados sin pasar por disco (los restaurados de la caché no tienen eventos en
+    memoria); después se liberan.
+
+    Returns:
+        dict: Nombre del escenario -> métricas.
+    """
+    from src.memoria_compartida import DataFrameCompartido, compartir_seguimiento
+
+    metricas_por_escenario = {}
+    compartidos = {}
+
+    def guardar(resultado: dict, graficar):
+        nombre = resultado["nombre"]
+        descriptor = resultado["eventos_compartidos"]
+        if descriptor is not None:
+            compartidos[nombre] = DataFrameCompartido(descriptor)
+            resultado["resultados_df"] = compartidos[nombre].dataframe
+            # El proceso de gráficos abre el mismo bloque: solo viaja el descriptor
+            graficar = partial(graficar, descriptor=descriptor)
+        try:
+            guardar_salidas_escenario(resultado, graficar)
+        finally:
+            resultado["resultados_df"] = None
+        metricas_por_escenario[nombre] = resultado["metricas"]
+
+    func_simular = partial(simular_escenario, compartir=True, **opciones)
+    compartir_seguimiento()
+    try:
+        with EtapaSalida(guardar) as etapa, \
+                multiprocessing.Pool(processes=num_procesos, initializer=inicializar_trabajador) as pool:
+            etapa.consumir(pool, func_simular, nombres_escenarios, num_procesos)
+        if analisis_conjunto is not None and metricas_por_escenario:
+            eventos_por_escenario = {nombre: compartido.dataframe for nombre, compartido in compartidos.items()}
+            analisis_conjunto(metricas_por_escenario, eventos_por_escenario)
+            del eventos_por_escenario
+    finally:
+        for compartido in compartidos.values():
+            compartido.cerrar()
+    return metricas_por_escenario
+
+def analizar_escenarios_en_memoria(metricas_por_escenario: dict, eventos_por_escenario: dict):
+    """
+    Análisis conjunto al terminar el pool, con las métricas y los eventos todavía en memoria:
+    la tabla consolidada y los vacunados por día de todos los escenarios, en 'data/output/comparativas/'.
+    """
+    from src.generar_comparativas import generar_tabla_consolidada, generar_tabla_vacunados_por_dia
+
+    ruta_salida_comparativa = os.path.join("data", "output", "comparativas")
+    os.makedirs(ruta_salida_comparativa, exist_ok=True)
+    generar_tabla_consolidada(metricas_por_escenario, ruta_salida_comparativa)
+    if eventos_por_escenario:
+        generar_tabla_vacunados_por_dia(eventos_por_escenario, ruta_salida_comparativa)
+
+def restaurar_escenario(nombre_escenario: str, entrada: dict, parametros: dict, config_escenario: dict) -> dict:
+    """
+    Reutiliza una corrida de la caché: copia los eventos y las métricas a la carpeta del escenario
+    y genera los gráficos solo si faltan.
+    """
+    ruta_salida_escenario = os.path.join("data", "output", nombre_escenario)
+    os.makedirs(ruta_salida_escenario, exist_ok=True)
+    metricas, ruta_resultados = restaurar_entrada(entrada, ruta_salida_escenario, nombre_escenario)
+    print(f"Escenario '{nombre_escenario}' encontrado en la caché: se reutilizan sus resultados sin simular.")
+
+    with open(os.path.join(ruta_salida_escenario, "metricas.json"), 'w') as f:
+        json.dump(metricas, f, indent=4, default=str)
+    escribir_meta_escenario(ruta_salida_escenario, parametros)
+
+    graficos = ("vacunados_acumulados.png", "longitud_cola.png", "histograma_tiempos_espera.png")
+    faltan_graficos = not all(os.path.exists(os.path.join(ruta_salida_escenario, g)) for g in graficos)
+    if ruta_resultados is not None and faltan_graficos and parametros["modo"] == "en_disco":
+        # Archivo en orden de tiempo: se grafica de a lotes, como al simular
+        from src.visualization import generar_visualizaciones_desde_archivo
+        generar_visualizaciones_desde_archivo(ruta_resultados, ruta_salida_escenario, config_escenario)
+    elif ruta_resultados is not None and faltan_graficos:
+        from src.almacenamiento import cargar_resultados
+        from src.visualization import generar_visualizaciones_escenario
+        generar_visualizaciones_escenario(cargar_resultados(ruta_resultados), ruta_salida_escenario, config_escenario)
+    return metricas
+
+def ejecutar_replicas_y_guardar(nombres_escenarios: list, duracion_simulacion_dias: int, num_replicas: int, semilla: int, motor: str):
+    """
+    Ejecuta réplicas independientes de cada escenario en un único pool que usa todos los núcleos
+    y guarda el resumen (media, desviación e IC 95%) en 'metricas_replicas.json'.
+    """
+    from src.replicas import ejecutar_replicas_escenarios
+
+    configs = {nombre: ConfiguracionSimulacion.obtener_configuracion_escenario(nombre) for nombre in nombres_escenarios}
+    print(f"Ejecutando {num_replicas} réplicas de {len(configs)} escenarios (semilla {semilla})...")
+    resumenes = ejecutar_replicas_escenarios(configs, duracion_simulacion_dias, num_replicas, semilla, motor=motor)
+
+    for nombre, resumen in resumenes.items():
+        ruta_salida_escenario = os.path.join("data", "output", nombre)
+        os.makedirs(ruta_salida_escenario, exist_ok=True)
+        ruta_json = os.path.join(ruta_salida_escenario, "metricas_replicas.json")
+        with open(ruta_json, 'w') as f:
+            json.dump(resumen, f, indent=4, default=str)
+
+        vacunados = resumen["metricas"].get("generales.total_vacunados", {})
+        print(f"  {nombre}: total vacunados {vacunados.get('media', 0):,.0f} "
+              f"(IC 95%: {vacunados.get('ic95_inferior', 0):,.0f} - {vacunados.get('ic95_superior', 0):,.0f})")
+        print(f"  Resumen de réplicas guardado en: {ruta_json}")
+
+def ejecutar_replicas_adaptativas_y_guardar(nombres_escenarios: list, duracion_simulacion_dias: int, semilla: int,
+                                           motor: str, precision_relativa: float, antiteticas: bool = False):
+    """
+    Replica cada escenario de a lotes hasta alcanzar la precisión relativa buscada en las métricas
+    objetivo (o el presupuesto de réplicas) y guarda el resumen en 'metricas_replicas.json'.
+    """
+    from src.replicas import ejecutar_replicas_adaptativas
+
+    for nombre in nombres_escenarios:
+        config = ConfiguracionSimulacion.obtener_configuracion_escenario(nombre)
+        print(f"Replicando '{nombre}' hasta una precisión de ±{precision_relativa:.1%} (semilla {semilla})...")
+        resumen = ejecutar_replicas_adaptativas(config, duracion_simulacion_dias, semilla, precision_relativa,
+                                                antiteticas=antiteticas, motor=motor)
+
+        ruta_salida_escenario = os.path.join("data", "output", nombre)
+        os.makedirs(ruta_salida_escenario, exist_ok=True)
+        ruta_json = os.path.join(ruta_salida_escenario, "metricas_replicas.json")
+        with open(ruta_json, 'w') as f:
+            json.dump(resumen, f, indent=4, default=str)
+
+        estado = "alcanzada" if resumen["convergio"] else "no alcanzada (presupuesto agotado)"
+        print(f"  {nombre}: precisión {estado} con {resumen['corridas']} corridas en {resumen['lotes']} lotes")
+        for clave in resumen["metricas_sin_datos"]:
+            print(f"  {clave}: ninguna réplica lo alcanzó en {duracion_simulacion_dias} días")
+        for clave, censuradas in resumen["metricas_censuradas"].items():
+            print(f"  {clave}: {censuradas} de {resumen['observaciones']} réplicas no lo alcanzaron (media sesgada)")
+        print(f"  Resumen de réplicas guardado en: {ruta_json}")
+
+def ejecutar_comparacion_pareada_y_guardar(nombres_escenarios: list, duracion_simulacion_dias: int, num_replicas: int,
+                                           semilla: int, motor: str):
+    """
+    Ejecuta réplicas de los escenarios con números aleatorios comunes y guarda en
+    'data/output/comparativas' la comparación completa y la tabla de diferencias pareadas contra
+    el primer escenario.
+    """
+    from src.replicas import comparar_escenarios_pareados
+    from src.generar_comparativas import generar_tabla_diferencias_pareadas
+
+    configs = {nombre: ConfiguracionSimulacion.obtener_configuracion_escenario(nombre) for nombre in nombres_escenarios}
+    print(f"Comparando {len(configs)} escenarios con números aleatorios comunes ({num_replicas} réplicas, semilla {semilla})...")
+    comparacion = comparar_escenarios_pareados(configs, duracion_simulacion_dias, num_replicas, semilla, motor=motor)
+
+    ruta_comparativas = os.path.join("data", "output", "comparativas")
+    os.makedirs(ruta_comparativas, exist_ok=True)
+    with open(os.path.join(ruta_comparativas, "comparacion_pareada.json"), 'w') as f:
+        json.dump(comparacion, f, indent=4, default=str)
+    generar_tabla_diferencias_pareadas(comparacion, ruta_comparativas)
+
+def ejecutar_barrido_y_guardar(rangos: dict, duracion_simulacion_dias: int, semilla: int, motor: str,
+                               plazo_dias: int = None):
+    """
+    Expande la grilla de parámetros sobre el escenario base, simula todos los puntos en un pool
+    (ver src/barrido.py) y guarda en 'data/output/barrido' la tabla consolidada y el estado de
+    cada punto ('barrido.json', con la traza de los que fallaron).
+    """
+    from src.barrido import expandir_grilla, ejecutar_barrido
+    from src.generar_comparativas import generar_tabla_barrido
+
+    configs = expandir_grilla(rangos)
+    barrido = ejecutar_barrido(configs, duracion_simulacion_dias, semilla, motor=motor, plazo_dias=plazo_dias)
+
+    ruta_salida_barrido = os.path.join("data", "output", "barrido")
+    os.makedirs(ruta_salida_barrido, exist_ok=True)
+    generar_tabla_barrido(barrido, ruta_salida_barrido)
+    estados = {
+        "rangos": {clave: list(valores) for clave, valores in rangos.items()},
+        **{clave: valor for clave, valor in barrido.items() if clave != "puntos"},
+        "puntos": {nombre: {"estado": punto["estado"], "intentos": punto["intentos"], "error": punto["error"]}
+                   for nombre, punto in barrido["puntos"].items()},
+    }
+    with open(os.path.join(ruta_salida_barrido, "barrido.json"), 'w') as f:
+        json.dump(estados, f, indent=4, default=str)
+    print(f"Puntos por estado: {barrido['resumen']}")
+
+def ejecutar_bifurcacion_y_guardar(nombre_escenario: str, bifurcacion: dict, duracion_simulacion_dias: int, semilla: int):
+    """
+    Simula el escenario hasta `bifurcacion["dia"]` una sola vez y continúa en paralelo cada rama
+    de `bifurcacion["ramas"]` con sus cambios (ver src/bifurcacion.py). Guarda las métricas de
+    todas las ramas en 'data/output/bifurcacion_<escenario>/metricas_ramas.json'.
+    """
+    from src.bifurcacion import tomar_instantanea, ejecutar_ramas
+
+    config = ConfiguracionSimulacion.obtener_configuracion_escenario(nombre_escenario)
+    ramas = {"sin_cambios": {}, **bifurcacion["ramas"]}
+    print(f"Simulando '{nombre_escenario}' hasta el día {bifurcacion['dia']} y {len(ramas)} ramas desde ahí...")
+    instantanea = tomar_instantanea(config, bifurcacion["dia"], semilla)
+    resultado = ejecutar_ramas(instantanea, ramas, duracion_simulacion_dias)
+
+    ruta_salida = os.path.join("data", "output", f"bifurcacion_{nombre_escenario}")
+    os.makedirs(ruta_salida, exist_ok=True)
+    metricas_ramas = {nombre: rama["metricas"] for nombre, rama in resultado["ramas"].items()}
+    with open(os.path.join(ruta_salida, "metricas_ramas.json"), 'w') as f:
+        json.dump(metricas_ramas, f, indent=4, default=str)
+    for nombre, metricas in metricas_ramas.items():
+        hito = metricas["hitos_vacunacion"]["100_porciento"]["dias"]
+        print(f"  {nombre}: 100% en {hito} días, espera promedio "
+              f"{metricas['tiempos_espera_minutos']['promedio']:.1f} min, costo ${metricas['costos']['costo_total_campana']:,.0f}")
+    print(f"  Métricas de las ramas guardadas en: {ruta_salida}")
+
+def recostear_cache_y_guardar(ruta_variantes: str):
+    """
+    Recostea todas las corridas de la caché de resultados con las variantes de precios de
+    `ruta_variantes` (CSV con una columna por precio de `COSTOS` y una fila por variante), sin
+    volver a simular (ver src/recosteo.py). Guarda la tabla en 'data/output/comparativas/recosteo.csv'.
+    """
+    import pandas as pd
+    from src.recosteo import cargar_estadisticas_cache, tabla_recosteo
+
+    corridas = cargar_estadisticas_cache()
+    if not corridas:
+        print("La caché de resultados está vacía: no hay corridas para recostear.")
+        return
+    variantes = pd.read_csv(ruta_variantes)
+    print(f"Recosteando {len(corridas)} corridas de la caché con {len(variantes)} variantes de precios...")
+    tabla = tabla_recosteo(corridas, variantes)
+
+    ruta_comparativas = os.path.join("data", "output", "comparativas")
+    os.makedirs(ruta_comparativas, exist_ok=True)
+    ruta_tabla = os.path.join(ruta_comparativas, "recosteo.csv")
+    tabla.to_csv(ruta_tabla, index=False)
+    mejores = tabla.loc[tabla.groupby("variante")["costo_total_con_espera"].idxmin()]
+    print(mejores[["variante", "num_cabinas", "horas_operacion_por_dia", "costo_total_con_espera"]].to_string(index=False))
+    print(f"  Tabla de recosteo guardada en: {ruta_tabla}")
+
+def ejecutar_red_y_guardar(nombre_red: str, duracion_simulacion_dias: int, semilla: int, motor: str):
+    """
+    Simula una red de centros (un proceso por centro) y guarda en 'data/output/red_<nombre>/'
+    las métricas de la red en 'metricas.json' y las de cada centro en 'metricas_centros.json'.
+    """
+    from src.red_centros import ejecutar_red
+
+    config_red = ConfiguracionSimulacion.obtener_configuracion_red(nombre_red)
+    print(f"Ejecutando la red '{nombre_red}' con {len(config_red['centros'])} centros (semilla {semilla})...")
+    resultado = ejecutar_red(config_red, duracion_simulacion_dias, semilla, motor=motor)
+
+    ruta_salida_red = os.path.join("data", "output", f"red_{nombre_red}")
+    os.makedirs(ruta_salida_red, exist_ok=True)
+    with open(os.path.join(ruta_salida_red, "metricas.json"), 'w') as f:
+        json.dump(resultado["red"], f, indent=4, default=str)
+    with open(os.path.join(ruta_salida_red, "metricas_centros.json"), 'w') as f:
+        json.dump(resultado["centros"], f, indent=4, default=str)
+
+    generales = resultado["red"]["generales"]
+    print(f"  Red '{nombre_red}': total vacunados {generales['total_vacunados']:,}, "
+          f"tasa de abandono {generales['tasa_abandono_porcentual']:.2f}%")
+    print(f"  Métricas de la red y de sus centros guardadas en: {ruta_salida_red}")
 
 def main():
     """
@@ -70,6 +492,13 @@ def main():
     Esta función ejecuta las simulaciones y guarda los resultados y métricas
     de cada escenario en su respectivo directorio en 'data/output/'.
     """
+    parser = argparse.ArgumentParser(description="Simulación de la campaña de vacunación por escenarios.")
+    parser.add_argument("--force", action="store_true",
+                        help="Vuelve a simular aunque el resultado ya esté en la caché.")
+    parser.add_argument("--perfil", choices=MODOS_PERFIL, default=None,
+                        help=f"Guarda 'perf.json' con tiempos y memoria por fase (también con {VARIABLE_ENTORNO}=fases).")
+    argumentos = parser.parse_args()
+
     print("Iniciando la simulación de la campaña de vacunación...")
 
     # Escenarios a ejecutar. Puedes comentar o añadir escenarios según sea necesario.
@@ -84,23 +513,96 @@ def main():
         # "dos_dosis",
          "horario_extendido",
         # "digito_dni"
+        # "cierre_diario",
+        # "picos_horarios",
          "12_semanas"
     ]
     duracion_simulacion_dias = 200
+    # "vectorizado" resuelve la cola de cada día en lote con NumPy; "simpy" usa un proceso por paciente
+    motor = "vectorizado"
+    # Semilla raíz: con la misma semilla los resultados se reproducen exactamente
+    semilla = 2025
+    # Con más de una réplica se guardan media, desvío e IC 95% de cada métrica en 'metricas_replicas.json'
+    num_replicas = 1
+    # Con réplicas, números aleatorios comunes: todos los escenarios ven los mismos pacientes y se reportan
+    # las diferencias pareadas contra el primero ('diferencias_pareadas_escenarios.csv')
+    numeros_comunes = False
+    # Precisión relativa buscada (ej. 0.02 = IC 95% de ±2%): replica de a lotes hasta alcanzarla en lugar
+    # de usar un número fijo de réplicas; con `antiteticas` cada observación promedia un par antitético
+    precision_replicas = None
+    antiteticas = False
+    # Formato de los eventos crudos: "parquet" y "feather" son columnares y comprimidos; "csv" para exportar
+    formato_salida = "parquet"
+    # "eventos" guarda todos los eventos y gráficos; "solo_metricas" solo calcula 'metricas.json' en memoria O(1);
+    # "en_disco" escribe los eventos día por día y analiza y grafica el archivo de a lotes (poblaciones enormes)
+    modo = "eventos"
+    # Nombre de una red de centros de config (ej. "provincial"): simula un centro por proceso en lugar de los escenarios
+    red_centros = None
+    # Barrido de parámetros sobre el escenario base en lugar de los escenarios, ej.:
+    # {"num_cabinas": range(5, 30), "horas_operacion_por_dia": [8, 10, 12], "tasa_asistencia": [0.6, 0.7, 0.8],
+    #  "tiempo_promedio_vacunacion_minutos": [2, 3]}. Con `plazo_barrido` no se simulan los puntos que el
+    # modelo analítico da por infactibles para ese plazo en días
+    barrido = None
+    plazo_barrido = None
+    # CSV de variantes de precios (una columna por precio de COSTOS, ej. "costo_por_minuto_espera_por_persona"):
+    # recostea todas las corridas de la caché sin volver a simular en lugar de ejecutar los escenarios
+    variantes_costos = None
+    # Ramas "qué pasa si" del primer escenario: se simula hasta `dia` una vez y cada rama sigue con sus
+    # cambios (num_cabinas, horas_operacion_por_dia, tasa_asistencia), ej.:
+    # {"dia": 40, "ramas": {"mas_5_cabinas": {"num_cabinas": 10}, "jornada_12_horas": {"horas_operacion_por_dia": 12}}}
+    bifurcacion = None
+
+    if bifurcacion is not None:
+        ejecutar_bifurcacion_y_guardar(nombres_escenarios[0], bifurcacion, duracion_simulacion_dias, semilla)
+        print("\nLas ramas de la bifurcación han finalizado.")
+        return
+
+    if variantes_costos is not None:
+        recostear_cache_y_guardar(variantes_costos)
+        print("\nEl recosteo de las corridas guardadas ha finalizado.")
+        return
+
+    if barrido is not None:
+        ejecutar_barrido_y_guardar(barrido, duracion_simulacion_dias, semilla, motor, plazo_barrido)
+        print("\nEl barrido de parámetros ha finalizado.")
+        return
+
+    if red_centros is not None:
+        ejecutar_red_y_guardar(red_centros, duracion_simulacion_dias, semilla, motor)
+        print("\nLa simulación de la red de centros ha finalizado.")
+        return
+
+    if precision_replicas is not None:
+        ejecutar_replicas_adaptativas_y_guardar(nombres_escenarios, duracion_simulacion_dias, semilla, motor,
+                                                precision_replicas, antiteticas)
+        print("\nLas réplicas adaptativas de los escenarios han finalizado.")
+        return
+
+    if num_replicas > 1 and numeros_comunes:
+        ejecutar_comparacion_pareada_y_guardar(nombres_escenarios, duracion_simulacion_dias, num_replicas, semilla, motor)
+        print("\nLa comparación pareada de los escenarios ha finalizado.")
+        return
+
+    if num_replicas > 1:
+        ejecutar_replicas_y_guardar(nombres_escenarios, duracion_simulacion_dias, num_replicas, semilla, motor)
+        print("\nTodas las réplicas de los escenarios han finalizado.")
+        return
 
     # Usar multiprocessing para ejecutar escenarios en paralelo
     # Se puede ajustar num_procesos a 1 para ejecución secuencial si hay problemas de memoria.
-    num_procesos = max(1, multiprocessing.cpu_count() // 2)
+    num_procesos = max(1, min(multiprocessing.cpu_count(), len(nombres_escenarios)))
     print(f"Utilizando {num_procesos} procesos para ejecutar {len(nombres_escenarios)} escenarios...")
 
-    # `partial` permite pre-llenar un argumento de la función
-    func_ejecutar = partial(ejecutar_escenario, duracion_simulacion_dias=duracion_simulacion_dias)
-    
-    # Ejecutar los escenarios
-    with multiprocessing.Pool(processes=num_procesos) as pool:
-        # Usamos pool.map para procesar todos los escenarios.
-        # Los resultados (métricas) no se usan aquí, pero se podrían registrar si fuera necesario.
-        pool.map(func_ejecutar, nombres_escenarios)
+    # Ejecutar los escenarios: mientras un proceso simula, se escriben y grafican los que terminaron
+    # Al terminar, la tabla consolidada se arma con los resultados en memoria
+    ejecutar_escenarios(nombres_escenarios, num_procesos, analisis_conjunto=analizar_escenarios_en_memoria,
+                        duracion_simulacion_dias=duracion_simulacion_dias, motor=motor, semilla=semilla,
+                        formato_salida=formato_salida, modo=modo, forzar=argumentos.force, perfil=argumentos.perfil)
+
+    # Descartar entradas de la caché viejas o que exceden el tamaño máximo
+    eliminadas = limpiar_cache()
+    if eliminadas:
+        print(f"Se eliminaron {len(eliminadas)} entradas antiguas de la caché.")
 
     print("\nTodas las simulaciones de escenarios han finalizado.")
     print("Los resultados y métricas de cada escenario se han guardado en sus respectivos directorios en 'data/output/'.")
@@ -0,0 +1,121 @@
+# src/memoria_compartida.py
+
+import os
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+
+# Alineación de cada columna dentro del bloque (la de un float64)
+_ALINEACION = 8
+
+
+def exportar_dataframe(resultados_df: pd.DataFrame) -> dict:
+    """
+    Copia las columnas de un DataFrame de eventos a un bloque de memoria compartida y devuelve
+    su descriptor: un diccionario chico (nombre del bloque, tipo y posición de cada columna) que
+    viaja entre procesos en lugar de los eventos. Las columnas categóricas se guardan como sus
+    códigos. El bloque sobrevive a quien lo crea: lo libera `DataFrameCompartido.cerrar`.
+    """
+    columnas = []
+    tamano = 0
+    for nombre in resultados_df.columns:
+        serie = resultados_df[nombre]
+        categorias = None
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores = np.asarray(serie.cat.codes)
+            categorias = list(serie.cat.categories)
+        else:
+            valores = serie.to_numpy()
+        columnas.append((nombre, valores, categorias))
+        tamano += -tamano % _ALINEACION + valores.nbytes
+
+    bloque = shared_memory.SharedMemory(create=True, size=max(tamano, 1))
+    if os.name == "posix":
+        # El bloque queda a cargo de quien lo abre: si siguiera registrado en el resource_tracker
+        # de este proceso (ej.: un trabajador del pool), se borraría cuando termine el pool
+        resource_tracker.unregister(bloque._name, "shared_memory")
+    descriptor = {"nombre": bloque.name, "filas": len(resultados_df), "columnas": []}
+    posicion = 0
+    destino = None
+    for nombre, valores, categorias in columnas:
+        posicion += -posicion % _ALINEACION
+        destino = np.ndarray(valores.shape, dtype=valores.dtype, buffer=bloque.buf, offset=posicion)
+        destino[:] = valores
+        descriptor["columnas"].append({"nombre": nombre, "tipo": valores.dtype.str, "posicion": posicion,
+                                       "categorias": categorias})
+        posicion += valores.nbytes
+    del destino
+    bloque.close()
+    return descriptor
+
+
+def compartir_seguimiento():
+    """
+    Arranca el resource_tracker de este proceso antes de crear pools: los procesos hijos lo
+    heredan y un bloque que abre un hijo (ej.: el pool de gráficos) no se borra cuando ese hijo
+    termina, sino cuando lo libera este proceso.
+    """
+    if os.name == "posix":
+        resource_tracker.ensure_running()
+
+
+class DataFrameCompartido:
+    """
+    Abre el bloque de un descriptor de `exportar_dataframe` y arma sobre él vistas de NumPy y un
+    DataFrame sin copiar los eventos. Las vistas dejan de valer al cerrar: `cerrar()` (o salir
+    del `with`) las suelta y, con `liberar=True`, borra el bloque del sistema.
+
+    Uso:
+        with DataFrameCompartido(descriptor) as compartido:
+            resultados_df = compartido.dataframe
+    """
+
+    def __init__(self, descriptor: dict, columnas: list = None):
+        self.descriptor = descriptor
+        self.columnas = columnas
+        self._bloque = shared_memory.SharedMemory(name=descriptor["nombre"])
+        self._dataframe = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+    def vista(self, nombre: str) -> np.ndarray:
+        """Columna como vista de NumPy sobre el bloque (los códigos, si es categórica)."""
+        for columna in self.descriptor["columnas"]:
+            if columna["nombre"] == nombre:
+                return np.ndarray(self.descriptor["filas"], dtype=np.dtype(columna["tipo"]), buffer=self._bloque.buf,
+                                  offset=columna["posicion"])
+        raise KeyError(nombre)
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        """DataFrame cuyas columnas son vistas del bloque (pandas no las consolida ni las copia)."""
+        if self._dataframe is None:
+            datos = {}
+            for columna in self.descriptor["columnas"]:
+                if self.columnas is not None and columna["nombre"] not in self.columnas:
+                    continue
+                valores = self.vista(columna["nombre"])
+                if columna["categorias"] is not None:
+                    valores = pd.Categorical.from_codes(valores, categories=columna["categorias"])
+                datos[columna["nombre"]] = valores
+            self._dataframe = pd.DataFrame(datos, copy=False)
+        return self._dataframe
+
+    def cerrar(self, liberar: bool = True):
+        """Suelta las vistas y cierra el bloque; con `liberar=True` además lo borra."""
+        if self._bloque is None:
+            return
+        self._dataframe = None
+        try:
+            self._bloque.close()
+        except BufferError:
+            # Alguien conserva una vista: el mapeo se libera cuando esa vista deje de usarse
+            print(f"Advertencia: quedan vistas abiertas del bloque compartido '{self.descriptor['nombre']}'.")
+        if liberar:
+            self._bloque.unlink()
+        self._bloque = None
@@ -0,0 +1,399 @@
+# src/modelo_analitico.py
+
+from collections import deque
+from src.config import ConfiguracionSimulacion
+from src.acumuladores import HITOS_VACUNACION
+from src.calendario_dosis import dosis_por_esquema, intervalo_dias_operativos
+from src.cierre_diario import politica_cierre
+from src.intensidad_llegadas import pacientes_del_dia
+from src.recosteo import calcular_estadisticas_costo, costos_desde_estadisticas
+
+# Métricas (claves aplanadas, ver replicas.aplanar_metricas) que compara el reporte de validación
+METRICAS_VALIDACION = (
+    "hitos_vacunacion.70_porciento.dias",
+    "hitos_vacunacion.100_porciento.dias",
+    "generales.total_vacunados",
+    "generales.total_reprogramados",
+    "tiempos_espera_minutos.promedio",
+    "longitud_cola.promedio",
+    "rendimiento.utilizacion_promedio_cabinas_porcentual",
+    "costos.costo_total_campana",
+)
+
+
+def cola_estacionaria(llegadas_por_minuto: float, tiempo_servicio: float, num_cabinas: int,
+                      probabilidad_reprogramacion: float) -> dict:
+    """
+    Régimen estacionario de la cola M/M/c con abandono: quien llega con todas las cabinas
+    ocupadas se va a reprogramar con probabilidad `probabilidad_reprogramacion`. Es un proceso de
+    nacimiento y muerte con tasa de entrada λ por debajo de c pacientes y λ(1 - p) desde c; la
+    cola es estable si ρ = λ(1 - p) / (c μ) < 1. Para no desbordar con muchas cabinas, las
+    sumas de Erlang se arman con la recursión de Erlang B.
+
+    Returns:
+        dict: "prob_ocupadas" (fracción de llegadas que encuentra todo ocupado), "cola_promedio"
+              (Lq), "espera_promedio" de quienes se quedan (Wq, por Little) y "rho"; None si la
+              cola no es estable.
+    """
+    carga = llegadas_por_minuto * tiempo_servicio
+    rho = carga * (1 - probabilidad_reprogramacion) / num_cabinas
+    if rho >= 1:
+        return None
+    if carga == 0:
+        return {"prob_ocupadas": 0.0, "cola_promedio": 0.0, "espera_promedio": 0.0, "rho": 0.0}
+    erlang_b = 1.0
+    for k in range(1, num_cabinas + 1):
+        erlang_b = carga * erlang_b / (k + carga * erlang_b)
+    # Con X = a^c / c!: sum_{n<c} a^n/n! = X (1/B - 1) y sum_{n>=c} = X / (1 - ρ)
+    cola_ocupada = 1.0 / (1.0 - rho)
+    prob_ocupadas = cola_ocupada / (1.0 / erlang_b - 1.0 + cola_ocupada)
+    cola_promedio = prob_ocupadas * rho / (1.0 - rho)
+    entran = llegadas_por_minuto * (1 - probabilidad_reprogramacion * prob_ocupadas)
+    return {
+        "prob_ocupadas": prob_ocupadas,
+        "cola_promedio": cola_promedio,
+        "espera_promedio": cola_promedio / entran,
+        "rho": rho,
+    }
+
+
+def _dia_fluido(llegadas: float, cola_inicial: float, config: dict, politica: str) -> dict:
+    """
+    Un día con `llegadas` pacientes repartidos en la jornada y `cola_inicial` esperando a la
+    apertura. Mientras hay cola (o si la entrada supera a la capacidad) la cola evoluciona como
+    un fluido: todos encuentran las cabinas ocupadas, abandona una fracción p y la cola crece a
+    razón de λ(1 - p) - c μ. Si la cola se vacía, el resto del día es el régimen estacionario
+    M/M/c con abandono. Al cierre la cola pasa al día siguiente ("continuar"), se atiende en
+    horas extra ("vaciar_cola") o se reprograma ("reprogramar").
+
+    Returns:
+        dict: Atendidos, reprogramados, cola al cierre, minutos de espera sumados de quienes
+              entran, integral de la cola, minutos de cabina ocupados, duración del día (horas
+              extra incluidas) y los tramos (desde, hasta, tasa) de entrada a la cola.
+    """
+    minutos = config["horas_operacion_por_dia"] * 60
+    servicio = config["tiempo_promedio_vacunacion_minutos"]
+    cabinas = config["num_cabinas"]
+    p = config["probabilidad_reprogramacion"]
+    tasa = llegadas / minutos
+    capacidad = cabinas / servicio
+    deriva = tasa * (1 - p) - capacidad
+    estacionaria = cola_estacionaria(tasa, servicio, cabinas, p)
+
+    # Tramo fluido [0, tau): hasta que se vacía la cola o hasta el cierre
+    if cola_inicial > 0 or estacionaria is None:
+        tau = minutos if deriva >= 0 else min(minutos, cola_inicial / -deriva)
+    else:
+        tau = 0.0
+    cola_cierre_fluido = cola_inicial + deriva * tau
+    entran = tasa * (1 - p) * tau
+    atendidos = capacidad * tau
+    reprogramados = tasa * p * tau
+    espera_total = entran * (cola_inicial + deriva * tau / 2) / capacidad
+    integral_cola = (cola_inicial + deriva * tau / 2) * tau
+    ocupado = cabinas * tau
+    entradas = [(0.0, tau, tasa * (1 - p))]
+    duracion = minutos
+
+    cola_final = cola_cierre_fluido if tau >= minutos else 0.0
+    if tau < minutos:
+        # Resto del día en régimen estacionario
+        resto = minutos - tau
+        entran_resto = tasa * resto * (1 - p * estacionaria["prob_ocupadas"])
+        atendidos += entran_resto
+        reprogramados += tasa * resto - entran_resto
+        espera_total += entran_resto * estacionaria["espera_promedio"]
+        integral_cola += estacionaria["cola_promedio"] * resto
+        ocupado += entran_resto * servicio
+        entradas.append((tau, minutos, entran_resto / resto))
+    elif cola_final > 0 and politica == "vaciar_cola":
+        # Horas extra: la cola del cierre se atiende a capacidad plena (su espera ya está contada)
+        extra = cola_final / capacidad
+        atendidos += cola_final
+        integral_cola += cola_final * extra / 2
+        ocupado += cabinas * extra
+        duracion += extra
+        cola_final = 0.0
+    elif cola_final > 0 and politica == "reprogramar":
+        # Solo se vacunan quienes llegan a una cabina antes del cierre (t + Q(t) / (c μ) <= cierre)
+        corte = minutos / (1 + deriva / capacidad)
+        espera_total = tasa * (1 - p) * corte * (deriva * corte / 2) / capacidad
+        reprogramados += cola_final
+        cola_final = 0.0
+    return {
+        "atendidos": atendidos,
+        "reprogramados": reprogramados,
+        "cola_final": cola_final,
+        "espera_total": espera_total,
+        "integral_cola": integral_cola,
+        "ocupado": ocupado,
+        "entradas": entradas,
+        "duracion": duracion,
+    }
+
+
+def _espera_en_cola_al_cierre(entradas: list, tiempo_final: float, en_cola: float) -> float:
+    """
+    Minutos que ya esperaron los `en_cola` pacientes que siguen en la cola FIFO en `tiempo_final`:
+    son los últimos en entrar, así que se recorren los tramos de entrada hacia atrás.
+    """
+    pendientes = en_cola
+    espera = 0.0
+    for desde, hasta, tasa in reversed(entradas):
+        if pendientes <= 0:
+            break
+        hasta = min(hasta, tiempo_final)
+        if hasta <= desde or tasa <= 0:
+            continue
+        desde = max(desde, hasta - pendientes / tasa)
+        espera += tasa * ((tiempo_final - desde) ** 2 - (tiempo_final - hasta) ** 2) / 2
+        pendientes -= tasa * (hasta - desde)
+    return espera
+
+
+def estimar_campana(config: dict, duracion_dias: int) -> dict:
+    """
+    Estimación analítica de una campaña en una fracción de milisegundo: recorre los días con
+    `_dia_fluido`, arrastrando la cola entre días según la política de cierre y, con dos dosis,
+    agendando las vueltas como el calendario del simulador. Los hitos se interpolan dentro del
+    día en que se cruzan, en días operativos (como `analysis.formatear_hitos_vacunacion`).
+
+    Es una aproximación: ignora el arranque vacío de cada régimen y la variabilidad de la cola y
+    de los hitos. La cola arrastrada se sigue en bloques FIFO por día de entrada, para saber
+    cuántas primeras y segundas dosis se atienden cada día.
+
+    Returns:
+        dict: Totales hasta el 100% (o hasta `duracion_dias`), "espera_promedio",
+              "cola_promedio", "utilizacion", "costo_total_campana" (como en analysis) y
+              "dias_hitos" (nombre del hito -> días, None si no se alcanza).
+    """
+    politica = politica_cierre(config)
+    minutos = config["horas_operacion_por_dia"] * 60
+    poblacion = config["poblacion_total"]
+    dosis = dosis_por_esquema(config)
+    intervalo = intervalo_dias_operativos(config) if dosis > 1 else 0
+
+    objetivos = sorted((fraccion * poblacion, nombre) for nombre, fraccion in HITOS_VACUNACION.items())
+    dias_hitos = {nombre: None for nombre in HITOS_VACUNACION}
+    vueltas = {}
+    # Cola FIFO en bloques [primeras dosis, segundas dosis], uno por día de entrada
+    fila = deque()
+    cola = 0.0
+    totales = {"atendidos": 0.0, "reprogramados": 0.0, "espera_total": 0.0, "integral_cola": 0.0, "ocupado": 0.0,
+               "duracion": 0.0}
+    completos = primeras = entraron = 0.0
+    dias_simulados = 0.0
+    entradas = []
+
+    for dia in range(duracion_dias):
+        nuevas = float(pacientes_del_dia(config, dia))
+        if dosis > 1:
+            nuevas = max(0.0, min(nuevas, poblacion - primeras))
+        llegadas = [nuevas, vueltas.pop(dia, 0.0)]
+        total_llegadas = llegadas[0] + llegadas[1]
+        mezcla = [cantidad / total_llegadas if total_llegadas > 0 else 0.0 for cantidad in llegadas]
+        resultado = _dia_fluido(total_llegadas, cola, config, politica)
+
+        # Los que entran hoy van al final de la fila; los atendidos salen del frente
+        entran = resultado["atendidos"] + resultado["cola_final"] - cola
+        atendidos = [0.0, 0.0]
+        por_atender = resultado["atendidos"]
+        if dosis == 1:
+            atendidos[0], por_atender = por_atender, 0.0
+        else:
+            fila.append([entran * mezcla[0], entran * mezcla[1]])
+        while fila and por_atender > 0:
+            bloque = fila[0]
+            tamano = bloque[0] + bloque[1]
+            tomados = min(tamano, por_atender)
+            for d in (0, 1):
+                atendidos[d] += bloque[d] * tomados / tamano if tamano > 0 else 0.0
+                bloque[d] -= bloque[d] * tomados / tamano if tamano > 0 else 0.0
+            por_atender -= tomados
+            if tomados >= tamano:
+                fila.popleft()
+        cola = resultado["cola_final"]
+        if dosis > 1:
+            # Las primeras dosis vuelven a los `intervalo` días; las segundas que abandonan, al día siguiente
+            vueltas[dia + intervalo] = vueltas.get(dia + intervalo, 0.0) + atendidos[0]
+            vueltas[dia + 1] = vueltas.get(dia + 1, 0.0) + resultado["reprogramados"] * mezcla[1]
+            primeras += atendidos[0]
+
+        completos_dia = atendidos[dosis - 1]
+        # La corrida se corta en el último hito: de ese día solo cuenta la fracción hasta cruzarlo.
+        # Las vacunaciones se reparten parejas en la duración del día (horas extra incluidas).
+        escala = 1.0
+        while objetivos and completos_dia > 0 and completos + completos_dia >= objetivos[0][0]:
+            necesarios, nombre = objetivos.pop(0)
+            avance = (necesarios - completos) / completos_dia
+            dias_hitos[nombre] = dia + avance * resultado["duracion"] / minutos
+            if not objetivos:
+                escala = avance
+        for clave in totales:
+            totales[clave] += resultado[clave] * escala
+        completos += completos_dia * escala
+        dias_simulados = dia + escala
+        if politica == "continuar":
+            entradas.extend((dia * minutos + desde, dia * minutos + hasta, tasa)
+                            for desde, hasta, tasa in resultado["entradas"] if hasta > desde)
+            entraron += entran * escala
+        if not objetivos:
+            break
+
+    # Como en EstadisticasTiempo, el tiempo de un día con horas extra se cuenta hasta la última salida
+    tiempo_total = totales["duracion"]
+    espera_atendidos = totales["espera_total"]
+    # Con cierre, el área bajo la cola que no esperaron los atendidos es la de quienes se van al cierre
+    espera_reprogramados = max(0.0, totales["integral_cola"] - espera_atendidos)
+    if politica == "continuar":
+        # FIFO: la espera de los atendidos es el área bajo la cola menos lo que ya lleva esperando
+        # quien sigue en la cola al final (la corrida se corta con la cola llena)
+        en_cola = max(0.0, entraron - totales["atendidos"])
+        espera_atendidos = totales["integral_cola"] - _espera_en_cola_al_cierre(entradas, dias_simulados * minutos,
+                                                                                 en_cola)
+        espera_reprogramados = 0.0
+    espera_promedio = espera_atendidos / totales["atendidos"] if totales["atendidos"] > 0 else 0.0
+    estadisticas_costo = calcular_estadisticas_costo(config, duracion_dias, totales["atendidos"],
+                                                     totales["reprogramados"], espera_promedio, espera_reprogramados)
+    return {
+        "total_vacunados": totales["atendidos"],
+        "total_reprogramados": totales["reprogramados"],
+        "esquemas_completos": completos,
+        "espera_promedio": espera_promedio,
+        "espera_total_reprogramados": espera_reprogramados,
+        "cola_promedio": totales["integral_cola"] / tiempo_total if tiempo_total > 0 else 0.0,
+        "utilizacion": totales["ocupado"] / (config["num_cabinas"] * tiempo_total) if tiempo_total > 0 else 0.0,
+        "costo_total_campana": costos_desde_estadisticas(estadisticas_costo)["costo_total_campana"],
+        "dias_hitos": dias_hitos,
+    }
+
+
+def metricas_analiticas(config: dict, duracion_dias: int) -> dict:
+    """
+    La estimación de `estimar_campana` con las mismas claves que las métricas del simulador
+    (ver analysis.calcular_metricas_desde_acumuladores), para compararlas directamente.
+    """
+    from src.analysis import formatear_hitos_vacunacion, _ensamblar_metricas
+
+    estimacion = estimar_campana(config, duracion_dias)
+    minutos = config["horas_operacion_por_dia"] * 60
+    tiempos_hitos = {nombre: (dias * minutos if dias is not None else None)
+                     for nombre, dias in estimacion["dias_hitos"].items()}
+    espera = estimacion["espera_promedio"]
+    estadisticas_espera = {"promedio": espera, "maximo": float("nan"), "minimo": 0.0,
+                           "en_sistema_promedio": espera + config["tiempo_promedio_vacunacion_minutos"]}
+    metricas = _ensamblar_metricas(
+        config, duracion_dias, estimacion["total_vacunados"], estimacion["total_reprogramados"], estadisticas_espera,
+        estimacion["cola_promedio"], float("nan"),
+        formatear_hitos_vacunacion(tiempos_hitos, config["poblacion_total"], config["horas_operacion_por_dia"]),
+        espera_total_reprogramados=estimacion["espera_total_reprogramados"],
+    )
+    metricas["rendimiento"]["utilizacion_promedio_cabinas_porcentual"] = estimacion["utilizacion"] * 100
+    return metricas
+
+
+def cribar_configuraciones(configs: dict, duracion_dias: int, plazo_dias: float = None, margen: float = 0.15) -> list:
+    """
+    Ordena configuraciones candidatas por su costo analítico antes de simularlas y marca las
+    que no vale la pena simular: las que según el modelo terminan después de
+    `plazo_dias * (1 + margen)` (o no terminan dentro de `duracion_dias`). El margen cubre el
+    error del modelo (ver el reporte de `validar_modelo_analitico`).
+
+    Returns:
+        list: Un diccionario por configuración ("nombre", "simular", "dias_100_porciento",
+              "costo_total_campana", "espera_promedio"), las que se simulan primero y por costo.
+    """
+    filas = []
+    for nombre, config in configs.items():
+        estimacion = estimar_campana(config, duracion_dias)
+        dias = estimacion["dias_hitos"]["100_porciento"]
+        limite = plazo_dias * (1 + margen) if plazo_dias is not None else duracion_dias
+        filas.append({
+            "nombre": nombre,
+            "simular": dias is not None and dias <= limite,
+            "dias_100_porciento": dias,
+            "costo_total_campana": estimacion["costo_total_campana"],
+            "espera_promedio": estimacion["espera_promedio"],
+        })
+    return sorted(filas, key=lambda fila: (not fila["simular"], fila["costo_total_campana"]))
+
+
+def cabinas_minimas_analiticas(config: dict, plazo_dias: int, max_cabinas: int = 200) -> int:
+    """
+    Mínima cantidad de cabinas con la que el modelo analítico vacuna al 100% dentro del plazo
+    (None si ni con `max_cabinas` alcanza). Es un punto de partida para la búsqueda simulada.
+    """
+    from src.optimizador import cabinas_minimas_teoricas
+
+    for num_cabinas in range(cabinas_minimas_teoricas(config, plazo_dias), max_cabinas + 1):
+        dias = estimar_campana(dict(config, num_cabinas=num_cabinas), plazo_dias)["dias_hitos"]["100_porciento"]
+        if dias is not None and dias <= plazo_dias:
+            return num_cabinas
+    return None
+
+
+def validar_modelo_analitico(configs: dict, duracion_dias: int, num_replicas: int = 5, semilla: int = None,
+                             motor: str = "vectorizado", metricas: tuple = METRICAS_VALIDACION) -> list:
+    """
+    Compara el modelo analítico con la media de `num_replicas` réplicas simuladas de cada
+    escenario. El error relativo es (analítico - simulado) / |simulado|; una métrica que no
+    está en alguno de los dos (ej. un hito no alcanzado) queda sin error.
+
+    Returns:
+        list: Una fila por escenario y métrica ("escenario", "metrica", "analitico",
+              "simulado", "ic95_simulado", "error_relativo").
+    """
+    from src.replicas import ejecutar_replicas, aplanar_metricas
+
+    filas = []
+    for nombre, config in configs.items():
+        analiticas = aplanar_metricas(metricas_analiticas(config, duracion_dias))
+        simuladas = ejecutar_replicas(config, duracion_dias, num_replicas, semilla, motor=motor)["metricas"]
+        for clave in metricas:
+            analitico = analiticas.get(clave)
+            resumen = simuladas.get(clave)
+            simulado = resumen["media"] if resumen is not None else None
+            error = None
+            if analitico is not None and simulado:
+                error = (analitico - simulado) / abs(simulado)
+            filas.append({
+                "escenario": nombre,
+                "metrica": clave,
+                "analitico": analitico,
+                "simulado": simulado,
+                "ic95_simulado": (resumen["ic95_superior"] - simulado) if resumen is not None else None,
+                "error_relativo": error,
+            })
+    return filas
+
+
+def generar_reporte_validacion(filas: list, ruta_salida: str) -> str:
+    """Guarda las filas de `validar_modelo_analitico` en 'validacion_modelo_analitico.csv'."""
+    import os
+    import pandas as pd
+
+    os.makedirs(ruta_salida, exist_ok=True)
+    ruta = os.path.join(ruta_salida, "validacion_modelo_analitico.csv")
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    return ruta
+
+
+# --- Bloque para Pruebas ---
+if __name__ == '__main__':
+    import os
+    import time
+
+    nombres = ["base", "10_cabinas", "12_semanas", "80_asistencia", "acelerado", "horario_extendido", "cierre_diario"]
+    configs = {nombre: ConfiguracionSimulacion.obtener_configuracion_escenario(nombre) for nombre in nombres}
+
+    inicio = time.perf_counter()
+    for config in configs.values():
+        estimar_campana(config, 365)
+    print(f"Estimación analítica: {(time.perf_counter() - inicio) / len(configs) * 1e6:,.0f} µs por escenario.")
+
+    filas = validar_modelo_analitico(configs, 365, num_replicas=5, semilla=2025)
+    ruta = generar_reporte_validacion(filas, os.path.join("data", "output", "comparativas"))
+    for fila in filas:
+        error = f"{fila['error_relativo']:+.1%}" if fila["error_relativo"] is not None else "-"
+        print(f"  {fila['escenario']:<18} {fila['metrica']:<55} {error}")
+    print(f"Reporte de validación guardado en: {ruta}")
@@ -0,0 +1,535 @@
+# src/motor_vectorizado.py
+
+import heapq
+from collections import deque
+import numpy as np
+from src.registro_eventos import RegistroEventos, EVENTO_VACUNADO, EVENTO_REPROGRAMACION
+from src.acumuladores import EstadisticasTiempo
+from src.calendario_dosis import CalendarioDosis, dosis_por_esquema, intervalo_dias_operativos
+from src.cierre_diario import politica_cierre, secuencia_del_dia
+from src.intensidad_llegadas import pacientes_del_dia, aplicar_perfil
+from src.numeros_comunes import (
+    numeros_comunes_activos, variables_antiteticas, generar_azar_del_dia, elegir_digitos, flujo_comun
+)
+
+# Columnas que se acarrean por cada paciente que llega al centro
+_CAMPOS_LLEGADA = ("llegada", "servicio", "azar", "dia", "digito", "paciente", "dosis")
+# Columnas de un paciente que ya tiene cabina asignada y todavía no salió
+_CAMPOS_PENDIENTE = ("llegada", "inicio", "salida", "dia", "digito", "paciente", "dosis")
+# Tipos compactos de las columnas enteras, iguales a los del registro de eventos
+_TIPOS_ENTEROS = {"dia": np.int32, "digito": np.int8, "paciente": np.int32, "dosis": np.uint8}
+
+
+def _concatenar(bloques: list, campos: tuple) -> dict:
+    """Concatena una lista de bloques columnares (diccionarios de arrays)."""
+    bloques = [b for b in bloques if len(b[campos[0]]) > 0]
+    if not bloques:
+        return {campo: np.empty(0, dtype=_TIPOS_ENTEROS.get(campo, np.float64)) for campo in campos}
+    if len(bloques) == 1:
+        return bloques[0]
+    return {campo: np.concatenate([b[campo] for b in bloques]) for campo in campos}
+
+
+def _filtrar(bloque: dict, mascara) -> dict:
+    """Aplica una máscara booleana (o un slice) a todas las columnas de un bloque."""
+    return {campo: valores[mascara] for campo, valores in bloque.items()}
+
+
+class MotorVectorizado:
+    """
+    Motor alternativo al modelo SimPy. En lugar de un proceso por paciente, calcula la cola
+    FIFO multiservidor de cada día en lote sobre arrays de NumPy de tiempos de llegada y de
+    servicio, y emite los eventos de cada ventana diaria en orden de tiempo.
+
+    El estado entre días es mínimo: los instantes en que se libera cada cabina, los pacientes
+    asignados que todavía no salieron, las llegadas que caen después del cierre del día y, con
+    el esquema de dos dosis, el calendario de vueltas para la segunda dosis.
+
+    Con una política de cierre que vacía el centro (ver src/cierre_diario.py) no se arrastra
+    cola: cada día arranca con las cabinas libres y, si se pasa `secuencia_dias`, con su propio
+    flujo aleatorio, así un día da lo mismo simulado en orden o suelto. Con números aleatorios
+    comunes, `secuencia_dias` es también la raíz de los flujos por propósito y paciente.
+    """
+
+    def __init__(self, config: dict, rng: np.random.Generator = None, contadores: dict = None,
+                 estadisticas_tiempo: EstadisticasTiempo = None, secuencia_dias: np.random.SeedSequence = None):
+        self.config = config
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.minutos_por_dia = config["horas_operacion_por_dia"] * 60
+        # El día `d` empieza en el minuto `desplazamiento_minutos + d * minutos_por_dia`; solo deja
+        # de ser 0 si la jornada cambia a mitad de campaña (ver src/bifurcacion.py)
+        self.desplazamiento_minutos = 0.0
+        self.politica_cierre = politica_cierre(config)
+        self.secuencia_dias = secuencia_dias
+        self.numeros_comunes = numeros_comunes_activos(config)
+        if self.numeros_comunes and secuencia_dias is None:
+            raise ValueError("Los números aleatorios comunes necesitan la semilla raíz de la corrida (secuencia_dias).")
+
+        # Heap con el instante en que se libera cada cabina
+        self.cabinas_libres = [0.0] * config["num_cabinas"]
+        # Pacientes con cabina asignada que todavía no salieron (en orden FIFO)
+        self.pendientes = deque()
+        # Llegadas generadas que caen después del cierre de la ventana actual
+        self.diferidas = _concatenar([], _CAMPOS_LLEGADA)
+
+        # Conteos acumulados hasta el inicio de la ventana actual
+        self.llegadas_en_cola_acumuladas = 0
+        self.inicios_acumulados = 0
+        # Esquemas completos (la última dosis) y, con dos dosis, primeras dosis aplicadas
+        self.contador_vacunados = 0
+        self.contador_primeras_dosis = 0
+        self.objetivo_alcanzado = False
+
+        # Esquema de dos dosis: cada primera dosis agenda la vuelta `intervalo_dosis` días operativos después
+        self.dosis_por_esquema = dosis_por_esquema(config)
+        self.intervalo_dosis = intervalo_dias_operativos(config)
+        self.calendario = CalendarioDosis()
+
+        # Contadores de instrumentación (ver src/perfil.py); None si no se perfila
+        self.contadores = contadores
+        # Integrales en el tiempo de la cola y de las cabinas ocupadas, ventana por ventana
+        self.estadisticas_tiempo = (estadisticas_tiempo if estadisticas_tiempo is not None
+                                    else EstadisticasTiempo(config["num_cabinas"]))
+
+    def inicio_dia(self, dia: int) -> float:
+        """Minuto de simulación en que abre el día `dia`."""
+        return self.desplazamiento_minutos + dia * self.minutos_por_dia
+
+    def generar_llegadas_dia(self, dia: int) -> dict:
+        """
+        Genera en un solo paso las llegadas de un día: tiempos entre llegadas, dígito del DNI,
+        tiempo de servicio y el número aleatorio que decide la reprogramación. Con dos dosis se
+        suman las vueltas agendadas para ese día, mezcladas al azar con las primeras dosis. Con
+        un perfil de llegadas los instantes siguen la intensidad de la jornada (ver
+        src/intensidad_llegadas.py).
+        """
+        config = self.config
+        digitos_hoy = config["asignacion_digitos_dias"].get(dia % 5, [])
+        pacientes_que_asisten = pacientes_del_dia(config, dia)
+        # Con dos dosis, las primeras dosis no superan a la población que todavía no la recibió
+        if self.dosis_por_esquema > 1:
+            pacientes_que_asisten = max(0, min(pacientes_que_asisten, config["poblacion_total"] - self.contador_primeras_dosis))
+        vueltas_por_digito = self.calendario.retirar_dia(dia) if self.dosis_por_esquema > 1 else None
+        total = pacientes_que_asisten + (int(vueltas_por_digito.sum()) if vueltas_por_digito is not None else 0)
+        if total <= 0:
+            return _concatenar([], _CAMPOS_LLEGADA)
+
+        if self.numeros_comunes:
+            return self._llegadas_numeros_comunes(dia, total, pacientes_que_asisten, digitos_hoy, vueltas_por_digito)
+        if self.politica_cierre == "continuar":
+            tasa_llegada_promedio = total / self.minutos_por_dia
+            instantes = np.cumsum(self.rng.exponential(1.0 / tasa_llegada_promedio, total))
+        else:
+            # Con cierre nadie llega con el centro cerrado: las llegadas de un proceso de Poisson
+            # condicionadas a `total` son uniformes ordenadas dentro del horario
+            instantes = np.sort(self.rng.uniform(0.0, self.minutos_por_dia, total))
+        llegadas = {
+            "llegada": self.inicio_dia(dia) + aplicar_perfil(instantes, config, self.minutos_por_dia),
+            "servicio": self.rng.exponential(config["tiempo_promedio_vacunacion_minutos"], total),
+            "azar": self.rng.random(total),
+            "dia": np.full(total, dia, dtype=np.int32),
+        }
+        if vueltas_por_digito is None:
+            llegadas["digito"] = self.rng.choice(np.asarray(digitos_hoy, dtype=np.int8), total)
+            llegadas["dosis"] = np.ones(total, dtype=np.uint8)
+        else:
+            primeras = (self.rng.choice(np.asarray(digitos_hoy, dtype=np.int8), pacientes_que_asisten)
+                        if pacientes_que_asisten > 0 else np.empty(0, dtype=np.int8))
+            self._mezclar_vueltas(llegadas, primeras, vueltas_por_digito, self.rng.permutation(total))
+        llegadas["paciente"] = np.arange(total, dtype=np.int32)
+        return llegadas
+
+    def _llegadas_numeros_comunes(self, dia: int, total: int, pacientes_que_asisten: int, digitos_hoy,
+                                  vueltas_por_digito) -> dict:
+        """
+        Llegadas del día con números aleatorios comunes (ver src/numeros_comunes.py): cada
+        propósito sale de su propio flujo del día, indexado por el ordinal del paciente.
+        """
+        azar = generar_azar_del_dia(self.secuencia_dias, dia, total, self.minutos_por_dia,
+                                    self.config["tiempo_promedio_vacunacion_minutos"],
+                                    uniformes=self.politica_cierre != "continuar",
+                                    antiteticas=variables_antiteticas(self.config))
+        llegadas = {
+            "llegada": self.inicio_dia(dia) + aplicar_perfil(azar["instantes"], self.config, self.minutos_por_dia),
+            "servicio": azar["servicio"],
+            "azar": azar["azar"],
+            "dia": np.full(total, dia, dtype=np.int32),
+        }
+        if vueltas_por_digito is None:
+            llegadas["digito"] = elegir_digitos(azar["eleccion"], digitos_hoy)
+            llegadas["dosis"] = np.ones(total, dtype=np.uint8)
+        else:
+            primeras = elegir_digitos(azar["eleccion"][:pacientes_que_asisten], digitos_hoy)
+            self._mezclar_vueltas(llegadas, primeras, vueltas_por_digito,
+                                  flujo_comun(self.secuencia_dias, "mezcla", dia).permutation(total))
+        llegadas["paciente"] = np.arange(total, dtype=np.int32)
+        return llegadas
+
+    @staticmethod
+    def _mezclar_vueltas(llegadas: dict, primeras: np.ndarray, vueltas_por_digito: np.ndarray, orden: np.ndarray):
+        """Mezcla en el orden dado las primeras dosis del día con las vueltas para la segunda."""
+        vueltas = np.repeat(np.arange(10, dtype=np.int8), vueltas_por_digito)
+        llegadas["digito"] = np.concatenate([primeras, vueltas])[orden]
+        llegadas["dosis"] = np.concatenate([
+            np.ones(len(primeras), dtype=np.uint8), np.full(len(vueltas), 2, dtype=np.uint8),
+        ])[orden]
+
+    def _atender_llegadas(self, llegadas: dict):
+        """
+        Recorre las llegadas en orden y asigna a cada una la primera cabina que se libera.
+        Devuelve la máscara de pacientes que reprograman y el instante de inicio de servicio.
+        """
+        probabilidad_reprogramacion = self.config["probabilidad_reprogramacion"]
+        cabinas_libres = self.cabinas_libres
+        n = len(llegadas["llegada"])
+        reprograma = np.zeros(n, dtype=bool)
+        inicios = np.empty(n)
+
+        tiempos = llegadas["llegada"].tolist()
+        servicios = llegadas["servicio"].tolist()
+        azares = llegadas["azar"].tolist()
+        heapreplace = heapq.heapreplace
+        for i in range(n):
+            tiempo_llegada = tiempos[i]
+            primera_libre = cabinas_libres[0]
+            # Todas las cabinas ocupadas: el paciente puede irse a reprogramar
+            if primera_libre > tiempo_llegada and azares[i] < probabilidad_reprogramacion:
+                reprograma[i] = True
+                continue
+            inicio = tiempo_llegada if tiempo_llegada > primera_libre else primera_libre
+            heapreplace(cabinas_libres, inicio + servicios[i])
+            inicios[i] = inicio
+
+        return reprograma, inicios
+
+    def _extraer_salidas(self, fin_ventana: float) -> tuple:
+        """
+        Saca de la lista de pendientes a todos los pacientes que empezaron a ser atendidos antes
+        del cierre de la ventana. Devuelve los que salen dentro de la ventana y los que siguen
+        en una cabina; estos últimos vuelven al frente de la lista.
+        """
+        candidatos = []
+        while self.pendientes:
+            bloque = self.pendientes[0]
+            corte = int(np.searchsorted(bloque["inicio"], fin_ventana, side="left"))
+            if corte == 0:
+                break
+            if corte == len(bloque["inicio"]):
+                candidatos.append(self.pendientes.popleft())
+                continue
+            candidatos.append(_filtrar(bloque, slice(None, corte)))
+            self.pendientes[0] = _filtrar(bloque, slice(corte, None))
+            break
+
+        candidatos = _concatenar(candidatos, _CAMPOS_PENDIENTE)
+        en_cabina = candidatos["salida"] >= fin_ventana
+        en_servicio = _filtrar(candidatos, en_cabina)
+        if en_cabina.any():
+            self.pendientes.appendleft(en_servicio)
+        return _filtrar(candidatos, ~en_cabina), en_servicio
+
+    def cambiar_cabinas(self, num_cabinas: int, desde: float):
+        """
+        Pasa a `num_cabinas` cabinas desde el instante `desde` (una apertura de día, ver
+        src/bifurcacion.py). Los pacientes que ya están en una cabina terminan su vacunación; si
+        sobran, las cabinas que se sacan son las que se liberan primero. Los que esperan en la
+        cola tenían asignado un inicio con las cabinas anteriores: se reasignan en orden FIFO.
+        """
+        pendientes = _concatenar(list(self.pendientes), _CAMPOS_PENDIENTE)
+        esperando = pendientes["inicio"] >= desde
+        en_servicio = _filtrar(pendientes, ~esperando)
+        en_cola = _filtrar(pendientes, esperando)
+
+        cabinas = sorted(en_servicio["salida"].tolist())[-num_cabinas:] if len(en_servicio["salida"]) else []
+        cabinas = [float(desde)] * (num_cabinas - len(cabinas)) + cabinas
+        servicios = en_cola["salida"] - en_cola["inicio"]
+        # Todos llegaron antes de `desde`: cada uno empieza apenas se libera una cabina
+        inicios = []
+        agregar_inicio = inicios.append
+        heapreplace = heapq.heapreplace
+        for servicio in servicios.tolist():
+            inicio = cabinas[0]
+            agregar_inicio(inicio)
+            heapreplace(cabinas, inicio + servicio)
+        en_cola["inicio"] = np.asarray(inicios, dtype=np.float64)
+        en_cola["salida"] = en_cola["inicio"] + servicios
+
+        self.cabinas_libres = cabinas
+        self.pendientes = deque(bloque for bloque in (en_servicio, en_cola) if len(bloque["inicio"]))
+        self.estadisticas_tiempo.cambiar_cabinas(num_cabinas)
+
+    def simular_dia(self, dia: int) -> dict:
+        """
+        Simula la ventana [dia, dia + 1) y devuelve los eventos que ocurren en ella,
+        ordenados por tiempo, como un diccionario de columnas.
+        """
+        if self.politica_cierre != "continuar":
+            return self._simular_dia_con_cierre(dia)
+        inicio_ventana = self.inicio_dia(dia)
+        fin_ventana = inicio_ventana + self.minutos_por_dia
+
+        # 1. Llegadas de la ventana: las del día más las diferidas de días anteriores
+        nuevas = self.generar_llegadas_dia(dia) if not self.objetivo_alcanzado else _concatenar([], _CAMPOS_LLEGADA)
+        llegadas = _concatenar([self.diferidas, nuevas], _CAMPOS_LLEGADA)
+        if len(self.diferidas["llegada"]) and len(nuevas["llegada"]):
+            llegadas = _filtrar(llegadas, np.argsort(llegadas["llegada"], kind="stable"))
+        dentro = llegadas["llegada"] < fin_ventana
+        self.diferidas = _filtrar(llegadas, ~dentro)
+        llegadas = _filtrar(llegadas, dentro)
+
+        # 2. Cola FIFO multiservidor con reprogramación
+        reprograma, inicios = self._atender_llegadas(llegadas)
+        atendidos = ~reprograma
+        en_cola = {
+            "llegada": llegadas["llegada"][atendidos],
+            "inicio": inicios[atendidos],
+            "salida": inicios[atendidos] + llegadas["servicio"][atendidos],
+            "dia": llegadas["dia"][atendidos],
+            "digito": llegadas["digito"][atendidos],
+            "paciente": llegadas["paciente"][atendidos],
+            "dosis": llegadas["dosis"][atendidos],
+        }
+        if len(en_cola["llegada"]):
+            self.pendientes.append(en_cola)
+
+        # 3. Salidas que ocurren dentro de la ventana
+        salidas, en_servicio = self._extraer_salidas(fin_ventana)
+        salidas = _filtrar(salidas, np.argsort(salidas["salida"], kind="stable"))
+        reprogramados = _filtrar(llegadas, reprograma)
+
+        # 4. Longitud de la cola en cada evento: llegadas que se quedaron menos inicios de servicio
+        inicios_ventana = np.concatenate([salidas["inicio"], en_servicio["inicio"]])
+        inicios_ventana = np.sort(inicios_ventana[inicios_ventana >= inicio_ventana])
+
+        def longitud_cola(tiempos, lado_llegadas):
+            llegadas_previas = np.searchsorted(en_cola["llegada"], tiempos, side=lado_llegadas)
+            inicios_previos = np.searchsorted(inicios_ventana, tiempos, side="left")
+            return (self.llegadas_en_cola_acumuladas + llegadas_previas
+                    - self.inicios_acumulados - inicios_previos)
+
+        cola_salidas = longitud_cola(salidas["salida"], "right")
+        cola_reprogramados = longitud_cola(reprogramados["llegada"], "left")
+
+        self.llegadas_en_cola_acumuladas += len(en_cola["llegada"])
+        self.inicios_acumulados += len(inicios_ventana)
+
+        # 5. Parada temprana al completar la población objetivo (esquemas completos)
+        num_salidas = len(salidas["salida"])
+        salidas_finales = salidas["salida"][salidas["dosis"] == self.dosis_por_esquema]
+        faltantes = self.config["poblacion_total"] - self.contador_vacunados
+        instante_objetivo = None
+        if len(salidas_finales) >= faltantes:
+            instante_objetivo = salidas_finales[max(faltantes, 1) - 1]
+            self.objetivo_alcanzado = True
+
+        eventos = {
+            "tiempo_simulacion": np.concatenate([salidas["salida"], reprogramados["llegada"]]),
+            "dia": np.concatenate([salidas["dia"], reprogramados["dia"]]),
+            "digito_dni": np.concatenate([salidas["digito"], reprogramados["digito"]]),
+            "paciente": np.concatenate([salidas["paciente"], reprogramados["paciente"]]),
+            "evento": np.concatenate([
+                np.full(num_salidas, EVENTO_VACUNADO, dtype=np.uint8),
+                np.full(len(reprogramados["llegada"]), EVENTO_REPROGRAMACION, dtype=np.uint8),
+            ]),
+            "dosis": np.concatenate([salidas["dosis"], reprogramados["dosis"]]),
+            "longitud_cola_actual": np.concatenate([cola_salidas, cola_reprogramados]),
+            "tiempo_espera_minutos": np.concatenate([
+                salidas["inicio"] - salidas["llegada"], np.zeros(len(reprogramados["llegada"])),
+            ]),
+            "tiempo_en_sistema_minutos": np.concatenate([
+                salidas["salida"] - salidas["llegada"], np.zeros(len(reprogramados["llegada"])),
+            ]),
+        }
+        orden = np.argsort(eventos["tiempo_simulacion"], kind="stable")
+        if instante_objetivo is not None:
+            orden = orden[eventos["tiempo_simulacion"][orden] <= instante_objetivo]
+        eventos = _filtrar(eventos, orden)
+        self._integrar_ventana(fin_ventana, instante_objetivo, en_cola["llegada"], inicios_ventana, salidas["salida"])
+        if self.contadores is not None:
+            self._actualizar_contadores(llegadas, eventos)
+        vacunados = eventos["evento"] == EVENTO_VACUNADO
+        self.contador_vacunados += int(np.count_nonzero(vacunados & (eventos["dosis"] == self.dosis_por_esquema)))
+        if self.dosis_por_esquema > 1:
+            self._agendar_segundas_dosis(dia, eventos, vacunados)
+        return eventos
+
+    def _simular_dia_con_cierre(self, dia: int) -> dict:
+        """
+        Simula un día que empieza con el centro vacío y termina vaciándolo: con "vaciar_cola" se
+        atiende a todos los que llegaron, aunque sea después del cierre; con "reprogramar" los que
+        siguen en la cola al cierre se reprograman en ese instante. Las salidas después del cierre
+        son horas extra del mismo día: las estadísticas en el tiempo del día se integran hasta la
+        última y se fusionan con las de la campaña.
+        """
+        inicio_ventana = self.inicio_dia(dia)
+        fin_ventana = inicio_ventana + self.minutos_por_dia
+        if self.secuencia_dias is not None:
+            self.rng = np.random.default_rng(secuencia_del_dia(self.secuencia_dias, dia))
+        self.cabinas_libres = [float(inicio_ventana)] * self.config["num_cabinas"]
+
+        llegadas = self.generar_llegadas_dia(dia) if not self.objetivo_alcanzado else _concatenar([], _CAMPOS_LLEGADA)
+        reprograma, inicios = self._atender_llegadas(llegadas)
+        # La asignación FIFO de los primeros no depende de los que vienen atrás: sacar a los
+        # que empezarían después del cierre no cambia a nadie más
+        cerrados = ~reprograma & (inicios >= fin_ventana) if self.politica_cierre == "reprogramar" else np.zeros_like(reprograma)
+        atendidos = ~reprograma & ~cerrados
+        salidas = {
+            "llegada": llegadas["llegada"][atendidos],
+            "inicio": inicios[atendidos],
+            "salida": inicios[atendidos] + llegadas["servicio"][atendidos],
+            "dia": llegadas["dia"][atendidos],
+            "digito": llegadas["digito"][atendidos],
+            "paciente": llegadas["paciente"][atendidos],
+            "dosis": llegadas["dosis"][atendidos],
+        }
+        salidas = _filtrar(salidas, np.argsort(salidas["salida"], kind="stable"))
+        reprogramados = _filtrar(llegadas, reprograma)
+        cerrados = _filtrar(llegadas, cerrados)
+        num_cerrados = len(cerrados["llegada"])
+
+        # Longitud de la cola: llegadas que se quedaron menos inicios de servicio; al cierre se
+        # van de golpe los que no llegaron a una cabina
+        llegadas_en_cola = llegadas["llegada"][~reprograma]
+        inicios_servicio = np.sort(salidas["inicio"])
+
+        def longitud_cola(tiempos, lado_llegadas):
+            return (np.searchsorted(llegadas_en_cola, tiempos, side=lado_llegadas)
+                    - np.searchsorted(inicios_servicio, tiempos, side="left")
+                    - np.where(tiempos > fin_ventana, num_cerrados, 0))
+
+        # Parada temprana al completar la población objetivo (esquemas completos)
+        salidas_finales = salidas["salida"][salidas["dosis"] == self.dosis_por_esquema]
+        faltantes = self.config["poblacion_total"] - self.contador_vacunados
+        instante_objetivo = None
+        if len(salidas_finales) >= faltantes:
+            instante_objetivo = salidas_finales[max(faltantes, 1) - 1]
+            self.objetivo_alcanzado = True
+
+        bloques = (salidas["salida"], reprogramados["llegada"], np.full(num_cerrados, float(fin_ventana)))
+        eventos = {
+            "tiempo_simulacion": np.concatenate(bloques),
+            "dia": np.concatenate([salidas["dia"], reprogramados["dia"], cerrados["dia"]]),
+            "digito_dni": np.concatenate([salidas["digito"], reprogramados["digito"], cerrados["digito"]]),
+            "paciente": np.concatenate([salidas["paciente"], reprogramados["paciente"], cerrados["paciente"]]),
+            "evento": np.concatenate([
+                np.full(len(salidas["salida"]), EVENTO_VACUNADO, dtype=np.uint8),
+                np.full(len(reprogramados["llegada"]) + num_cerrados, EVENTO_REPROGRAMACION, dtype=np.uint8),
+            ]),
+            "dosis": np.concatenate([salidas["dosis"], reprogramados["dosis"], cerrados["dosis"]]),
+            "longitud_cola_actual": np.concatenate([
+                longitud_cola(salidas["salida"], "right"), longitud_cola(reprogramados["llegada"], "left"),
+                longitud_cola(bloques[2], "left"),
+            ]),
+            # Quien se va al cierre esperó en la cola desde que llegó
+            "tiempo_espera_minutos": np.concatenate([
+                salidas["inicio"] - salidas["llegada"], np.zeros(len(reprogramados["llegada"])),
+                fin_ventana - cerrados["llegada"],
+            ]),
+            "tiempo_en_sistema_minutos": np.concatenate([
+                salidas["salida"] - salidas["llegada"], np.zeros(len(reprogramados["llegada"])),
+                fin_ventana - cerrados["llegada"],
+            ]),
+        }
+        orden = np.argsort(eventos["tiempo_simulacion"], kind="stable")
+        if instante_objetivo is not None:
+            orden = orden[eventos["tiempo_simulacion"][orden] <= instante_objetivo]
+        eventos = _filtrar(eventos, orden)
+
+        self._integrar_dia_con_cierre(inicio_ventana, fin_ventana, instante_objetivo, llegadas_en_cola,
+                                      inicios_servicio, salidas["salida"], num_cerrados)
+        if self.contadores is not None:
+            self._actualizar_contadores(llegadas, eventos)
+        vacunados = eventos["evento"] == EVENTO_VACUNADO
+        self.contador_vacunados += int(np.count_nonzero(vacunados & (eventos["dosis"] == self.dosis_por_esquema)))
+        if self.dosis_por_esquema > 1:
+            self._agendar_segundas_dosis(dia, eventos, vacunados)
+        return eventos
+
+    def _integrar_dia_con_cierre(self, inicio_ventana: float, fin_ventana: float, instante_objetivo,
+                                 llegadas: np.ndarray, inicios: np.ndarray, salidas: np.ndarray, num_cerrados: int):
+        """
+        Integra un día con cierre en sus propias estadísticas (desde la apertura hasta la última
+        salida, o hasta `instante_objetivo`) y las suma a las de la campaña.
+        """
+        fin = max(fin_ventana, float(salidas[-1])) if len(salidas) else fin_ventana
+        if instante_objetivo is not None:
+            fin = instante_objetivo
+            llegadas = llegadas[llegadas <= fin]
+            inicios = inicios[inicios <= fin]
+            salidas = salidas[salidas <= fin]
+        estadisticas = EstadisticasTiempo(self.config["num_cabinas"], self.estadisticas_tiempo.resolucion_minutos,
+                                          inicio=inicio_ventana)
+        if num_cerrados and fin > fin_ventana:
+            # Hasta el cierre con la cola completa; después solo quedan las cabinas ocupadas
+            antes = np.searchsorted(salidas, fin_ventana, side="right")
+            estadisticas.registrar_ventana(fin_ventana, llegadas, inicios, salidas[:antes])
+            estadisticas.registrar(fin_ventana, 0, estadisticas.ocupadas)
+            estadisticas.registrar_ventana(fin, llegadas[:0], inicios[:0], salidas[antes:])
+        else:
+            estadisticas.registrar_ventana(fin, llegadas, inicios, salidas)
+        self.estadisticas_tiempo.fusionar(estadisticas)
+
+    def _integrar_ventana(self, fin_ventana: float, instante_objetivo, llegadas: np.ndarray, inicios: np.ndarray,
+                          salidas: np.ndarray):
+        """
+        Pasa a las estadísticas en el tiempo los cambios de estado de la ventana. Con parada
+        temprana la corrida termina en `instante_objetivo` (la última vacunación necesaria).
+        """
+        fin = fin_ventana
+        if instante_objetivo is not None:
+            fin = instante_objetivo
+            llegadas = llegadas[llegadas <= fin]
+            inicios = inicios[inicios <= fin]
+            salidas = salidas[salidas <= fin]
+        self.estadisticas_tiempo.registrar_ventana(fin, llegadas, inicios, salidas)
+
+    def _actualizar_contadores(self, llegadas: dict, eventos: dict):
+        """
+        Sin procesos ni cola de eventos, los equivalentes del motor son: pacientes generados en
+        la ventana ("procesos_creados") y pacientes que quedan en una cabina o por llegar al
+        cierre ("max_tamano_heap", el estado que se arrastra al día siguiente).
+        """
+        contadores = self.contadores
+        contadores["eventos_procesados"] += len(eventos["evento"])
+        contadores["procesos_creados"] += len(llegadas["llegada"])
+        en_curso = sum(len(bloque["llegada"]) for bloque in self.pendientes) + len(self.diferidas["llegada"])
+        contadores["max_tamano_heap"] = max(contadores["max_tamano_heap"], en_curso)
+        if len(eventos["longitud_cola_actual"]):
+            contadores["max_longitud_cola"] = max(contadores["max_longitud_cola"], int(eventos["longitud_cola_actual"].max()))
+
+    def _agendar_segundas_dosis(self, dia: int, eventos: dict, vacunados: np.ndarray):
+        """
+        Agenda la vuelta de quienes recibieron la primera dosis en la ventana. Las segundas
+        dosis que se van a reprogramar vuelven al día operativo siguiente.
+        """
+        primeras = vacunados & (eventos["dosis"] == 1)
+        self.contador_primeras_dosis += int(np.count_nonzero(primeras))
+        self.calendario.programar_lote(dia + self.intervalo_dosis, eventos["digito_dni"][primeras])
+        self.calendario.programar_lote(dia + 1, eventos["digito_dni"][~vacunados & (eventos["dosis"] == 2)])
+
+
+def simular_vectorizado(config: dict, duracion_dias: int, rng: np.random.Generator = None, destino=None,
+                        criterio_parada=None, contadores: dict = None, estadisticas_tiempo: EstadisticasTiempo = None,
+                        secuencia_dias: np.random.SeedSequence = None):
+    """
+    Ejecuta la campaña completa con el motor vectorizado. Los eventos de cada día se pasan al
+    `destino` apenas se calculan, en orden de tiempo de simulación: por defecto un registro
+    compacto, o un AcumuladorMetricas que no guarda ningún evento.
+
+    `criterio_parada(destino, dia)` se evalúa al cerrar cada día; si devuelve True la corrida
+    se corta ahí (lo usa el optimizador para abandonar corridas que ya no pueden cumplir un plazo).
+    Si se pasa `contadores` (ver perfil.contadores_motor), el motor los actualiza día a día.
+    Las integrales en el tiempo de la cola y la ocupación quedan en `destino.estadisticas_tiempo`
+    (en `estadisticas_tiempo`, si se pasa uno). Con una política de cierre, `secuencia_dias` da
+    a cada día su propio flujo aleatorio (ver MotorVectorizado).
+    """
+    motor = MotorVectorizado(config, rng, contadores, estadisticas_tiempo, secuencia_dias)
+    destino = destino if destino is not None else RegistroEventos()
+    for dia in range(duracion_dias):
+        destino.extender(motor.simular_dia(dia))
+        if motor.objetivo_alcanzado:
+            break
+        if criterio_parada is not None and criterio_parada(destino, dia):
+            break
+    destino.estadisticas_tiempo = motor.estadisticas_tiempo
+    return destino
@@ -0,0 +1,82 @@
+# src/numeros_comunes.py
+
+import numpy as np
+
+# Un flujo aleatorio por propósito: así cambiar un parámetro (ej. el tiempo de servicio) no
+# corre los números de los demás, y el paciente `i` del día `d` recibe siempre los mismos
+PROPOSITOS = ("llegadas", "digitos", "servicio", "reprogramacion", "mezcla")
+
+
+def numeros_comunes_activos(config: dict) -> bool:
+    """
+    Indica si el escenario usa números aleatorios comunes: con la misma semilla, escenarios
+    distintos ven los mismos pacientes (mismos instantes relativos, dígitos, tiempos de servicio
+    y decisiones de reprogramación), y las diferencias entre ellos se miden pareadas. Las
+    variables antitéticas usan los mismos flujos, así que también los activan.
+    """
+    return bool(config.get("numeros_aleatorios_comunes", False)) or variables_antiteticas(config)
+
+
+def variables_antiteticas(config: dict) -> bool:
+    """
+    Indica si la corrida es la antitética de su semilla: cada uniforme `u` de los flujos por
+    propósito se reemplaza por `1 - u`. Promediada con la corrida normal de la misma semilla, la
+    correlación negativa entre las dos reduce la varianza (ver replicas.ejecutar_replicas_adaptativas).
+    """
+    return bool(config.get("variables_antiteticas", False))
+
+
+def _uniformes(rng: np.random.Generator, cantidad: int, antiteticas: bool) -> np.ndarray:
+    """Uniformes en [0, 1) o sus antitéticas (1 - u, sin llegar a 1)."""
+    uniformes = rng.random(cantidad)
+    if antiteticas:
+        uniformes = np.minimum(1.0 - uniformes, np.nextafter(1.0, 0.0))
+    return uniformes
+
+
+def _exponenciales(rng: np.random.Generator, cantidad: int, antiteticas: bool) -> np.ndarray:
+    """Exponenciales estándar por inversión de la uniforme, para que tengan antitética."""
+    return -np.log1p(-_uniformes(rng, cantidad, antiteticas))
+
+
+def flujo_comun(raiz: np.random.SeedSequence, proposito: str, dia: int) -> np.random.Generator:
+    """
+    Generador de un propósito para un día, derivado de la semilla raíz sin tocar su contador de
+    hijos. Su valor `i` es el del paciente `i` del día, sin importar cuántos pacientes haya.
+    """
+    clave = tuple(raiz.spawn_key) + (PROPOSITOS.index(proposito), dia)
+    return np.random.default_rng(np.random.SeedSequence(raiz.entropy, spawn_key=clave, pool_size=raiz.pool_size))
+
+
+def generar_azar_del_dia(raiz: np.random.SeedSequence, dia: int, total: int, minutos_por_dia: float,
+                         tiempo_servicio: float, uniformes: bool = False, antiteticas: bool = False) -> dict:
+    """
+    Números de los `total` pacientes de un día, cada propósito de su flujo y en orden de
+    paciente, de modo que los primeros `k` coinciden entre escenarios con distinta cantidad de
+    pacientes. Se transforman por inversión (escalando exponenciales estándar): un escenario
+    con más cabinas o menos tiempo de servicio recibe los mismos pacientes, solo más rápidos.
+    Con `antiteticas` cada uniforme `u` se usa como `1 - u`.
+
+    Con `uniformes` los instantes son uniformes ordenadas dentro del horario (política de
+    cierre, ver src/cierre_diario.py): se arman normalizando la suma acumulada de `total + 1`
+    exponenciales.
+
+    Returns:
+        dict: "instantes" (minutos desde la apertura, ordenados), "servicio", "azar" (decide la
+              reprogramación) y "eleccion" (uniformes para elegir el dígito del DNI).
+    """
+    exponenciales = _exponenciales(flujo_comun(raiz, "llegadas", dia), total + 1 if uniformes else total, antiteticas)
+    sumas = np.cumsum(exponenciales)
+    instantes = sumas[:-1] / sumas[-1] * minutos_por_dia if uniformes else sumas * (minutos_por_dia / total)
+    return {
+        "instantes": instantes,
+        "servicio": _exponenciales(flujo_comun(raiz, "servicio", dia), total, antiteticas) * tiempo_servicio,
+        "azar": _uniformes(flujo_comun(raiz, "reprogramacion", dia), total, antiteticas),
+        "eleccion": _uniformes(flujo_comun(raiz, "digitos", dia), total, antiteticas),
+    }
+
+
+def elegir_digitos(eleccion: np.ndarray, digitos_hoy) -> np.ndarray:
+    """Dígito del DNI de cada paciente a partir de su uniforme (mismo uniforme, mismo dígito)."""
+    digitos_hoy = np.asarray(digitos_hoy, dtype=np.int8)
+    return digitos_hoy[np.minimum((eleccion * len(digitos_hoy)).astype(np.int64), len(digitos_hoy) - 1)]
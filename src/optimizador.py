@@ -0,0 +1,233 @@
+# src/optimizador.py
+
+import math
+import numpy as np
+from src.config import ConfiguracionSimulacion
+from src.simulation import crear_secuencia_semilla
+from src.motor_vectorizado import simular_vectorizado
+from src.acumuladores import AcumuladorMetricas
+from src.calendario_dosis import dosis_por_esquema
+from src.modelo_analitico import cabinas_minimas_analiticas
+from src.recosteo import calcular_estadisticas_costo, costos_desde_estadisticas
+
+# Desviaciones estándar de margen para declarar que una corrida ya no puede cumplir el plazo
+DESVIOS_ABANDONO = 4.0
+
+
+def capacidad_diaria(config_escenario: dict) -> float:
+    """Vacunaciones esperadas por día con todas las cabinas ocupadas durante toda la jornada."""
+    minutos_por_dia = config_escenario["horas_operacion_por_dia"] * 60
+    return config_escenario["num_cabinas"] * minutos_por_dia / config_escenario["tiempo_promedio_vacunacion_minutos"]
+
+
+def cabinas_minimas_teoricas(config_escenario: dict, plazo_dias: int) -> int:
+    """
+    Cota inferior de cabinas: con menos, ni trabajando siempre a plena capacidad se aplican
+    todas las dosis del esquema a toda la población dentro del plazo.
+    """
+    config_una_cabina = dict(config_escenario, num_cabinas=1)
+    dosis_totales = config_escenario["poblacion_total"] * dosis_por_esquema(config_escenario)
+    return max(1, math.ceil(dosis_totales / (capacidad_diaria(config_una_cabina) * plazo_dias)))
+
+
+def criterio_abandono(config_escenario: dict, plazo_dias: int):
+    """
+    Devuelve un criterio de parada para `simular_vectorizado` que corta la corrida en cuanto
+    queda claramente detrás de la trayectoria necesaria: las dosis que faltan (todas las del
+    esquema para toda la población) superan a la capacidad de los días restantes más
+    `DESVIOS_ABANDONO` desviaciones (con las cabinas siempre ocupadas las salidas son un proceso
+    de Poisson, así que la varianza es igual a la media).
+    """
+    capacidad = capacidad_diaria(config_escenario)
+    dosis_totales = config_escenario["poblacion_total"] * dosis_por_esquema(config_escenario)
+
+    def criterio(acumulador: AcumuladorMetricas, dia: int) -> bool:
+        # `total_vacunados` cuenta dosis aplicadas, no personas
+        faltantes = dosis_totales - acumulador.total_vacunados
+        capacidad_restante = capacidad * (plazo_dias - dia - 1)
+        return faltantes > capacidad_restante + DESVIOS_ABANDONO * math.sqrt(capacidad_restante)
+
+    return criterio
+
+
+def costo_campana(config_escenario: dict, dias_campana: int, acumulador: AcumuladorMetricas) -> float:
+    """
+    Costo operativo de una réplica con el mismo modelo que las métricas (ver src/recosteo.py):
+    cabinas por día de campaña, dosis aplicadas (todas las del esquema) y reprogramaciones. Igual
+    que en las métricas, el costo fijo es por cabina y por día sin importar las horas de
+    operación, y el alquiler único de cabinas adicionales no se cobra.
+    """
+    estadisticas = calcular_estadisticas_costo(config_escenario, dias_campana, acumulador.total_vacunados,
+                                               acumulador.total_reprogramados, acumulador.espera.media,
+                                               acumulador.espera_total_reprogramados)
+    return costos_desde_estadisticas(estadisticas)["costo_total_campana"]
+
+
+def evaluar_configuracion(config_escenario: dict, plazo_dias: int, secuencias: list, confianza: float) -> dict:
+    """
+    Corre réplicas de una configuración (motor vectorizado, modo solo métricas) hasta decidir si
+    cumple el plazo con la confianza pedida, es decir, si al menos `ceil(confianza * n)` de las
+    `n` réplicas vacunan al 100% dentro de `plazo_dias`.
+
+    Las réplicas se cortan apenas quedan detrás de la trayectoria necesaria, y la evaluación se
+    detiene cuando ya fallaron demasiadas réplicas para alcanzar la confianza. Las factibles
+    corren todas las réplicas para estimar el costo.
+    """
+    n = len(secuencias)
+    necesarias = math.ceil(confianza * n)
+    minutos_por_dia = config_escenario["horas_operacion_por_dia"] * 60
+    quedo_atras = criterio_abandono(config_escenario, plazo_dias)
+    abandonos = []
+
+    def criterio(acumulador, dia):
+        if quedo_atras(acumulador, dia):
+            abandonos.append(dia)
+            return True
+        return False
+
+    cumplen = 0
+    ejecutadas = 0
+    dias_campanas = []
+    costos = []
+    for secuencia in secuencias:
+        acumulador = AcumuladorMetricas(config_escenario["poblacion_total"], minutos_por_dia, dosis_por_esquema(config_escenario))
+        simular_vectorizado(config_escenario, plazo_dias, np.random.default_rng(secuencia),
+                            destino=acumulador, criterio_parada=criterio)
+        ejecutadas += 1
+        tiempo_total = acumulador.tiempos_hitos["100_porciento"]
+        if tiempo_total is not None:
+            cumplen += 1
+            dias_campanas.append(math.ceil(tiempo_total / minutos_por_dia))
+            costos.append(costo_campana(config_escenario, dias_campanas[-1], acumulador))
+        if (ejecutadas - cumplen) > n - necesarias:
+            break
+
+    factible = cumplen >= necesarias
+    evaluacion = {
+        "num_cabinas": config_escenario["num_cabinas"],
+        "horas_operacion_por_dia": config_escenario["horas_operacion_por_dia"],
+        "factible": factible,
+        "replicas_ejecutadas": ejecutadas,
+        "replicas_que_cumplen": cumplen,
+        "replicas_abandonadas": len(abandonos),
+    }
+    if factible:
+        evaluacion["dias_campana_promedio"] = float(np.mean(dias_campanas))
+        evaluacion["costo_promedio"] = float(np.mean(costos))
+    return evaluacion
+
+
+def buscar_cabinas_minimas(config_escenario: dict, plazo_dias: int, secuencias: list, confianza: float,
+                           max_cabinas: int = 200) -> tuple:
+    """
+    Busca por bisección la mínima cantidad de cabinas que cumple el plazo. Parte de la
+    estimación del modelo analítico (ver src/modelo_analitico.py), que suele caer a una o dos
+    cabinas del resultado: si no es factible avanza con pasos que se duplican hasta encontrar una
+    cantidad factible, y luego bisecciona el intervalo desde la cota teórica, que sigue siendo
+    la única cota inferior garantizada.
+
+    Returns:
+        tuple: (evaluación de la mínima cantidad factible o None, lista de todas las evaluaciones).
+    """
+    evaluaciones = {}
+
+    def evaluar(num_cabinas):
+        if num_cabinas not in evaluaciones:
+            config = dict(config_escenario, num_cabinas=num_cabinas)
+            evaluaciones[num_cabinas] = evaluar_configuracion(config, plazo_dias, secuencias, confianza)
+        return evaluaciones[num_cabinas]
+
+    # Cota inferior conocida como infactible y superior factible
+    inferior = cabinas_minimas_teoricas(config_escenario, plazo_dias) - 1
+    estimacion = cabinas_minimas_analiticas(config_escenario, plazo_dias, max_cabinas)
+    superior = estimacion if estimacion is not None else inferior + 1
+    paso = 1
+    while not evaluar(superior)["factible"]:
+        inferior = superior
+        if superior >= max_cabinas:
+            return None, sorted(evaluaciones.values(), key=lambda e: e["num_cabinas"])
+        superior = min(max_cabinas, superior + paso)
+        paso *= 2
+
+    while superior - inferior > 1:
+        medio = (inferior + superior) // 2
+        if evaluar(medio)["factible"]:
+            superior = medio
+        else:
+            inferior = medio
+
+    return evaluaciones[superior], sorted(evaluaciones.values(), key=lambda e: e["num_cabinas"])
+
+
+def optimizar_cabinas(config_escenario: dict, plazo_dias: int, horas_candidatas: list = None, n_replicas: int = 10,
+                      confianza: float = 0.9, presupuesto: float = None, semilla: int = None,
+                      max_cabinas: int = 200) -> dict:
+    """
+    Busca la combinación de cabinas y horas de operación más barata que vacuna al 100% de la
+    población dentro de `plazo_dias` días operativos con la confianza pedida.
+
+    Para cada jornada candidata se busca por bisección la mínima cantidad de cabinas factible
+    (más cabinas nunca empeoran el plazo) y se estima su costo con las réplicas (ver
+    `costo_campana`). Todas las configuraciones usan los mismos flujos aleatorios, así las
+    comparaciones no dependen del azar.
+
+    Args:
+        config_escenario (dict): Escenario de partida (población, asistencia, tiempos, etc.).
+        plazo_dias (int): Días operativos para alcanzar el 100% de la población.
+        horas_candidatas (list): Horas de operación por día a evaluar. Por defecto, las del escenario.
+        n_replicas (int): Réplicas por configuración.
+        confianza (float): Fracción mínima de réplicas que deben cumplir el plazo.
+        presupuesto (float): Costo máximo admitido (None = sin límite).
+        semilla (int): Semilla raíz de los flujos aleatorios.
+        max_cabinas (int): Máximo de cabinas a considerar.
+
+    Returns:
+        dict: La mejor configuración ('mejor', None si ninguna cumple) y el detalle por jornada.
+    """
+    if not 0 < confianza <= 1:
+        raise ValueError("La confianza debe estar entre 0 y 1.")
+    if n_replicas < 1:
+        raise ValueError("Hace falta al menos una réplica por configuración.")
+    if horas_candidatas is None:
+        horas_candidatas = [config_escenario["horas_operacion_por_dia"]]
+
+    secuencias = crear_secuencia_semilla(semilla).spawn(n_replicas)
+    candidatos = []
+    evaluaciones = []
+    for horas in horas_candidatas:
+        config = dict(config_escenario, horas_operacion_por_dia=horas)
+        minima, evaluadas = buscar_cabinas_minimas(config, plazo_dias, secuencias, confianza, max_cabinas)
+        evaluaciones.extend(evaluadas)
+        if minima is not None:
+            candidatos.append(minima)
+
+    dentro_presupuesto = [c for c in candidatos if presupuesto is None or c["costo_promedio"] <= presupuesto]
+    mejor = min(dentro_presupuesto, key=lambda c: c["costo_promedio"]) if dentro_presupuesto else None
+    return {
+        "plazo_dias": plazo_dias,
+        "confianza": confianza,
+        "replicas": n_replicas,
+        "presupuesto": presupuesto,
+        "mejor": mejor,
+        "candidatos": candidatos,
+        "evaluaciones": evaluaciones,
+    }
+
+
+# --- Bloque para Pruebas ---
+if __name__ == '__main__':
+    import time
+
+    config_base = ConfiguracionSimulacion.obtener_configuracion_escenario("base")
+    print("Buscando la cantidad mínima de cabinas para vacunar al 100% en 60 días operativos...")
+    inicio = time.perf_counter()
+    resultado = optimizar_cabinas(config_base, plazo_dias=60, horas_candidatas=[10, 12], n_replicas=10,
+                                  confianza=0.9, semilla=2025)
+    print(f"Búsqueda completada en {time.perf_counter() - inicio:.1f} s "
+          f"({len(resultado['evaluaciones'])} configuraciones evaluadas).")
+    for candidato in resultado["candidatos"]:
+        print(f"  {candidato['horas_operacion_por_dia']} h/día: {candidato['num_cabinas']} cabinas, "
+              f"{candidato['dias_campana_promedio']:.1f} días, costo ${candidato['costo_promedio']:,.0f}")
+    if resultado["mejor"] is not None:
+        mejor = resultado["mejor"]
+        print(f"Mejor opción: {mejor['num_cabinas']} cabinas con {mejor['horas_operacion_por_dia']} h/día.")
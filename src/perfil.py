@@ -0,0 +1,161 @@
+# src/perfil.py
+
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+# Variable de entorno que activa la instrumentación sin tocar el código (mismos valores que --perfil)
+VARIABLE_ENTORNO = "VACUNACION_PERFIL"
+# "fases": tiempos y memoria por fase; "cprofile"/"pyinstrument": además un volcado de la fase de simulación
+MODOS_PERFIL = ("fases", "cprofile", "pyinstrument")
+ARCHIVO_PERF = "perf.json"
+
+
+def modo_desde_entorno() -> str:
+    """Lee el modo de perfilado de `VACUNACION_PERFIL` (None si no está definida o está vacía)."""
+    modo = os.environ.get(VARIABLE_ENTORNO, "").strip().lower()
+    if not modo or modo in ("0", "no", "false"):
+        return None
+    if modo in ("1", "si", "true"):
+        return "fases"
+    if modo not in MODOS_PERFIL:
+        raise ValueError(f"Modo de perfilado desconocido en {VARIABLE_ENTORNO}: {modo}. Opciones: {', '.join(MODOS_PERFIL)}")
+    return modo
+
+
+def contadores_motor() -> dict:
+    """Contadores que llenan los motores cuando se les pide instrumentación."""
+    return {
+        "eventos_procesados": 0,
+        "procesos_creados": 0,
+        "max_tamano_heap": 0,
+        "max_longitud_cola": 0,
+    }
+
+
+class PerfilEscenario:
+    """
+    Instrumentación por fases de un escenario: tiempo de reloj, tiempo de CPU y pico de memoria
+    de Python (tracemalloc, que también ve los arrays de NumPy) de cada fase, más los contadores
+    del motor. Desactivado, `fase` devuelve un contexto vacío y `contadores` es None, así que
+    los motores no cuentan nada.
+
+    tracemalloc encarece las asignaciones de memoria: con el perfil activo los tiempos de las
+    fases con muchos objetos chicos (el modelo SimPy) salen inflados respecto de una corrida normal.
+    """
+
+    def __init__(self, modo: str = None):
+        if modo is not None and modo not in MODOS_PERFIL:
+            raise ValueError(f"Modo de perfilado desconocido: {modo}. Opciones: {', '.join(MODOS_PERFIL)}")
+        self.modo = modo
+        self.fases = {}
+        # Fases abiertas: una fase anidada se descuenta de la que la contiene
+        self._abiertas = []
+        self.contadores = contadores_motor() if modo is not None else None
+
+    @property
+    def activo(self) -> bool:
+        return self.modo is not None
+
+    def fase(self, nombre: str):
+        """
+        Contexto que mide una fase. Si la fase se repite, los tiempos se suman; si se abre dentro
+        de otra, su tiempo se descuenta de la externa (los tiempos de las fases no se solapan).
+        """
+        if not self.activo:
+            return contextlib.nullcontext()
+        return self._medir_fase(nombre)
+
+    @contextlib.contextmanager
+    def _medir_fase(self, nombre: str):
+        inicio_tracemalloc = not tracemalloc.is_tracing()
+        if inicio_tracemalloc:
+            tracemalloc.start()
+        # reset_peak borra el pico de la fase externa: se lo guarda antes
+        self._registrar_pico_abiertas()
+        tracemalloc.reset_peak()
+        abierta = {"memoria_inicial": tracemalloc.get_traced_memory()[0], "pico": 0, "segundos_anidados": 0.0,
+                   "cpu_anidado": 0.0}
+        self._abiertas.append(abierta)
+        inicio_reloj = time.perf_counter()
+        inicio_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            segundos_cpu = time.process_time() - inicio_cpu
+            segundos = time.perf_counter() - inicio_reloj
+            self._registrar_pico_abiertas()
+            self._abiertas.pop()
+            if self._abiertas:
+                self._abiertas[-1]["segundos_anidados"] += segundos
+                self._abiertas[-1]["cpu_anidado"] += segundos_cpu
+            if inicio_tracemalloc:
+                tracemalloc.stop()
+            medicion = self.fases.setdefault(nombre, {"segundos": 0.0, "segundos_cpu": 0.0, "pico_memoria_mb": 0.0})
+            medicion["segundos"] += segundos - abierta["segundos_anidados"]
+            medicion["segundos_cpu"] += segundos_cpu - abierta["cpu_anidado"]
+            medicion["pico_memoria_mb"] = max(medicion["pico_memoria_mb"], abierta["pico"] / 1024**2)
+
+    def _registrar_pico_abiertas(self):
+        """Actualiza el pico (sobre la memoria al abrir cada una) de todas las fases abiertas."""
+        pico = tracemalloc.get_traced_memory()[1]
+        for abierta in self._abiertas:
+            abierta["pico"] = max(abierta["pico"], pico - abierta["memoria_inicial"])
+
+    @contextlib.contextmanager
+    def perfilar(self, ruta_salida: str, nombre: str):
+        """
+        Con modo "cprofile" o "pyinstrument", perfila el bloque y guarda el volcado en
+        `ruta_salida` ('<nombre>.prof' para pstats/snakeviz o '<nombre>.html'). pyinstrument es
+        opcional: si no está instalado se usa cProfile.
+        """
+        if self.modo not in ("cprofile", "pyinstrument"):
+            yield
+            return
+
+        os.makedirs(ruta_salida, exist_ok=True)
+        if self.modo == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("pyinstrument no está instalado (pip install pyinstrument): se usa cProfile.")
+            else:
+                perfilador = Profiler()
+                perfilador.start()
+                try:
+                    yield
+                finally:
+                    perfilador.stop()
+                    with open(os.path.join(ruta_salida, f"{nombre}.html"), "w") as f:
+                        f.write(perfilador.output_html())
+                return
+
+        import cProfile
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        try:
+            yield
+        finally:
+            perfilador.disable()
+            perfilador.dump_stats(os.path.join(ruta_salida, f"{nombre}.prof"))
+
+    def resumen(self) -> dict:
+        return {
+            "modo": self.modo,
+            "segundos_total": sum(f["segundos"] for f in self.fases.values()),
+            "fases": self.fases,
+            "contadores_motor": self.contadores,
+        }
+
+    def guardar(self, ruta_escenario: str) -> str:
+        """Escribe 'perf.json' en la carpeta del escenario (junto a 'metricas.json')."""
+        ruta = os.path.join(ruta_escenario, ARCHIVO_PERF)
+        with open(ruta, "w") as f:
+            json.dump(self.resumen(), f, indent=4, default=str)
+        return ruta
+
+
+# Instancia desactivada que usan por defecto las funciones que aceptan un perfil
+PERFIL_INACTIVO = PerfilEscenario()
@@ -0,0 +1,192 @@
+# src/recosteo.py
+
+import json
+import os
+import numpy as np
+from src.config import ConfiguracionSimulacion
+from src.cache import RUTA_CACHE, ARCHIVO_META, ARCHIVO_METRICAS
+
+# Estadísticas suficientes de una corrida para su costo: cada partida de `COSTOS` es un precio por
+# una de ellas. El orden de las columnas es el de las matrices de `recostear`.
+ESTADISTICAS_COSTO = ("total_vacunados", "total_reprogramados", "cabinas_dia", "minutos_espera_total")
+# Precio de `COSTOS` que multiplica a cada estadística (mismo orden)
+PRECIOS_COSTO = ("costo_por_dosis", "costo_por_reprogramacion", "costo_fijo_por_cabina_por_dia",
+                 "costo_por_minuto_espera_por_persona")
+
+
+def calcular_estadisticas_costo(config_escenario: dict, duracion_dias: int, total_vacunados: int,
+                                total_reprogramados: int, espera_promedio: float,
+                                espera_total_reprogramados: float = 0.0) -> dict:
+    """
+    Estadísticas suficientes de una corrida para recalcular su costo con cualquier `COSTOS`.
+    La espera total es la de todos los que hicieron cola: la de los vacunados (la media por la
+    cantidad: es exacta) más la de los reprogramados, que con la política "reprogramar" esperaron
+    hasta el cierre.
+    """
+    return {
+        "total_vacunados": int(total_vacunados),
+        "total_reprogramados": int(total_reprogramados),
+        "cabinas_dia": int(config_escenario["num_cabinas"] * duracion_dias),
+        "minutos_espera_total": float(espera_promedio * total_vacunados + espera_total_reprogramados),
+    }
+
+
+def costos_desde_estadisticas(estadisticas: dict, costos: dict = None) -> dict:
+    """
+    Sección "costos" de las métricas a partir de las estadísticas suficientes. El costo total de
+    la campaña es el operativo (cabinas, dosis y reprogramaciones); la espera de las personas se
+    valora aparte en "costo_total_espera" y se suma en "costo_total_con_espera".
+    """
+    costos = ConfiguracionSimulacion.COSTOS if costos is None else costos
+    cabinas_dia = estadisticas["cabinas_dia"]
+    total_vacunados = estadisticas["total_vacunados"]
+    costo_fijo_total = costos["costo_fijo_por_cabina_por_dia"] * cabinas_dia
+    costo_total_dosis = costos["costo_por_dosis"] * total_vacunados
+    costo_total_reprogramaciones = costos["costo_por_reprogramacion"] * estadisticas["total_reprogramados"]
+    costo_total_espera = costos["costo_por_minuto_espera_por_persona"] * estadisticas["minutos_espera_total"]
+
+    costo_total_campana = costo_fijo_total + costo_total_dosis + costo_total_reprogramaciones
+    return {
+        "costo_total_campana": float(costo_total_campana),
+        "costo_fijo_total": float(costo_fijo_total),
+        "costo_total_dosis": float(costo_total_dosis),
+        "costo_total_reprogramaciones": float(costo_total_reprogramaciones),
+        "costo_total_espera": float(costo_total_espera),
+        "costo_total_con_espera": float(costo_total_campana + costo_total_espera),
+    }
+
+
+def estadisticas_desde_metricas(metricas: dict, config_escenario: dict = None, duracion_dias: int = None) -> dict:
+    """
+    Estadísticas suficientes guardadas en unas métricas. Las métricas anteriores a la sección
+    "estadisticas_costo" se reconstruyen con los conteos, la espera promedio y, para los
+    cabina-día, la configuración y la duración de la corrida. Esas métricas no guardan la espera
+    de los reprogramados: la reconstrucción solo cuenta la de los vacunados.
+    """
+    if "estadisticas_costo" in metricas:
+        return metricas["estadisticas_costo"]
+    if config_escenario is None or duracion_dias is None:
+        raise ValueError("Las métricas no tienen 'estadisticas_costo': hacen falta la configuración y la duración.")
+    generales = metricas["generales"]
+    return calcular_estadisticas_costo(config_escenario, duracion_dias, generales["total_vacunados"],
+                                       generales["total_reprogramados"], metricas["tiempos_espera_minutos"]["promedio"])
+
+
+def cargar_estadisticas_cache(ruta_cache: str = RUTA_CACHE) -> dict:
+    """
+    Estadísticas suficientes de todas las corridas de la caché de resultados (ver src/cache.py),
+    por clave. Cada una lleva la configuración, la duración, la semilla y el motor de su corrida.
+    """
+    corridas = {}
+    if not os.path.isdir(ruta_cache):
+        return corridas
+    for carpeta in sorted(os.scandir(ruta_cache), key=lambda entrada: entrada.name):
+        try:
+            with open(os.path.join(carpeta.path, ARCHIVO_META)) as f:
+                meta = json.load(f)
+            with open(os.path.join(carpeta.path, ARCHIVO_METRICAS)) as f:
+                metricas = json.load(f)
+        except (OSError, ValueError):
+            continue
+        corridas[carpeta.name] = {
+            "config": meta["config"],
+            "duracion_dias": meta["duracion_dias"],
+            "semilla": meta.get("semilla"),
+            "motor": meta.get("motor"),
+            "estadisticas": estadisticas_desde_metricas(metricas, meta["config"], meta["duracion_dias"]),
+        }
+    return corridas
+
+
+def matriz_estadisticas(estadisticas_por_escenario: dict) -> tuple:
+    """
+    Apila las estadísticas suficientes de los escenarios en una matriz (escenarios x
+    `ESTADISTICAS_COSTO`). Devuelve (nombres, matriz).
+    """
+    nombres = list(estadisticas_por_escenario)
+    matriz = np.array([[estadisticas_por_escenario[nombre][clave] for clave in ESTADISTICAS_COSTO]
+                       for nombre in nombres], dtype=np.float64).reshape(len(nombres), len(ESTADISTICAS_COSTO))
+    return nombres, matriz
+
+
+def matriz_precios(variantes, costos_base: dict = None) -> np.ndarray:
+    """
+    Matriz de precios (variantes x `PRECIOS_COSTO`) a partir de columnas: `variantes` es un
+    diccionario (o un DataFrame) de precio -> valores, todos del mismo largo. Los precios que no
+    están toman el valor de `costos_base` (por defecto, `COSTOS`).
+    """
+    costos_base = ConfiguracionSimulacion.COSTOS if costos_base is None else costos_base
+    columnas = {precio: np.asarray(variantes[precio], dtype=np.float64) for precio in PRECIOS_COSTO
+                if precio in variantes}
+    desconocidos = [precio for precio in variantes if precio not in PRECIOS_COSTO]
+    if desconocidos:
+        raise ValueError(f"Precios que no dependen de la simulación o desconocidos: {', '.join(map(str, desconocidos))}")
+    largos = {len(valores) for valores in columnas.values()}
+    if len(largos) > 1:
+        raise ValueError("Todas las columnas de precios deben tener el mismo largo.")
+    cantidad = largos.pop() if largos else 1
+    return np.column_stack([columnas.get(precio, np.full(cantidad, float(costos_base[precio])))
+                            for precio in PRECIOS_COSTO])
+
+
+def recostear(estadisticas: np.ndarray, precios: np.ndarray) -> dict:
+    """
+    Costos de todos los escenarios bajo todas las variantes de precios en una pasada: cada
+    partida es el producto de una estadística por su precio, así que las matrices (variantes x
+    escenarios) salen de productos externos sin volver a simular.
+
+    Args:
+        estadisticas (np.ndarray): Escenarios x `ESTADISTICAS_COSTO` (ver `matriz_estadisticas`).
+        precios (np.ndarray): Variantes x `PRECIOS_COSTO` (ver `matriz_precios`).
+
+    Returns:
+        dict: Partida -> matriz variantes x escenarios, con las mismas claves que la sección
+              "costos" de las métricas.
+    """
+    partidas = precios[:, None, :] * estadisticas[None, :, :]
+    dosis, reprogramaciones, fijo, espera = np.moveaxis(partidas, -1, 0)
+    campana = fijo + dosis + reprogramaciones
+    vacunados = estadisticas[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        por_vacunado = np.where(vacunados > 0, campana / vacunados, 0.0)
+    return {
+        "costo_total_campana": campana,
+        "costo_fijo_total": fijo,
+        "costo_total_dosis": dosis,
+        "costo_total_reprogramaciones": reprogramaciones,
+        "costo_total_espera": espera,
+        "costo_total_con_espera": campana + espera,
+        "costo_por_paciente_vacunado": por_vacunado,
+    }
+
+
+def mejor_escenario_por_variante(nombres: list, costos: dict, partida: str = "costo_total_con_espera") -> list:
+    """Para cada variante de precios, el escenario más barato según `partida` y su costo."""
+    matriz = costos[partida]
+    indices = np.argmin(matriz, axis=1)
+    return [(nombres[indice], float(matriz[variante, indice])) for variante, indice in enumerate(indices)]
+
+
+def tabla_recosteo(corridas: dict, variantes, partidas: tuple = ("costo_total_campana", "costo_total_espera",
+                                                                  "costo_total_con_espera")):
+    """
+    Recostea las corridas de `cargar_estadisticas_cache` con las variantes de precios y arma una
+    tabla larga (una fila por variante y corrida) con los parámetros principales de cada corrida,
+    los precios de la variante y las `partidas` pedidas.
+    """
+    import pandas as pd
+
+    nombres, estadisticas = matriz_estadisticas({clave: corrida["estadisticas"] for clave, corrida in corridas.items()})
+    precios = matriz_precios(variantes)
+    costos = recostear(estadisticas, precios)
+    num_variantes, num_corridas = len(precios), len(nombres)
+    tabla = pd.DataFrame({"variante": np.repeat(np.arange(num_variantes), num_corridas),
+                          "clave": np.tile(nombres, num_variantes)})
+    for parametro in ("num_cabinas", "horas_operacion_por_dia", "tasa_asistencia"):
+        tabla[parametro] = np.tile([corridas[clave]["config"].get(parametro) for clave in nombres], num_variantes)
+    tabla["duracion_dias"] = np.tile([corridas[clave]["duracion_dias"] for clave in nombres], num_variantes)
+    for columna, precio in enumerate(PRECIOS_COSTO):
+        tabla[precio] = np.repeat(precios[:, columna], num_corridas)
+    for partida in partidas:
+        tabla[partida] = costos[partida].ravel()
+    return tabla
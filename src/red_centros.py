@@ -0,0 +1,175 @@
+# src/red_centros.py
+
+import multiprocessing
+import numpy as np
+from src.simulation import ejecutar_simulacion, crear_secuencia_semilla
+from src.analysis import calcular_metricas_desde_acumuladores
+from src.acumuladores import AcumuladorMetricas, EstadisticasTiempo, HITOS_VACUNACION
+from src.calendario_dosis import dosis_por_esquema
+
+# Población que atiende cada cabina en las redes sintéticas (la del escenario base: 198.000 / 5)
+POBLACION_POR_CABINA = 40_000
+
+
+def configuraciones_centros(config_red: dict) -> dict:
+    """
+    Arma la configuración completa de cada centro de una red: los parámetros comunes con lo que
+    cada centro redefine encima (cabinas, horario, población, etc.).
+
+    Args:
+        config_red (dict): {"parametros_comunes": dict, "centros": [dict con "nombre", ...]}.
+
+    Returns:
+        dict: Nombre del centro -> diccionario de configuración, en el orden de la red.
+    """
+    comunes = config_red.get("parametros_comunes", {})
+    configs = {}
+    for centro in config_red["centros"]:
+        nombre = centro["nombre"]
+        if nombre in configs:
+            raise ValueError(f"Centro repetido en la red: {nombre}")
+        configs[nombre] = {**comunes, **{clave: valor for clave, valor in centro.items() if clave != "nombre"}}
+    return configs
+
+
+def crear_red_sintetica(num_centros: int, poblacion_total: int, semilla: int = 0,
+                        poblacion_por_cabina: int = POBLACION_POR_CABINA) -> dict:
+    """
+    Red de prueba con `num_centros` centros que se reparten `poblacion_total` con tamaños
+    log-normales (pocos centros grandes y muchos chicos) y una cabina cada `poblacion_por_cabina`
+    personas. La usa el benchmark de redes.
+    """
+    from src.config import ConfiguracionSimulacion
+
+    rng = np.random.default_rng(semilla)
+    pesos = rng.lognormal(sigma=1.0, size=num_centros)
+    poblaciones = np.floor(pesos / pesos.sum() * poblacion_total).astype(np.int64)
+    poblaciones[np.argmax(poblaciones)] += poblacion_total - poblaciones.sum()
+    return {
+        "parametros_comunes": ConfiguracionSimulacion.ESCENARIO_BASE,
+        "centros": [
+            {"nombre": f"centro_{i:03d}", "poblacion_total": int(poblacion),
+             "num_cabinas": max(1, round(int(poblacion) / poblacion_por_cabina))}
+            for i, poblacion in enumerate(poblaciones)
+        ],
+    }
+
+
+def _simular_centro(tarea: tuple) -> tuple:
+    """
+    Simula un centro en un proceso del pool en modo "solo_metricas" y devuelve sus métricas y su
+    acumulador (memoria O(días)), que es lo que se fusiona para la red.
+    """
+    nombre, config_centro, duracion_dias, secuencia, motor = tarea
+    acumulador = ejecutar_simulacion(config_centro, duracion_dias, motor=motor, semilla=secuencia, modo="solo_metricas")
+    metricas = calcular_metricas_desde_acumuladores(acumulador, config_centro, duracion_dias)
+    return nombre, acumulador, metricas
+
+
+def _tiempos_hitos_por_dia(vacunados_por_dia: dict, poblacion_total: int, minutos_por_dia: float) -> dict:
+    """
+    Instante de cada hito con resolución de un día: el fin del primer día en que el acumulado de
+    vacunados lo alcanza (los centros no comparten reloj dentro del día).
+    """
+    dias = np.array(sorted(vacunados_por_dia), dtype=np.int64)
+    acumulados = np.cumsum([vacunados_por_dia[dia] for dia in dias.tolist()])
+    tiempos = {}
+    for nombre, porcentaje in HITOS_VACUNACION.items():
+        posicion = int(np.searchsorted(acumulados, max(int(poblacion_total * porcentaje), 1)))
+        tiempos[nombre] = float((dias[posicion] + 1) * minutos_por_dia) if posicion < len(dias) else None
+    return tiempos
+
+
+def agregar_red(acumuladores: dict, configs_centros: dict, duracion_dias: int) -> dict:
+    """
+    Métricas de la red completa a partir de los acumuladores de sus centros: conteos, esperas y
+    costos sumados como si fuera un solo centro con todas las cabinas y toda la población; la
+    cola y la utilización como sistemas simultáneos (ver EstadisticasTiempo.fusionar_simultaneos).
+    Los hitos salen del acumulado diario de la red, con resolución de un día.
+    """
+    configs = [configs_centros[nombre] for nombre in acumuladores]
+    horas_operacion = max(config["horas_operacion_por_dia"] for config in configs)
+    config_red = dict(configs[0])
+    config_red["num_cabinas"] = sum(config["num_cabinas"] for config in configs)
+    config_red["poblacion_total"] = sum(config["poblacion_total"] for config in configs)
+    config_red["horas_operacion_por_dia"] = horas_operacion
+    # Tiempo de servicio y asistencia de la red: promedio de los centros ponderado por población
+    for clave in ("tiempo_promedio_vacunacion_minutos", "tasa_asistencia"):
+        config_red[clave] = sum(config[clave] * config["poblacion_total"] for config in configs) / config_red["poblacion_total"]
+
+    acumulador_red = AcumuladorMetricas(config_red["poblacion_total"], horas_operacion * 60, dosis_por_esquema(config_red))
+    sistemas = []
+    for nombre, acumulador in acumuladores.items():
+        acumulador_red.fusionar(acumulador)
+        if acumulador.estadisticas_tiempo is not None:
+            sistemas.append((acumulador.estadisticas_tiempo, configs_centros[nombre]["horas_operacion_por_dia"] * 60))
+    if sistemas:
+        acumulador_red.estadisticas_tiempo = EstadisticasTiempo.fusionar_simultaneos(sistemas, horas_operacion * 60)
+    acumulador_red.hitos.tiempos = _tiempos_hitos_por_dia(acumulador_red.vacunados_por_dia, config_red["poblacion_total"],
+                                                          horas_operacion * 60)
+
+    metricas = calcular_metricas_desde_acumuladores(acumulador_red, config_red, duracion_dias)
+    metricas["parametros_escenario"]["num_centros"] = len(acumuladores)
+    metricas["parametros_escenario"]["poblacion_total"] = config_red["poblacion_total"]
+    return metricas
+
+
+def ejecutar_red(config_red: dict, duracion_dias: int, semilla: int, motor: str = "vectorizado",
+                 procesos: int = None) -> dict:
+    """
+    Simula cada centro de una red en su propio proceso y fusiona los resultados.
+
+    Los centros se lanzan del más poblado al menos poblado, así el último en terminar es uno
+    chico y los núcleos quedan ocupados hasta el final. Cada proceso devuelve solo métricas y
+    acumuladores, nunca eventos. El centro `i` (en el orden de la red) usa el flujo
+    `SeedSequence(semilla).spawn(n)[i]`: el resultado no depende de la cantidad de procesos.
+
+    Args:
+        config_red (dict): Red de centros (ver `configuraciones_centros`).
+        duracion_dias (int): Días máximos a simular en cada centro.
+        semilla (int): Semilla raíz de los flujos aleatorios.
+        motor (str): Motor de simulación ("simpy" o "vectorizado").
+        procesos (int): Procesos del pool. Por defecto, todos los núcleos disponibles.
+
+    Returns:
+        dict: {"centros": nombre -> métricas del centro, "red": métricas agregadas, "semilla", "motor"}.
+    """
+    configs = configuraciones_centros(config_red)
+    if not configs:
+        raise ValueError("La red no tiene centros.")
+    secuencias = crear_secuencia_semilla(semilla).spawn(len(configs))
+    tareas = [(nombre, config, duracion_dias, secuencias[i], motor) for i, (nombre, config) in enumerate(configs.items())]
+    tareas.sort(key=lambda tarea: tarea[1]["poblacion_total"], reverse=True)
+    procesos = procesos or multiprocessing.cpu_count()
+    procesos = max(1, min(procesos, len(tareas)))
+
+    acumuladores = {}
+    metricas_centros = {}
+    if procesos == 1:
+        resultados = map(_simular_centro, tareas)
+        for nombre, acumulador, metricas in resultados:
+            acumuladores[nombre], metricas_centros[nombre] = acumulador, metricas
+    else:
+        with multiprocessing.Pool(processes=procesos) as pool:
+            for nombre, acumulador, metricas in pool.imap_unordered(_simular_centro, tareas):
+                acumuladores[nombre], metricas_centros[nombre] = acumulador, metricas
+
+    # Fusionar siempre en el orden de la red: la suma en punto flotante da lo mismo en cada corrida
+    acumuladores = {nombre: acumuladores[nombre] for nombre in configs}
+    return {
+        "semilla": semilla,
+        "motor": motor,
+        "centros": {nombre: metricas_centros[nombre] for nombre in configs},
+        "red": agregar_red(acumuladores, configs, duracion_dias),
+    }
+
+
+# --- Bloque para Pruebas ---
+if __name__ == '__main__':
+    from src.config import ConfiguracionSimulacion
+    import json
+
+    red = ConfiguracionSimulacion.obtener_configuracion_red("provincial")
+    print(f"Ejecutando la red 'provincial' ({len(red['centros'])} centros, duración: 5 días)...")
+    resultado = ejecutar_red(red, duracion_dias=5, semilla=2025)
+    print(json.dumps(resultado["red"]["generales"], indent=4))
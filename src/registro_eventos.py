@@ -0,0 +1,121 @@
+# src/registro_eventos.py
+
+import numpy as np
+import pandas as pd
+
+# Códigos de evento: se guarda un uint8 por evento y la etiqueta se deriva al armar el DataFrame
+EVENTO_VACUNADO = 0
+EVENTO_REPROGRAMACION = 1
+ETIQUETAS_EVENTO = ("Vacunado", "Reprogramacion")
+
+# Una fila del registro ocupa 35 bytes, frente a cientos de bytes de una tupla con strings
+TIPO_EVENTO = np.dtype([
+    ("tiempo_simulacion", np.float64),
+    ("dia", np.int32),
+    ("paciente", np.int32),
+    ("digito_dni", np.int8),
+    ("evento", np.uint8),
+    # Número de dosis del paciente (1 o 2; siempre 1 sin esquema de dos dosis)
+    ("dosis", np.uint8),
+    ("longitud_cola_actual", np.int32),
+    ("tiempo_espera_minutos", np.float32),
+    ("tiempo_en_sistema_minutos", np.float32),
+])
+COLUMNAS_EVENTOS = list(TIPO_EVENTO.names)
+# Columnas que pueden faltar en un bloque de eventos y su valor implícito
+_VALORES_IMPLICITOS = {"dosis": 1}
+
+
+class RegistroEventos:
+    """
+    Registro de eventos columnar: bloques preasignados de un array estructurado. Cuando un
+    bloque se llena se reserva otro, así crecer nunca copia los eventos ya registrados.
+    Reemplaza a la lista de tuplas con el ID del paciente como string.
+    """
+
+    def __init__(self, filas_por_bloque: int = 65536):
+        self.filas_por_bloque = max(1, filas_por_bloque)
+        self._bloques = [np.empty(self.filas_por_bloque, dtype=TIPO_EVENTO)]
+        # Filas ocupadas en el último bloque; los anteriores están llenos
+        self._ocupadas = 0
+        self._tamano = 0
+        # Integrales en el tiempo de la cola y la ocupación; las asigna el motor al terminar
+        self.estadisticas_tiempo = None
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    def _nuevo_bloque(self, filas_minimas: int = 0):
+        self._bloques[-1] = self._bloques[-1][:self._ocupadas]
+        self._bloques.append(np.empty(max(self.filas_por_bloque, filas_minimas), dtype=TIPO_EVENTO))
+        self._ocupadas = 0
+
+    def agregar(self, tiempo, dia, paciente, digito_dni, evento, longitud_cola, tiempo_espera, tiempo_sistema, dosis=1):
+        """Agrega un evento individual (usado por el modelo SimPy)."""
+        bloque = self._bloques[-1]
+        if self._ocupadas == len(bloque):
+            self._nuevo_bloque()
+            bloque = self._bloques[-1]
+        bloque[self._ocupadas] = (tiempo, dia, paciente, digito_dni, evento, dosis, longitud_cola, tiempo_espera, tiempo_sistema)
+        self._ocupadas += 1
+        self._tamano += 1
+
+    def extender(self, columnas: dict):
+        """
+        Agrega un bloque de eventos dado como diccionario de columnas (usado por el motor
+        vectorizado). Sin la columna `dosis` se asume primera dosis.
+        """
+        cantidad = len(columnas["tiempo_simulacion"])
+        if cantidad == 0:
+            return
+        if self._ocupadas + cantidad > len(self._bloques[-1]):
+            self._nuevo_bloque(cantidad)
+        destino = self._bloques[-1][self._ocupadas:self._ocupadas + cantidad]
+        for columna in COLUMNAS_EVENTOS:
+            destino[columna] = columnas[columna] if columna in columnas else _VALORES_IMPLICITOS[columna]
+        self._ocupadas += cantidad
+        self._tamano += cantidad
+
+    def _bloques_ocupados(self) -> list:
+        return self._bloques[:-1] + [self._bloques[-1][:self._ocupadas]]
+
+    def columna(self, nombre: str) -> np.ndarray:
+        """Devuelve una columna como array contiguo."""
+        return np.concatenate([bloque[nombre] for bloque in self._bloques_ocupados()])
+
+    def como_array(self) -> np.ndarray:
+        """Array estructurado contiguo con todos los eventos registrados."""
+        return np.concatenate(self._bloques_ocupados())
+
+    def a_dataframe(self) -> pd.DataFrame:
+        """
+        Arma el DataFrame de resultados con tipos compactos. `evento` es categórica y el ID
+        del paciente no se materializa: ver `agregar_ids_paciente`.
+        """
+        columnas = {nombre: self.columna(nombre) for nombre in COLUMNAS_EVENTOS}
+        columnas["evento"] = pd.Categorical.from_codes(columnas["evento"].astype(np.int8), categories=list(ETIQUETAS_EVENTO))
+        return pd.DataFrame(columnas, columns=COLUMNAS_EVENTOS, copy=False)
+
+
+def construir_ids_paciente(resultados_df: pd.DataFrame) -> pd.Series:
+    """Deriva los IDs legibles 'Dia{dia}_Digito{d}_Pac{i}' a partir de las columnas compactas."""
+    ids = [
+        f"Dia{dia}_Digito{digito}_Pac{paciente}"
+        for dia, digito, paciente in zip(
+            resultados_df["dia"].tolist(), resultados_df["digito_dni"].tolist(), resultados_df["paciente"].tolist()
+        )
+    ]
+    return pd.Series(ids, index=resultados_df.index, name="paciente_id")
+
+
+def agregar_ids_paciente(resultados_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Devuelve una copia del DataFrame con la columna `paciente_id` en lugar del ordinal
+    `paciente`, con el mismo esquema que el registro original (usado al exportar a CSV).
+    """
+    if "paciente" not in resultados_df.columns or "paciente_id" in resultados_df.columns:
+        return resultados_df
+    exportado = resultados_df.copy()
+    posicion = exportado.columns.get_loc("paciente")
+    exportado.insert(posicion, "paciente_id", construir_ids_paciente(exportado))
+    return exportado.drop(columns="paciente")
@@ -0,0 +1,346 @@
+# src/replicas.py
+
+import math
+import multiprocessing
+import numpy as np
+from src.simulation import ejecutar_simulacion, crear_secuencia_semilla
+from src.analysis import calcular_metricas_desde_acumuladores
+from src.cierre_diario import secuencia_del_dia
+
+# Valores críticos de la t de Student para un intervalo de confianza bilateral del 95%,
+# indexados por grados de libertad (1 a 30).
+_T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+_Z_975 = 1.959964
+
+# Métricas que deciden cuándo cortar las réplicas adaptativas (claves de `aplanar_metricas`)
+METRICAS_OBJETIVO = (
+    "hitos_vacunacion.100_porciento.dias",
+    "tiempos_espera_minutos.promedio",
+    "costos.costo_total_campana",
+)
+
+
+def valor_critico_t_95(grados_libertad: int) -> float:
+    """
+    Devuelve el cuantil 0.975 de la t de Student. Hasta 30 grados de libertad se usa la tabla;
+    por encima, la expansión de Cornish-Fisher alrededor de la normal (error < 1e-4).
+    """
+    if grados_libertad < 1:
+        return float("nan")
+    if grados_libertad <= len(_T_95):
+        return _T_95[grados_libertad - 1]
+    z = _Z_975
+    g = grados_libertad
+    return z + (z**3 + z) / (4 * g) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * g**2)
+
+
+def aplanar_metricas(metricas: dict, prefijo: str = "") -> dict:
+    """
+    Convierte el diccionario anidado de `calcular_metricas_principales` en un diccionario plano
+    con claves separadas por puntos (ej. 'costos.costo_total_campana'). Solo conserva valores
+    numéricos: los hitos "No alcanzado" no entran en el resumen.
+    """
+    planas = {}
+    for clave, valor in metricas.items():
+        nombre = f"{prefijo}{clave}"
+        if isinstance(valor, dict):
+            planas.update(aplanar_metricas(valor, f"{nombre}."))
+        elif isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, bool):
+            planas[nombre] = float(valor)
+    return planas
+
+
+def resumir_replicas(metricas_replicas: list) -> dict:
+    """
+    Calcula media, desviación estándar e intervalo de confianza del 95% para cada métrica
+    numérica de una lista de diccionarios de métricas (uno por réplica).
+    """
+    valores_por_metrica = {}
+    for metricas in metricas_replicas:
+        for clave, valor in aplanar_metricas(metricas).items():
+            valores_por_metrica.setdefault(clave, []).append(valor)
+
+    return {clave: _resumir_valores(valores) for clave, valores in valores_por_metrica.items()}
+
+
+def _resumir_valores(valores: list) -> dict:
+    """Media, desviación estándar e IC del 95% (t de Student) de una lista de valores."""
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    media = float(valores.mean())
+    desviacion = float(valores.std(ddof=1)) if n > 1 else 0.0
+    semiamplitud = valor_critico_t_95(n - 1) * desviacion / math.sqrt(n) if n > 1 else float("nan")
+    return {
+        "media": media,
+        "desviacion_estandar": desviacion,
+        "ic95_inferior": media - semiamplitud,
+        "ic95_superior": media + semiamplitud,
+        "n": n,
+    }
+
+
+def _ejecutar_replica(tarea: tuple) -> tuple:
+    """
+    Ejecuta una réplica en un proceso del pool y devuelve solo sus métricas. Las réplicas no
+    necesitan los eventos, así que corren en modo "solo_metricas".
+    """
+    clave, indice, config_escenario, duracion_dias, secuencia, motor = tarea
+    acumulador = ejecutar_simulacion(config_escenario, duracion_dias, motor=motor, semilla=secuencia, modo="solo_metricas")
+    metricas = calcular_metricas_desde_acumuladores(acumulador, config_escenario, duracion_dias)
+    return clave, indice, metricas
+
+
+def _metricas_por_replica(configs_escenarios: dict, duracion_dias: int, n: int, semilla: int, motor: str,
+                          procesos: int = None) -> dict:
+    """
+    Ejecuta `n` réplicas de cada escenario en un único pool y devuelve, por escenario, la lista
+    de métricas de cada réplica en orden de réplica. La réplica `i` de todos los escenarios usa el
+    flujo `SeedSequence(semilla).spawn(n)[i]`.
+    """
+    if n < 1:
+        raise ValueError("El número de réplicas debe ser al menos 1.")
+
+    secuencias = crear_secuencia_semilla(semilla).spawn(n)
+    tareas = [
+        (nombre, i, dict(config), duracion_dias, secuencias[i], motor)
+        for nombre, config in configs_escenarios.items()
+        for i in range(n)
+    ]
+    procesos = procesos or multiprocessing.cpu_count()
+    procesos = max(1, min(procesos, len(tareas)))
+
+    metricas_por_escenario = {nombre: [None] * n for nombre in configs_escenarios}
+    if procesos == 1:
+        resultados = map(_ejecutar_replica, tareas)
+        for nombre, i, metricas in resultados:
+            metricas_por_escenario[nombre][i] = metricas
+    else:
+        with multiprocessing.Pool(processes=procesos) as pool:
+            for nombre, i, metricas in pool.imap_unordered(_ejecutar_replica, tareas):
+                metricas_por_escenario[nombre][i] = metricas
+    return metricas_por_escenario
+
+
+def ejecutar_replicas_escenarios(configs_escenarios: dict, duracion_dias: int, n: int, semilla: int,
+                                 motor: str = "vectorizado", procesos: int = None) -> dict:
+    """
+    Ejecuta `n` réplicas independientes de varios escenarios en un único pool de procesos.
+
+    Todas las tareas (escenario, réplica) se reparten juntas, así que 30 réplicas de 8 escenarios
+    ocupan todos los núcleos hasta el final. La réplica `i` de cada escenario usa el flujo
+    `SeedSequence(semilla).spawn(n)[i]`, por lo que los resultados son reproducibles.
+
+    Args:
+        configs_escenarios (dict): Nombre del escenario -> diccionario de configuración.
+        duracion_dias (int): Días máximos a simular en cada réplica.
+        n (int): Número de réplicas por escenario.
+        semilla (int): Semilla raíz de los flujos aleatorios.
+        motor (str): Motor de simulación ("simpy" o "vectorizado").
+        procesos (int): Procesos del pool. Por defecto, todos los núcleos disponibles.
+
+    Returns:
+        dict: Nombre del escenario -> resumen con las réplicas y las métricas agregadas.
+    """
+    metricas_por_escenario = _metricas_por_replica(configs_escenarios, duracion_dias, n, semilla, motor, procesos)
+    return {
+        nombre: {
+            "replicas": n,
+            "semilla": semilla,
+            "motor": motor,
+            "metricas": resumir_replicas(metricas),
+        }
+        for nombre, metricas in metricas_por_escenario.items()
+    }
+
+
+def resumir_diferencias_pareadas(metricas_escenario: list, metricas_referencia: list) -> dict:
+    """
+    Para cada métrica numérica, media, desviación e IC del 95% de la diferencia réplica a réplica
+    (escenario menos referencia). Solo entran las réplicas en que la métrica existe en los dos
+    (un hito "No alcanzado" no tiene días).
+    """
+    diferencias = {}
+    for metricas, referencia in zip(metricas_escenario, metricas_referencia):
+        planas_referencia = aplanar_metricas(referencia)
+        for clave, valor in aplanar_metricas(metricas).items():
+            if clave in planas_referencia:
+                diferencias.setdefault(clave, []).append(valor - planas_referencia[clave])
+    return {clave: _resumir_valores(valores) for clave, valores in diferencias.items()}
+
+
+def comparar_escenarios_pareados(configs_escenarios: dict, duracion_dias: int, n: int, semilla: int,
+                                 referencia: str = None, motor: str = "vectorizado", procesos: int = None) -> dict:
+    """
+    Compara escenarios con números aleatorios comunes: la réplica `i` de todos los escenarios
+    usa la misma semilla y, con los flujos por propósito (ver src/numeros_comunes.py), los mismos
+    pacientes. La diferencia con la referencia se mide réplica a réplica, así el ruido común se
+    cancela y el IC de la diferencia es mucho más angosto que el de cada escenario por separado.
+
+    Args:
+        configs_escenarios (dict): Nombre del escenario -> diccionario de configuración.
+        duracion_dias (int): Días máximos a simular en cada réplica.
+        n (int): Número de réplicas por escenario (al menos 2 para tener IC).
+        semilla (int): Semilla raíz de los flujos aleatorios.
+        referencia (str): Escenario contra el que se comparan los demás (por defecto, el primero).
+        motor (str): Motor de simulación ("simpy" o "vectorizado").
+        procesos (int): Procesos del pool. Por defecto, todos los núcleos disponibles.
+
+    Returns:
+        dict: {"referencia", "replicas", "semilla", "motor", "escenarios": nombre -> métricas
+              resumidas, "diferencias": nombre -> métrica -> resumen de la diferencia pareada}.
+    """
+    referencia = referencia if referencia is not None else next(iter(configs_escenarios))
+    if referencia not in configs_escenarios:
+        raise ValueError(f"El escenario de referencia no está entre los comparados: {referencia}")
+    configs = {nombre: {**config, "numeros_aleatorios_comunes": True} for nombre, config in configs_escenarios.items()}
+    metricas_por_escenario = _metricas_por_replica(configs, duracion_dias, n, semilla, motor, procesos)
+    return {
+        "referencia": referencia,
+        "replicas": n,
+        "semilla": semilla,
+        "motor": motor,
+        "escenarios": {nombre: resumir_replicas(metricas) for nombre, metricas in metricas_por_escenario.items()},
+        "diferencias": {
+            nombre: resumir_diferencias_pareadas(metricas, metricas_por_escenario[referencia])
+            for nombre, metricas in metricas_por_escenario.items() if nombre != referencia
+        },
+    }
+
+
+def _promediar_metricas(metricas_a: dict, metricas_b: dict) -> dict:
+    """Promedio de las métricas numéricas de un par antitético (solo las que tienen los dos)."""
+    planas_b = aplanar_metricas(metricas_b)
+    return {clave: (valor + planas_b[clave]) / 2 for clave, valor in aplanar_metricas(metricas_a).items()
+            if clave in planas_b}
+
+
+def _precision_relativa(resumen: dict) -> float:
+    """Semiamplitud del IC 95% relativa a la media (infinita sin IC o con media 0)."""
+    semiamplitud = resumen["ic95_superior"] - resumen["media"]
+    if resumen["n"] < 2 or resumen["media"] == 0 or math.isnan(semiamplitud):
+        return float("inf")
+    return semiamplitud / abs(resumen["media"])
+
+
+def ejecutar_replicas_adaptativas(config: dict, duracion_dias: int, semilla: int, precision_relativa: float = 0.02,
+                                  metricas_objetivo: tuple = METRICAS_OBJETIVO, replicas_por_lote: int = None,
+                                  min_replicas: int = 4, max_replicas: int = 200, antiteticas: bool = False,
+                                  motor: str = "vectorizado", procesos: int = None) -> dict:
+    """
+    Ejecuta réplicas de un escenario de a lotes hasta que el IC del 95% de cada métrica objetivo
+    tenga una semiamplitud relativa a la media de a lo sumo `precision_relativa`, o hasta
+    `max_replicas` corridas. Después de cada lote se actualizan las estimaciones: un escenario
+    poco ruidoso termina con pocas réplicas y el cómputo va a los que lo necesitan.
+
+    Cada observación es una réplica o, con `antiteticas`, el promedio de un par: la corrida
+    normal y la antitética de la misma semilla (ver numeros_comunes.variables_antiteticas), que
+    están correlacionadas negativamente. La observación `i` usa el flujo `SeedSequence(semilla)`
+    hijo `i`, igual que la réplica `i` de `ejecutar_replicas`. Todas las métricas objetivo tienen
+    que estar en todas las observaciones para cortar: un hito que no se alcanza en alguna réplica
+    es un dato censurado (su media sale solo de las que terminaron antes) y la corrida no converge.
+    Esas métricas quedan en "metricas_censuradas" (cuántas observaciones no tienen valor) o, si
+    no están en ninguna, en "metricas_sin_datos".
+
+    Args:
+        config (dict): Configuración del escenario.
+        duracion_dias (int): Días máximos a simular en cada réplica.
+        semilla (int): Semilla raíz de los flujos aleatorios.
+        precision_relativa (float): Semiamplitud relativa del IC 95% buscada (0.02 = ±2%).
+        metricas_objetivo (tuple): Claves aplanadas de las métricas que deciden el corte.
+        replicas_por_lote (int): Corridas por lote. Por defecto, una por proceso (al menos 2).
+        min_replicas (int): Observaciones mínimas antes de confiar en el IC.
+        max_replicas (int): Presupuesto máximo de corridas (un par antitético son dos).
+        antiteticas (bool): Usar pares de variables antitéticas.
+        motor (str): Motor de simulación ("simpy" o "vectorizado").
+        procesos (int): Procesos del pool. Por defecto, todos los núcleos disponibles.
+
+    Returns:
+        dict: Resumen de las métricas (como `ejecutar_replicas`) más "convergio", "corridas",
+              "observaciones", "lotes", la precisión alcanzada por métrica objetivo (infinita si
+              falta en alguna observación) y las métricas censuradas o sin datos.
+    """
+    if precision_relativa <= 0:
+        raise ValueError("La precisión relativa buscada debe ser positiva.")
+    raiz = crear_secuencia_semilla(semilla)
+    procesos = max(1, procesos or multiprocessing.cpu_count())
+    corridas_por_observacion = 2 if antiteticas else 1
+    replicas_por_lote = max(replicas_por_lote or procesos, corridas_por_observacion, 2)
+    observaciones_por_lote = replicas_por_lote // corridas_por_observacion
+    max_observaciones = max(max_replicas // corridas_por_observacion, 1)
+    # Los dos lados del par usan los flujos por propósito: el antitético invierte cada uniforme del normal
+    configs = ([{**config, "numeros_aleatorios_comunes": True}, {**config, "variables_antiteticas": True}]
+               if antiteticas else [dict(config)])
+
+    observaciones = []
+    lotes = 0
+    resumen, precision = {}, {}
+    convergio = False
+    pool = multiprocessing.Pool(processes=procesos) if procesos > 1 else None
+    try:
+        while len(observaciones) < max_observaciones:
+            inicio = len(observaciones)
+            indices = range(inicio, min(inicio + observaciones_por_lote, max_observaciones))
+            # La observación `i` usa el hijo `i` de la raíz, derivado igual que el flujo de un día
+            tareas = [(lado, i, configs[lado], duracion_dias, secuencia_del_dia(raiz, i), motor)
+                      for i in indices for lado in range(corridas_por_observacion)]
+            resultados = pool.imap_unordered(_ejecutar_replica, tareas) if pool is not None else map(_ejecutar_replica, tareas)
+            por_indice = {}
+            for lado, i, metricas in resultados:
+                por_indice.setdefault(i, [None] * corridas_por_observacion)[lado] = metricas
+            for i in indices:
+                pares = por_indice[i]
+                observaciones.append(_promediar_metricas(*pares) if antiteticas else aplanar_metricas(pares[0]))
+            lotes += 1
+
+            resumen = resumir_replicas(observaciones)
+            precision = {clave: _precision_relativa(resumen[clave]) if resumen[clave]["n"] == len(observaciones)
+                         else float("inf")
+                         for clave in metricas_objetivo if clave in resumen}
+            convergio = len(observaciones) >= min_replicas and all(
+                precision.get(clave, float("inf")) <= precision_relativa for clave in metricas_objetivo)
+            if convergio:
+                break
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return {
+        "semilla": semilla,
+        "motor": motor,
+        "antiteticas": antiteticas,
+        "precision_relativa_objetivo": precision_relativa,
+        "convergio": convergio,
+        "corridas": len(observaciones) * corridas_por_observacion,
+        "observaciones": len(observaciones),
+        "lotes": lotes,
+        "precision_alcanzada": precision,
+        "metricas_censuradas": {clave: len(observaciones) - resumen[clave]["n"] for clave in metricas_objetivo
+                                if clave in resumen and resumen[clave]["n"] < len(observaciones)},
+        "metricas_sin_datos": [clave for clave in metricas_objetivo if clave not in resumen],
+        "metricas": resumen,
+    }
+
+
+def ejecutar_replicas(config: dict, dias: int, n: int, semilla: int,
+                      motor: str = "vectorizado", procesos: int = None) -> dict:
+    """
+    Ejecuta `n` réplicas independientes de un escenario y devuelve, para cada métrica de
+    `calcular_metricas_principales`, la media, la desviación estándar y el IC del 95%.
+    """
+    return ejecutar_replicas_escenarios({"escenario": config}, dias, n, semilla, motor, procesos)["escenario"]
+
+
+# --- Bloque para Pruebas ---
+if __name__ == '__main__':
+    from src.config import ConfiguracionSimulacion
+    import json
+
+    config_base = ConfiguracionSimulacion.obtener_configuracion_escenario("base")
+    print("Ejecutando 5 réplicas del escenario 'base' (duración: 5 días)...")
+    resumen = ejecutar_replicas(config_base, dias=5, n=5, semilla=2025)
+    print(json.dumps(resumen["metricas"]["generales.total_vacunados"], indent=4))
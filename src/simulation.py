@@ -2,41 +2,141 @@
 
 import simpy
 import random
+import numpy as np
 import pandas as pd
 from src.config import ConfiguracionSimulacion
+from src.motor_vectorizado import simular_vectorizado, MotorVectorizado
+from src.registro_eventos import RegistroEventos, EVENTO_VACUNADO, EVENTO_REPROGRAMACION, COLUMNAS_EVENTOS
+from src.acumuladores import AcumuladorMetricas, EstadisticasTiempo
+from src.almacenamiento import EscritorEventos
+from src.calendario_dosis import CalendarioDosis, dosis_por_esquema, intervalo_dias_operativos
+from src.cierre_diario import politica_cierre, dias_independientes, secuencia_del_dia, simular_dias_en_paralelo
+from src.intensidad_llegadas import pacientes_del_dia, aplicar_perfil
+from src.numeros_comunes import (
+    numeros_comunes_activos, variables_antiteticas, generar_azar_del_dia, elegir_digitos, flujo_comun
+)
+from src.perfil import PERFIL_INACTIVO
+
+MOTORES_DISPONIBLES = ("simpy", "vectorizado")
+# "eventos" devuelve el DataFrame de eventos; "solo_metricas" devuelve un AcumuladorMetricas;
+# "en_disco" vuelca los eventos a un Parquet día por día y devuelve el EscritorEventos cerrado
+MODOS_SIMULACION = ("eventos", "solo_metricas", "en_disco")
+
+
+class _EntornoContado(simpy.Environment):
+    """
+    Environment que cuenta, por la API pública (`schedule` y `step`), los eventos programados y
+    el pico de eventos pendientes. Solo se usa con el perfil activo: sin contadores la corrida
+    usa el Environment de SimPy tal cual.
+    """
+
+    def __init__(self, initial_time: float = 0):
+        super().__init__(initial_time)
+        self.eventos_programados = 0
+        self.eventos_procesados = 0
+        self.max_pendientes = 0
+
+    def schedule(self, event, priority=simpy.core.NORMAL, delay=0):
+        super().schedule(event, priority, delay)
+        self.eventos_programados += 1
+        self.max_pendientes = max(self.max_pendientes, self.eventos_programados - self.eventos_procesados)
+
+    def step(self):
+        self.eventos_procesados += 1
+        super().step()
+
+
+def _crear_entorno(contadores, inicio: float = 0) -> simpy.Environment:
+    return _EntornoContado(inicio) if contadores is not None else simpy.Environment(initial_time=inicio)
+
+
+def _sumar_contadores_entorno(env, contadores):
+    """Pasa a los contadores del perfil lo que contó un `_EntornoContado`."""
+    if contadores is None or not isinstance(env, _EntornoContado):
+        return
+    contadores["max_tamano_heap"] = max(contadores["max_tamano_heap"], env.max_pendientes)
+    # Eventos internos de SimPy (timeouts, pedidos y liberaciones de cabina) programados en la corrida
+    contadores["eventos_simpy"] = contadores.get("eventos_simpy", 0) + env.eventos_programados
 
 def generar_llegadas_por_dia(env, dia, centro_vacunacion, config, datos_simulacion):
     """
     Genera las llegadas de pacientes para un día específico, con tiempos relativos
     al inicio de ese día. Esta función es iniciada por un proceso maestro.
+    Con el esquema de dos dosis, a los pacientes del día se suman en el mismo bloque las
+    vueltas para la segunda dosis agendadas en el calendario para ese día.
     """
+    estado_sim = config["estado_sim"]
     dia_semana = dia % 5
     digitos_hoy = config["asignacion_digitos_dias"].get(dia_semana, [])
-    
-    if not digitos_hoy:
-        return
+    pacientes_que_asisten = pacientes_del_dia(config, dia)
 
-    pacientes_por_digito = config["poblacion_total"] / 10
-    pacientes_esperados_hoy = len(digitos_hoy) * pacientes_por_digito
-    pacientes_que_asisten = int(pacientes_esperados_hoy * config["tasa_asistencia"])
+    dos_dosis = estado_sim["dosis_por_esquema"] > 1
+    # Con dos dosis, las primeras dosis no superan a la población que todavía no la recibió
+    if dos_dosis:
+        pacientes_que_asisten = max(0, min(pacientes_que_asisten, config["poblacion_total"] - estado_sim["contador_primeras_dosis"]))
+    vueltas_por_digito = estado_sim["calendario"].retirar_dia(dia) if dos_dosis else None
+    total_llegadas = pacientes_que_asisten + (int(vueltas_por_digito.sum()) if dos_dosis else 0)
 
     minutos_operacion = config["horas_operacion_por_dia"] * 60
-    if pacientes_que_asisten > 0:
-        tasa_llegada_promedio = pacientes_que_asisten / minutos_operacion
+    if total_llegadas > 0:
+        tasa_llegada_promedio = total_llegadas / minutos_operacion
         
         # --- OPTIMIZACIÓN: Pre-generar todos los tiempos y dígitos de una vez ---
-        tiempos_entre_llegadas = [random.expovariate(tasa_llegada_promedio) for _ in range(pacientes_que_asisten)]
-        digitos_pacientes = random.choices(digitos_hoy, k=pacientes_que_asisten)
+        rng = estado_sim["rng"]
+        servicios = azares = None
+        if numeros_comunes_activos(config):
+            # Números aleatorios comunes: el paciente `i` del día recibe los mismos números en todos los escenarios
+            azar = generar_azar_del_dia(estado_sim["raiz"], dia, total_llegadas, minutos_operacion,
+                                        config["tiempo_promedio_vacunacion_minutos"],
+                                        uniformes=politica_cierre(config) != "continuar",
+                                        antiteticas=variables_antiteticas(config))
+            instantes = azar["instantes"]
+            servicios, azares = azar["servicio"].tolist(), azar["azar"].tolist()
+            digitos_pacientes = elegir_digitos(azar["eleccion"][:pacientes_que_asisten], digitos_hoy).tolist()
+        else:
+            # Los instantes del día salen en bloque de NumPy, con una semilla tomada del flujo del día
+            rng_llegadas = np.random.default_rng(rng.getrandbits(64))
+            if politica_cierre(config) == "continuar":
+                instantes = np.cumsum(rng_llegadas.exponential(1.0 / tasa_llegada_promedio, total_llegadas))
+            else:
+                # Con cierre nadie llega con el centro cerrado: uniformes ordenadas dentro del horario
+                instantes = np.sort(rng_llegadas.uniform(0.0, minutos_operacion, total_llegadas))
+        instantes = aplicar_perfil(instantes, config, minutos_operacion)
+        tiempos_entre_llegadas = np.diff(instantes, prepend=0.0).tolist()
+        if servicios is None:
+            digitos_pacientes = rng.choices(digitos_hoy, k=pacientes_que_asisten) if pacientes_que_asisten > 0 else []
+        dosis_pacientes = [1] * pacientes_que_asisten
+        if dos_dosis:
+            for digito, cantidad in enumerate(vueltas_por_digito.tolist()):
+                digitos_pacientes.extend([digito] * cantidad)
+                dosis_pacientes.extend([2] * cantidad)
+            if servicios is None:
+                orden = list(range(total_llegadas))
+                rng.shuffle(orden)
+            else:
+                orden = flujo_comun(estado_sim["raiz"], "mezcla", dia).permutation(total_llegadas).tolist()
+            digitos_pacientes = [digitos_pacientes[j] for j in orden]
+            dosis_pacientes = [dosis_pacientes[j] for j in orden]
 
-        for i in range(pacientes_que_asisten):
+        contadores = estado_sim["contadores"]
+        for i in range(total_llegadas):
             # Si el objetivo ya se alcanzó, no generar más llegadas
-            if config["estado_sim"]["objetivo_alcanzado"].triggered:
+            if estado_sim["objetivo_alcanzado"].triggered:
                 break
             
             yield env.timeout(tiempos_entre_llegadas[i])
+            if contadores is not None:
+                # El pico de eventos pendientes lo cuenta el `_EntornoContado`
+                contadores["procesos_creados"] += 1
+                contadores["max_longitud_cola"] = max(contadores["max_longitud_cola"], len(centro_vacunacion.queue))
             
-            id_paciente = f"Dia{dia}_Digito{digitos_pacientes[i]}_Pac{i}"
-            env.process(proceso_paciente(env, id_paciente, centro_vacunacion, config, dia, digitos_pacientes[i], datos_simulacion))
+            # El paciente se identifica por su ordinal dentro del día; el ID legible se deriva al exportar
+            proceso = env.process(proceso_paciente(env, i, centro_vacunacion, config, dia, digitos_pacientes[i],
+                                                   datos_simulacion, dosis_pacientes[i],
+                                                   servicios[i] if servicios is not None else None,
+                                                   azares[i] if azares is not None else None))
+            if estado_sim.get("pacientes") is not None:
+                estado_sim["pacientes"].append(proceso)
 
 def fuente_de_llegadas(env, centro_vacunacion, config, duracion_dias, datos_simulacion):
     """
@@ -52,61 +152,261 @@ def fuente_de_llegadas(env, centro_vacunacion, config, duracion_dias, datos_simu
         yield env.timeout(minutos_por_dia)
 
 
-def proceso_paciente(env, nombre_paciente, centro_vacunacion, config, dia, digito_dni, datos_simulacion):
-    """Modela el flujo completo de un paciente en el centro de vacunación."""
+def proceso_paciente(env, paciente, centro_vacunacion, config, dia, digito_dni, datos_simulacion, dosis=1,
+                     tiempo_vacunacion=None, azar_reprogramacion=None):
+    """
+    Modela el flujo completo de un paciente en el centro de vacunación. Con el esquema de dos
+    dosis, la primera agenda la vuelta en el calendario (no queda un proceso esperando 21 días)
+    y una segunda dosis que se reprograma vuelve al día operativo siguiente. Con números
+    aleatorios comunes el tiempo de servicio y el azar de la reprogramación vienen dados.
+    """
     tiempo_llegada = env.now
+    estado_sim = config["estado_sim"]
+    rng = estado_sim["rng"]
+    minutos_por_dia = config["horas_operacion_por_dia"] * 60
     
     if centro_vacunacion.count == centro_vacunacion.capacity:
-        if random.random() < config["probabilidad_reprogramacion"]:
-            registrar_evento(env, nombre_paciente, "Reprogramacion", len(centro_vacunacion.queue), 0, 0, dia, digito_dni, datos_simulacion)
+        azar = azar_reprogramacion if azar_reprogramacion is not None else rng.random()
+        if azar < config["probabilidad_reprogramacion"]:
+            registrar_evento(env, paciente, EVENTO_REPROGRAMACION, len(centro_vacunacion.queue), 0, 0, dia, digito_dni,
+                             datos_simulacion, dosis)
+            if dosis == 2:
+                estado_sim["calendario"].programar(int(env.now // minutos_por_dia) + 1, digito_dni)
             return
 
+    estadisticas_tiempo = estado_sim["estadisticas_tiempo"]
+    # Con la política "reprogramar", el cierre del día saca de la cola a quien todavía espera
+    cierre = estado_sim.get("cierre")
     with centro_vacunacion.request() as solicitud:
-        yield solicitud
-        tiempo_inicio_servicio = env.now
-        tiempo_espera = tiempo_inicio_servicio - tiempo_llegada
-        
-        tiempo_vacunacion = random.expovariate(1.0 / config["tiempo_promedio_vacunacion_minutos"])
-        yield env.timeout(tiempo_vacunacion)
-        
-        tiempo_salida = env.now
-        tiempo_en_sistema = tiempo_salida - tiempo_llegada
-        
-        registrar_evento(env, nombre_paciente, "Vacunado", len(centro_vacunacion.queue), tiempo_espera, tiempo_en_sistema, dia, digito_dni, datos_simulacion)
+        # Cambios de estado: llegar a la cola (o a una cabina libre), pasar de la cola a una cabina y liberarla
+        estadisticas_tiempo.registrar(env.now, len(centro_vacunacion.queue), centro_vacunacion.count)
+        yield solicitud if cierre is None else solicitud | cierre
+        atendido = solicitud.triggered
+        if atendido:
+            estadisticas_tiempo.registrar(env.now, len(centro_vacunacion.queue), centro_vacunacion.count)
+            tiempo_inicio_servicio = env.now
+            tiempo_espera = tiempo_inicio_servicio - tiempo_llegada
 
-        # --- NUEVO: Comprobar si se alcanzó el objetivo de vacunación ---
-        estado_sim = config["estado_sim"]
-        estado_sim["contador_vacunados"] += 1
-        
-        if estado_sim["contador_vacunados"] >= config["poblacion_total"]:
-            if not estado_sim["objetivo_alcanzado"].triggered:
-                estado_sim["objetivo_alcanzado"].succeed()
+            if tiempo_vacunacion is None:
+                tiempo_vacunacion = rng.expovariate(1.0 / config["tiempo_promedio_vacunacion_minutos"])
+            yield env.timeout(tiempo_vacunacion)
+
+            tiempo_salida = env.now
+            tiempo_en_sistema = tiempo_salida - tiempo_llegada
+
+            registrar_evento(env, paciente, EVENTO_VACUNADO, len(centro_vacunacion.queue), tiempo_espera, tiempo_en_sistema, dia, digito_dni,
+                             datos_simulacion, dosis)
+        else:
+            # Quien se va al cierre esperó en la cola desde que llegó
+            registrar_evento(env, paciente, EVENTO_REPROGRAMACION, len(centro_vacunacion.queue), env.now - tiempo_llegada,
+                             env.now - tiempo_llegada, dia, digito_dni, datos_simulacion, dosis)
+    # SimPy asigna la cabina liberada al siguiente de la cola en un evento aparte, en el mismo instante
+    estadisticas_tiempo.registrar(env.now, len(centro_vacunacion.queue), centro_vacunacion.count)
+
+    if not atendido:
+        if dosis == 2:
+            estado_sim["calendario"].programar(dia + 1, digito_dni)
+        return
+
+    if dosis < estado_sim["dosis_por_esquema"]:
+        # Primera dosis de un esquema de dos: se agenda la vuelta y no cuenta para el objetivo
+        estado_sim["contador_primeras_dosis"] += 1
+        estado_sim["calendario"].programar(int(tiempo_salida // minutos_por_dia) + estado_sim["intervalo_dosis"], digito_dni)
+        return
+
+    # --- NUEVO: Comprobar si se alcanzó el objetivo de vacunación ---
+    estado_sim["contador_vacunados"] += 1
+    
+    if estado_sim["contador_vacunados"] >= config["poblacion_total"]:
+        if not estado_sim["objetivo_alcanzado"].triggered:
+            estado_sim["objetivo_alcanzado"].succeed()
 
-def registrar_evento(env, paciente_id, evento, longitud_cola, tiempo_espera, tiempo_sistema, dia, digito_dni, datos_simulacion):
-    """Registra un evento clave de la simulación."""
-    datos_simulacion.append((
+def registrar_evento(env, paciente, codigo_evento, longitud_cola, tiempo_espera, tiempo_sistema, dia, digito_dni, datos_simulacion,
+                     dosis=1):
+    """
+    Registra un evento clave de la simulación en el registro columnar o, en modo
+    "solo_metricas", actualiza los acumuladores sin guardar el evento.
+    """
+    datos_simulacion.agregar(
         env.now,
         dia,
-        paciente_id,
+        paciente,
         digito_dni,
-        evento,
+        codigo_evento,
         longitud_cola,
         tiempo_espera,
         tiempo_sistema,
-    ))
+        dosis,
+    )
+
+def ejecutar_simulacion_vectorizada(config_escenario: dict, duracion_dias: int, rng=None) -> pd.DataFrame:
+    """
+    Ejecuta el escenario con el motor vectorizado y arma el DataFrame con el mismo
+    esquema de eventos que produce el modelo SimPy.
+    """
+    return simular_vectorizado(config_escenario, duracion_dias, rng).a_dataframe()
 
-def ejecutar_simulacion(config_escenario: dict, duracion_dias: int):
-    """Configura y ejecuta un escenario completo de la simulación."""
-    datos_simulacion = []
-    env = simpy.Environment()
+def crear_secuencia_semilla(semilla=None) -> np.random.SeedSequence:
+    """
+    Normaliza una semilla (entero, SeedSequence o None) a un np.random.SeedSequence.
+    Con None se toma entropía del sistema operativo.
+    """
+    if isinstance(semilla, np.random.SeedSequence):
+        return semilla
+    return np.random.SeedSequence(semilla)
 
-    # --- NUEVO: Añadir estado para parada temprana ---
-    estado_sim = {
+def _crear_estado_sim(config_escenario: dict, env, secuencia: np.random.SeedSequence, contadores,
+                      estadisticas_tiempo: EstadisticasTiempo) -> dict:
+    """Estado de la corrida SimPy que comparten los procesos (parada temprana, azar, dos dosis)."""
+    return {
         "contador_vacunados": 0,
-        "objetivo_alcanzado": env.event()
+        "objetivo_alcanzado": env.event(),
+        "rng": random.Random(int(secuencia.generate_state(2, dtype=np.uint64)[0])),
+        # Raíz de los flujos por propósito con números aleatorios comunes (ver src/numeros_comunes.py)
+        "raiz": secuencia,
+        # Esquema de dos dosis: vueltas agendadas por día en lugar de procesos dormidos
+        "dosis_por_esquema": dosis_por_esquema(config_escenario),
+        "intervalo_dosis": intervalo_dias_operativos(config_escenario),
+        "contador_primeras_dosis": 0,
+        "calendario": CalendarioDosis(),
+        "contadores": contadores,
+        "estadisticas_tiempo": estadisticas_tiempo,
     }
+
+def _simular_dia_simpy_con_cierre(config_escenario: dict, dia: int, datos_simulacion,
+                                  raiz: np.random.SeedSequence) -> bool:
+    """
+    Simula un día con política de cierre en su propio Environment, que arranca en la apertura
+    con el centro vacío y corre hasta que sale el último paciente (horas extra incluidas) o se
+    alcanza el objetivo. El día usa su propio flujo aleatorio y sus propias estadísticas en el
+    tiempo, que al terminar se suman a las de la campaña. Devuelve si se alcanzó el objetivo.
+    """
+    estado_sim = config_escenario["estado_sim"]
+    minutos_por_dia = config_escenario["horas_operacion_por_dia"] * 60
+    inicio = dia * minutos_por_dia
+    env = _crear_entorno(estado_sim["contadores"], inicio)
+    estadisticas_campania = estado_sim["estadisticas_tiempo"]
+    estadisticas_dia = EstadisticasTiempo(config_escenario["num_cabinas"], estadisticas_campania.resolucion_minutos,
+                                          inicio=inicio)
+    estado_sim.update({
+        "objetivo_alcanzado": env.event(),
+        "rng": random.Random(int(secuencia_del_dia(raiz, dia).generate_state(2, dtype=np.uint64)[0])),
+        "estadisticas_tiempo": estadisticas_dia,
+        "cierre": env.timeout(minutos_por_dia) if politica_cierre(config_escenario) == "reprogramar" else None,
+        "pacientes": [],
+    })
+    centro_vacunacion = simpy.Resource(env, capacity=config_escenario["num_cabinas"])
+    llegadas = env.process(generar_llegadas_por_dia(env, dia, centro_vacunacion, config_escenario, datos_simulacion))
+
+    def jornada():
+        yield llegadas
+        yield env.all_of(estado_sim["pacientes"])
+
+    env.run(until=estado_sim["objetivo_alcanzado"] | env.process(jornada()))
+    _sumar_contadores_entorno(env, estado_sim["contadores"])
+    alcanzado = estado_sim["objetivo_alcanzado"].triggered
+    # Sin objetivo, el día dura al menos el horario aunque se vacíe antes
+    estadisticas_dia.cerrar(env.now if alcanzado else max(env.now, inicio + minutos_por_dia))
+    estadisticas_campania.fusionar(estadisticas_dia)
+    estado_sim["estadisticas_tiempo"] = estadisticas_campania
+    return alcanzado
+
+def simular_dia_independiente(config_escenario: dict, dia: int, motor: str, raiz: np.random.SeedSequence,
+                              contador_vacunados: int = 0) -> tuple:
+    """
+    Simula un solo día de un escenario con política de cierre, desde el centro vacío y con
+    `contador_vacunados` esquemas completos previos (para la parada temprana). Da lo mismo que
+    ese día dentro de la corrida en serie con la misma semilla raíz.
+
+    Returns:
+        tuple: (eventos del día como diccionario de columnas, EstadisticasTiempo del día).
+    """
+    estadisticas = EstadisticasTiempo(config_escenario["num_cabinas"])
+    if motor == "vectorizado":
+        motor_dia = MotorVectorizado(config_escenario, estadisticas_tiempo=estadisticas, secuencia_dias=raiz)
+        motor_dia.contador_vacunados = contador_vacunados
+        return motor_dia.simular_dia(dia), estadisticas
+
+    registro = RegistroEventos()
+    config_dia = dict(config_escenario)
+    config_dia["estado_sim"] = _crear_estado_sim(config_escenario, simpy.Environment(), raiz, None, estadisticas)
+    config_dia["estado_sim"]["contador_vacunados"] = contador_vacunados
+    _simular_dia_simpy_con_cierre(config_dia, dia, registro, raiz)
+    return {nombre: registro.columna(nombre) for nombre in COLUMNAS_EVENTOS}, estadisticas
+
+def ejecutar_simulacion(config_escenario: dict, duracion_dias: int, motor: str = "simpy", semilla=None,
+                        modo: str = "eventos", perfil=None, estadisticas_tiempo: EstadisticasTiempo = None,
+                        ruta_eventos: str = None, dias_por_lote: int = 1, procesos: int = 1):
+    """
+    Configura y ejecuta un escenario completo de la simulación.
+
+    Args:
+        config_escenario (dict): Parámetros del escenario.
+        duracion_dias (int): Días máximos a simular.
+        motor (str): "simpy" para el modelo de procesos por paciente o "vectorizado" para
+                     el motor que resuelve la cola de cada día en lote con NumPy.
+        semilla (int | np.random.SeedSequence | None): Semilla del flujo de números aleatorios.
+                     La misma semilla reproduce exactamente la misma corrida.
+        modo (str): "eventos" devuelve el DataFrame con todos los eventos. "solo_metricas" no guarda
+                     eventos: devuelve un AcumuladorMetricas (ver analysis.calcular_metricas_desde_acumuladores).
+                     "en_disco" escribe los eventos en `ruta_eventos` (Parquet) cada `dias_por_lote` días
+                     y los suelta: la memoria no crece con la campaña. Devuelve el EscritorEventos cerrado.
+        perfil (perfil.PerfilEscenario | None): Si está activo, recibe los contadores del motor y
+                     mide aparte la construcción del DataFrame.
+        estadisticas_tiempo (EstadisticasTiempo | None): Dónde acumula el motor las integrales en el
+                     tiempo de la cola y la ocupación (se calculan siempre; pasarlo permite leerlas
+                     junto al DataFrame). En modo "solo_metricas" quedan también en el acumulador.
+        procesos (int): Con una política de cierre que vacía el centro cada día (`politica_cierre`,
+                     ver src/cierre_diario.py), reparte los días en un pool de procesos; None usa
+                     todos los núcleos. El resultado es el mismo que con 1 (en serie).
+    """
+    if modo not in MODOS_SIMULACION:
+        raise ValueError(f"Modo de simulación desconocido: {modo}. Opciones: {', '.join(MODOS_SIMULACION)}")
+    secuencia = crear_secuencia_semilla(semilla)
+    perfil = perfil if perfil is not None else PERFIL_INACTIVO
+    if modo == "solo_metricas":
+        datos_simulacion = AcumuladorMetricas(config_escenario["poblacion_total"], config_escenario["horas_operacion_por_dia"] * 60,
+                                              dosis_por_esquema(config_escenario))
+    elif modo == "en_disco":
+        if ruta_eventos is None:
+            raise ValueError("El modo 'en_disco' necesita la ruta del archivo de eventos (ruta_eventos).")
+        datos_simulacion = EscritorEventos(ruta_eventos, config_escenario["horas_operacion_por_dia"] * 60, dias_por_lote)
+    else:
+        datos_simulacion = RegistroEventos()
+
+    if motor not in MOTORES_DISPONIBLES:
+        raise ValueError(f"Motor de simulación desconocido: {motor}. Opciones: {', '.join(MOTORES_DISPONIBLES)}")
+    if estadisticas_tiempo is None:
+        estadisticas_tiempo = EstadisticasTiempo(config_escenario["num_cabinas"])
+    if procesos != 1:
+        datos_simulacion = simular_dias_en_paralelo(config_escenario, duracion_dias, motor, secuencia, datos_simulacion,
+                                                    estadisticas_tiempo, procesos)
+        return _entregar_resultado(datos_simulacion, modo, perfil)
+
+    if motor == "vectorizado":
+        rng = np.random.default_rng(secuencia)
+        datos_simulacion = simular_vectorizado(config_escenario, duracion_dias, rng, destino=datos_simulacion,
+                                               contadores=perfil.contadores, estadisticas_tiempo=estadisticas_tiempo,
+                                               secuencia_dias=secuencia)
+        return _entregar_resultado(datos_simulacion, modo, perfil)
+
+    env = _crear_entorno(perfil.contadores)
+    # --- NUEVO: Añadir estado para parada temprana ---
+    # El estado vive en una copia de la configuración para no modificar los escenarios compartidos
+    estado_sim = _crear_estado_sim(config_escenario, env, secuencia, perfil.contadores, estadisticas_tiempo)
+    config_escenario = dict(config_escenario)
     config_escenario["estado_sim"] = estado_sim
 
+    if dias_independientes(config_escenario):
+        # Cada día en su propio Environment, desde el centro vacío (ver src/cierre_diario.py)
+        for dia in range(duracion_dias):
+            if _simular_dia_simpy_con_cierre(config_escenario, dia, datos_simulacion, secuencia):
+                break
+        datos_simulacion.estadisticas_tiempo = estadisticas_tiempo
+        if perfil.contadores is not None:
+            perfil.contadores["eventos_procesados"] += len(datos_simulacion)
+        return _entregar_resultado(datos_simulacion, modo, perfil)
+
     centro_vacunacion = simpy.Resource(env, capacity=config_escenario["num_cabinas"])
     
     env.process(fuente_de_llegadas(env, centro_vacunacion, config_escenario, duracion_dias, datos_simulacion))
@@ -116,12 +416,22 @@ def ejecutar_simulacion(config_escenario: dict, duracion_dias: int):
     # --- MODIFICADO: Correr hasta que se cumpla el objetivo o el tiempo límite ---
     # Se usa el operador | (OR) para combinar eventos en SimPy
     env.run(until=estado_sim["objetivo_alcanzado"] | env.timeout(duracion_total_minutos))
+    estadisticas_tiempo.cerrar(env.now)
+    datos_simulacion.estadisticas_tiempo = estadisticas_tiempo
+    if perfil.contadores is not None:
+        perfil.contadores["eventos_procesados"] += len(datos_simulacion)
+    _sumar_contadores_entorno(env, perfil.contadores)
+
+    return _entregar_resultado(datos_simulacion, modo, perfil)
 
-    columnas = [
-        "tiempo_simulacion", "dia", "paciente_id", "digito_dni", "evento",
-        "longitud_cola_actual", "tiempo_espera_minutos", "tiempo_en_sistema_minutos"
-    ]
-    return pd.DataFrame(datos_simulacion, columns=columnas)
+def _entregar_resultado(datos_simulacion, modo: str, perfil):
+    """Cierra el archivo en modo "en_disco" y devuelve el destino o, en modo "eventos", el DataFrame."""
+    if modo == "en_disco":
+        datos_simulacion.cerrar()
+    if modo != "eventos":
+        return datos_simulacion
+    with perfil.fase("construccion_dataframe"):
+        return datos_simulacion.a_dataframe()
 
 # --- Bloque para Pruebas ---
 if __name__ == '__main__':
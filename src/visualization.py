@@ -5,6 +5,14 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import numpy as np
+from src.config import ConfiguracionSimulacion
+
+# Puntos máximos de una serie temporal: del orden del ancho en píxeles de la figura
+MAX_PUNTOS_SERIE = 4000
+# Resolución de la grilla fina sobre la que se calcula la KDE agrupada
+BALDES_KDE = 2048
+# Puntos en que se evalúa la curva de densidad (los mismos que usa seaborn)
+PUNTOS_CURVA_KDE = 200
 
 def configurar_estilo_graficos():
     """Configura un estilo visual consistente y agradable para todos los gráficos."""
@@ -13,6 +21,106 @@ def configurar_estilo_graficos():
     plt.rcParams['axes.titlesize'] = 16
     plt.rcParams['axes.labelsize'] = 12
 
+def reducir_serie(x: np.ndarray, y: np.ndarray, max_puntos: int = MAX_PUNTOS_SERIE) -> tuple:
+    """
+    Reduce una serie ordenada por `x` a una envolvente mínimo/máximo: divide el rango de `x` en
+    `max_puntos // 2` intervalos iguales y conserva, en cada uno, el primer punto con el valor
+    mínimo y el primero con el máximo (más los extremos de la serie). Todo punto descartado
+    queda entre el mínimo y el máximo de su intervalo, de ancho menor a un píxel, así que la
+    línea dibujada no cambia.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if n <= max_puntos or x[-1] == x[0]:
+        return x, y
+
+    num_intervalos = max(1, max_puntos // 2)
+    intervalos = ((x - x[0]) * (num_intervalos / (x[-1] - x[0]))).astype(np.int64)
+    np.clip(intervalos, 0, num_intervalos - 1, out=intervalos)
+    inicios = np.concatenate([[0], np.flatnonzero(np.diff(intervalos)) + 1])
+    cantidades = np.diff(np.append(inicios, n))
+
+    def primeros_iguales(extremos):
+        # Primera posición de cada intervalo cuyo valor coincide con el extremo del intervalo
+        posiciones = np.flatnonzero(y == np.repeat(extremos, cantidades))
+        intervalo = intervalos[posiciones]
+        return posiciones[np.concatenate([[True], intervalo[1:] != intervalo[:-1]])]
+
+    indices = np.unique(np.concatenate([
+        primeros_iguales(np.minimum.reduceat(y, inicios)),
+        primeros_iguales(np.maximum.reduceat(y, inicios)),
+        [0, n - 1],
+    ]))
+    return x[indices], y[indices]
+
+def histograma_con_kde(valores: np.ndarray, bins: int = 30) -> tuple:
+    """
+    Calcula el histograma y una KDE gaussiana agrupada, escalada a conteos como la de
+    `sns.histplot(kde=True)` (ancho de banda de Scott, curva sobre el rango de los datos).
+    Los valores se cuentan en una grilla fina y la densidad es la convolución de esos conteos
+    con el núcleo, así que el costo depende de la grilla y no de la cantidad de valores.
+
+    Returns:
+        tuple: (bordes, conteos, grilla de la curva, curva en conteos por intervalo).
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    conteos, bordes = np.histogram(valores, bins=bins)
+    desvio = valores.std(ddof=1) if len(valores) > 1 else 0.0
+    conteos_finos, _ = np.histogram(valores, bins=BALDES_KDE, range=(bordes[0], bordes[-1]))
+    grilla, curva = _curva_kde(conteos_finos, bordes, len(valores), desvio)
+    return bordes, conteos, grilla, curva
+
+def _curva_kde(conteos_finos: np.ndarray, bordes: np.ndarray, n: int, desvio: float) -> tuple:
+    """
+    Curva de la KDE a partir de los conteos en la grilla fina de BALDES_KDE intervalos sobre el
+    rango de `bordes`, en conteos por intervalo del histograma. Solo usa conteos y el desvío,
+    así que sirve igual para valores leídos de a lotes.
+    """
+    minimo, maximo = bordes[0], bordes[-1]
+    grilla = np.linspace(minimo, maximo, PUNTOS_CURVA_KDE)
+    ancho_banda = desvio * n ** (-1 / 5) if n > 1 else 0.0
+    if ancho_banda <= 0 or maximo <= minimo:
+        return grilla, np.zeros_like(grilla)
+
+    paso = (maximo - minimo) / BALDES_KDE
+    centros = minimo + paso * (np.arange(BALDES_KDE) + 0.5)
+    semiancho = min(BALDES_KDE, int(np.ceil(4 * ancho_banda / paso)))
+    desplazamientos = np.arange(-semiancho, semiancho + 1) * paso
+    nucleo = np.exp(-0.5 * (desplazamientos / ancho_banda) ** 2) / (ancho_banda * np.sqrt(2 * np.pi))
+    densidad = np.convolve(conteos_finos, nucleo)[semiancho:semiancho + BALDES_KDE] / n
+
+    ancho_bin = bordes[1] - bordes[0]
+    curva = np.interp(grilla, centros, densidad) * n * ancho_bin
+    return grilla, curva
+
+def _guardar_serie(dias: np.ndarray, valores: np.ndarray, ruta_archivo: str, titulo: str, etiqueta_y: str, **estilo):
+    """Dibuja y guarda una serie contra el tiempo en días (ya reducida con `reducir_serie`)."""
+    plt.figure()
+    plt.plot(dias, valores, **estilo)
+    plt.title(titulo)
+    plt.xlabel('Tiempo (días)')
+    plt.ylabel(etiqueta_y)
+    plt.grid(True)
+    plt.savefig(ruta_archivo)
+    # Liberación de memoria
+    plt.close()
+
+def _guardar_histograma(bordes: np.ndarray, conteos: np.ndarray, grilla: np.ndarray, curva: np.ndarray, ruta_archivo: str):
+    """Dibuja y guarda el histograma de espera precalculado con su curva de densidad."""
+    # Histograma y KDE precalculados: seaborn solo dibuja 30 barras y una curva de 200 puntos
+    color = sns.color_palette()[0]
+    plt.figure()
+    sns.histplot(x=bordes[:-1], weights=conteos, bins=bordes.tolist(), color=color, alpha=0.5)
+    # Línea suave que estima la distribución
+    plt.plot(grilla, curva, color=color)
+    plt.title('Distribución de los Tiempos de Espera')
+    plt.xlabel('Tiempo de Espera (minutos)')
+    plt.ylabel('Frecuencia (Nº de Pacientes)')
+    plt.grid(True)
+    plt.savefig(ruta_archivo)
+    plt.close()
+
 def plot_vacunados_acumulados(resultados_df: pd.DataFrame, ruta_guardado: str, horas_operacion_dia: int):
     """
     Genera y guarda un gráfico de la cantidad de pacientes vacunados acumulados a lo largo del tiempo.
@@ -27,19 +135,12 @@ def plot_vacunados_acumulados(resultados_df: pd.DataFrame, ruta_guardado: str, h
         return
 
     vacunados_df['vacunados_acumulados'] = range(1, len(vacunados_df) + 1)
-    
-    # Creación del gráfico
-    plt.figure()
-    # Dibujado del gráfico
-    plt.plot(vacunados_df['tiempo_simulacion'] / (60 * horas_operacion_dia), vacunados_df['vacunados_acumulados'])
-    plt.title('Pacientes Vacunados Acumulados vs. Tiempo')
-    plt.xlabel('Tiempo (días)')
-    plt.ylabel('Total de Pacientes Vacunados')
-    plt.grid(True)
-    # Guardado como archivo png
-    plt.savefig(os.path.join(ruta_guardado, 'vacunados_acumulados.png'))
-    # Liberación de memoria
-    plt.close()
+    dias, vacunados_acumulados = reducir_serie(
+        vacunados_df['tiempo_simulacion'].to_numpy() / (60 * horas_operacion_dia),
+        vacunados_df['vacunados_acumulados'].to_numpy(),
+    )
+    _guardar_serie(dias, vacunados_acumulados, os.path.join(ruta_guardado, 'vacunados_acumulados.png'),
+                   'Pacientes Vacunados Acumulados vs. Tiempo', 'Total de Pacientes Vacunados')
 
 def plot_longitud_cola_vs_tiempo(resultados_df: pd.DataFrame, ruta_guardado: str, horas_operacion_dia: int):
     """
@@ -49,14 +150,13 @@ def plot_longitud_cola_vs_tiempo(resultados_df: pd.DataFrame, ruta_guardado: str
         print("Advertencia: DataFrame vacío o sin columna 'longitud_cola_actual'. No se puede generar gráfico de cola.")
         return
 
-    plt.figure()
-    plt.plot(resultados_df['tiempo_simulacion'] / (60 * horas_operacion_dia), resultados_df['longitud_cola_actual'], alpha=0.7)
-    plt.title('Evolución de la Longitud de la Cola vs. Tiempo')
-    plt.xlabel('Tiempo (días)')
-    plt.ylabel('Número de Pacientes en Cola')
-    plt.grid(True)
-    plt.savefig(os.path.join(ruta_guardado, 'longitud_cola.png'))
-    plt.close()
+    # Una línea con millones de eventos se reduce a su envolvente por píxel antes de dibujarla
+    dias, longitud_cola = reducir_serie(
+        resultados_df['tiempo_simulacion'].to_numpy() / (60 * horas_operacion_dia),
+        resultados_df['longitud_cola_actual'].to_numpy(),
+    )
+    _guardar_serie(dias, longitud_cola, os.path.join(ruta_guardado, 'longitud_cola.png'),
+                   'Evolución de la Longitud de la Cola vs. Tiempo', 'Número de Pacientes en Cola', alpha=0.7)
 
 def plot_histograma_tiempos_espera(resultados_df: pd.DataFrame, ruta_guardado: str):
     """
@@ -71,15 +171,8 @@ def plot_histograma_tiempos_espera(resultados_df: pd.DataFrame, ruta_guardado: s
         print("Advertencia: No hay tiempos de espera para graficar.")
         return
 
-    plt.figure()
-    # kde=True para aladir línea suave que estima distribución
-    sns.histplot(data=vacunados_df, x='tiempo_espera_minutos', kde=True, bins=30)
-    plt.title('Distribución de los Tiempos de Espera')
-    plt.xlabel('Tiempo de Espera (minutos)')
-    plt.ylabel('Frecuencia (Nº de Pacientes)')
-    plt.grid(True)
-    plt.savefig(os.path.join(ruta_guardado, 'histograma_tiempos_espera.png'))
-    plt.close()
+    bordes, conteos, grilla, curva = histograma_con_kde(vacunados_df['tiempo_espera_minutos'].to_numpy())
+    _guardar_histograma(bordes, conteos, grilla, curva, os.path.join(ruta_guardado, 'histograma_tiempos_espera.png'))
 
 def plot_comparacion_escenarios(metricas_por_escenario: dict, metrica: str, titulo: str, ruta_guardado: str):
     """
@@ -120,9 +213,10 @@ def plot_comparacion_escenarios(metricas_por_escenario: dict, metrica: str, titu
     plt.savefig(os.path.join(ruta_guardado, f'comparacion_{metrica}.png'))
     plt.close()
 
-def generar_visualizaciones_escenario(resultados_df: pd.DataFrame, ruta_escenario: str, config_escenario: dict):
+def generar_visualizaciones_escenario(resultados_df: pd.DataFrame, ruta_escenario: str, config_escenario: dict = None):
     """
     Genera y guarda todas las visualizaciones para un único escenario. Simplifica el main.py, para que solo tenga que llamar a esta función.
+    Sin `config_escenario` se usan las horas de operación del escenario base.
     """
     # Asegurar que la carpeta destino existe
     if not os.path.exists(ruta_escenario):
@@ -131,6 +225,8 @@ def generar_visualizaciones_escenario(resultados_df: pd.DataFrame, ruta_escenari
     # Configurar estilo de gráficos
     configurar_estilo_graficos()
     
+    if config_escenario is None:
+        config_escenario = ConfiguracionSimulacion.obtener_configuracion_escenario("base")
     horas_operacion_dia = config_escenario["horas_operacion_por_dia"]
 
     # Llamar a cada una de las funciones de gráficos individuales
@@ -140,6 +236,64 @@ def generar_visualizaciones_escenario(resultados_df: pd.DataFrame, ruta_escenari
     
     print(f"Gráficos para el escenario guardados en: {ruta_escenario}")
 
+def generar_visualizaciones_desde_archivo(ruta_resultados: str, ruta_escenario: str, config_escenario: dict = None):
+    """
+    Los mismos gráficos que `generar_visualizaciones_escenario`, leyendo el archivo de eventos
+    de a un lote (ver almacenamiento.leer_resultados_por_lotes) en lugar de cargarlo entero:
+    la memoria es la de un lote más unos pocos miles de puntos por serie. El archivo tiene que
+    estar en orden de tiempo, como lo deja el modo "en_disco" de la simulación.
+
+    Una primera pasada reduce las dos series lote por lote y junta el rango y el desvío de la
+    espera; la segunda cuenta el histograma y la grilla de la KDE con esos bordes fijos.
+    """
+    from src.acumuladores import EstadisticoEnLinea
+    from src.almacenamiento import leer_resultados_por_lotes
+
+    os.makedirs(ruta_escenario, exist_ok=True)
+    configurar_estilo_graficos()
+    if config_escenario is None:
+        config_escenario = ConfiguracionSimulacion.obtener_configuracion_escenario("base")
+    minutos_por_dia = 60 * config_escenario["horas_operacion_por_dia"]
+
+    columnas = ["tiempo_simulacion", "evento", "longitud_cola_actual", "tiempo_espera_minutos"]
+    partes_vacunados, partes_cola = [], []
+    espera = EstadisticoEnLinea()
+    for lote in leer_resultados_por_lotes(ruta_resultados, columnas):
+        dias = lote["tiempo_simulacion"].to_numpy() / minutos_por_dia
+        partes_cola.append(reducir_serie(dias, lote["longitud_cola_actual"].to_numpy()))
+        vacunado = (lote["evento"] == "Vacunado").to_numpy()
+        acumulados = espera.n + np.arange(1, np.count_nonzero(vacunado) + 1)
+        partes_vacunados.append(reducir_serie(dias[vacunado], acumulados))
+        espera.agregar_lote(lote["tiempo_espera_minutos"].to_numpy()[vacunado])
+
+    def unir(partes):
+        return reducir_serie(np.concatenate([x for x, _ in partes]), np.concatenate([y for _, y in partes]))
+
+    if espera.n == 0:
+        print("Advertencia: No hay datos de vacunados para graficar.")
+    else:
+        _guardar_serie(*unir(partes_vacunados), os.path.join(ruta_escenario, 'vacunados_acumulados.png'),
+                       'Pacientes Vacunados Acumulados vs. Tiempo', 'Total de Pacientes Vacunados')
+    if partes_cola and sum(len(x) for x, _ in partes_cola) > 0:
+        _guardar_serie(*unir(partes_cola), os.path.join(ruta_escenario, 'longitud_cola.png'),
+                       'Evolución de la Longitud de la Cola vs. Tiempo', 'Número de Pacientes en Cola', alpha=0.7)
+
+    if espera.n == 0 or espera.maximo <= 0:
+        print("Advertencia: No hay tiempos de espera para graficar.")
+    else:
+        bordes = np.histogram_bin_edges([espera.minimo, espera.maximo], bins=30)
+        conteos = np.zeros(len(bordes) - 1, dtype=np.int64)
+        conteos_finos = np.zeros(BALDES_KDE, dtype=np.int64)
+        for lote in leer_resultados_por_lotes(ruta_resultados, ["evento", "tiempo_espera_minutos"]):
+            valores = lote["tiempo_espera_minutos"].to_numpy()[(lote["evento"] == "Vacunado").to_numpy()]
+            valores = valores.astype(np.float64)
+            conteos += np.histogram(valores, bins=bordes)[0]
+            conteos_finos += np.histogram(valores, bins=BALDES_KDE, range=(bordes[0], bordes[-1]))[0]
+        grilla, curva = _curva_kde(conteos_finos, bordes, espera.n, np.sqrt(espera.varianza))
+        _guardar_histograma(bordes, conteos, grilla, curva, os.path.join(ruta_escenario, 'histograma_tiempos_espera.png'))
+
+    print(f"Gráficos para el escenario guardados en: {ruta_escenario}")
+
 # --- Bloque para Pruebas ---
 if __name__ == '__main__':
     
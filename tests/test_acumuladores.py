@@ -0,0 +1,153 @@
+# tests/test_acumuladores.py
+
+import numpy as np
+import pytest
+from src.acumuladores import EstadisticoEnLinea, BosquejoCuantiles, EstadisticasTiempo
+from src.analysis import calcular_metricas_principales, calcular_metricas_desde_acumuladores
+from src.simulation import ejecutar_simulacion
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 2,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 600,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def test_estadistico_en_linea_coincide_con_numpy():
+    """Welford (de a uno, en lotes y fusionado) coincide con la media y varianza de NumPy."""
+    valores = np.random.default_rng(0).gamma(2.0, 5.0, 1000)
+    uno_a_uno = EstadisticoEnLinea()
+    for valor in valores:
+        uno_a_uno.agregar(valor)
+    por_lotes = EstadisticoEnLinea()
+    por_lotes.agregar_lote(valores[:300])
+    otro = EstadisticoEnLinea()
+    otro.agregar_lote(valores[300:])
+    por_lotes.fusionar(otro)
+
+    for estadistico in (uno_a_uno, por_lotes):
+        assert estadistico.media == pytest.approx(valores.mean())
+        assert estadistico.varianza == pytest.approx(valores.var(ddof=1))
+        assert estadistico.minimo == valores.min()
+        assert estadistico.maximo == valores.max()
+
+def test_bosquejo_cuantiles_error_relativo_y_fusion():
+    """Los cuantiles del bosquejo fusionado respetan el error relativo del 1%."""
+    valores = np.random.default_rng(1).exponential(30.0, 20000)
+    bosquejo = BosquejoCuantiles(precision_relativa=0.01)
+    bosquejo.agregar_lote(valores[:10000])
+    otro = BosquejoCuantiles(precision_relativa=0.01)
+    for valor in valores[10000:]:
+        otro.agregar(valor)
+    bosquejo.fusionar(otro)
+
+    assert bosquejo.n == len(valores)
+    for q in (0.5, 0.9, 0.99):
+        exacto = np.quantile(valores, q)
+        assert bosquejo.cuantil(q) == pytest.approx(exacto, rel=0.02)
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_solo_metricas_igual_que_eventos(motor):
+    """Con la misma semilla, el modo "solo_metricas" reproduce las métricas del DataFrame de eventos."""
+    estadisticas_tiempo = EstadisticasTiempo(CONFIG_PRUEBA["num_cabinas"])
+    resultados_df = ejecutar_simulacion(CONFIG_PRUEBA, duracion_dias=10, motor=motor, semilla=4,
+                                        estadisticas_tiempo=estadisticas_tiempo)
+    acumulador = ejecutar_simulacion(CONFIG_PRUEBA, duracion_dias=10, motor=motor, semilla=4, modo="solo_metricas")
+
+    metricas_eventos = calcular_metricas_principales(resultados_df, CONFIG_PRUEBA, 10, estadisticas_tiempo)
+    metricas_acumuladas = calcular_metricas_desde_acumuladores(acumulador, CONFIG_PRUEBA, 10)
+
+    assert metricas_acumuladas["generales"] == metricas_eventos["generales"]
+    assert metricas_acumuladas["hitos_vacunacion"] == metricas_eventos["hitos_vacunacion"]
+    assert metricas_acumuladas["longitud_cola"]["maxima"] == metricas_eventos["longitud_cola"]["maxima"]
+    assert metricas_acumuladas["longitud_cola"]["promedio"] == pytest.approx(metricas_eventos["longitud_cola"]["promedio"])
+    assert metricas_acumuladas["tiempos_espera_minutos"]["promedio"] == pytest.approx(
+        metricas_eventos["tiempos_espera_minutos"]["promedio"], rel=1e-5)
+    assert metricas_acumuladas["costos"] == pytest.approx(metricas_eventos["costos"])
+    percentiles = metricas_acumuladas["tiempos_espera_minutos"]["percentiles"]
+    assert percentiles["p50"] <= percentiles["p90"] <= percentiles["p99"]
+
+def test_solo_metricas_dos_dosis_igual_que_eventos():
+    """Los hitos de primera dosis y de esquema completo coinciden entre ambos modos."""
+    config = dict(CONFIG_PRUEBA, num_cabinas=3, esquema_dos_dosis_habilitado=True, intervalo_dos_dosis_dias=21)
+    resultados_df = ejecutar_simulacion(config, duracion_dias=40, motor="vectorizado", semilla=5)
+    acumulador = ejecutar_simulacion(config, duracion_dias=40, motor="vectorizado", semilla=5, modo="solo_metricas")
+
+    metricas_eventos = calcular_metricas_principales(resultados_df, config, 40)
+    metricas_acumuladas = calcular_metricas_desde_acumuladores(acumulador, config, 40)
+    assert metricas_acumuladas["generales"] == metricas_eventos["generales"]
+    assert metricas_acumuladas["hitos_vacunacion"] == metricas_eventos["hitos_vacunacion"]
+    assert metricas_acumuladas["hitos_primera_dosis"] == metricas_eventos["hitos_primera_dosis"]
+
+def test_estadisticas_tiempo_ventana_igual_que_cambio_a_cambio():
+    """Integrar una ventana en lote da lo mismo que registrar cada cambio de estado (como SimPy)."""
+    rng = np.random.default_rng(2)
+    llegadas = np.sort(rng.uniform(0, 60, 40))
+    inicios = np.sort(llegadas + rng.uniform(0, 5, 40))[:35]
+    salidas = np.sort(inicios + rng.uniform(0, 3, 35))
+    salidas = salidas[salidas < 60]
+
+    en_lote = EstadisticasTiempo(num_cabinas=5, resolucion_minutos=7)
+    en_lote.registrar_ventana(60.0, llegadas, inicios, salidas)
+
+    cambio_a_cambio = EstadisticasTiempo(num_cabinas=5, resolucion_minutos=7)
+    cambios = sorted([(t, 1, 0) for t in llegadas] + [(t, -1, 1) for t in inicios] + [(t, 0, -1) for t in salidas])
+    cola = ocupadas = 0
+    for tiempo, cambio_cola, cambio_ocupadas in cambios:
+        cola += cambio_cola
+        ocupadas += cambio_ocupadas
+        cambio_a_cambio.registrar(tiempo, cola, ocupadas)
+    cambio_a_cambio.cerrar(60.0)
+
+    assert en_lote.integral_cola == pytest.approx(cambio_a_cambio.integral_cola)
+    assert en_lote.integral_ocupadas == pytest.approx(cambio_a_cambio.integral_ocupadas)
+    assert (en_lote.cola, en_lote.ocupadas) == (cola, ocupadas)
+    serie_lote, serie_cambios = en_lote.serie(), cambio_a_cambio.serie()
+    assert len(serie_lote) == 9
+    np.testing.assert_allclose(serie_lote["longitud_cola"], serie_cambios["longitud_cola"])
+    np.testing.assert_allclose(serie_lote["cabinas_ocupadas"], serie_cambios["cabinas_ocupadas"])
+    # La serie promediada en el tiempo reproduce el promedio total
+    assert np.average(serie_lote["longitud_cola"], weights=np.diff(np.append(serie_lote["minuto"], 60.0))) == \
+        pytest.approx(en_lote.cola_promedio)
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_utilizacion_medida_por_el_motor(motor):
+    """La utilización sale del tiempo ocupado medido: coincide con el servicio de los vacunados."""
+    estadisticas_tiempo = EstadisticasTiempo(CONFIG_PRUEBA["num_cabinas"])
+    resultados_df = ejecutar_simulacion(CONFIG_PRUEBA, duracion_dias=3, motor=motor, semilla=5,
+                                        estadisticas_tiempo=estadisticas_tiempo)
+    vacunados = resultados_df[resultados_df["evento"] == "Vacunado"]
+    servicio_registrado = float((vacunados["tiempo_en_sistema_minutos"] - vacunados["tiempo_espera_minutos"]).sum())
+    # Solo falta el servicio en curso al final de la corrida (a lo sumo una atención por cabina)
+    assert servicio_registrado <= estadisticas_tiempo.integral_ocupadas + 1e-3
+    assert estadisticas_tiempo.integral_ocupadas - servicio_registrado < 60 * CONFIG_PRUEBA["num_cabinas"]
+    assert 0 < estadisticas_tiempo.utilizacion <= 1
+    assert estadisticas_tiempo.maximo_cola >= resultados_df["longitud_cola_actual"].max()
+
+    metricas = calcular_metricas_principales(resultados_df, CONFIG_PRUEBA, 3, estadisticas_tiempo)
+    assert metricas["longitud_cola"]["promedio"] == pytest.approx(estadisticas_tiempo.cola_promedio)
+    assert metricas["rendimiento"]["utilizacion_promedio_cabinas_porcentual"] == pytest.approx(
+        100 * estadisticas_tiempo.utilizacion)
+
+def test_fusionar_simultaneos_alinea_los_dias_y_no_extrapola():
+    # Centro A: 2 cabinas y jornadas de 10 minutos; cola de 4 y una cabina ocupada los dos días
+    centro_a = EstadisticasTiempo(num_cabinas=2, resolucion_minutos=5)
+    centro_a.registrar(0.0, 4, 1)
+    centro_a.cerrar(20.0)
+    # Centro B: 3 cabinas y jornadas de 5 minutos; cola de 2 y las tres ocupadas solo el primer día
+    centro_b = EstadisticasTiempo(num_cabinas=3, resolucion_minutos=5)
+    centro_b.registrar(0.0, 2, 3)
+    centro_b.cerrar(5.0)
+
+    red = EstadisticasTiempo.fusionar_simultaneos([(centro_a, 10.0), (centro_b, 5.0)], 10.0)
+    assert red.num_cabinas == 5
+    assert red.tiempo_total == 20.0
+    # B suma su cola solo en sus 5 minutos: (4·20 + 2·5) / 20
+    assert red.cola_promedio == pytest.approx(4.5)
+    # Las cabinas de B quedan ociosas el segundo día: (1·20 + 3·5) / (2·20 + 3·10)
+    assert red.utilizacion == pytest.approx(35 / 70)
+    assert red.maximo_cola == 6
+    assert red.serie()["longitud_cola"].tolist() == pytest.approx([6.0, 4.0, 4.0, 4.0])
@@ -0,0 +1,82 @@
+# tests/test_almacenamiento.py
+
+import pytest
+from src.almacenamiento import (
+    guardar_resultados, cargar_resultados, buscar_resultados, leer_resultados_por_lotes, EscritorEventos
+)
+from src.simulation import ejecutar_simulacion
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 1,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 3000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+@pytest.fixture
+def resultados_df():
+    """Eventos de una corrida corta y reproducible del motor vectorizado."""
+    return ejecutar_simulacion(CONFIG_PRUEBA, duracion_dias=4, motor="vectorizado", semilla=3)
+
+@pytest.mark.parametrize("formato", ["csv", "parquet", "feather"])
+def test_ida_y_vuelta(resultados_df, formato, tmp_path):
+    """Lo que se guarda se recupera en el mismo orden de tiempo, con `evento` categórica."""
+    ruta = guardar_resultados(resultados_df, str(tmp_path), "prueba", formato=formato)
+    cargado = cargar_resultados(ruta)
+
+    assert len(cargado) == len(resultados_df)
+    assert cargado["tiempo_simulacion"].tolist() == pytest.approx(resultados_df["tiempo_simulacion"].tolist())
+    assert cargado["evento"].dtype == "category"
+    assert buscar_resultados(str(tmp_path), "prueba") == ruta
+
+@pytest.mark.parametrize("formato", ["parquet", "feather"])
+def test_carga_parcial_columnas_y_dias(resultados_df, formato, tmp_path):
+    """Los formatos columnares devuelven solo las columnas y los días pedidos."""
+    ruta = guardar_resultados(resultados_df, str(tmp_path), "prueba", formato=formato)
+    cargado = cargar_resultados(ruta, columnas=["tiempo_simulacion", "evento"], dias=[1, 2])
+
+    assert list(cargado.columns) == ["tiempo_simulacion", "evento"]
+    esperado = resultados_df[resultados_df["dia"].isin([1, 2])]
+    assert len(cargado) == len(esperado)
+    assert cargado["tiempo_simulacion"].is_monotonic_increasing
+
+def test_formato_desconocido(resultados_df, tmp_path):
+    """Un formato no soportado lanza ValueError."""
+    with pytest.raises(ValueError):
+        guardar_resultados(resultados_df, str(tmp_path), "prueba", formato="xlsx")
+
+@pytest.mark.parametrize("motor", ["vectorizado", "simpy"])
+def test_modo_en_disco_vuelca_un_row_group_por_dia(motor, tmp_path):
+    """Los eventos volcados día por día son los mismos que los del registro en memoria."""
+    en_memoria = ejecutar_simulacion(CONFIG_PRUEBA, duracion_dias=4, motor=motor, semilla=3)
+    ruta = str(tmp_path / "eventos.parquet")
+    escritor = ejecutar_simulacion(CONFIG_PRUEBA, duracion_dias=4, motor=motor, semilla=3, modo="en_disco",
+                                   ruta_eventos=ruta)
+
+    assert len(escritor) == len(en_memoria)
+    assert escritor.lotes_escritos == 4
+    lotes = list(leer_resultados_por_lotes(ruta))
+    assert [len(lote) for lote in lotes] == [
+        int(((en_memoria["tiempo_simulacion"] // 60) == dia).sum()) for dia in range(4)
+    ]
+    cargado = cargar_resultados(ruta)
+    assert cargado["tiempo_simulacion"].tolist() == en_memoria["tiempo_simulacion"].tolist()
+    assert cargado["evento"].astype(str).tolist() == en_memoria["evento"].astype(str).tolist()
+
+def test_escritor_eventos_parte_bloques_y_acepta_corridas_vacias(resultados_df, tmp_path):
+    columnas = {nombre: resultados_df[nombre].to_numpy() for nombre in resultados_df.columns}
+    columnas["evento"] = resultados_df["evento"].cat.codes.to_numpy()
+    escritor = EscritorEventos(str(tmp_path / "eventos.parquet"), minutos_por_dia=60, dias_por_lote=2)
+    escritor.extender(columnas)  # un solo bloque con los cuatro días
+    escritor.cerrar()
+    assert escritor.lotes_escritos == 2
+    assert len(cargar_resultados(escritor.ruta)) == len(resultados_df)
+
+    vacio = EscritorEventos(str(tmp_path / "vacio.parquet"), minutos_por_dia=60)
+    vacio.cerrar()
+    assert cargar_resultados(vacio.ruta).empty
+    with pytest.raises(ValueError):
+        EscritorEventos(str(tmp_path / "eventos.csv"), minutos_por_dia=60)
@@ -51,3 +51,24 @@ def test_analisis_dataframe_vacio():
     metricas = calcular_metricas_principales(pd.DataFrame(), config, duracion_dias=1)
     assert "error" in metricas
     assert metricas["error"] == "El DataFrame de resultados está vacío. No se pueden calcular métricas."
+
+def test_metricas_por_lotes_igual_que_en_memoria(tmp_path):
+    """Leer el archivo del modo "en_disco" de a un día da los mismos conteos, hitos y esperas."""
+    from src.acumuladores import EstadisticasTiempo
+    from src.analysis import calcular_metricas_desde_archivo
+    from src.simulation import ejecutar_simulacion
+
+    config = dict(ConfiguracionSimulacion.obtener_configuracion_escenario("base"), poblacion_total=5000)
+    estadisticas_memoria = EstadisticasTiempo(config["num_cabinas"])
+    resultados_df = ejecutar_simulacion(config, 6, motor="vectorizado", semilla=2, estadisticas_tiempo=estadisticas_memoria)
+    estadisticas_disco = EstadisticasTiempo(config["num_cabinas"])
+    ruta = str(tmp_path / "eventos.parquet")
+    ejecutar_simulacion(config, 6, motor="vectorizado", semilla=2, modo="en_disco", ruta_eventos=ruta,
+                        estadisticas_tiempo=estadisticas_disco)
+
+    en_memoria = calcular_metricas_principales(resultados_df, config, 6, estadisticas_memoria)
+    por_lotes = calcular_metricas_desde_archivo(ruta, config, 6, estadisticas_disco, por_lotes=True)
+    assert por_lotes["generales"] == en_memoria["generales"]
+    assert por_lotes["hitos_vacunacion"] == en_memoria["hitos_vacunacion"]
+    assert por_lotes["longitud_cola"] == pytest.approx(en_memoria["longitud_cola"])
+    assert por_lotes["tiempos_espera_minutos"]["promedio"] == pytest.approx(en_memoria["tiempos_espera_minutos"]["promedio"])
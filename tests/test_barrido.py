@@ -0,0 +1,55 @@
+# tests/test_barrido.py
+
+import os
+import pytest
+from src.barrido import expandir_grilla, ejecutar_barrido
+from src.generar_comparativas import generar_tabla_barrido
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 1,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def test_expandir_grilla():
+    configs = expandir_grilla({"num_cabinas": range(2, 5), "horas_operacion_por_dia": [1, 2]}, CONFIG_PRUEBA)
+    assert len(configs) == 6
+    config = configs["num_cabinas=3__horas_operacion_por_dia=2"]
+    assert config["num_cabinas"] == 3 and config["horas_operacion_por_dia"] == 2
+    assert config["tasa_asistencia"] == CONFIG_PRUEBA["tasa_asistencia"]
+    with pytest.raises(ValueError):
+        expandir_grilla({"num_cabinas": []}, CONFIG_PRUEBA)
+
+def test_barrido_deduplica_aisla_fallas_y_usa_la_cache(tmp_path):
+    configs = expandir_grilla({"num_cabinas": [2, 4, 8]}, CONFIG_PRUEBA)
+    configs["copia"] = dict(configs["num_cabinas=4"])
+    configs["roto"] = dict(CONFIG_PRUEBA, politica_cierre="desconocida")
+    ruta_cache = str(tmp_path / "cache")
+
+    barrido = ejecutar_barrido(configs, 20, semilla=5, procesos=2, reintentos=1, ruta_cache=ruta_cache)
+    puntos = barrido["puntos"]
+    assert barrido["resumen"]["simulado"] == 3
+    assert puntos["copia"]["estado"] == "duplicado"
+    assert puntos["copia"]["metricas"] == puntos["num_cabinas=4"]["metricas"]
+    assert puntos["roto"]["estado"] == "fallido" and puntos["roto"]["intentos"] == 2
+    assert "Política de cierre desconocida" in puntos["roto"]["error"]
+
+    # La segunda vez todo sale de la caché, con las mismas métricas
+    repetido = ejecutar_barrido(configs, 20, semilla=5, procesos=1, reintentos=0, ruta_cache=ruta_cache)
+    assert repetido["resumen"]["cache"] == 3 and repetido["resumen"]["simulado"] == 0
+    assert repetido["puntos"]["num_cabinas=8"]["metricas"]["costos"] == puntos["num_cabinas=8"]["metricas"]["costos"]
+
+    tabla = generar_tabla_barrido(barrido, str(tmp_path))
+    assert os.path.exists(os.path.join(tmp_path, "resumen_barrido.csv"))
+    assert list(tabla["num_cabinas"]) == sorted(tabla["num_cabinas"]) and "politica_cierre" in tabla.columns
+    assert tabla["Costo Total"].is_monotonic_increasing
+
+def test_barrido_descarta_infactibles_con_el_modelo(tmp_path):
+    configs = expandir_grilla({"num_cabinas": [1, 12]}, CONFIG_PRUEBA)
+    barrido = ejecutar_barrido(configs, 30, semilla=5, procesos=1, plazo_dias=15, usar_cache=False)
+    assert barrido["puntos"]["num_cabinas=1"]["estado"] == "descartado"
+    assert barrido["puntos"]["num_cabinas=12"]["estado"] == "simulado"
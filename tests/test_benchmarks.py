@@ -0,0 +1,36 @@
+# tests/test_benchmarks.py
+
+from benchmarks.suite import comparar, definir_casos, POBLACION_MAXIMA_SIMPY, _ejecutar_en_proceso, _medir_red
+
+def test_comparar_marca_regresiones_sobre_el_umbral():
+    linea_base = {"casos": {
+        "a": {"segundos": 1.0, "rss_pico_mb": 100.0},
+        "b": {"segundos": 2.0, "rss_pico_mb": 100.0},
+        "c": {"segundos": 1.0, "rss_pico_mb": None},
+        "solo_en_base": {"segundos": 1.0},
+        "ruido": {"segundos": 0.01},
+    }}
+    actual = {"casos": {
+        "a": {"segundos": 1.1, "rss_pico_mb": 105.0},
+        "b": {"segundos": 2.0, "rss_pico_mb": 150.0},
+        "c": {"segundos": 1.5, "rss_pico_mb": None},
+        "ruido": {"segundos": 0.02},
+    }}
+    filas = {fila["caso"]: fila for fila in comparar(linea_base, actual, umbral=0.2)}
+
+    assert set(filas) == {"a", "b", "c", "ruido"}
+    assert not filas["ruido"]["regresion"]
+    assert not filas["a"]["regresion"]
+    assert filas["b"]["regresion"] and filas["b"]["rss_pico_mb"] == 1.5
+    assert filas["c"]["regresion"] and "rss_pico_mb" not in filas["c"]
+
+def test_casos_simpy_limitados_a_poblaciones_chicas():
+    casos = definir_casos()
+    assert all(poblacion <= POBLACION_MAXIMA_SIMPY for _, poblacion, _, motor in casos if motor == "simpy")
+    assert max(poblacion for _, poblacion, _, _ in casos) == 10_000_000
+    assert max(poblacion for _, poblacion, _, _ in definir_casos(rapido=True)) <= 100_000
+
+def test_red_con_varios_procesos_dentro_del_proceso_de_medicion():
+    # El proceso de medición abre el pool de la red: no puede ser un proceso demonio
+    medicion = _ejecutar_en_proceso(_medir_red, 4, 20000, 2, 1)
+    assert medicion["procesos"] == 2 and medicion["vacunados"] > 0
@@ -0,0 +1,57 @@
+# tests/test_bifurcacion.py
+
+import pytest
+from src.bifurcacion import tomar_instantanea, simular_rama, ejecutar_ramas, eventos_completos
+from src.simulation import ejecutar_simulacion
+from src.analysis import calcular_metricas_desde_acumuladores
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 1,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def _metricas_completas(config, duracion_dias, semilla):
+    acumulador = ejecutar_simulacion(config, duracion_dias, motor="vectorizado", semilla=semilla, modo="solo_metricas")
+    return calcular_metricas_desde_acumuladores(acumulador, config, duracion_dias)
+
+@pytest.mark.parametrize("politica", ["continuar", "reprogramar"])
+def test_rama_sin_cambios_reproduce_la_corrida(politica):
+    config = dict(CONFIG_PRUEBA, politica_cierre=politica)
+    instantanea = tomar_instantanea(config, 10, semilla=7, guardar_eventos=True)
+    rama = simular_rama(instantanea, {}, 40, guardar_eventos=True)
+    metricas = rama["metricas"]
+    assert metricas["parametros_escenario"].pop("bifurcacion") == {"dia": 10, "cambios": {}}
+    assert metricas == _metricas_completas(config, 40, 7)
+    # Los eventos de la rama siguen a los del prefijo
+    eventos = eventos_completos(instantanea, rama)
+    assert len(instantanea["registro"]) == instantanea["desplazamiento_eventos"]
+    assert eventos.equals(ejecutar_simulacion(config, 40, motor="vectorizado", semilla=7))
+
+def test_rama_desde_el_dia_cero_equivale_a_la_configuracion_cambiada():
+    cambios = {"num_cabinas": 3, "horas_operacion_por_dia": 2, "tasa_asistencia": 0.7}
+    rama = simular_rama(tomar_instantanea(CONFIG_PRUEBA, 0, semilla=3), cambios, 40)["metricas"]
+    rama["parametros_escenario"].pop("bifurcacion")
+    assert rama == _metricas_completas(dict(CONFIG_PRUEBA, **cambios), 40, 3)
+
+def test_ramas_en_paralelo_aplican_los_cambios():
+    instantanea = tomar_instantanea(CONFIG_PRUEBA, 20, semilla=5)
+    resultado = ejecutar_ramas(instantanea, {"igual": {}, "mas_cabinas": {"num_cabinas": 4},
+                                             "jornada_doble": {"horas_operacion_por_dia": 2}}, 60, procesos=2)
+    igual, mas_cabinas, jornada_doble = (resultado["ramas"][nombre]["metricas"]
+                                         for nombre in ("igual", "mas_cabinas", "jornada_doble"))
+    # Con la cola llena, las cabinas nuevas atienden también a los que ya esperaban
+    assert mas_cabinas["tiempos_espera_minutos"]["promedio"] < igual["tiempos_espera_minutos"]["promedio"]
+    assert mas_cabinas["rendimiento"]["utilizacion_promedio_cabinas_porcentual"] <= 100.0 + 1e-9
+    assert mas_cabinas["estadisticas_costo"]["cabinas_dia"] == 2 * 20 + 4 * 40
+    # Doble jornada y doble de cabinas dan la misma capacidad diaria: terminan el mismo día
+    dias_igual = igual["hitos_vacunacion"]["100_porciento"]["dias"]
+    dias_mas_cabinas = mas_cabinas["hitos_vacunacion"]["100_porciento"]["dias"]
+    assert dias_mas_cabinas < dias_igual
+    assert jornada_doble["hitos_vacunacion"]["100_porciento"]["dias"] == pytest.approx(dias_mas_cabinas, abs=1.0)
+    with pytest.raises(ValueError):
+        simular_rama(instantanea, {"probabilidad_reprogramacion": 0.1}, 60)
@@ -0,0 +1,91 @@
+# tests/test_cache.py
+
+import json
+import os
+import time
+import src.main as main
+import src.simulation as simulation
+from src.cache import (
+    parametros_corrida, clave_corrida, buscar_entrada, guardar_entrada, restaurar_entrada,
+    limpiar_cache, escribir_meta_escenario, resultado_desactualizado
+)
+from src.config import ConfiguracionSimulacion
+
+CONFIG_PRUEBA = ConfiguracionSimulacion.obtener_configuracion_escenario("base")
+
+def test_clave_estable_y_sensible_a_parametros():
+    parametros = parametros_corrida(CONFIG_PRUEBA, 10, 2025, "vectorizado", "eventos", "parquet")
+    clave = clave_corrida(parametros)
+
+    assert clave == clave_corrida(parametros_corrida(dict(CONFIG_PRUEBA), 10, 2025, "vectorizado", "eventos", "parquet"))
+    assert clave != clave_corrida(parametros_corrida(dict(CONFIG_PRUEBA, num_cabinas=6), 10, 2025, "vectorizado", "eventos", "parquet"))
+    assert clave != clave_corrida(parametros_corrida(CONFIG_PRUEBA, 10, 2026, "vectorizado", "eventos", "parquet"))
+    assert clave != clave_corrida(parametros_corrida(CONFIG_PRUEBA, 10, 2025, "simpy", "eventos", "parquet"))
+
+    # Las métricas guardadas incluyen los costos: otros precios son otra entrada
+    costos = ConfiguracionSimulacion.COSTOS
+    ConfiguracionSimulacion.COSTOS = dict(costos, costo_por_dosis=costos["costo_por_dosis"] + 1)
+    try:
+        assert clave != clave_corrida(parametros_corrida(CONFIG_PRUEBA, 10, 2025, "vectorizado", "eventos", "parquet"))
+    finally:
+        ConfiguracionSimulacion.COSTOS = costos
+
+def test_guardar_buscar_y_restaurar_entrada(tmp_path):
+    ruta_cache = str(tmp_path / "cache")
+    eventos = tmp_path / "resultados_base.parquet"
+    eventos.write_bytes(b"eventos")
+    parametros = parametros_corrida(CONFIG_PRUEBA, 10, 1, "vectorizado", "eventos", "parquet")
+    clave = clave_corrida(parametros)
+
+    assert buscar_entrada(clave, ruta_cache) is None
+    guardar_entrada(clave, parametros, {"generales": {"total_vacunados": 5}}, str(eventos), ruta_cache)
+    entrada = buscar_entrada(clave, ruta_cache)
+    assert entrada is not None
+
+    ruta_escenario = tmp_path / "salida"
+    ruta_escenario.mkdir()
+    metricas, ruta_eventos = restaurar_entrada(entrada, str(ruta_escenario), "base", ruta_cache)
+    assert metricas == {"generales": {"total_vacunados": 5}}
+    assert open(ruta_eventos, "rb").read() == b"eventos"
+
+def test_limpiar_cache_por_antiguedad_y_tamano(tmp_path):
+    ruta_cache = str(tmp_path / "cache")
+    claves = []
+    for i in range(3):
+        parametros = parametros_corrida(CONFIG_PRUEBA, 10, i, "vectorizado", "solo_metricas", "parquet")
+        clave = clave_corrida(parametros)
+        guardar_entrada(clave, parametros, {"relleno": "x" * 1000}, ruta_cache=ruta_cache)
+        claves.append(clave)
+
+    # La primera entrada quedó sin usar hace 40 días
+    ruta_meta = os.path.join(ruta_cache, claves[0], "meta.json")
+    meta = json.load(open(ruta_meta))
+    meta["ultimo_uso"] = time.time() - 40 * 86400
+    json.dump(meta, open(ruta_meta, "w"))
+    assert limpiar_cache(ruta_cache, max_bytes=None, max_dias=30) == [claves[0]]
+
+    # Con un límite de tamaño chico solo sobrevive la usada más recientemente
+    buscar_entrada(claves[1], ruta_cache)
+    assert limpiar_cache(ruta_cache, max_bytes=3000, max_dias=None) == [claves[2]]
+    assert os.listdir(ruta_cache) == [claves[1]]
+
+def test_resultado_desactualizado(tmp_path):
+    parametros = parametros_corrida(CONFIG_PRUEBA, 10, 1, "vectorizado", "eventos", "parquet")
+    assert resultado_desactualizado(str(tmp_path), CONFIG_PRUEBA)
+    escribir_meta_escenario(str(tmp_path), parametros)
+    assert not resultado_desactualizado(str(tmp_path), CONFIG_PRUEBA)
+    assert resultado_desactualizado(str(tmp_path), dict(CONFIG_PRUEBA, num_cabinas=6))
+
+def test_ejecutar_escenario_reutiliza_la_cache(tmp_path, monkeypatch):
+    """La segunda corrida con los mismos parámetros no vuelve a simular, salvo con forzar=True."""
+    monkeypatch.chdir(tmp_path)
+    _, metricas = main.ejecutar_escenario("base", 2, motor="vectorizado", semilla=3, modo="solo_metricas")
+
+    def simulacion_prohibida(*args, **kwargs):
+        raise AssertionError("No debería simular con un acierto de caché")
+    monkeypatch.setattr(simulation, "ejecutar_simulacion", simulacion_prohibida)
+    _, metricas_cache = main.ejecutar_escenario("base", 2, motor="vectorizado", semilla=3, modo="solo_metricas")
+    assert json.loads(json.dumps(metricas, default=str)) == metricas_cache
+
+    # forzar=True ignora la caché (y la simulación prohibida hace fallar el escenario)
+    assert main.ejecutar_escenario("base", 2, motor="vectorizado", semilla=3, modo="solo_metricas", forzar=True)[1] == {}
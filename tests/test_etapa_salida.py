@@ -0,0 +1,69 @@
+# tests/test_etapa_salida.py
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+import pandas as pd
+import src.main as main
+from src.etapa_salida import EtapaSalida
+
+def _duplicar(valor):
+    return {"nombre": str(valor), "valor": 2 * valor}
+
+def test_encolar_se_bloquea_con_la_cola_llena():
+    liberar = threading.Event()
+    guardados = []
+
+    def guardar_lento(resultado, graficar):
+        liberar.wait()
+        guardados.append(resultado["valor"])
+
+    with EtapaSalida(guardar_lento, capacidad=1) as etapa:
+        etapa.encolar({"valor": 1})  # lo toma el escritor, que queda esperando
+        time.sleep(0.1)
+        etapa.encolar({"valor": 2})  # ocupa el único lugar de la cola
+        productor = threading.Thread(target=etapa.encolar, args=({"valor": 3},))
+        productor.start()
+        productor.join(timeout=0.2)
+        assert productor.is_alive()
+        liberar.set()
+        productor.join()
+    assert guardados == [1, 2, 3]
+
+def test_consumir_guarda_todos_los_resultados_en_orden():
+    guardados = []
+    with EtapaSalida(lambda resultado, graficar: guardados.append(resultado["valor"])) as etapa, \
+            multiprocessing.Pool(processes=2) as pool:
+        etapa.consumir(pool, _duplicar, range(10), procesos=2, max_en_vuelo=2)
+    assert guardados == [2 * i for i in range(10)]
+
+def test_ejecutar_escenarios_escribe_eventos_graficos_y_metricas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main.ejecutar_escenarios(["base", "10_cabinas"], 2, duracion_simulacion_dias=1, motor="vectorizado", semilla=1,
+                             formato_salida="csv", usar_cache=False)
+    for nombre in ("base", "10_cabinas"):
+        ruta = os.path.join("data", "output", nombre)
+        for archivo in ("metricas.json", f"resultados_{nombre}.csv", "vacunados_acumulados.png",
+                        "longitud_cola.png", "histograma_tiempos_espera.png"):
+            assert os.path.exists(os.path.join(ruta, archivo)), archivo
+        # Mismas métricas que la ejecución secuencial
+        with open(os.path.join(ruta, "metricas.json")) as f:
+            metricas = json.load(f)
+        _, secuencial = main.ejecutar_escenario(nombre, 1, motor="vectorizado", semilla=1, formato_salida="csv",
+                                                usar_cache=False)
+        assert metricas == json.loads(json.dumps(secuencial, default=str))
+
+def test_analisis_conjunto_recibe_eventos_en_memoria(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    metricas = main.ejecutar_escenarios(["base", "10_cabinas"], 2, analisis_conjunto=main.analizar_escenarios_en_memoria,
+                                        duracion_simulacion_dias=1, motor="vectorizado", semilla=1,
+                                        formato_salida="csv", usar_cache=False)
+    assert set(metricas) == {"base", "10_cabinas"}
+    ruta = os.path.join("data", "output", "comparativas")
+    assert os.path.exists(os.path.join(ruta, "resumen_consolidado_escenarios.csv"))
+    vacunados = pd.read_csv(os.path.join(ruta, "vacunados_por_dia_escenarios.csv"), index_col="dia")
+    for nombre in ("base", "10_cabinas"):
+        eventos = pd.read_csv(os.path.join("data", "output", nombre, f"resultados_{nombre}.csv"))
+        assert vacunados[nombre].sum() == (eventos["evento"] == "Vacunado").sum()
@@ -0,0 +1,68 @@
+# tests/test_intensidad_llegadas.py
+
+import numpy as np
+import pytest
+from src.intensidad_llegadas import pacientes_del_dia, tramos_perfil, aplicar_perfil
+from src.simulation import ejecutar_simulacion
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 2,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def test_perfil_parejo_no_cambia_los_instantes():
+    instantes = np.sort(np.random.default_rng(1).uniform(0, 120, 500))
+    assert aplicar_perfil(instantes, CONFIG_PRUEBA, 120) is instantes
+    parejo = aplicar_perfil(instantes, dict(CONFIG_PRUEBA, perfil_llegadas=[2, 2, 2]), 120)
+    assert np.allclose(parejo, instantes)
+
+def test_perfil_reparte_las_llegadas_segun_los_pesos():
+    config = dict(CONFIG_PRUEBA, perfil_llegadas={0: 3.0, 0.5: 0.0, 1: 1.0})
+    bordes, intensidad = tramos_perfil(config, 120)
+    assert list(bordes) == [0, 30, 60, 120]
+    assert np.sum(intensidad * np.diff(bordes)) == pytest.approx(120)
+
+    instantes = np.sort(np.random.default_rng(2).uniform(0, 120, 20000))
+    # Lo que pasa al día siguiente con "continuar" queda igual
+    transformados = aplicar_perfil(np.append(instantes, 130.0), config, 120)
+    assert transformados[-1] == 130.0
+    transformados = transformados[:-1]
+    assert np.all(np.diff(transformados) >= 0) and transformados.max() <= 120
+    # 3·30 del primer tramo contra 1·60 del último: 60% y 40% de las llegadas, ninguna en el medio
+    assert np.mean(transformados < 30) == pytest.approx(0.6, abs=0.02)
+    assert not np.any((transformados > 30) & (transformados < 60))
+
+    with pytest.raises(ValueError):
+        tramos_perfil(dict(CONFIG_PRUEBA, perfil_llegadas={1: 1.0}), 120)
+    with pytest.raises(ValueError):
+        tramos_perfil(dict(CONFIG_PRUEBA, perfil_llegadas=[0, 0]), 120)
+
+def test_factor_del_dia_de_la_semana():
+    config = dict(CONFIG_PRUEBA, factor_asistencia_dia_semana={0: 1.5, 4: 3.0})
+    assert pacientes_del_dia(CONFIG_PRUEBA, 0) == 200
+    assert pacientes_del_dia(config, 0) == 300
+    assert pacientes_del_dia(config, 1) == 200
+    # La asistencia no supera a toda la población de los dígitos del día
+    assert pacientes_del_dia(config, 9) == 400
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+@pytest.mark.parametrize("politica", ["continuar", "reprogramar"])
+def test_motores_con_perfil_de_llegadas(motor, politica):
+    config = dict(CONFIG_PRUEBA, politica_cierre=politica, perfil_llegadas=[4.0, 1.0, 1.0, 1.0, 1.0, 0.0])
+    eventos = ejecutar_simulacion(config, 5, motor=motor, semilla=11)
+    parejo = ejecutar_simulacion(dict(config, perfil_llegadas=None), 5, motor=motor, semilla=11)
+    if politica == "reprogramar":
+        # Cada llegada termina el día vacunada o reprogramada: el perfil no cambia cuántas llegan
+        assert len(eventos) == len(parejo)
+    primer_dia = eventos[eventos["dia"] == 0]
+    llegada = primer_dia["tiempo_simulacion"] - primer_dia["tiempo_en_sistema_minutos"]
+    # La mitad de las llegadas en los primeros 20 minutos y ninguna en los últimos 20
+    assert np.mean(llegada < 20) == pytest.approx(0.5, abs=0.08)
+    assert not np.any((llegada > 100 + 1e-3) & (llegada < 120 - 1e-3))
+    # El pico de la apertura alarga la espera
+    assert eventos["tiempo_espera_minutos"].mean() > parejo["tiempo_espera_minutos"].mean()
@@ -0,0 +1,23 @@
+# tests/test_main.py
+
+import subprocess
+import sys
+from benchmarks.suite import ARRANQUES
+
+def test_importar_main_no_carga_el_stack_pesado():
+    # `--help` y los procesos del pool no deben pagar pandas ni matplotlib al importar main
+    codigo = ("import sys, src.main; "
+              "print(','.join(m for m in ('pandas', 'matplotlib', 'seaborn', 'simpy') if m in sys.modules))")
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == ""
+
+def test_inicializar_trabajador_fuerza_backend_agg():
+    codigo = ("import src.main; src.main.inicializar_trabajador(); "
+              "import matplotlib; print(matplotlib.get_backend())")
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert salida.stdout.strip().lower() == "agg"
+
+def test_comando_de_arranque_medido_es_valido():
+    argumentos, _ = ARRANQUES["importacion.main_help"]
+    salida = subprocess.run([sys.executable, *argumentos], capture_output=True, text=True, check=True)
+    assert "--perfil" in salida.stdout
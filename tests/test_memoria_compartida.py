@@ -0,0 +1,68 @@
+# tests/test_memoria_compartida.py
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import textwrap
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+import pytest
+from src.memoria_compartida import exportar_dataframe, DataFrameCompartido
+
+def _eventos():
+    return pd.DataFrame({
+        "tiempo_simulacion": np.array([0.5, 1.0, 2.5]),
+        "dia": np.array([0, 0, 1], dtype=np.int32),
+        "evento": pd.Categorical(["Llegada", "Vacunado", "Llegada"]),
+        "cabina_id": np.array([-1, 2, -1], dtype=np.int16),
+    })
+
+def _exportar_en_trabajador(_):
+    return exportar_dataframe(_eventos())
+
+def test_ida_y_vuelta_sin_copiar():
+    original = _eventos()
+    descriptor = exportar_dataframe(original)
+    with DataFrameCompartido(descriptor) as compartido:
+        resultados_df = compartido.dataframe
+        pd.testing.assert_frame_equal(resultados_df, original)
+        assert np.shares_memory(resultados_df["tiempo_simulacion"].to_numpy(), compartido.vista("tiempo_simulacion"))
+        assert compartido.vista("evento").tolist() == original["evento"].cat.codes.tolist()
+    # Al cerrar con liberar=True el bloque ya no existe
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=descriptor["nombre"])
+
+def test_solo_columnas_pedidas():
+    descriptor = exportar_dataframe(_eventos())
+    with DataFrameCompartido(descriptor, columnas=("dia", "evento")) as compartido:
+        assert list(compartido.dataframe.columns) == ["dia", "evento"]
+
+def test_bloque_creado_en_un_proceso_del_pool():
+    with multiprocessing.Pool(processes=1) as pool:
+        descriptor = pool.map(_exportar_en_trabajador, [0])[0]
+    with DataFrameCompartido(descriptor) as compartido:
+        pd.testing.assert_frame_equal(compartido.dataframe, _eventos())
+
+def test_bloque_del_pool_sobrevive_en_un_interprete_nuevo():
+    # Sin un resource_tracker previo en el padre, el trabajador arranca el suyo, que borra lo que
+    # quede registrado cuando el pool termina: el bloque exportado no tiene que estar entre eso
+    programa = textwrap.dedent("""
+        import multiprocessing, time
+        import pandas as pd
+        from src.memoria_compartida import DataFrameCompartido
+        from tests.test_memoria_compartida import _eventos, _exportar_en_trabajador
+
+        if __name__ == "__main__":
+            with multiprocessing.Pool(processes=1) as pool:
+                descriptor = pool.map(_exportar_en_trabajador, [0])[0]
+            pool.join()
+            time.sleep(1.0)
+            with DataFrameCompartido(descriptor) as compartido:
+                pd.testing.assert_frame_equal(compartido.dataframe, _eventos())
+    """)
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    corrida = subprocess.run([sys.executable, "-c", programa], cwd=raiz, capture_output=True, text=True, timeout=60)
+    assert corrida.returncode == 0, corrida.stderr
+    assert "leaked" not in corrida.stderr
@@ -0,0 +1,63 @@
+# tests/test_modelo_analitico.py
+
+import pytest
+from src.modelo_analitico import (
+    cola_estacionaria,
+    estimar_campana,
+    cribar_configuraciones,
+    metricas_analiticas,
+    validar_modelo_analitico,
+    generar_reporte_validacion,
+)
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 1,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def test_cola_estacionaria_erlang_c():
+    """Sin abandono es la M/M/c: con c = 2 y a = 1, C(2, 1) = 1/3 y Lq = 1/3."""
+    resultado = cola_estacionaria(1 / 3, 3, 2, 0.0)
+    assert resultado["prob_ocupadas"] == pytest.approx(1 / 3)
+    assert resultado["cola_promedio"] == pytest.approx(1 / 3)
+    assert resultado["espera_promedio"] == pytest.approx(1.0)
+    # El abandono baja la carga efectiva: una entrada que satura sin abandono puede ser estable
+    assert cola_estacionaria(1.0, 3, 2, 0.0) is None
+    assert cola_estacionaria(1.0, 3, 2, 0.5) is not None
+
+def test_estimacion_saturada():
+    """Con la cola siempre llena se vacuna a capacidad plena: 40 por día, 2000 en 50 días."""
+    estimacion = estimar_campana(CONFIG_PRUEBA, 60)
+    assert estimacion["dias_hitos"]["100_porciento"] == pytest.approx(50.0)
+    assert estimacion["total_vacunados"] == pytest.approx(2000)
+    assert estimacion["utilizacion"] == pytest.approx(1.0)
+    assert estimar_campana(CONFIG_PRUEBA, 30)["dias_hitos"]["100_porciento"] is None
+
+def test_validacion_contra_simulacion(tmp_path):
+    """Días al 100% y espera de una campaña saturada dentro del 5% de la media simulada."""
+    filas = validar_modelo_analitico({"saturado": CONFIG_PRUEBA}, 60, num_replicas=3, semilla=1,
+                                     metricas=("hitos_vacunacion.100_porciento.dias", "tiempos_espera_minutos.promedio"))
+    assert len(filas) == 2
+    assert all(abs(fila["error_relativo"]) < 0.05 for fila in filas)
+    ruta = generar_reporte_validacion(filas, str(tmp_path))
+    assert ruta.endswith("validacion_modelo_analitico.csv")
+
+def test_cribado_ordena_por_costo_y_descarta_infactibles():
+    configs = {cabinas: dict(CONFIG_PRUEBA, num_cabinas=cabinas) for cabinas in (1, 3, 6, 12)}
+    filas = cribar_configuraciones(configs, 60, plazo_dias=20)
+    assert [fila["nombre"] for fila in filas if not fila["simular"]] == [1, 3]
+    simuladas = [fila for fila in filas if fila["simular"]]
+    assert filas[:len(simuladas)] == simuladas
+    costos = [fila["costo_total_campana"] for fila in simuladas]
+    assert costos == sorted(costos)
+
+def test_costo_estimado_igual_al_de_las_metricas_analiticas():
+    config = dict(CONFIG_PRUEBA, politica_cierre="reprogramar")
+    estimacion = estimar_campana(config, 10)
+    metricas = metricas_analiticas(config, 10)
+    assert estimacion["costo_total_campana"] == pytest.approx(metricas["costos"]["costo_total_campana"])
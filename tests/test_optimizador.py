@@ -0,0 +1,87 @@
+# tests/test_optimizador.py
+
+import numpy as np
+import pytest
+from src.acumuladores import AcumuladorMetricas
+from src.analysis import calcular_metricas_desde_acumuladores
+from src.motor_vectorizado import simular_vectorizado
+from src.config import ConfiguracionSimulacion
+from src.optimizador import (
+    cabinas_minimas_teoricas,
+    costo_campana,
+    criterio_abandono,
+    evaluar_configuracion,
+    optimizar_cabinas,
+)
+from src.simulation import crear_secuencia_semilla
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 1,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 2,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def test_optimizador_encuentra_minimo_factible():
+    """La configuración elegida cumple el plazo y con una cabina menos ya no lo cumple."""
+    resultado = optimizar_cabinas(CONFIG_PRUEBA, plazo_dias=20, horas_candidatas=[2, 3], n_replicas=5,
+                                  confianza=0.8, semilla=7)
+    mejor = resultado["mejor"]
+    assert mejor is not None and mejor["factible"]
+    assert mejor["num_cabinas"] >= cabinas_minimas_teoricas(dict(CONFIG_PRUEBA, horas_operacion_por_dia=mejor["horas_operacion_por_dia"]), 20)
+    assert mejor["costo_promedio"] == min(c["costo_promedio"] for c in resultado["candidatos"])
+
+    secuencias = crear_secuencia_semilla(7).spawn(5)
+    config_menos = dict(CONFIG_PRUEBA, num_cabinas=mejor["num_cabinas"] - 1,
+                        horas_operacion_por_dia=mejor["horas_operacion_por_dia"])
+    assert not evaluar_configuracion(config_menos, 20, secuencias, 0.8)["factible"]
+
+def test_presupuesto_insuficiente_no_devuelve_configuracion():
+    resultado = optimizar_cabinas(CONFIG_PRUEBA, plazo_dias=20, n_replicas=3, confianza=1.0, presupuesto=1.0, semilla=7)
+    assert resultado["mejor"] is None
+    assert resultado["candidatos"]
+
+def test_costo_igual_al_de_las_metricas():
+    """El costo de una réplica es el "costo_total_campana" de sus métricas con la misma duración."""
+    config = dict(CONFIG_PRUEBA, num_cabinas=3)
+    acumulador = AcumuladorMetricas(config["poblacion_total"], config["horas_operacion_por_dia"] * 60)
+    simular_vectorizado(config, 20, np.random.default_rng(3), destino=acumulador)
+    metricas = calcular_metricas_desde_acumuladores(acumulador, config, 20)
+    assert costo_campana(config, 20, acumulador) == pytest.approx(metricas["costos"]["costo_total_campana"])
+
+def test_sin_replicas_no_hay_evidencia():
+    with pytest.raises(ValueError):
+        optimizar_cabinas(CONFIG_PRUEBA, plazo_dias=20, n_replicas=0)
+
+def test_criterio_abandono_corta_corridas_infactibles():
+    """Una corrida que queda detrás de la trayectoria se corta antes del plazo."""
+    config = dict(CONFIG_PRUEBA, num_cabinas=2)
+    acumulador = AcumuladorMetricas(config["poblacion_total"], config["horas_operacion_por_dia"] * 60)
+    dias_simulados = []
+
+    criterio = criterio_abandono(config, plazo_dias=24)
+    def registrar(destino, dia):
+        dias_simulados.append(dia)
+        return criterio(destino, dia)
+
+    simular_vectorizado(config, 24, np.random.default_rng(0), destino=acumulador, criterio_parada=registrar)
+    assert 0 < dias_simulados[-1] < 23
+    assert acumulador.tiempos_hitos["100_porciento"] is None
+
+def test_dos_dosis_cuentan_todas_las_dosis():
+    config_dos = dict(CONFIG_PRUEBA, esquema_dos_dosis_habilitado=True)
+    una_dosis = AcumuladorMetricas(CONFIG_PRUEBA["poblacion_total"], 120)
+    una_dosis.total_vacunados = CONFIG_PRUEBA["poblacion_total"]
+    dos_dosis = AcumuladorMetricas(CONFIG_PRUEBA["poblacion_total"], 120, dosis_por_esquema=2)
+    dos_dosis.total_vacunados = 2 * CONFIG_PRUEBA["poblacion_total"]
+    diferencia = costo_campana(config_dos, 20, dos_dosis) - costo_campana(CONFIG_PRUEBA, 20, una_dosis)
+    assert diferencia == ConfiguracionSimulacion.COSTOS["costo_por_dosis"] * CONFIG_PRUEBA["poblacion_total"]
+
+    # Con toda la población con la primera dosis todavía falta la mitad de las dosis
+    acumulador = AcumuladorMetricas(CONFIG_PRUEBA["poblacion_total"], 120, dosis_por_esquema=2)
+    acumulador.total_vacunados = CONFIG_PRUEBA["poblacion_total"]
+    assert criterio_abandono(config_dos, plazo_dias=20)(acumulador, 17)
+    assert not criterio_abandono(CONFIG_PRUEBA, plazo_dias=20)(acumulador, 17)
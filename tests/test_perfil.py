@@ -0,0 +1,62 @@
+# tests/test_perfil.py
+
+import json
+import os
+import pytest
+import src.main as main
+from src.config import ConfiguracionSimulacion
+from src.perfil import PerfilEscenario, PERFIL_INACTIVO, modo_desde_entorno
+from src.simulation import ejecutar_simulacion
+
+CONFIG_PRUEBA = dict(ConfiguracionSimulacion.obtener_configuracion_escenario("base"), poblacion_total=5000)
+
+def test_perfil_inactivo_no_mide():
+    with PERFIL_INACTIVO.fase("simulacion"):
+        pass
+    assert PERFIL_INACTIVO.fases == {}
+    assert PERFIL_INACTIVO.contadores is None
+
+def test_fases_anidadas_no_se_solapan():
+    perfil = PerfilEscenario("fases")
+    with perfil.fase("externa"):
+        datos = bytearray(4 * 1024**2)
+        with perfil.fase("interna"):
+            otros = bytearray(8 * 1024**2)
+        del datos, otros
+    assert set(perfil.fases) == {"externa", "interna"}
+    assert perfil.fases["interna"]["pico_memoria_mb"] >= 8
+    # El pico de la externa incluye lo que asignó la interna
+    assert perfil.fases["externa"]["pico_memoria_mb"] >= 12
+    assert perfil.resumen()["segundos_total"] == pytest.approx(
+        perfil.fases["externa"]["segundos"] + perfil.fases["interna"]["segundos"])
+
+@pytest.mark.parametrize("politica", ["continuar", "reprogramar"])
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_contadores_del_motor(motor, politica):
+    perfil = PerfilEscenario("fases")
+    config = dict(CONFIG_PRUEBA, politica_cierre=politica)
+    resultados_df = ejecutar_simulacion(config, 3, motor=motor, semilla=1, perfil=perfil)
+    # El perfil no cambia la corrida
+    assert resultados_df.equals(ejecutar_simulacion(config, 3, motor=motor, semilla=1))
+    contadores = perfil.contadores
+    assert contadores["eventos_procesados"] == len(resultados_df)
+    assert contadores["procesos_creados"] >= len(resultados_df)
+    assert contadores["max_longitud_cola"] > 0
+    # Con cierre el motor vectorizado no arrastra pacientes al día siguiente
+    assert contadores["max_tamano_heap"] > 0 or (motor, politica) == ("vectorizado", "reprogramar")
+    assert "construccion_dataframe" in perfil.fases
+    if motor == "simpy":
+        # Cada paciente programa al menos su llegada, su pedido de cabina y su salida o abandono
+        assert contadores["eventos_simpy"] >= 2 * len(resultados_df)
+
+def test_ejecutar_escenario_guarda_perf_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("VACUNACION_PERFIL", "cprofile")
+    assert modo_desde_entorno() == "cprofile"
+    main.ejecutar_escenario("base", 1, motor="vectorizado", semilla=1, formato_salida="csv", usar_cache=False)
+
+    ruta_escenario = os.path.join("data", "output", "base")
+    perf = json.load(open(os.path.join(ruta_escenario, "perf.json")))
+    assert {"simulacion", "escritura_eventos", "analisis", "graficos", "escritura_metricas"} <= set(perf["fases"])
+    assert perf["contadores_motor"]["eventos_procesados"] > 0
+    assert os.path.exists(os.path.join(ruta_escenario, "perfil_simulacion.prof"))
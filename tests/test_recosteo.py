@@ -0,0 +1,95 @@
+# tests/test_recosteo.py
+
+import numpy as np
+import pytest
+from src.config import ConfiguracionSimulacion
+from src.barrido import expandir_grilla, ejecutar_barrido
+from src.simulation import ejecutar_simulacion
+from src.analysis import calcular_metricas_principales, calcular_metricas_desde_acumuladores
+from src.recosteo import (
+    PRECIOS_COSTO,
+    costos_desde_estadisticas,
+    estadisticas_desde_metricas,
+    cargar_estadisticas_cache,
+    matriz_estadisticas,
+    matriz_precios,
+    recostear,
+    tabla_recosteo,
+)
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 1,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+@pytest.fixture(scope="module")
+def corridas(tmp_path_factory):
+    ruta_cache = str(tmp_path_factory.mktemp("cache"))
+    configs = expandir_grilla({"num_cabinas": [2, 4, 8]}, CONFIG_PRUEBA)
+    barrido = ejecutar_barrido(configs, 20, semilla=3, procesos=1, ruta_cache=ruta_cache)
+    return barrido, cargar_estadisticas_cache(ruta_cache)
+
+def test_recosteo_con_los_precios_actuales_reproduce_las_metricas(corridas):
+    barrido, estadisticas = corridas
+    assert len(estadisticas) == 3
+    por_clave = {punto["clave"]: punto["metricas"] for punto in barrido["puntos"].values()}
+    nombres, matriz = matriz_estadisticas({clave: corrida["estadisticas"] for clave, corrida in estadisticas.items()})
+    costos = recostear(matriz, matriz_precios({}))
+    for columna, clave in enumerate(nombres):
+        metricas = por_clave[clave]
+        for partida in ("costo_total_campana", "costo_total_espera", "costo_total_con_espera", "costo_por_paciente_vacunado"):
+            assert costos[partida][0, columna] == pytest.approx(metricas["costos"][partida])
+        # La espera total es la espera promedio de los vacunados por su cantidad
+        generales = metricas["generales"]
+        assert metricas["estadisticas_costo"]["minutos_espera_total"] == pytest.approx(
+            metricas["tiempos_espera_minutos"]["promedio"] * generales["total_vacunados"])
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_espera_total_incluye_a_quienes_se_van_al_cierre(motor):
+    config = dict(CONFIG_PRUEBA, politica_cierre="reprogramar")
+    resultados_df = ejecutar_simulacion(config, 5, motor=motor, semilla=4)
+    reprogramados = resultados_df[resultados_df["evento"] == "Reprogramacion"]
+    assert reprogramados["tiempo_espera_minutos"].sum() > 0
+
+    estadisticas = calcular_metricas_principales(resultados_df, config, 5)["estadisticas_costo"]
+    assert estadisticas["minutos_espera_total"] == pytest.approx(
+        resultados_df["tiempo_espera_minutos"].to_numpy().sum(dtype=np.float64))
+    acumulador = ejecutar_simulacion(config, 5, motor=motor, semilla=4, modo="solo_metricas")
+    assert calcular_metricas_desde_acumuladores(acumulador, config, 5)["estadisticas_costo"] == pytest.approx(estadisticas)
+
+def test_metricas_sin_estadisticas_se_reconstruyen(corridas):
+    barrido, _ = corridas
+    metricas = dict(barrido["puntos"]["num_cabinas=4"]["metricas"])
+    guardadas = metricas.pop("estadisticas_costo")
+    assert estadisticas_desde_metricas(metricas, dict(CONFIG_PRUEBA, num_cabinas=4), 20) == pytest.approx(guardadas)
+    with pytest.raises(ValueError):
+        estadisticas_desde_metricas(metricas)
+
+def test_miles_de_variantes_en_una_pasada(corridas):
+    _, estadisticas = corridas
+    precio_espera = np.linspace(0, 50, 2000)
+    variantes = {"costo_por_minuto_espera_por_persona": precio_espera}
+    tabla = tabla_recosteo(estadisticas, variantes)
+    assert len(tabla) == 2000 * 3
+    assert (tabla["costo_por_dosis"] == ConfiguracionSimulacion.COSTOS["costo_por_dosis"]).all()
+
+    # Cada variante coincide con el cálculo escalar de la sección de costos
+    fila = tabla.iloc[-1]
+    costos = costos_desde_estadisticas(estadisticas[fila["clave"]]["estadisticas"],
+                                       dict(ConfiguracionSimulacion.COSTOS, costo_por_minuto_espera_por_persona=50.0))
+    assert fila["costo_total_con_espera"] == pytest.approx(costos["costo_total_con_espera"])
+    # El costo de la espera es lineal en su precio y el operativo no depende de él
+    por_corrida = tabla.groupby("clave")
+    assert all(np.allclose(np.diff(grupo["costo_total_espera"], 2), 0) for _, grupo in por_corrida)
+    assert (por_corrida["costo_total_campana"].nunique() == 1).all()
+
+    with pytest.raises(ValueError):
+        matriz_precios({"costo_por_cabina_adicional_una_vez": [1.0]})
+    with pytest.raises(ValueError):
+        matriz_precios({"costo_por_dosis": [1, 2], "costo_por_reprogramacion": [1, 2, 3]})
+    assert matriz_precios({"costo_por_dosis": [1, 2]}).shape == (2, len(PRECIOS_COSTO))
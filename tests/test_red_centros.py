@@ -0,0 +1,85 @@
+# tests/test_red_centros.py
+
+import pytest
+from src.analysis import calcular_metricas_desde_acumuladores
+from src.red_centros import configuraciones_centros, crear_red_sintetica, ejecutar_red
+from src.simulation import ejecutar_simulacion, crear_secuencia_semilla
+
+COMUNES = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 2,
+    "tasa_asistencia": 0.7,
+    "poblacion_total": 1000,
+    "asignacion_digitos_dias": {0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9]},
+}
+RED_PRUEBA = {
+    "parametros_comunes": COMUNES,
+    "centros": [
+        {"nombre": "grande", "num_cabinas": 3, "poblacion_total": 3000},
+        {"nombre": "chico", "horas_operacion_por_dia": 1, "poblacion_total": 600},
+        {"nombre": "mediano", "poblacion_total": 1500},
+    ],
+}
+
+def test_configuraciones_centros_sobrescriben_los_comunes():
+    configs = configuraciones_centros(RED_PRUEBA)
+    assert list(configs) == ["grande", "chico", "mediano"]
+    assert configs["grande"]["num_cabinas"] == 3 and configs["grande"]["horas_operacion_por_dia"] == 2
+    assert configs["chico"]["num_cabinas"] == 2 and configs["chico"]["horas_operacion_por_dia"] == 1
+    with pytest.raises(ValueError):
+        configuraciones_centros({"centros": [{"nombre": "a"}, {"nombre": "a"}]})
+
+def test_red_sintetica_reparte_toda_la_poblacion():
+    red = crear_red_sintetica(10, 500_000, semilla=3)
+    assert len(red["centros"]) == 10
+    assert sum(centro["poblacion_total"] for centro in red["centros"]) == 500_000
+    assert all(centro["num_cabinas"] >= 1 for centro in red["centros"])
+
+def test_red_no_depende_de_los_procesos_y_suma_los_centros():
+    secuencial = ejecutar_red(RED_PRUEBA, 5, semilla=8, procesos=1)
+    paralelo = ejecutar_red(RED_PRUEBA, 5, semilla=8, procesos=2)
+    assert paralelo == secuencial
+
+    red = secuencial["red"]
+    centros = secuencial["centros"]
+    assert red["parametros_escenario"]["num_cabinas"] == 7
+    assert red["parametros_escenario"]["poblacion_total"] == 5100
+    for clave in ("total_vacunados", "total_reprogramados"):
+        assert red["generales"][clave] == sum(metricas["generales"][clave] for metricas in centros.values())
+    assert red["costos"]["costo_total_campana"] == pytest.approx(
+        sum(metricas["costos"]["costo_total_campana"] for metricas in centros.values()))
+    # Los centros comparten el reloj por día: el "chico" atiende una hora de las dos de la red
+    # y en la otra no suma cola ni cabinas disponibles
+    configs = configuraciones_centros(RED_PRUEBA)
+    horas = {nombre: config["horas_operacion_por_dia"] for nombre, config in configs.items()}
+    assert red["longitud_cola"]["promedio"] == pytest.approx(
+        sum(metricas["longitud_cola"]["promedio"] * horas[nombre] / 2 for nombre, metricas in centros.items()))
+    disponible = {nombre: config["num_cabinas"] * horas[nombre] for nombre, config in configs.items()}
+    assert red["rendimiento"]["utilizacion_promedio_cabinas_porcentual"] == pytest.approx(
+        sum(metricas["rendimiento"]["utilizacion_promedio_cabinas_porcentual"] * disponible[nombre]
+            for nombre, metricas in centros.items()) / sum(disponible.values()))
+
+def test_centro_que_termina_antes_no_se_extrapola():
+    red_prueba = {"parametros_comunes": dict(COMUNES, tasa_asistencia=1.0),
+                  "centros": [{"nombre": "grande", "poblacion_total": 3000},
+                              {"nombre": "chico", "num_cabinas": 1, "poblacion_total": 300}]}
+    resultado = ejecutar_red(red_prueba, 20, semilla=2, procesos=1)
+    grande, chico = resultado["centros"]["grande"], resultado["centros"]["chico"]
+    assert chico["hitos_vacunacion"]["100_porciento"]["dias"] < 15
+    assert grande["hitos_vacunacion"]["100_porciento"]["dias"] == "No alcanzado"
+    # Con el chico vacío el resto de la campaña, la red queda por debajo de la suma de promedios
+    assert resultado["red"]["longitud_cola"]["promedio"] < (grande["longitud_cola"]["promedio"]
+                                                           + chico["longitud_cola"]["promedio"])
+    assert resultado["red"]["rendimiento"]["utilizacion_promedio_cabinas_porcentual"] < max(
+        grande["rendimiento"]["utilizacion_promedio_cabinas_porcentual"],
+        chico["rendimiento"]["utilizacion_promedio_cabinas_porcentual"])
+
+def test_centro_de_la_red_igual_que_corrida_suelta():
+    resultado = ejecutar_red(RED_PRUEBA, 5, semilla=8, procesos=1)
+    # El centro "chico" es el segundo de la red: usa el segundo flujo de la semilla
+    config = configuraciones_centros(RED_PRUEBA)["chico"]
+    acumulador = ejecutar_simulacion(config, 5, motor="vectorizado", semilla=crear_secuencia_semilla(8).spawn(3)[1],
+                                     modo="solo_metricas")
+    assert resultado["centros"]["chico"] == calcular_metricas_desde_acumuladores(acumulador, config, 5)
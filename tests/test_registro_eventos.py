@@ -0,0 +1,51 @@
+# tests/test_registro_eventos.py
+
+import numpy as np
+from src.registro_eventos import (
+    RegistroEventos, agregar_ids_paciente, EVENTO_VACUNADO, EVENTO_REPROGRAMACION
+)
+
+def test_registro_crece_y_conserva_eventos():
+    """El registro reserva bloques nuevos sin perder eventos agregados de a uno o en bloque."""
+    registro = RegistroEventos(filas_por_bloque=2)
+    for i in range(5):
+        registro.agregar(float(i), 0, i, 3, EVENTO_VACUNADO, i, 1.5, 4.5)
+    registro.extender({
+        "tiempo_simulacion": np.array([10.0, 11.0]),
+        "dia": np.array([1, 1]),
+        "paciente": np.array([0, 1]),
+        "digito_dni": np.array([2, 2]),
+        "evento": np.array([EVENTO_REPROGRAMACION, EVENTO_VACUNADO]),
+        "longitud_cola_actual": np.array([7, 0]),
+        "tiempo_espera_minutos": np.array([0.0, 2.0]),
+        "tiempo_en_sistema_minutos": np.array([0.0, 5.0]),
+    })
+
+    assert len(registro) == 7
+    datos = registro.como_array()
+    assert datos["paciente"].tolist() == [0, 1, 2, 3, 4, 0, 1]
+    assert datos["longitud_cola_actual"][5] == 7
+
+def test_dataframe_compacto_y_categorico():
+    """El DataFrame usa tipos compactos y la etiqueta del evento es categórica."""
+    registro = RegistroEventos()
+    registro.agregar(1.0, 0, 0, 1, EVENTO_VACUNADO, 0, 0.0, 3.0)
+    registro.agregar(2.0, 0, 1, 0, EVENTO_REPROGRAMACION, 2, 0.0, 0.0)
+    df = registro.a_dataframe()
+
+    assert df["evento"].dtype == "category"
+    assert df["evento"].tolist() == ["Vacunado", "Reprogramacion"]
+    assert df["dia"].dtype == np.int32
+    assert df["digito_dni"].dtype == np.int8
+    assert df["tiempo_espera_minutos"].dtype == np.float32
+    assert (df["evento"] == "Vacunado").sum() == 1
+
+def test_ids_paciente_derivados_al_exportar():
+    """`agregar_ids_paciente` reconstruye el ID legible con el esquema original de columnas."""
+    registro = RegistroEventos()
+    registro.agregar(1.0, 4, 17, 9, EVENTO_VACUNADO, 0, 0.0, 3.0)
+    exportado = agregar_ids_paciente(registro.a_dataframe())
+
+    assert exportado["paciente_id"].tolist() == ["Dia4_Digito9_Pac17"]
+    assert list(exportado.columns[:4]) == ["tiempo_simulacion", "dia", "paciente_id", "digito_dni"]
+    assert "paciente" not in exportado.columns
@@ -0,0 +1,121 @@
+# tests/test_replicas.py
+
+import pytest
+from src.replicas import (ejecutar_replicas, resumir_replicas, valor_critico_t_95, comparar_escenarios_pareados,
+                          ejecutar_replicas_adaptativas)
+
+CONFIG_PRUEBA = {
+    "num_cabinas": 2,
+    "tiempo_promedio_vacunacion_minutos": 3,
+    "probabilidad_reprogramacion": 0.2,
+    "horas_operacion_por_dia": 1,
+    "tasa_asistencia": 0.5,
+    "poblacion_total": 2000,
+    "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+}
+
+def test_resumir_replicas_media_e_intervalo():
+    """La media, el desvío y el IC 95% se calculan sobre las métricas numéricas aplanadas."""
+    metricas = [
+        {"generales": {"total_vacunados": 10}, "hitos_vacunacion": {"100_porciento": {"dias": "No alcanzado"}}},
+        {"generales": {"total_vacunados": 12}, "hitos_vacunacion": {"100_porciento": {"dias": "No alcanzado"}}},
+        {"generales": {"total_vacunados": 14}, "hitos_vacunacion": {"100_porciento": {"dias": "No alcanzado"}}},
+    ]
+    resumen = resumir_replicas(metricas)
+
+    vacunados = resumen["generales.total_vacunados"]
+    assert vacunados["media"] == pytest.approx(12.0)
+    assert vacunados["desviacion_estandar"] == pytest.approx(2.0)
+    semiamplitud = 4.303 * 2.0 / 3 ** 0.5
+    assert vacunados["ic95_inferior"] == pytest.approx(12.0 - semiamplitud)
+    assert vacunados["ic95_superior"] == pytest.approx(12.0 + semiamplitud)
+    # Los valores no numéricos no forman parte del resumen
+    assert "hitos_vacunacion.100_porciento.dias" not in resumen
+
+def test_valor_critico_t_95():
+    """La tabla y la aproximación asintótica de la t de Student son consistentes."""
+    assert valor_critico_t_95(1) == pytest.approx(12.706)
+    assert valor_critico_t_95(60) == pytest.approx(2.000, abs=1e-3)
+    assert valor_critico_t_95(10_000) == pytest.approx(1.960, abs=1e-3)
+
+def test_ejecutar_replicas_reproducible():
+    """Con la misma semilla las réplicas se reproducen, incluso repartidas en un pool de procesos."""
+    resumen_serie = ejecutar_replicas(CONFIG_PRUEBA, dias=2, n=4, semilla=11, procesos=1)
+    resumen_pool = ejecutar_replicas(CONFIG_PRUEBA, dias=2, n=4, semilla=11, procesos=2)
+
+    assert resumen_serie["replicas"] == 4
+    vacunados_serie = resumen_serie["metricas"]["generales.total_vacunados"]
+    vacunados_pool = resumen_pool["metricas"]["generales.total_vacunados"]
+    assert vacunados_serie == vacunados_pool
+    assert vacunados_serie["n"] == 4
+    assert vacunados_serie["ic95_inferior"] <= vacunados_serie["media"] <= vacunados_serie["ic95_superior"]
+
+def test_comparacion_pareada_angosta_el_intervalo():
+    """
+    Con números aleatorios comunes, subir la asistencia solo agrega pacientes al final de cada
+    día: la diferencia pareada tiene un IC mucho más angosto que el de los escenarios por separado.
+    """
+    configs = {
+        "referencia": dict(CONFIG_PRUEBA, num_cabinas=3),
+        "mas_asistencia": dict(CONFIG_PRUEBA, num_cabinas=3, tasa_asistencia=0.55),
+    }
+    comparacion = comparar_escenarios_pareados(configs, 5, 6, semilla=4, procesos=1)
+
+    assert comparacion["referencia"] == "referencia"
+    assert "numeros_aleatorios_comunes" not in configs["referencia"]
+    diferencia = comparacion["diferencias"]["mas_asistencia"]["generales.total_reprogramados"]
+    assert diferencia["n"] == 6
+    assert diferencia["ic95_inferior"] > 0
+    semiamplitudes = [
+        resumen["generales.total_reprogramados"]["ic95_superior"] - resumen["generales.total_reprogramados"]["media"]
+        for resumen in comparacion["escenarios"].values()
+    ]
+    assert diferencia["ic95_superior"] - diferencia["media"] < min(semiamplitudes)
+
+
+def test_replicas_adaptativas_cortan_al_alcanzar_la_precision():
+    """Una precisión holgada se alcanza con el mínimo de réplicas; una exigente agota el presupuesto."""
+    metricas = ("generales.total_vacunados",)
+    holgada = ejecutar_replicas_adaptativas(CONFIG_PRUEBA, 5, semilla=3, precision_relativa=0.5, metricas_objetivo=metricas,
+                                            replicas_por_lote=2, min_replicas=4, procesos=1)
+    assert holgada["convergio"]
+    assert holgada["observaciones"] == 4 and holgada["lotes"] == 2
+    assert holgada["metricas"]["generales.total_vacunados"]["n"] == 4
+    # La observación `i` es la réplica `i` de la corrida con número fijo de réplicas
+    fijas = ejecutar_replicas(CONFIG_PRUEBA, 5, 4, semilla=3, procesos=1)
+    assert holgada["metricas"]["generales.total_vacunados"] == fijas["metricas"]["generales.total_vacunados"]
+
+    exigente = ejecutar_replicas_adaptativas(CONFIG_PRUEBA, 5, semilla=3, precision_relativa=1e-9,
+                                             metricas_objetivo=metricas + ("no.existe",), replicas_por_lote=2,
+                                             max_replicas=6, procesos=1)
+    assert not exigente["convergio"]
+    assert exigente["corridas"] == 6
+    assert exigente["metricas_sin_datos"] == ["no.existe"]
+
+def test_replicas_adaptativas_no_cortan_con_hitos_censurados():
+    """Un hito que no alcanzan todas las réplicas no deja converger, aunque su media sea estable."""
+    metricas = ("hitos_vacunacion.100_porciento.dias", "costos.costo_total_campana")
+    config = dict(CONFIG_PRUEBA, poblacion_total=40, probabilidad_reprogramacion=0.5)
+    censurada = ejecutar_replicas_adaptativas(config, 10, semilla=1, precision_relativa=0.5, metricas_objetivo=metricas,
+                                              replicas_por_lote=4, max_replicas=8, procesos=1)
+    assert not censurada["convergio"]
+    assert censurada["corridas"] == 8
+    assert censurada["metricas_censuradas"] == {"hitos_vacunacion.100_porciento.dias": 4}
+    assert censurada["precision_alcanzada"]["hitos_vacunacion.100_porciento.dias"] == float("inf")
+    # Con días de sobra todas lo alcanzan y alcanza el mínimo de réplicas
+    completa = ejecutar_replicas_adaptativas(config, 12, semilla=1, precision_relativa=0.5, metricas_objetivo=metricas,
+                                             replicas_por_lote=4, max_replicas=8, procesos=1)
+    assert completa["convergio"] and completa["observaciones"] == 4
+    assert completa["metricas_censuradas"] == {}
+    # Un hito que ninguna réplica alcanza tampoco se saltea
+    sin_datos = ejecutar_replicas_adaptativas(config, 5, semilla=1, precision_relativa=0.5, metricas_objetivo=metricas,
+                                              replicas_por_lote=4, max_replicas=8, procesos=1)
+    assert not sin_datos["convergio"] and sin_datos["corridas"] == 8
+    assert sin_datos["metricas_sin_datos"] == ["hitos_vacunacion.100_porciento.dias"]
+
+def test_replicas_adaptativas_antiteticas_promedian_pares():
+    resumen = ejecutar_replicas_adaptativas(CONFIG_PRUEBA, 5, semilla=3, precision_relativa=0.5, antiteticas=True,
+                                            replicas_por_lote=4, min_replicas=2, procesos=1)
+    assert resumen["antiteticas"]
+    assert resumen["corridas"] == 2 * resumen["observaciones"]
+    assert resumen["metricas"]["generales.total_vacunados"]["n"] == resumen["observaciones"]
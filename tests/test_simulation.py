@@ -1,7 +1,9 @@
 # tests/test_simulation.py
 
+import numpy as np
+import pandas as pd
 import pytest
-from src.simulation import ejecutar_simulacion
+from src.simulation import ejecutar_simulacion, ejecutar_simulacion_vectorizada
 
 def test_ejecucion_smoke_test():
     """
@@ -28,8 +30,9 @@ def test_ejecucion_smoke_test():
     # Si se produjeron eventos, verificar la estructura
     if not resultados_df.empty:
         # 2. Asegurar que el DataFrame tiene las columnas esperadas
+        # El ID legible del paciente se deriva a demanda a partir del ordinal `paciente`
         columnas_esperadas = [
-            "tiempo_simulacion", "paciente_id", "evento", 
+            "tiempo_simulacion", "paciente", "evento", 
             "longitud_cola_actual", "tiempo_espera_minutos", "tiempo_en_sistema_minutos"
         ]
         for col in columnas_esperadas:
@@ -60,3 +63,218 @@ def test_simulacion_sin_reprogramacion():
     if not resultados_df.empty:
         # Asegurar que no hay ningún evento "Reprogramacion"
         assert "Reprogramacion" not in resultados_df["evento"].unique()
+
+def test_motor_vectorizado_mismo_esquema():
+    """El motor vectorizado devuelve las mismas columnas y tipos de evento que el modelo SimPy."""
+    config_test = {
+        "num_cabinas": 2,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.2,
+        "horas_operacion_por_dia": 1,
+        "tasa_asistencia": 0.9,
+        "poblacion_total": 2000,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+    }
+
+    df_simpy = ejecutar_simulacion(dict(config_test), duracion_dias=2)
+    df_vectorizado = ejecutar_simulacion(dict(config_test), duracion_dias=2, motor="vectorizado")
+
+    assert list(df_vectorizado.columns) == list(df_simpy.columns)
+    assert set(df_vectorizado["evento"].unique()).issubset({"Vacunado", "Reprogramacion"})
+    # Los eventos se registran en orden de tiempo y nunca después del límite de la simulación
+    assert df_vectorizado["tiempo_simulacion"].is_monotonic_increasing
+    assert df_vectorizado["tiempo_simulacion"].max() <= 2 * 60
+
+def test_motor_vectorizado_parada_temprana():
+    """Ambos motores se detienen exactamente al vacunar a la población objetivo."""
+    config_test = {
+        "num_cabinas": 5,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.2,
+        "horas_operacion_por_dia": 2,
+        "tasa_asistencia": 0.5,
+        "poblacion_total": 300,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+    }
+    for motor in ("simpy", "vectorizado"):
+        resultados_df = ejecutar_simulacion(dict(config_test), duracion_dias=30, motor=motor)
+        assert (resultados_df["evento"] == "Vacunado").sum() == 300
+
+def test_motor_vectorizado_equivalencia_estadistica():
+    """
+    Compara las medias de varias réplicas de ambos motores con un test z de dos muestras:
+    las diferencias deben ser compatibles con ruido de muestreo.
+    """
+    config_test = {
+        "num_cabinas": 2,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.3,
+        "horas_operacion_por_dia": 2,
+        "tasa_asistencia": 0.5,
+        "poblacion_total": 2000,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+    }
+
+    def resumen(df):
+        vacunados = df[df["evento"] == "Vacunado"]
+        return (
+            len(vacunados),
+            int((df["evento"] == "Reprogramacion").sum()),
+            vacunados["tiempo_espera_minutos"].mean(),
+            df["longitud_cola_actual"].mean(),
+        )
+
+    replicas = 60
+    muestras_simpy, muestras_vectorizado = [], []
+    for i in range(replicas):
+        muestras_simpy.append(resumen(ejecutar_simulacion(config_test, duracion_dias=3, semilla=i)))
+        muestras_vectorizado.append(resumen(
+            ejecutar_simulacion_vectorizada(dict(config_test), 3, rng=np.random.default_rng(1000 + i))
+        ))
+
+    muestras_simpy = np.array(muestras_simpy)
+    muestras_vectorizado = np.array(muestras_vectorizado)
+    error_estandar = np.sqrt((muestras_simpy.var(axis=0, ddof=1) + muestras_vectorizado.var(axis=0, ddof=1)) / replicas)
+    z = np.abs(muestras_simpy.mean(axis=0) - muestras_vectorizado.mean(axis=0)) / error_estandar
+    assert np.all(z < 4)
+
+def test_motor_desconocido():
+    """Un nombre de motor inválido lanza ValueError."""
+    with pytest.raises(ValueError) as excinfo:
+        ejecutar_simulacion({}, duracion_dias=1, motor="inexistente")
+    assert "Motor de simulación desconocido" in str(excinfo.value)
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_semilla_reproduce_corrida(motor):
+    """La misma semilla reproduce exactamente la misma corrida; otra semilla la cambia."""
+    config_test = {
+        "num_cabinas": 2,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.2,
+        "horas_operacion_por_dia": 1,
+        "tasa_asistencia": 0.5,
+        "poblacion_total": 2000,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] }
+    }
+    df_a = ejecutar_simulacion(config_test, duracion_dias=2, motor=motor, semilla=7)
+    df_b = ejecutar_simulacion(config_test, duracion_dias=2, motor=motor, semilla=7)
+    df_c = ejecutar_simulacion(config_test, duracion_dias=2, motor=motor, semilla=8)
+
+    pd.testing.assert_frame_equal(df_a, df_b)
+    assert not df_a["tiempo_simulacion"].equals(df_c["tiempo_simulacion"])
+    # La configuración del escenario no queda modificada por la corrida
+    assert "estado_sim" not in config_test
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_esquema_dos_dosis(motor):
+    """
+    Con dos dosis cada primera dosis vuelve 15 días operativos después (21 días de calendario),
+    la corrida termina al completar los esquemas y los hitos se reportan por separado.
+    """
+    config_test = {
+        "num_cabinas": 3,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.2,
+        "horas_operacion_por_dia": 2,
+        "tasa_asistencia": 0.5,
+        "poblacion_total": 1000,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] },
+        "esquema_dos_dosis_habilitado": True,
+        "intervalo_dos_dosis_dias": 21,
+    }
+    from src.analysis import calcular_metricas_principales
+    resultados_df = ejecutar_simulacion(config_test, duracion_dias=60, motor=motor, semilla=3)
+    vacunados = resultados_df[resultados_df["evento"] == "Vacunado"]
+
+    assert (vacunados["dosis"] == 2).sum() == 1000
+    assert (vacunados["dosis"] == 1).sum() >= 1000
+    # Ninguna segunda dosis antes del día 15 de operación
+    assert vacunados.loc[vacunados["dosis"] == 2, "tiempo_simulacion"].min() >= 15 * 120
+
+    metricas = calcular_metricas_principales(resultados_df, config_test, 60)
+    assert metricas["generales"]["total_esquemas_completos"] == 1000
+    assert metricas["hitos_primera_dosis"]["100_porciento"]["dias"] + 14 < metricas["hitos_vacunacion"]["100_porciento"]["dias"]
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+def test_politica_cierre_reprogramar_vacia_el_centro(motor):
+    """
+    Con la política "reprogramar" nadie empieza a vacunarse después del cierre: quien sigue en
+    la cola se reprograma en ese instante y el día siguiente arranca con el centro vacío.
+    """
+    config_test = {
+        "num_cabinas": 2,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.0,
+        "horas_operacion_por_dia": 1,
+        "tasa_asistencia": 0.5,
+        "poblacion_total": 2000,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] },
+        "politica_cierre": "reprogramar",
+    }
+    resultados_df = ejecutar_simulacion(config_test, duracion_dias=3, motor=motor, semilla=5)
+    fin_del_dia = (resultados_df["dia"] + 1) * 60
+    vacunados = resultados_df[resultados_df["evento"] == "Vacunado"]
+    inicios = vacunados["tiempo_simulacion"] - vacunados["tiempo_en_sistema_minutos"] + vacunados["tiempo_espera_minutos"]
+
+    assert (inicios < fin_del_dia[vacunados.index]).all()
+    # Sin reprogramación por cola llena, todas las reprogramaciones son al cierre
+    reprogramados = resultados_df[resultados_df["evento"] == "Reprogramacion"]
+    assert len(reprogramados) > 0
+    assert np.allclose(reprogramados["tiempo_simulacion"], fin_del_dia[reprogramados.index])
+
+@pytest.mark.parametrize("motor", ["simpy", "vectorizado"])
+@pytest.mark.parametrize("politica", ["vaciar_cola", "reprogramar"])
+def test_dias_en_paralelo_igual_que_en_serie(motor, politica):
+    """Con días independientes, repartirlos en procesos da la misma corrida, parada temprana incluida."""
+    from src.acumuladores import EstadisticasTiempo
+    config_test = {
+        "num_cabinas": 3,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.2,
+        "horas_operacion_por_dia": 1,
+        "tasa_asistencia": 0.4,
+        "poblacion_total": 800,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] },
+        "politica_cierre": politica,
+    }
+    estadisticas_serie = EstadisticasTiempo(3)
+    estadisticas_paralelo = EstadisticasTiempo(3)
+    en_serie = ejecutar_simulacion(config_test, duracion_dias=30, motor=motor, semilla=11,
+                                   estadisticas_tiempo=estadisticas_serie)
+    en_paralelo = ejecutar_simulacion(config_test, duracion_dias=30, motor=motor, semilla=11,
+                                      estadisticas_tiempo=estadisticas_paralelo, procesos=2)
+
+    pd.testing.assert_frame_equal(en_serie, en_paralelo)
+    assert (en_serie["evento"] == "Vacunado").sum() == 800
+    assert estadisticas_serie.cola_promedio == estadisticas_paralelo.cola_promedio
+    assert estadisticas_serie.utilizacion == estadisticas_paralelo.utilizacion
+
+def test_dias_en_paralelo_requiere_politica_de_cierre():
+    """Sin una política que vacíe el centro, los días arrastran cola y no se pueden repartir."""
+    from src.config import ConfiguracionSimulacion
+    with pytest.raises(ValueError) as excinfo:
+        ejecutar_simulacion(ConfiguracionSimulacion.ESCENARIO_BASE, duracion_dias=2, motor="vectorizado", procesos=2)
+    assert "política de cierre" in str(excinfo.value)
+
+def test_numeros_comunes_mismos_pacientes_en_ambos_motores():
+    """
+    Con números aleatorios comunes cada paciente trae sus propios números (llegada, dígito,
+    servicio, reprogramación): los dos motores recorren exactamente la misma campaña.
+    """
+    config_test = {
+        "num_cabinas": 3,
+        "tiempo_promedio_vacunacion_minutos": 3,
+        "probabilidad_reprogramacion": 0.2,
+        "horas_operacion_por_dia": 2,
+        "tasa_asistencia": 0.7,
+        "poblacion_total": 2000,
+        "asignacion_digitos_dias": { 0: [0, 1], 1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9] },
+        "numeros_aleatorios_comunes": True,
+    }
+    vectorizado = ejecutar_simulacion(config_test, duracion_dias=4, motor="vectorizado", semilla=2)
+    simpy_df = ejecutar_simulacion(config_test, duracion_dias=4, motor="simpy", semilla=2)
+
+    assert len(vectorizado) == len(simpy_df)
+    assert np.allclose(vectorizado["tiempo_simulacion"], simpy_df["tiempo_simulacion"])
+    assert (vectorizado["paciente"].to_numpy() == simpy_df["paciente"].to_numpy()).all()
+    assert (vectorizado["evento"] == simpy_df["evento"]).all()
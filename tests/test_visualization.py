@@ -6,8 +6,12 @@ import numpy as np
 import os
 from src.visualization import (
     generar_visualizaciones_escenario, 
-    plot_comparacion_escenarios
+    plot_comparacion_escenarios,
+    reducir_serie,
+    histograma_con_kde,
+    generar_visualizaciones_desde_archivo
 )
+import src.visualization as visualization
 
 @pytest.fixture
 def datos_simulacion_completos():
@@ -113,3 +117,65 @@ def test_histograma_sin_tiempos_de_espera(tmp_path):
     assert not os.path.isfile(ruta_guardado / "histograma_tiempos_espera.png")
     # Pero los otros gráficos sí deberían crearse
     assert os.path.isfile(ruta_guardado / "vacunados_acumulados.png")
+
+def test_reducir_serie_conserva_envolvente():
+    """
+    Verifica que la serie reducida tiene a lo sumo el máximo de puntos, conserva los extremos
+    y que cada punto original queda dentro del mínimo y máximo de su intervalo.
+    """
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0, 1000, 200000))
+    y = rng.integers(0, 500, len(x))
+    x_reducida, y_reducida = reducir_serie(x, y, max_puntos=1000)
+
+    assert len(x_reducida) <= 1000 + 2
+    assert np.all(np.diff(x_reducida) >= 0)
+    assert x_reducida[0] == x[0] and x_reducida[-1] == x[-1]
+    assert y_reducida.max() == y.max() and y_reducida.min() == y.min()
+
+    intervalos = np.minimum((x / 1000 * 500).astype(int), 499)
+    intervalos_reducidos = np.minimum((x_reducida / 1000 * 500).astype(int), 499)
+    for intervalo in (0, 137, 499):
+        originales = y[intervalos == intervalo]
+        reducidos = y_reducida[intervalos_reducidos == intervalo]
+        assert reducidos.min() == originales.min() and reducidos.max() == originales.max()
+
+def test_histograma_con_kde_coincide_con_kde_exacta():
+    """Verifica que la KDE agrupada coincide con la KDE gaussiana exacta escalada a conteos."""
+    valores = np.random.default_rng(1).gamma(2, 10, 5000)
+    bordes, conteos, grilla, curva = histograma_con_kde(valores, bins=30)
+
+    assert conteos.sum() == len(valores)
+    ancho_banda = valores.std(ddof=1) * len(valores) ** (-1 / 5)
+    exacta = np.exp(-0.5 * ((grilla[:, None] - valores[None, :]) / ancho_banda) ** 2).sum(axis=1)
+    exacta *= (bordes[1] - bordes[0]) / (ancho_banda * np.sqrt(2 * np.pi))
+    assert np.max(np.abs(curva - exacta)) < 0.01 * exacta.max()
+
+def test_visualizaciones_desde_archivo_igual_que_en_memoria(tmp_path, monkeypatch):
+    """Graficar el archivo de a lotes dibuja el mismo histograma y la misma envolvente de la cola."""
+    from src.config import ConfiguracionSimulacion
+    from src.simulation import ejecutar_simulacion
+
+    config = dict(ConfiguracionSimulacion.obtener_configuracion_escenario("base"), poblacion_total=5000)
+    ruta = str(tmp_path / "eventos.parquet")
+    ejecutar_simulacion(config, 5, motor="vectorizado", semilla=6, modo="en_disco", ruta_eventos=ruta)
+    resultados_df = ejecutar_simulacion(config, 5, motor="vectorizado", semilla=6)
+
+    dibujados = {}
+    monkeypatch.setattr(visualization, "_guardar_histograma",
+                        lambda *argumentos: dibujados.setdefault("por_lotes" in argumentos[-1], argumentos))
+    monkeypatch.setattr(visualization, "_guardar_serie",
+                        lambda dias, valores, ruta_archivo, *resto, **estilo: dibujados.setdefault(ruta_archivo, valores))
+    generar_visualizaciones_desde_archivo(ruta, str(tmp_path / "por_lotes"), config)
+    generar_visualizaciones_escenario(resultados_df, str(tmp_path / "en_memoria"), config)
+
+    bordes, conteos, grilla, curva, _ = dibujados[True]
+    bordes_memoria, conteos_memoria, _, curva_memoria, _ = dibujados[False]
+    np.testing.assert_allclose(bordes, bordes_memoria)
+    np.testing.assert_array_equal(conteos, conteos_memoria)
+    np.testing.assert_allclose(curva, curva_memoria, rtol=1e-6)
+    cola_lotes = dibujados[os.path.join(str(tmp_path / "por_lotes"), "longitud_cola.png")]
+    cola_memoria = dibujados[os.path.join(str(tmp_path / "en_memoria"), "longitud_cola.png")]
+    assert cola_lotes.max() == cola_memoria.max() and cola_lotes.min() == cola_memoria.min()
+    vacunados = dibujados[os.path.join(str(tmp_path / "por_lotes"), "vacunados_acumulados.png")]
+    assert vacunados[-1] == (resultados_df["evento"] == "Vacunado").sum()